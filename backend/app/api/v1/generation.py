@@ -1,21 +1,74 @@
 """
 Jukeyman Autonomous Media Station (JAMS) - Generation API Routes
 """
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from uuid import UUID
+from pydantic import BaseModel, Field, confloat, conint
+from typing import Dict, Optional, List, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime
+import asyncio
+import base64
+import hashlib
+import json
 import logging
+import time
 
-from app.core.database import get_db, set_tenant_context
-from app.core.security import get_current_user, get_current_tenant
+from app.core.config import settings
+from app.core.database import get_db, get_db_context, set_tenant_context
+from app.core.security import (
+    create_stream_token,
+    get_current_user,
+    get_current_stream_user,
+    get_current_tenant,
+)
 from app.models.user import User
 from app.models.tenant import Tenant
 from app.models.generation import Generation
-from app.services.comfyui_service import comfyui_service
+from app.services.comfyui_pool import comfyui_pool
 from app.services.storage_service import storage_service
-from app.tasks.generation_tasks import generate_image_task
+from app.services.generation_cache import generation_cache, image_cache_key
+from app.services.generation_control import DEFAULT_PRIORITY, request_cancel
+from app.services.generation_grid import expand_grid, plan_grid_prompts
+from app.services.generation_jobs import dispatch_generation, get_queue_position
+from app.services.generation_status import (
+    generation_status,
+    EVENT_FIELDS,
+    TERMINAL_STATUSES,
+)
+from app.services.generation_events import generation_events
+from app.services.fair_scheduler import fair_scheduler
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.services.video_pipeline import plan_segments
+from app.services.voice_pipeline import (
+    CONTENT_TYPE as VOICE_CONTENT_TYPE,
+    tts_client,
+    voice_pipeline,
+)
+from app.services.llm_service import (
+    CONTENT_TYPE as TEXT_CONTENT_TYPE,
+    TokenStats,
+    llm_client,
+)
+from app.services.async_storage_service import async_storage_service
+from app.tasks.generation_tasks import (
+    generate_image_task,
+    generate_image_grid_task,
+    generate_video_task,
+    generate_voice_task,
+    generate_text_task,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +90,20 @@ class ImageGenerationRequest(BaseModel):
     batch_size: int = Field(1, ge=1, le=4)
 
 
+class ImageGridRequest(BaseModel):
+    base: ImageGenerationRequest
+    seeds: List[int] = Field(default_factory=list, max_length=64)
+    cfgs: List[confloat(ge=1.0, le=30.0)] = Field(default_factory=list, max_length=64)
+    steps: List[conint(ge=1, le=150)] = Field(default_factory=list, max_length=64)
+
+
 class VideoGenerationRequest(BaseModel):
     prompt: str = Field(..., min_length=1, max_length=5000)
-    duration: int = Field(10, ge=1, le=60)
+    negative_prompt: Optional[str] = Field(None, max_length=5000)
+    duration: int = Field(10, ge=1, le=settings.MAX_VIDEO_DURATION)
     fps: int = Field(24, ge=15, le=60)
     resolution: str = Field("720p", pattern="^(480p|720p|1080p)$")
+    seed: int = Field(-1)
 
 
 class VoiceGenerationRequest(BaseModel):
@@ -58,6 +120,12 @@ class TextGenerationRequest(BaseModel):
     temperature: float = Field(0.7, ge=0.0, le=2.0)
 
 
+class StatusBatchRequest(BaseModel):
+    ids: List[UUID] = Field(
+        ..., min_length=1, max_length=settings.GENERATION_STATUS_BATCH_MAX_IDS
+    )
+
+
 # Response Models
 class GenerationResponse(BaseModel):
     id: UUID
@@ -65,26 +133,171 @@ class GenerationResponse(BaseModel):
     type: str
     prompt: str
     output_url: Optional[str]
+    thumbnail_url: Optional[str] = None
+    progress: Optional[int] = None
+    queue_position: Optional[int] = None
     created_at: str
 
 
+class GenerationStatusItem(BaseModel):
+    status: str
+    progress: Optional[int] = None
+    output_url: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int
+
+
+class GridCell(BaseModel):
+    generation_id: UUID
+    seed: int
+    cfg: float
+    steps: int
+    status: str
+    output_url: Optional[str]
+
+
+class GridResponse(BaseModel):
+    grid_id: UUID
+    status: str
+    cells: List[GridCell]
+
+
+def _grid_response(
+    grid_id, generations, hot: Optional[Dict[str, dict]] = None
+) -> GridResponse:
+    # Cells in flight are further along in the hot-status store
+    hot = hot or {}
+    cells = [(g, hot.get(str(g.id), {})) for g in generations]
+    statuses = {fields.get("status", g.status) for g, fields in cells}
+    if statuses <= {"completed"}:
+        grid_status = "completed"
+    elif statuses & {"queued", "processing"}:
+        grid_status = (
+            "processing"
+            if "processing" in statuses or "completed" in statuses
+            else "queued"
+        )
+    else:
+        grid_status = "failed" if "failed" in statuses else "cancelled"
+
+    return GridResponse(
+        grid_id=grid_id,
+        status=grid_status,
+        cells=[
+            GridCell(
+                generation_id=g.id,
+                seed=g.parameters["seed"],
+                cfg=g.parameters["cfg"],
+                steps=g.parameters["steps"],
+                status=fields.get("status", g.status),
+                output_url=fields.get("output_url", g.output_url),
+            )
+            for g, fields in cells
+        ],
+    )
+
+
+class IdempotentRequest:
+    """Idempotency-Key state of one /generate/* request"""
+
+    def __init__(
+        self,
+        scope: Optional[str] = None,
+        key: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        replay_id: Optional[str] = None,
+    ):
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+        self.replay_id = replay_id
+        self.completed = False
+
+    async def complete(self, resource_id):
+        """Map the key to what this request created"""
+        if self.key and not self.completed:
+            await idempotency_store.complete(
+                self.scope, self.key, self.fingerprint, str(resource_id)
+            )
+            self.completed = True
+
+
+async def idempotency(
+    request: Request,
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", max_length=255
+    ),
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+):
+    """
+    Honour an Idempotency-Key header
+
+    A retry of a completed request gets replay_id (the generation or grid
+    the first request created) instead of creating another one. Reusing a
+    key for a different payload is rejected, as is a retry racing a first
+    request that is still running. Keys of failed requests are released.
+    """
+    if not idempotency_key:
+        yield IdempotentRequest()
+        return
+
+    scope = f"{current_tenant.id}:{current_user.id}:{request.url.path}"
+    fingerprint = request_fingerprint(
+        request.method, request.url.path, await request.body()
+    )
+    record = await idempotency_store.reserve(scope, idempotency_key, fingerprint)
+
+    if record is not None:
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        if not record["resource_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        yield IdempotentRequest(replay_id=record["resource_id"])
+        return
+
+    guard = IdempotentRequest(scope, idempotency_key, fingerprint)
+    try:
+        yield guard
+    finally:
+        if not guard.completed:
+            await idempotency_store.release(scope, idempotency_key)
+
+
 # Routes
 
 @router.post("/image", response_model=GenerationResponse)
 async def generate_image(
     request: ImageGenerationRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
 ):
     """
     Generate an image using ComfyUI
     
     - Supports uncensored generation for FetishVerse tenant
     - Uses tenant-specific model settings
-    - Queues generation as background task
+    - Dispatches generation to the Celery workers
+    - Retries carrying the same Idempotency-Key return the original generation
     """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
     # Set tenant context for RLS
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
     
@@ -97,12 +310,19 @@ async def generate_image(
         default_models = tenant_settings.get('default_models', {})
         request.model = default_models.get('image', 'RealVisXL_V4.0.safetensors')
     
+    # Deterministic requests (explicit seed) may already have a stored result
+    cached = None
+    if settings.GENERATION_CACHE_ENABLED:
+        cache_key = image_cache_key(**request.model_dump())
+        if cache_key:
+            cached = await generation_cache.get(str(current_tenant.id), cache_key)
+
     # Create generation record
     generation = Generation(
         tenant_id=current_tenant.id,
         user_id=current_user.id,
-        type='image',
-        status='queued',
+        type="image",
+        status="completed" if cached else "queued",
         prompt=request.prompt,
         negative_prompt=request.negative_prompt,
         model=request.model,
@@ -119,29 +339,79 @@ async def generate_image(
         cost_credits=request.batch_size
     )
     
+    if cached:
+        generation.output_url = (
+            cached["output_urls"][0] if cached["output_urls"] else None
+        )
+        generation.output_urls = cached["output_urls"]
+        generation.processing_time_seconds = 0
+        generation.metadata_ = {**cached.get("metadata", {}), "cache_hit": True}
+
     db.add(generation)
     await db.commit()
     await db.refresh(generation)
+
+    if cached:
+        await generation_status.touch(str(current_user.id))
+        await idempotent.complete(generation.id)
+        logger.info(f"Served image generation {generation.id} from result cache")
+        return GenerationResponse(
+            id=generation.id,
+            status=generation.status,
+            type=generation.type,
+            prompt=generation.prompt,
+            output_url=generation.output_url,
+            created_at=generation.created_at.isoformat(),
+        )
     
-    # Queue background task
-    background_tasks.add_task(
-        generate_image_task,
-        generation_id=str(generation.id),
-        tenant_id=str(current_tenant.id),
-        user_id=str(current_user.id),
-        prompt=request.prompt,
-        negative_prompt=request.negative_prompt or "",
-        model=request.model,
-        width=request.width,
-        height=request.height,
-        steps=request.steps,
-        cfg=request.cfg,
-        sampler=request.sampler,
-        scheduler=request.scheduler,
-        seed=request.seed,
-        safety_checker=safety_checker
-    )
+    # Hand the job to the Celery workers through the broker
+    priority = tenant_settings.get("generation_priority", DEFAULT_PRIORITY)
+    try:
+        task_id = await dispatch_generation(
+            db,
+            generate_image_task,
+            generation_ids=[str(generation.id)],
+            tenant_id=str(current_tenant.id),
+            user_id=str(current_user.id),
+            kwargs={
+                "generation_id": str(generation.id),
+                "tenant_id": str(current_tenant.id),
+                "user_id": str(current_user.id),
+                "prompt": request.prompt,
+                "negative_prompt": request.negative_prompt or "",
+                "model": request.model,
+                "width": request.width,
+                "height": request.height,
+                "steps": request.steps,
+                "cfg": request.cfg,
+                "sampler": request.sampler,
+                "scheduler": request.scheduler,
+                "seed": request.seed,
+                "safety_checker": safety_checker,
+                "batch_size": request.batch_size,
+                "priority": priority,
+            },
+            priority=priority,
+            cost=request.batch_size,
+            tenant_settings=tenant_settings,
+        )
+    except Exception as e:
+        generation.status = "failed"
+        generation.error_message = f"Failed to queue generation: {e}"
+        await db.commit()
+        await generation_status.touch(str(current_user.id))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue unavailable",
+        )
     
+    try:
+        await generation_status.create(generation, job_id=task_id)
+    except Exception as e:
+        # Status reads fall back to Postgres
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
     logger.info(f"Queued image generation: {generation.id} for user: {current_user.id}")
     
     return GenerationResponse(
@@ -154,18 +424,192 @@ async def generate_image(
     )
 
 
+@router.post("/grid", response_model=GridResponse)
+async def generate_image_grid(
+    request: ImageGridRequest,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
+):
+    """
+    Generate a seed/cfg/steps sweep of one image request
+
+    - Every combination of the given axes becomes one generation (a grid cell)
+    - All cells are inserted in a single statement
+    - Cells are rendered as a few batched ComfyUI prompts instead of one each
+    """
+    if idempotent.replay_id:
+        return await get_image_grid(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+
+    await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+
+    base = request.base
+    tenant_settings = current_tenant.settings or {}
+    if not base.model:
+        default_models = tenant_settings.get("default_models", {})
+        base.model = default_models.get("image", "RealVisXL_V4.0.safetensors")
+    base.negative_prompt = base.negative_prompt or ""
+
+    cells = expand_grid(base.model_dump(), request.seeds, request.cfgs, request.steps)
+    if len(cells) * base.batch_size > settings.GENERATION_GRID_MAX_IMAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Grid exceeds {settings.GENERATION_GRID_MAX_IMAGES} images",
+        )
+
+    grid_id = uuid4()
+    rows = [
+        {
+            "id": uuid4(),
+            "tenant_id": current_tenant.id,
+            "user_id": current_user.id,
+            "type": "image",
+            "status": "queued",
+            "prompt": cell["prompt"],
+            "negative_prompt": cell["negative_prompt"],
+            "model": cell["model"],
+            "parameters": {
+                "width": cell["width"],
+                "height": cell["height"],
+                "steps": cell["steps"],
+                "cfg": cell["cfg"],
+                "sampler": cell["sampler"],
+                "scheduler": cell["scheduler"],
+                "seed": cell["seed"],
+                "batch_size": cell["batch_size"],
+                "grid_id": str(grid_id),
+                "grid_cell": index,
+            },
+            "cost_credits": cell["batch_size"],
+        }
+        for index, cell in enumerate(cells)
+    ]
+
+    from sqlalchemy import insert
+
+    await db.execute(insert(Generation).values(rows))
+    await db.commit()
+
+    priority = tenant_settings.get("generation_priority", DEFAULT_PRIORITY)
+    for indices in plan_grid_prompts(cells, settings.COMFYUI_COALESCE_MAX_BATCH):
+        try:
+            await dispatch_generation(
+                db,
+                generate_image_grid_task,
+                generation_ids=[str(rows[i]["id"]) for i in indices],
+                tenant_id=str(current_tenant.id),
+                user_id=str(current_user.id),
+                kwargs={
+                    "grid_id": str(grid_id),
+                    "tenant_id": str(current_tenant.id),
+                    "cells": [
+                        {"generation_id": str(rows[i]["id"]), "params": cells[i]}
+                        for i in indices
+                    ],
+                },
+                priority=priority,
+                cost=sum(cells[i]["batch_size"] for i in indices),
+                tenant_settings=tenant_settings,
+            )
+        except Exception as e:
+            from sqlalchemy import update
+
+            await db.execute(
+                update(Generation)
+                .where(Generation.id.in_([rows[i]["id"] for i in indices]))
+                .values(
+                    status="failed", error_message=f"Failed to queue generation: {e}"
+                )
+            )
+            await db.commit()
+            for i in indices:
+                rows[i]["status"] = "failed"
+
+    await generation_status.touch(str(current_user.id))
+    await idempotent.complete(grid_id)
+    logger.info(
+        f"Queued image grid {grid_id} with {len(cells)} cells for user: {current_user.id}"
+    )
+
+    return GridResponse(
+        grid_id=grid_id,
+        status="queued",
+        cells=[
+            GridCell(
+                generation_id=row["id"],
+                seed=row["parameters"]["seed"],
+                cfg=row["parameters"]["cfg"],
+                steps=row["parameters"]["steps"],
+                status=row["status"],
+                output_url=None,
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.get("/grid/{grid_id}", response_model=GridResponse)
+async def get_image_grid(
+    grid_id: UUID,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the per-cell status of an image grid
+    """
+    await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+
+    from sqlalchemy import select
+
+    result = await db.execute(
+        select(Generation)
+        .where(
+            Generation.tenant_id == current_tenant.id,
+            Generation.user_id == current_user.id,
+            Generation.parameters["grid_id"].astext == str(grid_id),
+        )
+        .order_by(Generation.parameters["grid_cell"].as_integer())
+    )
+    generations = result.scalars().all()
+
+    if not generations:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Grid not found"
+        )
+
+    hot = await generation_status.get_many(
+        [str(g.id) for g in generations if g.status not in TERMINAL_STATUSES]
+    )
+    return _grid_response(grid_id, generations, hot)
+
+
 @router.post("/video", response_model=GenerationResponse)
 async def generate_video(
     request: VideoGenerationRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
 ):
     """
-    Generate a video using Open-Sora or Stable Video Diffusion
+    Generate a video with AnimateDiff on the ComfyUI pool
+
+    - The clip renders as overlapping segments in parallel across GPU nodes
+    - Output is an HLS playlist (output_url) that can be played while the
+      remaining segments are still rendering
     """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+    tenant_settings = current_tenant.settings or {}
     
     generation = Generation(
         tenant_id=current_tenant.id,
@@ -173,11 +617,13 @@ async def generate_video(
         type='video',
         status='queued',
         prompt=request.prompt,
-        model='Open-Sora',
+        negative_prompt=request.negative_prompt,
+        model=settings.VIDEO_CHECKPOINT,
         parameters={
-            'duration': request.duration,
-            'fps': request.fps,
-            'resolution': request.resolution
+            "duration": request.duration,
+            "fps": request.fps,
+            "resolution": request.resolution,
+            "seed": request.seed,
         },
         cost_credits=request.duration  # Cost scales with duration
     )
@@ -185,10 +631,54 @@ async def generate_video(
     db.add(generation)
     await db.commit()
     await db.refresh(generation)
-    
-    # TODO: Queue video generation task
-    
-    logger.info(f"Queued video generation: {generation.id}")
+
+    # Each segment is one GPU prompt
+    segments = plan_segments(
+        request.duration * request.fps,
+        round(settings.VIDEO_SEGMENT_SECONDS * request.fps),
+        settings.VIDEO_SEGMENT_OVERLAP_FRAMES,
+    )
+    priority = tenant_settings.get("generation_priority", DEFAULT_PRIORITY)
+    try:
+        task_id = await dispatch_generation(
+            db,
+            generate_video_task,
+            generation_ids=[str(generation.id)],
+            tenant_id=str(current_tenant.id),
+            user_id=str(current_user.id),
+            kwargs={
+                "generation_id": str(generation.id),
+                "tenant_id": str(current_tenant.id),
+                "user_id": str(current_user.id),
+                "prompt": request.prompt,
+                "negative_prompt": request.negative_prompt or "",
+                "duration": request.duration,
+                "fps": request.fps,
+                "resolution": request.resolution,
+                "seed": request.seed,
+                "priority": priority,
+            },
+            priority=priority,
+            cost=len(segments),
+            tenant_settings=tenant_settings,
+        )
+    except Exception as e:
+        generation.status = "failed"
+        generation.error_message = f"Failed to queue generation: {e}"
+        await db.commit()
+        await generation_status.touch(str(current_user.id))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue unavailable",
+        )
+
+    try:
+        await generation_status.create(generation, job_id=task_id)
+    except Exception as e:
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
+    logger.info(f"Queued video generation: {generation.id} ({len(segments)} segments)")
     
     return GenerationResponse(
         id=generation.id,
@@ -203,36 +693,68 @@ async def generate_video(
 @router.post("/voice", response_model=GenerationResponse)
 async def generate_voice(
     request: VoiceGenerationRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
 ):
     """
     Generate voice using Coqui TTS
+
+    The script is synthesized sentence by sentence in a worker and
+    uploaded to R2 as one MP3; use /voice/stream to listen while it renders.
     """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
-    
-    generation = Generation(
-        tenant_id=current_tenant.id,
-        user_id=current_user.id,
-        type='voice',
-        status='queued',
-        prompt=request.text,
-        model=request.voice_model,
-        parameters={
-            'language': request.language,
-            'reference_audio_url': request.reference_audio_url
-        },
-        cost_credits=2
+    tenant_settings = current_tenant.settings or {}
+
+    generation = _voice_generation(
+        request, current_user, current_tenant, status="queued"
     )
-    
     db.add(generation)
     await db.commit()
     await db.refresh(generation)
-    
-    # TODO: Queue voice generation task
-    
+
+    priority = tenant_settings.get("generation_priority", DEFAULT_PRIORITY)
+    try:
+        task_id = await dispatch_generation(
+            db,
+            generate_voice_task,
+            generation_ids=[str(generation.id)],
+            tenant_id=str(current_tenant.id),
+            user_id=str(current_user.id),
+            kwargs={
+                "generation_id": str(generation.id),
+                "tenant_id": str(current_tenant.id),
+                "user_id": str(current_user.id),
+                "text": request.text,
+                "language": request.language,
+                "reference_audio_url": request.reference_audio_url,
+            },
+            priority=priority,
+            tenant_settings=tenant_settings,
+        )
+    except Exception as e:
+        generation.status = "failed"
+        generation.error_message = f"Failed to queue generation: {e}"
+        await db.commit()
+        await generation_status.touch(str(current_user.id))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue unavailable",
+        )
+
+    try:
+        await generation_status.create(generation, job_id=task_id)
+    except Exception as e:
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
     logger.info(f"Queued voice generation: {generation.id}")
     
     return GenerationResponse(
@@ -245,39 +767,201 @@ async def generate_voice(
     )
 
 
+def _voice_generation(
+    request: VoiceGenerationRequest, user: User, tenant: Tenant, status: str
+) -> Generation:
+    return Generation(
+        tenant_id=tenant.id,
+        user_id=user.id,
+        type="voice",
+        status=status,
+        prompt=request.text,
+        model=request.voice_model,
+        parameters={
+            "language": request.language,
+            "reference_audio_url": request.reference_audio_url,
+        },
+        cost_credits=2,
+    )
+
+
+# Streaming renders outlive their requests; hold references until they finish
+_voice_renders = set()
+
+
+async def _render_voice(
+    generation_id: str,
+    tenant_id: str,
+    request: VoiceGenerationRequest,
+    listener: asyncio.Queue,
+):
+    start_time = time.time()
+    try:
+        output_url = await voice_pipeline.render(
+            tts_client,
+            async_storage_service,
+            tenant_id,
+            f"voice/{generation_id}.mp3",
+            request.text,
+            language=request.language,
+            speaker_wav=request.reference_audio_url,
+            listener=listener,
+        )
+    except Exception as e:
+        logger.error(f"Streaming voice generation failed: {e}", exc_info=True)
+        await run_in_threadpool(
+            generation_status.finish,
+            generation_id,
+            "failed",
+            error_message=str(e),
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        return
+
+    await run_in_threadpool(
+        generation_status.finish,
+        generation_id,
+        "completed",
+        output_url=output_url,
+        output_urls=[output_url],
+        processing_time_seconds=int(time.time() - start_time),
+    )
+    logger.info(f"Streaming voice generation completed: {generation_id}")
+
+
+@router.post("/voice/stream")
+async def stream_voice(
+    request: VoiceGenerationRequest,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
+):
+    """
+    Generate voice and stream it back as MP3 while it renders
+
+    - Audio starts once the first sentence is synthesized and encoded
+    - The same stream is uploaded to R2; the generation (X-Generation-Id)
+      completes with its URL when the script is done, even if the client
+      disconnects first
+    - A retry carrying the same Idempotency-Key gets the original
+      generation back as JSON instead of a second stream
+    """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
+    await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+
+    generation = _voice_generation(
+        request, current_user, current_tenant, status="processing"
+    )
+    db.add(generation)
+    await db.commit()
+    await db.refresh(generation)
+
+    try:
+        await generation_status.create(generation)
+    except Exception as e:
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
+
+    # Unbounded, but never holds more than the finished MP3
+    listener = asyncio.Queue()
+    render = asyncio.create_task(
+        _render_voice(str(generation.id), str(current_tenant.id), request, listener)
+    )
+    _voice_renders.add(render)
+    render.add_done_callback(_voice_renders.discard)
+
+    first = await listener.get()
+    if first is None:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail="Voice synthesis failed"
+        )
+
+    async def audio():
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            chunk = await listener.get()
+
+    logger.info(f"Streaming voice generation: {generation.id}")
+    return StreamingResponse(
+        audio(),
+        media_type=VOICE_CONTENT_TYPE,
+        headers={"X-Generation-Id": str(generation.id)},
+    )
+
+
 @router.post("/text", response_model=GenerationResponse)
 async def generate_text(
     request: TextGenerationRequest,
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
 ):
     """
     Generate text using uncensored LLM (Dolphin/MythoMax)
+
+    The reply is generated by llama.cpp in a worker and uploaded to R2 as
+    plain text; use /text/stream to read it token by token as it is sampled.
     """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
-    
-    generation = Generation(
-        tenant_id=current_tenant.id,
-        user_id=current_user.id,
-        type='text',
-        status='processing',
-        prompt=request.prompt,
-        model=request.model,
-        parameters={
-            'max_tokens': request.max_tokens,
-            'temperature': request.temperature
-        },
-        cost_credits=1
+    tenant_settings = current_tenant.settings or {}
+
+    generation = _text_generation(
+        request, current_user, current_tenant, status="queued"
     )
-    
     db.add(generation)
     await db.commit()
     await db.refresh(generation)
-    
-    # TODO: Call LLM service directly (or queue task)
-    # For now, return pending
-    
+
+    priority = tenant_settings.get("generation_priority", DEFAULT_PRIORITY)
+    try:
+        task_id = await dispatch_generation(
+            db,
+            generate_text_task,
+            generation_ids=[str(generation.id)],
+            tenant_id=str(current_tenant.id),
+            user_id=str(current_user.id),
+            kwargs={
+                "generation_id": str(generation.id),
+                "tenant_id": str(current_tenant.id),
+                "user_id": str(current_user.id),
+                "prompt": request.prompt,
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature,
+            },
+            priority=priority,
+            tenant_settings=tenant_settings,
+        )
+    except Exception as e:
+        generation.status = "failed"
+        generation.error_message = f"Failed to queue generation: {e}"
+        await db.commit()
+        await generation_status.touch(str(current_user.id))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue unavailable",
+        )
+
+    try:
+        await generation_status.create(generation, job_id=task_id)
+    except Exception as e:
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
     logger.info(f"Queued text generation: {generation.id}")
     
     return GenerationResponse(
@@ -290,60 +974,678 @@ async def generate_text(
     )
 
 
+def _text_generation(
+    request: TextGenerationRequest, user: User, tenant: Tenant, status: str
+) -> Generation:
+    return Generation(
+        tenant_id=tenant.id,
+        user_id=user.id,
+        type="text",
+        status=status,
+        prompt=request.prompt,
+        model=request.model,
+        parameters={
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+        },
+        cost_credits=1,
+    )
+
+
+# Like voice renders, streamed completions run on after their clients leave
+_text_completions = set()
+
+
+async def _complete_text(
+    generation_id: str,
+    tenant_id: str,
+    request: TextGenerationRequest,
+    listener: asyncio.Queue,
+):
+    # listener receives each token, then a final event dict
+    start_time = time.time()
+    stats = TokenStats()
+    tokens = []
+    try:
+        async for token in llm_client.stream(
+            request.prompt, request.max_tokens, request.temperature, stats
+        ):
+            tokens.append(token)
+            listener.put_nowait(token)
+
+        output_url = await run_in_threadpool(
+            storage_service.upload_bytes,
+            "".join(tokens).encode(),
+            tenant_id,
+            f"text/{generation_id}.txt",
+            TEXT_CONTENT_TYPE,
+        )
+    except Exception as e:
+        logger.error(f"Streaming text generation failed: {e}", exc_info=True)
+        listener.put_nowait({"status": "failed", "error_message": str(e)})
+        await run_in_threadpool(
+            generation_status.finish,
+            generation_id,
+            "failed",
+            error_message=str(e),
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        return
+
+    await run_in_threadpool(
+        generation_status.finish,
+        generation_id,
+        "completed",
+        output_url=output_url,
+        output_urls=[output_url],
+        processing_time_seconds=int(time.time() - start_time),
+        metadata=stats.as_metadata(),
+    )
+    listener.put_nowait(
+        {"status": "completed", "output_url": output_url, **stats.as_metadata()}
+    )
+    logger.info(
+        f"Streaming text generation completed: {generation_id} "
+        f"({stats.tokens} tokens, {stats.tokens_per_second or 0:.1f} tokens/s)"
+    )
+
+
+@router.post("/text/stream")
+async def stream_text(
+    request: TextGenerationRequest,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+    idempotent: IdempotentRequest = Depends(idempotency),
+):
+    """
+    Generate text and stream it back token by token as Server-Sent Events
+
+    - Each message is {"token": "..."}, holding every token sampled since
+      the previous message; the stream ends with a "done" event carrying
+      the output URL and timings, or an "error" event
+    - The reply is uploaded to R2 and the generation (X-Generation-Id)
+      completed in one write when it is done, even if the client
+      disconnects first
+    - A retry carrying the same Idempotency-Key gets the original
+      generation back as JSON instead of a second stream
+    """
+    if idempotent.replay_id:
+        generation, _, _ = await _load_generation(
+            UUID(idempotent.replay_id), current_user, current_tenant, db
+        )
+        return generation
+
+    await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+
+    generation = _text_generation(
+        request, current_user, current_tenant, status="processing"
+    )
+    db.add(generation)
+    await db.commit()
+    await db.refresh(generation)
+
+    try:
+        await generation_status.create(generation)
+    except Exception as e:
+        logger.warning(f"Failed to track hot status of {generation.id}: {e}")
+
+    await idempotent.complete(generation.id)
+
+    # Unbounded, but never holds more than max_tokens tokens
+    listener = asyncio.Queue()
+    completion = asyncio.create_task(
+        _complete_text(str(generation.id), str(current_tenant.id), request, listener)
+    )
+    _text_completions.add(completion)
+    completion.add_done_callback(_text_completions.discard)
+
+    async def events():
+        while True:
+            item = await listener.get()
+            # Tokens that piled up while the client was slow go out as one message
+            tokens = []
+            while isinstance(item, str):
+                tokens.append(item)
+                item = None if listener.empty() else listener.get_nowait()
+            if tokens:
+                yield f"data: {json.dumps({'token': ''.join(tokens)})}\n\n"
+            if item is not None:
+                event = "done" if item["status"] == "completed" else "error"
+                yield f"event: {event}\ndata: {json.dumps({'id': str(generation.id), **item})}\n\n"
+                return
+
+    logger.info(f"Streaming text generation: {generation.id}")
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "X-Generation-Id": str(generation.id),
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post(
+    "/status:batch",
+    response_model=Dict[UUID, GenerationStatusItem],
+    response_model_exclude_none=True,
+)
+async def get_generation_statuses(
+    request: StatusBatchRequest,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the status of many generations in one request
+
+    - Returns a map of generation ID to status, progress, output URL and
+      error; IDs that do not exist or are not the user's are left out
+    - In-flight generations come from the hot-status store, the rest from
+      one Postgres query
+    """
+    ids = list(dict.fromkeys(request.ids))
+    tenant_id = str(current_tenant.id)
+    user_id = str(current_user.id)
+
+    statuses = {}
+    hot = await generation_status.get_many(
+        [str(generation_id) for generation_id in ids]
+    )
+    for generation_id in ids:
+        fields = hot.get(str(generation_id))
+        if (
+            fields
+            and fields.get("tenant_id") == tenant_id
+            and fields.get("user_id") == user_id
+        ):
+            statuses[generation_id] = GenerationStatusItem(
+                status=fields["status"],
+                progress=fields.get("progress"),
+                output_url=fields.get("output_url"),
+                error_message=fields.get("error_message"),
+            )
+
+    remaining = [
+        generation_id for generation_id in ids if generation_id not in statuses
+    ]
+    if not remaining:
+        return statuses
+
+    await set_tenant_context(db, tenant_id, user_id)
+
+    # One array parameter rather than one per ID, so every batch size
+    # shares a prepared statement
+    from sqlalchemy import any_, bindparam, select
+    from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+
+    result = await db.execute(
+        select(
+            Generation.id,
+            Generation.status,
+            Generation.output_url,
+            Generation.error_message,
+        ).where(
+            Generation.id
+            == any_(bindparam("ids", remaining, type_=ARRAY(PG_UUID(as_uuid=True)))),
+            Generation.tenant_id == current_tenant.id,
+            Generation.user_id == current_user.id,
+        )
+    )
+
+    for row in result:
+        statuses[row.id] = GenerationStatusItem(
+            status=row.status,
+            progress=100 if row.status == "completed" else None,
+            output_url=row.output_url,
+            error_message=row.error_message,
+        )
+
+    return statuses
+
+
+def _etag(*parts) -> str:
+    """Strong ETag over the values a representation was built from"""
+    digest = hashlib.blake2b(
+        "|".join(map(str, parts)).encode(), digest_size=12
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _cache_control(state: str, kind: str, thumbnail_url: Optional[str]) -> str:
+    # A completed image changes once more when post-processing adds its thumbnail
+    if state == "completed" and (
+        thumbnail_url or kind != "image" or not settings.IMAGE_POSTPROCESS_ENABLED
+    ):
+        return f"private, max-age={settings.GENERATION_COMPLETED_MAX_AGE_SECONDS}, immutable"
+    return "private, no-cache"
+
+
+def _not_modified(
+    response: Response, if_none_match: Optional[str], etag: str, cache_control: str
+) -> Optional[Response]:
+    """
+    Set validator headers on a response
+
+    Returns:
+        A 304 response to send instead if If-None-Match matches the ETag
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    # If-None-Match compares weakly, so a W/ prefix added by a proxy still matches
+    tags = [tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def _load_generation(
+    generation_id: UUID, current_user: User, current_tenant: Tenant, db: AsyncSession
+) -> Tuple[GenerationResponse, str, str]:
+    """
+    Current state of one of the user's generations
+
+    In-flight image generations are answered from the hot-status store;
+    everything else (and anything Redis no longer tracks) from Postgres.
+
+    Returns:
+        (response, ETag, Cache-Control) tuple
+    """
+    hot = await generation_status.get(str(generation_id))
+    if (
+        hot
+        and hot.get("tenant_id") == str(current_tenant.id)
+        and hot.get("user_id") == str(current_user.id)
+    ):
+        queue_position = None
+        if (
+            hot["status"] == "queued"
+            and settings.SCHEDULER_ENABLED
+            and hot.get("job_id")
+        ):
+            queue_position = await run_in_threadpool(
+                fair_scheduler.position, hot["job_id"]
+            )
+
+        generation = GenerationResponse(
+            id=generation_id,
+            status=hot["status"],
+            type=hot["type"],
+            prompt=hot["prompt"],
+            output_url=hot.get("output_url"),
+            progress=hot.get("progress"),
+            queue_position=queue_position,
+            created_at=hot["created_at"],
+        )
+        etag = _etag(
+            generation_id,
+            hot["status"],
+            hot.get("updated_at", hot["created_at"]),
+            queue_position,
+        )
+        return generation, etag, _cache_control(hot["status"], hot["type"], None)
+
+    await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
+    
+    from sqlalchemy import select
+    result = await db.execute(
+        select(
+            Generation.id,
+            Generation.status,
+            Generation.type,
+            Generation.prompt,
+            Generation.output_url,
+            Generation.__table__.c.metadata["thumbnail_url"].astext.label(
+                "thumbnail_url"
+            ),
+            Generation.created_at,
+            Generation.updated_at,
+        ).where(
+            Generation.id == generation_id,
+            Generation.tenant_id == current_tenant.id,
+            Generation.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generation not found"
+        )
+    
+    queue_position = None
+    if row.status == "queued" and settings.SCHEDULER_ENABLED:
+        queue_position = await get_queue_position(db, str(row.id))
+
+    generation = GenerationResponse(
+        id=row.id,
+        status=row.status,
+        type=row.type,
+        prompt=row.prompt,
+        output_url=row.output_url,
+        thumbnail_url=row.thumbnail_url,
+        queue_position=queue_position,
+        created_at=row.created_at.isoformat(),
+    )
+    etag = _etag(row.id, row.status, row.updated_at.isoformat(), queue_position)
+    return generation, etag, _cache_control(row.status, row.type, row.thumbnail_url)
+
+
 @router.get("/{generation_id}", response_model=GenerationResponse)
 async def get_generation(
     generation_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get generation status and result
+
+    - Responses carry a strong ETag; a matching If-None-Match gets 304,
+      straight from the hot-status store while the generation is in flight
+    - Finished generations are cacheable for
+      GENERATION_COMPLETED_MAX_AGE_SECONDS
+    """
+    generation, etag, cache_control = await _load_generation(
+        generation_id, current_user, current_tenant, db
+    )
+    return _not_modified(response, if_none_match, etag, cache_control) or generation
+
+
+async def _stream_state(
+    generation_id: UUID, tenant_id: str, user_id: str
+) -> Optional[dict]:
+    """Event fields of a generation, from the hot-status store or Postgres"""
+    hot = await generation_status.get(str(generation_id))
+    if hot:
+        return {key: hot.get(key) for key in EVENT_FIELDS}
+
+    # Terminal and flushed; streams hold no session, so open one briefly
+    from sqlalchemy import select
+
+    async with get_db_context() as db:
+        await set_tenant_context(db, tenant_id, user_id)
+        result = await db.execute(
+            select(
+                Generation.status,
+                Generation.output_url,
+                Generation.output_urls,
+                Generation.error_message,
+            ).where(
+                Generation.id == generation_id,
+                Generation.tenant_id == tenant_id,
+                Generation.user_id == user_id,
+            )
+        )
+        row = result.one_or_none()
+
+    if row is None:
+        return None
+    return {
+        "status": row.status,
+        "progress": 100 if row.status == "completed" else None,
+        "output_url": row.output_url,
+        "output_urls": row.output_urls,
+        "error_message": row.error_message,
+    }
+
+
+@router.post("/{generation_id}/events/token", response_model=StreamTokenResponse)
+async def create_generation_events_token(
+    generation_id: UUID,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Mint a short-lived token for one generation's event stream
+
+    Browsers pass it to /events as ?token=, since EventSource cannot set
+    an Authorization header; it is checked when the stream opens, so
+    mint a fresh one for each (re)connect.
+    """
+    await _load_generation(generation_id, current_user, current_tenant, db)
+    return StreamTokenResponse(
+        token=create_stream_token(current_user, str(generation_id)),
+        expires_in=settings.GENERATION_EVENTS_TOKEN_EXPIRE_SECONDS,
+    )
+
+
+@router.get("/{generation_id}/events")
+async def stream_generation_events(
+    generation_id: UUID,
+    current_user: User = Depends(get_current_stream_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream generation progress as Server-Sent Events
+
+    - Each event is the generation's current state (status, progress,
+      output URLs, error); the stream ends once it is terminal
+    - Changes are pushed through Redis pub/sub from whichever worker
+      makes them, so any API replica can serve the stream
+    - Browsers that cannot set an Authorization header pass a token from
+      POST /{generation_id}/events/token as ?token= instead
+    """
+    snapshot, _, _ = await _load_generation(
+        generation_id, current_user, current_tenant, db
+    )
+    tenant_id = str(current_tenant.id)
+    user_id = str(current_user.id)
+
+    state = {
+        "id": str(generation_id),
+        "status": snapshot.status,
+        "progress": snapshot.progress,
+        "output_url": snapshot.output_url,
+        "queue_position": snapshot.queue_position,
+    }
+
+    async def events():
+        started = time.monotonic()
+        sent = 0
+
+        async with generation_events.subscribe(str(generation_id)) as queue:
+            # Anything that changed before the subscription took effect
+            latest = await generation_status.get(str(generation_id))
+            if latest:
+                state.update(
+                    {
+                        key: latest[key]
+                        for key in EVENT_FIELDS
+                        if latest.get(key) is not None
+                    }
+                )
+
+            while True:
+                sent += 1
+                yield f"id: {sent}\ndata: {json.dumps(state)}\n\n"
+                if state["status"] in TERMINAL_STATUSES:
+                    return
+
+                while True:
+                    remaining = settings.GENERATION_EVENTS_MAX_STREAM_SECONDS - (
+                        time.monotonic() - started
+                    )
+                    if remaining <= 0:
+                        return
+                    try:
+                        changes = await asyncio.wait_for(
+                            queue.get(),
+                            timeout=min(
+                                settings.GENERATION_EVENTS_HEARTBEAT_SECONDS, remaining
+                            ),
+                        )
+                    except asyncio.TimeoutError:
+                        # Pub/sub drops messages on reconnects and full queues
+                        changes = await _stream_state(generation_id, tenant_id, user_id)
+                        if changes is None:
+                            return
+                        changes = {
+                            key: value
+                            for key, value in changes.items()
+                            if value is not None
+                        }
+
+                    # Coalesce a backlog into one event
+                    while not queue.empty():
+                        changes.update(queue.get_nowait())
+                    if changes.get("status") != "queued":
+                        changes["queue_position"] = None
+
+                    if any(state.get(key) != value for key, value in changes.items()):
+                        state.update(changes)
+                        break
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/{generation_id}", response_model=GenerationResponse)
+async def cancel_generation(
+    generation_id: UUID,
+    current_user: User = Depends(get_current_user),
+    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cancel a queued or running generation
+
+    - Removes the prompt from its ComfyUI node's queue, or interrupts it if running
+    - Workers that have not picked the job up yet skip it
     """
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
-    
+
     from sqlalchemy import select
+
     result = await db.execute(
         select(Generation).where(
             Generation.id == generation_id,
             Generation.tenant_id == current_tenant.id,
-            Generation.user_id == current_user.id
+            Generation.user_id == current_user.id,
         )
     )
     generation = result.scalar_one_or_none()
-    
+
     if not generation:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Generation not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Generation not found"
         )
-    
+
+    # A terminal state may still be waiting for the status flush
+    hot = await generation_status.get(str(generation.id))
+    current_status = hot["status"] if hot else generation.status
+    if current_status in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Generation already {current_status}",
+        )
+
+    dispatch = await request_cancel(str(generation.id))
+
+    if dispatch:
+        try:
+            node = comfyui_pool.get_node(dispatch["node"])
+            outcome = await run_in_threadpool(
+                node.service.cancel_prompt, dispatch["prompt_id"]
+            )
+            logger.info(
+                f"Cancelled ComfyUI prompt {dispatch['prompt_id']} on {node.address}: {outcome}"
+            )
+        except Exception as e:
+            # The worker still sees the cancel flag and stops waiting
+            logger.warning(f"Failed to cancel ComfyUI prompt for {generation.id}: {e}")
+
+    generation.status = "cancelled"
+    await db.commit()
+    await generation_status.drop(
+        str(generation.id), str(current_user.id), status=generation.status
+    )
+
+    logger.info(f"Cancelled generation: {generation.id} for user: {current_user.id}")
+
     return GenerationResponse(
         id=generation.id,
         status=generation.status,
         type=generation.type,
         prompt=generation.prompt,
         output_url=generation.output_url,
-        created_at=generation.created_at.isoformat()
+        created_at=generation.created_at.isoformat(),
     )
 
 
+def _encode_cursor(created_at: datetime, generation_id: UUID) -> str:
+    """Opaque list cursor for the position after a row"""
+    raw = f"{created_at.isoformat()}|{generation_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, generation_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(generation_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
 @router.get("/", response_model=List[GenerationResponse])
 async def list_generations(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     type: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     current_tenant: Tenant = Depends(get_current_tenant),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List user's generations
+    List user's generations, newest first
+
+    - Pages with a cursor: when a page is full, X-Next-Cursor holds the
+      value to pass as ?cursor= for the next one. Pages cost the same at
+      any depth (idx_generations_tenant_user_created)
+    - skip is an offset into the list, kept for older clients; it reads
+      and discards every skipped row
+    - The ETag follows the user's change version, bumped whenever one of
+      their generations changes, so a matching If-None-Match gets 304
+      from one Redis read without touching Postgres
     """
+    version = await generation_status.version(str(current_user.id))
+    etag = _etag(version, current_tenant.id, limit, cursor, type, skip)
+    not_modified = _not_modified(response, if_none_match, etag, "private, no-cache")
+    if not_modified:
+        return not_modified
+
     await set_tenant_context(db, str(current_tenant.id), str(current_user.id))
     
-    from sqlalchemy import select
-    query = select(Generation).where(
+    # Only the columns the response needs; parameters and metadata JSONB
+    # would otherwise be read and decoded for every row
+    from sqlalchemy import select, tuple_
+
+    query = select(
+        Generation.id,
+        Generation.status,
+        Generation.type,
+        Generation.prompt,
+        Generation.output_url,
+        Generation.__table__.c.metadata["thumbnail_url"].astext.label("thumbnail_url"),
+        Generation.created_at,
+    ).where(
         Generation.tenant_id == current_tenant.id,
         Generation.user_id == current_user.id
     )
@@ -351,20 +1653,42 @@ async def list_generations(
     if type:
         query = query.where(Generation.type == type)
     
-    query = query.order_by(Generation.created_at.desc()).offset(skip).limit(limit)
-    
+    if cursor:
+        created_at, generation_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(Generation.created_at, Generation.id)
+            < tuple_(created_at, generation_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(Generation.created_at.desc(), Generation.id.desc()).limit(
+        limit
+    )
+
     result = await db.execute(query)
-    generations = result.scalars().all()
-    
+    generations = result.all()
+
+    if len(generations) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            generations[-1].created_at, generations[-1].id
+        )
+
+    # Rows still queued in Postgres may be further along in the hot-status store
+    hot = await generation_status.get_many(
+        [str(g.id) for g in generations if g.status not in TERMINAL_STATUSES]
+    )
+
     return [
         GenerationResponse(
             id=g.id,
-            status=g.status,
+            status=hot.get(str(g.id), {}).get("status", g.status),
             type=g.type,
             prompt=g.prompt,
-            output_url=g.output_url,
-            created_at=g.created_at.isoformat()
+            output_url=hot.get(str(g.id), {}).get("output_url", g.output_url),
+            thumbnail_url=g.thumbnail_url,
+            progress=hot.get(str(g.id), {}).get("progress"),
+            created_at=g.created_at.isoformat(),
         )
         for g in generations
     ]
-
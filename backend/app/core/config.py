@@ -23,6 +23,11 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 40
+    # Celery workers: one engine per worker process, so keep these small
+    WORKER_DATABASE_POOL_SIZE: int = 2
+    WORKER_DATABASE_MAX_OVERFLOW: int = 2
+    WORKER_DATABASE_POOL_TIMEOUT_SECONDS: float = 30.0
+    WORKER_DATABASE_POOL_RECYCLE_SECONDS: int = 1800
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -31,7 +36,18 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
+    WORKER_METRICS_PORT: int = 9808
     
+    # Fair-Share Scheduler (weighted fair queueing in front of GPU workers)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_MAX_IN_FLIGHT: int = 4  # About the total number of GPU worker slots
+    SCHEDULER_TENANT_MAX_IN_FLIGHT: int = (
+        2  # Default cap; tenant settings['max_concurrent_generations']
+    )
+    SCHEDULER_LEASE_SECONDS: int = 3900  # Longer than task_time_limit
+    SCHEDULER_PUMP_INTERVAL_SECONDS: float = 5.0
+    SCHEDULER_PLAN_WEIGHTS: dict = {"free": 1, "basic": 2, "pro": 4, "enterprise": 8}
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -54,6 +70,24 @@ class Settings(BaseSettings):
     LLAMA_CPP_URL: str = "http://localhost:8080"
     TTS_URL: str = "http://localhost:5002"
     
+    # ComfyUI Client
+    COMFYUI_URLS: list = []  # Multi-node pool; falls back to [COMFYUI_URL] when empty
+    COMFYUI_HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    COMFYUI_HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+    COMFYUI_EJECT_AFTER_FAILURES: int = 3
+    COMFYUI_CHECKPOINT_SWAP_PENALTY: float = (
+        2.0  # A model reload costs about this many queued prompts
+    )
+    COMFYUI_COALESCE_ENABLED: bool = False
+    COMFYUI_COALESCE_WINDOW_MS: int = 50
+    COMFYUI_COALESCE_MAX_BATCH: int = 8
+    COMFYUI_MAX_CONNECTIONS: int = 100
+    COMFYUI_KEEPALIVE_TIMEOUT_SECONDS: float = 60.0
+    COMFYUI_TIMEOUT_SECONDS: float = 30.0
+    COMFYUI_USE_WEBSOCKET: bool = True
+    COMFYUI_POLL_INTERVAL_SECONDS: float = 1.0
+    COMFYUI_WS_RECONNECT_SECONDS: float = 2.0
+
     # API Keys
     OPENAI_API_KEY: Optional[str] = None
     ANTHROPIC_API_KEY: Optional[str] = None
@@ -87,7 +121,121 @@ class Settings(BaseSettings):
     MAX_IMAGE_WIDTH: int = 2048
     MAX_IMAGE_HEIGHT: int = 2048
     MAX_VIDEO_DURATION: int = 60
+    GENERATION_GRID_MAX_IMAGES: int = 64
+
+    # Generation Result Cache (deterministic requests with an explicit seed)
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GENERATION_CACHE_MAX_ENTRIES_PER_TENANT: int = 10000
     
+    # Generation Preemption (lower-priority prompts queued on a saturated node)
+    GENERATION_PREEMPTION_ENABLED: bool = False
+    GENERATION_PREEMPT_SATURATION_DEPTH: int = 8
+    GENERATION_PREEMPT_MAX_VICTIMS: int = 1
+    GENERATION_PREEMPT_RETRY_SECONDS: int = 30
+
+    # Staged Image Pipeline (submit -> collect -> upload -> finalize queues)
+    GENERATION_COLLECT_TIMEOUT_SECONDS: int = 300
+    # Collectors wait on completions published by the submitting worker's
+    # WebSocket tracker and only check /history this often in case it died
+    COMFYUI_COLLECT_HISTORY_CHECK_SECONDS: float = 30.0
+    GENERATION_UPLOAD_MAX_RETRIES: int = 3
+
+    # Hot Generation Status (in-flight state in Redis, terminal states
+    # flushed to Postgres in batches)
+    GENERATION_STATUS_TTL_SECONDS: int = 24 * 3600
+    GENERATION_STATUS_FLUSH_BATCH_SIZE: int = 500
+    GENERATION_STATUS_FLUSH_BLOCK_MS: int = 1000
+    GENERATION_STATUS_FLUSH_CLAIM_IDLE_MS: int = (
+        60000  # Re-claim batches of dead flushers
+    )
+    GENERATION_STATUS_BATCH_MAX_IDS: int = 500  # Per POST /generate/status:batch
+    GENERATION_COMPLETED_MAX_AGE_SECONDS: int = (
+        7 * 24 * 3600
+    )  # Cache-Control on finished generations
+
+    # Generation progress streams (Server-Sent Events fed by Redis pub/sub)
+    GENERATION_EVENTS_HEARTBEAT_SECONDS: float = (
+        15.0  # Keep-alive, and re-read of the hot status
+    )
+    GENERATION_EVENTS_MAX_STREAM_SECONDS: int = (
+        3600  # EventSource reconnects after this
+    )
+    GENERATION_EVENTS_QUEUE_SIZE: int = (
+        64  # Per subscriber; overflow waits for the next heartbeat
+    )
+    GENERATION_EVENTS_TOKEN_EXPIRE_SECONDS: int = (
+        60  # ?token= on /events; checked on connect only
+    )
+
+    # Idempotency-Key header on /generate/* and duplicate-message suppression
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_PENDING_TTL_SECONDS: int = 60  # Longest a first request may take
+    GENERATION_LOCK_TTL_SECONDS: int = (
+        3600  # Held from submit to finalize; matches task_time_limit
+    )
+
+    # Video Generation (overlapping segments rendered across the ComfyUI pool,
+    # crossfaded and encoded to HLS by an ffmpeg subprocess pool)
+    VIDEO_CHECKPOINT: str = (
+        "realisticVisionV60B1_v51VAE.safetensors"  # SD 1.5 base for AnimateDiff
+    )
+    VIDEO_MOTION_MODULE: str = "mm_sd_v15_v2.ckpt"
+    VIDEO_STEPS: int = 20
+    VIDEO_CFG: float = 7.0
+    VIDEO_SEGMENT_SECONDS: float = 4.0  # Also the HLS segment length
+    VIDEO_SEGMENT_OVERLAP_FRAMES: int = 8
+    VIDEO_SEGMENT_TIMEOUT_SECONDS: int = 900
+    VIDEO_RENDER_CONCURRENCY: int = (
+        4  # Segments rendering at once per clip; about the pool's GPU count
+    )
+    VIDEO_FFMPEG_WORKERS: int = 2  # Concurrent ffmpeg encodes per worker process
+    VIDEO_FFMPEG_PATH: str = "ffmpeg"
+
+    # Voice Generation (TTS_URL; scripts are synthesized sentence by
+    # sentence and streamed out as MP3 while later sentences render)
+    TTS_CONCURRENCY: int = 4  # Sentences synthesizing at once per script
+    TTS_MAX_CHUNK_CHARS: int = 250  # XTTS degrades on longer inputs
+    TTS_MAX_CONNECTIONS: int = 32
+    TTS_TIMEOUT_SECONDS: float = 120.0
+    TTS_MP3_BITRATE: str = "128k"
+    TTS_FFMPEG_PATH: str = "ffmpeg"
+
+    # Text Generation (LLAMA_CPP_URL; completions are streamed token by token)
+    LLAMA_CPP_MAX_CONNECTIONS: int = (
+        32  # Per process; llama.cpp queues requests beyond its --parallel slots
+    )
+    LLAMA_CPP_TIMEOUT_SECONDS: float = 120.0  # Longest wait for the next token
+
+    # Upscaling (CPU-only: overlapping tiles in a process pool; Real-ESRGAN
+    # ONNX through OpenCV when UPSCALE_MODEL_PATH is set, Lanczos otherwise)
+    UPSCALE_WORKERS: int = 0  # Tile processes per worker; 0 = one per CPU
+    UPSCALE_TILE_SIZE: int = 256  # Source pixels per tile edge; bounds memory
+    UPSCALE_TILE_OVERLAP: int = 16
+    UPSCALE_MODEL_PATH: Optional[str] = None
+    UPSCALE_MAX_SCALE: int = 4
+    UPSCALE_MAX_INPUT_PIXELS: int = 4096 * 4096
+
+    # Generation Worker Mode: "celery" (prefork tasks) or "asyncio"
+    # (python -m app.tasks.async_worker, consuming the same generation queue)
+    GENERATION_WORKER_MODE: str = "celery"
+    ASYNC_WORKER_MAX_JOBS: int = 256  # Image jobs in flight per process
+    ASYNC_WORKER_SUBMIT_CONCURRENCY: int = 16
+    ASYNC_WORKER_COLLECT_CONCURRENCY: int = 64  # Concurrent /history polls
+    ASYNC_WORKER_UPLOAD_CONCURRENCY: int = 32
+    ASYNC_WORKER_DB_CONCURRENCY: int = (
+        10  # Keep within DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW
+    )
+
+    # Image Post-Processing (WebP/AVIF re-encode and thumbnails)
+    IMAGE_POSTPROCESS_ENABLED: bool = True
+    IMAGE_POSTPROCESS_WORKERS: int = 0  # Encoder processes per worker; 0 = one per CPU
+    IMAGE_POSTPROCESS_UPLOAD_CONCURRENCY: int = 8
+    IMAGE_THUMBNAIL_SIZES: list = [256, 512]
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_AVIF_ENABLED: bool = True
+    IMAGE_AVIF_QUALITY: int = 55
+
     # Tenant IDs (from seed data)
     FETISHVERSE_TENANT_ID: str = "11111111-1111-1111-1111-111111111111"
     SAAS_TENANT_ID: str = "22222222-2222-2222-2222-222222222222"
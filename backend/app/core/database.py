@@ -1,14 +1,19 @@
 """
 Jukeyman Autonomous Media Station (JAMS) - Database Connection
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from sqlalchemy.pool import NullPool
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Iterator, Optional
+import os
+import threading
+import time
 
 from app.core.config import settings
+from app.core.metrics import WORKER_DB_POOL_CHECKOUT_SECONDS, WORKER_DB_POOL_CHECKED_OUT
 
 # Create async engine
 engine = create_async_engine(
@@ -76,11 +81,13 @@ async def set_tenant_context(session: AsyncSession, tenant_id: str, user_id: str
     This must be called before any queries that use RLS policies.
     """
     await session.execute(
-        f"SET LOCAL app.current_tenant_id = '{tenant_id}'"
+        text("SELECT set_config('app.current_tenant_id', :tenant_id, true)"),
+        {"tenant_id": str(tenant_id)},
     )
     if user_id:
         await session.execute(
-            f"SET LOCAL app.current_user_id = '{user_id}'"
+            text("SELECT set_config('app.current_user_id', :user_id, true)"),
+            {"user_id": str(user_id)},
         )
 
 
@@ -106,3 +113,96 @@ async def close_db():
     """
     await engine.dispose()
 
+
+# Synchronous engine for Celery workers (one per worker process)
+_sync_engine: Optional[Engine] = None
+_sync_engine_pid: Optional[int] = None
+_sync_engine_lock = threading.Lock()
+SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def init_sync_engine() -> Engine:
+    """
+    Create this process's sync engine and bounded connection pool.
+
+    Called from Celery's worker_process_init so every prefork child gets its
+    own pool (connections must never cross a fork); also created lazily for
+    thread/solo pools, which have no per-process init.
+    """
+    global _sync_engine, _sync_engine_pid
+
+    with _sync_engine_lock:
+        if _sync_engine is not None and _sync_engine_pid == os.getpid():
+            return _sync_engine
+
+        if _sync_engine is not None:
+            # Inherited across fork: drop the parent's connections without closing them
+            _sync_engine.dispose(close=False)
+
+        engine = create_engine(
+            settings.DATABASE_URL,
+            pool_size=settings.WORKER_DATABASE_POOL_SIZE,
+            max_overflow=settings.WORKER_DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.WORKER_DATABASE_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.WORKER_DATABASE_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+        )
+        event.listen(engine, "checkout", lambda *args: WORKER_DB_POOL_CHECKED_OUT.inc())
+        event.listen(engine, "checkin", lambda *args: WORKER_DB_POOL_CHECKED_OUT.dec())
+
+        SyncSessionLocal.configure(bind=engine)
+        _sync_engine, _sync_engine_pid = engine, os.getpid()
+        return engine
+
+
+def dispose_sync_engine():
+    """
+    Close this process's pooled connections (worker_process_shutdown).
+    """
+    global _sync_engine, _sync_engine_pid
+
+    with _sync_engine_lock:
+        if _sync_engine is not None and _sync_engine_pid == os.getpid():
+            _sync_engine.dispose()
+        _sync_engine, _sync_engine_pid = None, None
+
+
+def new_sync_session() -> Session:
+    """
+    Open a session on the process engine with a connection already checked out.
+
+    The caller must close it; prefer sync_session().
+    """
+    if _sync_engine is None or _sync_engine_pid != os.getpid():
+        init_sync_engine()
+
+    session = SyncSessionLocal()
+    start = time.perf_counter()
+    try:
+        session.connection()
+    except Exception:
+        session.close()
+        raise
+    finally:
+        WORKER_DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+    return session
+
+
+@contextmanager
+def sync_session() -> Iterator[Session]:
+    """
+    Task-scoped sync session.
+    Usage:
+        with sync_session() as db:
+            db.query(...)
+            db.commit()
+    Rolls back on error and always returns the connection to the pool.
+    """
+    session = new_sync_session()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
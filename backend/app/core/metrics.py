@@ -0,0 +1,121 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Prometheus Metrics
+"""
+import os
+
+from prometheus_client import (
+    Counter,
+    Gauge,
+    Histogram,
+    CollectorRegistry,
+    start_http_server,
+)
+from prometheus_client import multiprocess
+
+# ComfyUI pool
+COMFYUI_NODE_HEALTHY = Gauge(
+    "jams_comfyui_node_healthy",
+    "Whether a ComfyUI node is admitted for routing (1) or ejected (0)",
+    ["node"],
+)
+COMFYUI_NODE_QUEUE_DEPTH = Gauge(
+    "jams_comfyui_node_queue_depth",
+    "Last sampled running + pending prompts on a ComfyUI node",
+    ["node"],
+)
+COMFYUI_CHECKPOINT_DISPATCHES = Counter(
+    "jams_comfyui_checkpoint_dispatches_total",
+    "Prompts dispatched to a node that already had (hit) or had to load (miss) the checkpoint",
+    ["node", "result"],
+)
+
+# Generation result cache
+GENERATION_CACHE_LOOKUPS = Counter(
+    "jams_generation_cache_lookups_total",
+    "Deterministic generation cache lookups by result (hit/miss)",
+    ["result"],
+)
+
+# Fair-share scheduler
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "jams_scheduler_queue_depth",
+    "Generation jobs waiting in the fair-share scheduler per tenant",
+    ["tenant"],
+    multiprocess_mode="mostrecent",
+)
+SCHEDULER_QUEUE_POSITION = Histogram(
+    "jams_scheduler_queue_position",
+    "Estimated jobs ahead of a generation job when it was queued",
+    ["plan"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "jams_scheduler_wait_seconds",
+    "Time a generation job waited in the scheduler before dispatch",
+    ["plan"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+
+# Celery worker database pool
+WORKER_DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "jams_worker_db_pool_checkout_seconds",
+    "Time a Celery task waited to check a connection out of its worker pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+WORKER_DB_POOL_CHECKED_OUT = Gauge(
+    "jams_worker_db_pool_checked_out",
+    "Connections currently checked out of Celery worker pools",
+    multiprocess_mode="livesum",
+)
+
+
+# Staged image pipeline
+PIPELINE_STAGE_SECONDS = Histogram(
+    "jams_pipeline_stage_seconds",
+    "Time an image job spent in one pipeline stage (submit, collect, upload, finalize)",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+
+
+# Hot generation status
+GENERATION_STATUS_FLUSH_ROWS = Histogram(
+    "jams_generation_status_flush_rows",
+    "Terminal generation states written to Postgres per batched flush",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+# Voice generation
+VOICE_FIRST_AUDIO_SECONDS = Histogram(
+    "jams_voice_first_audio_seconds",
+    "Time from the start of a voice generation to its first encoded audio chunk",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120),
+)
+
+# Text generation
+TEXT_FIRST_TOKEN_SECONDS = Histogram(
+    "jams_text_first_token_seconds",
+    "Time from requesting a completion from llama.cpp to its first token",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+TEXT_TOKENS_PER_SECOND = Histogram(
+    "jams_text_tokens_per_second",
+    "Decode rate of completed llama.cpp generations, after the first token",
+    buckets=(1, 5, 10, 20, 30, 50, 75, 100, 150, 250),
+)
+
+
+def start_worker_metrics_server(port: int):
+    """
+    Expose metrics from a Celery worker
+
+    Prefork children each hold their own registry, so when
+    PROMETHEUS_MULTIPROC_DIR is set the parent serves the aggregate of
+    every child's metrics files instead of its own registry.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
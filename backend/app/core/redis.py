@@ -0,0 +1,21 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Redis Connections
+"""
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# Async client for the API (connections are opened lazily)
+redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Sync client for Celery tasks
+sync_redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def close_redis():
+    """
+    Close the async Redis connection pool.
+    """
+    await redis_client.close()
@@ -3,9 +3,10 @@ Jukeyman Autonomous Media Station (JAMS) - Security & Authentication
 """
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, Query, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -21,6 +22,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -55,6 +57,26 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def create_stream_token(user: User, generation_id: str) -> str:
+    """
+    Create a short-lived JWT that only opens one generation's event stream.
+
+    EventSource cannot set headers, so this token travels in the query
+    string, where it may end up in proxy logs and browser history.
+    """
+    expire = datetime.utcnow() + timedelta(
+        seconds=settings.GENERATION_EVENTS_TOKEN_EXPIRE_SECONDS
+    )
+    to_encode = {
+        "sub": str(user.id),
+        "tenant_id": str(user.tenant_id),
+        "generation_id": str(generation_id),
+        "exp": expire,
+        "type": "stream",
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> dict:
     """Decode and verify JWT token"""
     try:
@@ -78,6 +100,17 @@ async def get_current_user(
     token = credentials.credentials
     payload = decode_token(token)
     
+    # Stream tokens only open the event stream they were minted for
+    if payload.get("type") == "stream":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+
+    return await _load_token_user(payload, db)
+
+
+async def _load_token_user(payload: dict, db: AsyncSession) -> User:
     user_id: str = payload.get("sub")
     tenant_id: str = payload.get("tenant_id")
     
@@ -108,6 +141,41 @@ async def get_current_user(
     return user
 
 
+async def get_current_stream_user(
+    generation_id: UUID,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Dependency for a generation's event stream: like get_current_user, but
+    also accepts a stream token (see create_stream_token) minted for this
+    generation as the token query parameter, since browser EventSource
+    clients cannot set an Authorization header.
+    """
+    if credentials is not None:
+        return await get_current_user(credentials, db)
+
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    payload = decode_token(token)
+    if payload.get("type") != "stream" or payload.get("generation_id") != str(
+        generation_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid stream token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return await _load_token_user(payload, db)
+
+
 async def get_current_tenant(
     request: Request,
     db: AsyncSession = Depends(get_db)
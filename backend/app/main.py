@@ -4,12 +4,18 @@ Jukeyman Autonomous Media Station (JAMS) - Main FastAPI Application
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from prometheus_client import make_asgi_app
 from contextlib import asynccontextmanager
 import logging
 import sys
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.redis import close_redis
+from app.services.async_storage_service import async_storage_service
+from app.services.generation_events import generation_events
+from app.services.voice_pipeline import tts_client
+from app.services.llm_service import llm_client
 
 # Configure logging
 logging.basicConfig(
@@ -36,7 +42,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down JAMS API...")
     await close_db()
-    logger.info("Database connections closed")
+    await generation_events.close()
+    await close_redis()
+    await tts_client.close()
+    await llm_client.close()
+    await async_storage_service.close()
+    logger.info("Database, Redis and HTTP connections closed")
 
 
 # Create FastAPI app
@@ -56,6 +67,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Generation-Id"],
 )
 
 
@@ -80,6 +92,10 @@ async def health_check():
     }
 
 
+# Prometheus metrics
+app.mount("/metrics", make_asgi_app())
+
+
 # Root endpoint
 @app.get("/")
 async def root():
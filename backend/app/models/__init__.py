@@ -0,0 +1,4 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ORM Models
+Mapped from database/schema.sql
+"""
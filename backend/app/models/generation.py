@@ -0,0 +1,37 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Model
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+
+from app.core.database import Base
+
+
+class Generation(Base):
+    __tablename__ = "generations"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()")
+    )
+    tenant_id = Column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    type = Column(String(50), nullable=False)
+    status = Column(String(50), nullable=False, server_default="queued")
+    prompt = Column(Text, nullable=False)
+    negative_prompt = Column(Text)
+    model = Column(String(255), nullable=False)
+    parameters = Column(JSONB, server_default=text("'{}'"))
+    output_url = Column(Text)
+    output_urls = Column(ARRAY(Text))
+    error_message = Column(Text)
+    processing_time_seconds = Column(Integer)
+    cost_credits = Column(Integer, server_default=text("1"))
+    # "metadata" is reserved on declarative classes
+    metadata_ = Column("metadata", JSONB, server_default=text("'{}'"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,35 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Marketplace Order Model
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Numeric, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.core.database import Base
+
+
+class Order(Base):
+    __tablename__ = "orders"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()")
+    )
+    tenant_id = Column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    product_id = Column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="SET NULL")
+    )
+    amount = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(3), server_default="USD")
+    stripe_payment_id = Column(String(255))
+    stripe_session_id = Column(String(255))
+    status = Column(String(50), nullable=False, server_default="pending")
+    payment_method = Column(String(50))
+    # "metadata" is reserved on declarative classes
+    metadata_ = Column("metadata", JSONB, server_default=text("'{}'"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
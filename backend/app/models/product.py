@@ -0,0 +1,50 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Marketplace Product Model
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+
+from app.core.database import Base
+
+
+class Product(Base):
+    __tablename__ = "products"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()")
+    )
+    tenant_id = Column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
+    creator_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    title = Column(String(255), nullable=False)
+    description = Column(Text)
+    price = Column(Numeric(10, 2), nullable=False)
+    category = Column(String(100))
+    tags = Column(ARRAY(Text))
+    content_urls = Column(ARRAY(Text), nullable=False)
+    preview_urls = Column(ARRAY(Text))
+    download_count = Column(Integer, server_default=text("0"))
+    view_count = Column(Integer, server_default=text("0"))
+    rating = Column(Numeric(3, 2), server_default=text("0.0"))
+    review_count = Column(Integer, server_default=text("0"))
+    active = Column(Boolean, server_default=text("TRUE"))
+    featured = Column(Boolean, server_default=text("FALSE"))
+    # "metadata" is reserved on declarative classes
+    metadata_ = Column("metadata", JSONB, server_default=text("'{}'"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,24 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Tenant Model
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.core.database import Base
+
+
+class Tenant(Base):
+    __tablename__ = "tenants"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()")
+    )
+    name = Column(String(255), nullable=False)
+    domain = Column(String(255), unique=True, nullable=False)
+    content_policy = Column(String(50), nullable=False, server_default="moderated")
+    stripe_account_id = Column(String(255))
+    settings = Column(JSONB, server_default=text("'{}'"))
+    active = Column(Boolean, server_default=text("TRUE"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,155 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Async R2 Storage Service
+Non-blocking streamed uploads to Cloudflare R2 for the asyncio generation worker
+"""
+
+import logging
+from contextlib import AsyncExitStack
+from typing import AsyncIterable, Optional
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Same part size as STREAM_TRANSFER_CONFIG (R2 requires at least 5 MiB)
+PART_SIZE = 8 * 1024 * 1024
+
+
+class AsyncR2StorageService:
+    """
+    aiobotocore counterpart of R2StorageService.upload_stream
+
+    The client and its connection pool are opened on first use, on the
+    running event loop, and released by close().
+    """
+
+    def __init__(self, max_connections: int = 32):
+        self.bucket_name = settings.R2_BUCKET_NAME
+        self.public_url = settings.R2_PUBLIC_URL
+        self.max_connections = max_connections
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client = None
+
+    async def client(self):
+        if self._client is None:
+            self._exit_stack = AsyncExitStack()
+            self._client = await self._exit_stack.enter_async_context(
+                get_session().create_client(
+                    "s3",
+                    endpoint_url=settings.R2_ENDPOINT_URL,
+                    aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+                    region_name="auto",  # Cloudflare R2 uses 'auto'
+                    config=AioConfig(
+                        signature_version="s3v4",
+                        max_pool_connections=self.max_connections,
+                    ),
+                )
+            )
+        return self._client
+
+    async def upload_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+        tenant_id: str,
+        filename: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        Upload an async iterator of byte chunks to R2
+
+        Files smaller than one part are sent with a single PUT; larger ones
+        as a multipart upload, so memory stays bounded by PART_SIZE.
+
+        Args:
+            chunks: Async iterable of file content chunks
+            tenant_id: Tenant ID for organization
+            filename: Filename with extension
+            content_type: MIME type
+
+        Returns:
+            Public URL of the uploaded file
+        """
+        key = f"{tenant_id}/{filename}"
+        client = await self.client()
+        buffer = bytearray()
+        parts = []
+        upload_id = None
+
+        async def upload_part():
+            response = await client.upload_part(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=len(parts) + 1,
+                Body=bytes(buffer),
+            )
+            parts.append({"PartNumber": len(parts) + 1, "ETag": response["ETag"]})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= PART_SIZE:
+                    if upload_id is None:
+                        response = await client.create_multipart_upload(
+                            Bucket=self.bucket_name,
+                            Key=key,
+                            ContentType=content_type,
+                            ACL="public-read",
+                        )
+                        upload_id = response["UploadId"]
+                    await upload_part()
+
+            if upload_id is None:
+                await client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=bytes(buffer),
+                    ContentType=content_type,
+                    ACL="public-read",
+                )
+            else:
+                if buffer:
+                    await upload_part()
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+
+        except Exception as e:
+            if upload_id is not None:
+                try:
+                    await client.abort_multipart_upload(
+                        Bucket=self.bucket_name, Key=key, UploadId=upload_id
+                    )
+                except ClientError:
+                    pass
+            if isinstance(e, ClientError):
+                logger.error(f"Failed to stream upload to R2: {e}")
+                raise Exception(f"Failed to upload stream: {str(e)}")
+            raise
+
+        public_url = f"{self.public_url}/{key}"
+        logger.info(f"Streamed upload to R2: {public_url}")
+
+        return public_url
+
+    async def close(self):
+        """Close the client and its connection pool"""
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+
+
+# Global instance
+async_storage_service = AsyncR2StorageService(
+    max_connections=settings.ASYNC_WORKER_UPLOAD_CONCURRENCY
+)
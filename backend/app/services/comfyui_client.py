@@ -0,0 +1,415 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI HTTP Client
+Connection-pooled, keep-alive client for the ComfyUI REST API
+"""
+
+import asyncio
+import os
+import threading
+import time
+import logging
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, List, Callable
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class ComfyUIConnectionError(Exception):
+    """Raised when a prompt could not be submitted to a ComfyUI server"""
+
+
+class ComfyUIOutputError(Exception):
+    """Raised when an output file could not be read from a ComfyUI server"""
+
+
+class PromptCancelled(Exception):
+    """Raised to a waiter whose prompt was cancelled or preempted"""
+
+    def __init__(self, prompt_id: Optional[str], reason: str = "cancelled"):
+        super().__init__(f"ComfyUI prompt {prompt_id} {reason}")
+        self.prompt_id = prompt_id
+        self.reason = reason
+
+
+CancelCheck = Callable[[], Optional[str]]
+
+
+class AsyncComfyUIClient:
+    """
+    asyncio-native ComfyUI client backed by a shared aiohttp connection pool.
+
+    One instance should be shared by every coroutine talking to the same
+    ComfyUI server so that requests reuse keep-alive connections instead of
+    paying a TCP handshake per call.
+    """
+
+    def __init__(
+        self,
+        server_address: str,
+        client_id: str,
+        max_connections: int = 100,
+        keepalive_timeout: float = 60.0,
+        timeout: float = 30.0,
+    ):
+        self.server_address = server_address.rstrip("/")
+        self.client_id = client_id
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session, created lazily on the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=self.server_address,
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.max_connections,
+                    keepalive_timeout=self.keepalive_timeout,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def queue_prompt(self, prompt: Dict[str, Any]) -> str:
+        """
+        Queue a prompt for generation
+
+        Args:
+            prompt: ComfyUI workflow prompt dictionary
+
+        Returns:
+            Prompt ID
+        """
+        try:
+            async with self.session.post(
+                "/prompt", json={"prompt": prompt, "client_id": self.client_id}
+            ) as response:
+                response.raise_for_status()
+                return (await response.json())["prompt_id"]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to queue prompt: {e}")
+            raise ComfyUIConnectionError(f"ComfyUI connection error: {str(e)}")
+
+    async def get_image(
+        self, filename: str, subfolder: str = "", folder_type: str = "output"
+    ) -> bytes:
+        """
+        Get generated image from ComfyUI
+
+        Args:
+            filename: Image filename
+            subfolder: Subfolder in output directory
+            folder_type: Type of folder (output, input, temp)
+
+        Returns:
+            Image bytes
+        """
+        params = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+
+        try:
+            async with self.session.get("/view", params=params) as response:
+                response.raise_for_status()
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to get image: {e}")
+            raise ComfyUIOutputError(f"Failed to retrieve image: {str(e)}")
+
+    async def stream_image(
+        self,
+        filename: str,
+        subfolder: str = "",
+        folder_type: str = "output",
+        chunk_size: int = 1024 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream an output file from ComfyUI in bounded chunks
+
+        Args:
+            filename: Output filename
+            subfolder: Subfolder in output directory
+            folder_type: Type of folder (output, input, temp)
+            chunk_size: Maximum bytes per yielded chunk
+
+        Yields:
+            Raw file bytes
+        """
+        params = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+
+        try:
+            # Large outputs (video) must not be cut off by the session timeout
+            async with self.session.get(
+                "/view",
+                params=params,
+                timeout=aiohttp.ClientTimeout(sock_read=self.timeout),
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to stream image: {e}")
+            raise ComfyUIOutputError(f"Failed to retrieve image: {str(e)}")
+
+    async def get_history(self, prompt_id: str) -> Dict:
+        """
+        Get generation history/status
+
+        Args:
+            prompt_id: Prompt ID from queue_prompt
+
+        Returns:
+            History dictionary (empty if unavailable)
+        """
+        try:
+            async with self.session.get(f"/history/{prompt_id}") as response:
+                response.raise_for_status()
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to get history: {e}")
+            return {}
+
+    async def get_queue(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Get the server's running and pending queue
+
+        Args:
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Dictionary with queue_running and queue_pending lists
+        """
+        async with self.session.get("/queue", **self._timeout(timeout)) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def get_system_stats(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Get system and device (VRAM) statistics
+
+        Args:
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Dictionary with system and devices info
+        """
+        async with self.session.get(
+            "/system_stats", **self._timeout(timeout)
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def delete_from_queue(self, prompt_ids: List[str]):
+        """
+        Remove pending prompts from the server queue
+
+        Args:
+            prompt_ids: Prompt IDs that have not started executing
+        """
+        try:
+            async with self.session.post(
+                "/queue", json={"delete": prompt_ids}
+            ) as response:
+                response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to delete prompts from queue: {e}")
+            raise Exception(f"ComfyUI connection error: {str(e)}")
+
+    async def interrupt(self, prompt_id: Optional[str] = None):
+        """
+        Interrupt the currently executing prompt
+
+        Args:
+            prompt_id: Only interrupt if this prompt is the one running
+                (honoured by recent ComfyUI versions)
+        """
+        try:
+            payload = {"prompt_id": prompt_id} if prompt_id else {}
+            async with self.session.post("/interrupt", json=payload) as response:
+                response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to interrupt prompt: {e}")
+            raise Exception(f"ComfyUI connection error: {str(e)}")
+
+    def _timeout(self, timeout: Optional[float]) -> Dict[str, Any]:
+        # Omitting the kwarg keeps the session default; None would disable it
+        return {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+
+    async def wait_for_completion(
+        self,
+        prompt_id: str,
+        timeout: int = 300,
+        poll_interval: float = 1.0,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
+        """
+        Poll history until the prompt completes
+
+        Args:
+            prompt_id: Prompt ID
+            timeout: Maximum wait time in seconds
+            poll_interval: Seconds between history polls
+            cancel_check: Optional callable returning a reason once the wait should be abandoned;
+                it may block (a Redis read), so it runs in the loop's executor rather than
+                stalling every other waiter on the shared loop
+
+        Returns:
+            Generation result with image info
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            history = await self.get_history(prompt_id)
+
+            if prompt_id in history:
+                return history[prompt_id]
+
+            reason = (
+                await loop.run_in_executor(None, cancel_check) if cancel_check else None
+            )
+            if reason:
+                raise PromptCancelled(prompt_id, reason)
+
+            await asyncio.sleep(poll_interval)
+
+        raise TimeoutError(f"Generation timed out after {timeout} seconds")
+
+    async def aclose(self):
+        """Close all pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+
+
+class ComfyUIClient:
+    """
+    Blocking facade over AsyncComfyUIClient for Celery workers.
+
+    Coroutines are executed on a private event loop running in a daemon
+    thread, so every caller in the process shares one connection pool.
+    The loop is recreated after fork() because Celery prefork children
+    inherit the parent's instance but not its threads.
+    """
+
+    def __init__(self, server_address: str, client_id: str, **client_kwargs):
+        self.server_address = server_address.rstrip("/")
+        self.client_id = client_id
+        self._client_kwargs = client_kwargs
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[AsyncComfyUIClient] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop (once per process)"""
+        if self._pid == os.getpid() and self._loop is not None:
+            return self._loop
+
+        with self._lock:
+            if self._pid != os.getpid() or self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name=f"comfyui-client-{self.client_id[:8]}",
+                    daemon=True,
+                )
+                thread.start()
+                self._async_client = asyncio.run_coroutine_threadsafe(
+                    self._create_async_client(), loop
+                ).result()
+                self._loop = loop
+                self._pid = os.getpid()
+
+        return self._loop
+
+    async def _create_async_client(self) -> AsyncComfyUIClient:
+        # aiohttp binds its session to the loop it is created on
+        return AsyncComfyUIClient(
+            self.server_address, self.client_id, **self._client_kwargs
+        )
+
+    def _run(self, coro_factory, timeout: Optional[float] = None):
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            coro_factory(self._async_client), loop
+        )
+        return future.result(timeout)
+
+    def queue_prompt(self, prompt: Dict[str, Any]) -> str:
+        return self._run(lambda c: c.queue_prompt(prompt))
+
+    def get_image(
+        self, filename: str, subfolder: str = "", folder_type: str = "output"
+    ) -> bytes:
+        return self._run(lambda c: c.get_image(filename, subfolder, folder_type))
+
+    def get_history(self, prompt_id: str) -> Dict:
+        return self._run(lambda c: c.get_history(prompt_id))
+
+    def iter_image(
+        self,
+        filename: str,
+        subfolder: str = "",
+        folder_type: str = "output",
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        """
+        Blocking iterator over AsyncComfyUIClient.stream_image
+
+        Chunks are pulled one at a time from the client loop, so at most one
+        chunk is buffered regardless of file size.
+        """
+        loop = self._ensure_loop()
+        stream = self._async_client.stream_image(
+            filename, subfolder, folder_type, chunk_size
+        )
+
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(
+                        stream.__anext__(), loop
+                    ).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.aclose(), loop).result()
+
+    def get_queue(self, timeout: Optional[float] = None) -> Dict:
+        return self._run(lambda c: c.get_queue(timeout))
+
+    def get_system_stats(self, timeout: Optional[float] = None) -> Dict:
+        return self._run(lambda c: c.get_system_stats(timeout))
+
+    def delete_from_queue(self, prompt_ids: List[str]):
+        return self._run(lambda c: c.delete_from_queue(prompt_ids))
+
+    def interrupt(self, prompt_id: Optional[str] = None):
+        return self._run(lambda c: c.interrupt(prompt_id))
+
+    def wait_for_completion(
+        self,
+        prompt_id: str,
+        timeout: int = 300,
+        poll_interval: float = 1.0,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
+        return self._run(
+            lambda c: c.wait_for_completion(
+                prompt_id, timeout, poll_interval, cancel_check
+            )
+        )
+
+    def close(self):
+        """Close the pool and stop the background loop"""
+        if self._loop is None or self._pid != os.getpid():
+            return
+
+        asyncio.run_coroutine_threadsafe(
+            self._async_client.aclose(), self._loop
+        ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._async_client = None
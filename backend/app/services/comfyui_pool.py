@@ -0,0 +1,446 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Node Pool
+Routes prompts across multiple ComfyUI servers by queue depth and loaded checkpoint
+"""
+
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    COMFYUI_NODE_HEALTHY,
+    COMFYUI_NODE_QUEUE_DEPTH,
+    COMFYUI_CHECKPOINT_DISPATCHES,
+)
+from app.services.comfyui_client import ComfyUIConnectionError, CancelCheck
+from app.services.comfyui_service import ComfyUIService, QueuedCallback
+from app.services.generation_control import PreemptionPolicy, mark_preempted
+
+logger = logging.getLogger(__name__)
+
+
+class ComfyUINode:
+    """
+    A single ComfyUI server and its last observed health/load
+    """
+
+    def __init__(self, server_address: str):
+        self.address = server_address.rstrip("/")
+        self.service = ComfyUIService(self.address)
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.queue_remaining = 0
+        self.in_flight = 0
+        self.dispatched_since_check = 0
+        self.vram_free: Optional[int] = None
+        self.last_checked: Optional[float] = None
+        self.checkpoint: Optional[str] = None
+        self.checkpoint_hits = 0
+        self.checkpoint_misses = 0
+
+    @property
+    def load(self) -> int:
+        """Server-side queue depth plus prompts sent since it was sampled"""
+        return self.queue_remaining + self.dispatched_since_check
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "healthy": self.healthy,
+            "load": self.load,
+            "queue_remaining": self.queue_remaining,
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "vram_free": self.vram_free,
+            "last_checked": self.last_checked,
+            "checkpoint": self.checkpoint,
+            "checkpoint_hits": self.checkpoint_hits,
+            "checkpoint_misses": self.checkpoint_misses,
+        }
+
+
+class ComfyUIPool:
+    """
+    Pool of ComfyUI nodes with least-loaded, checkpoint-aware routing.
+
+    Each node remembers the checkpoint of the last prompt it accepted (the
+    model it will have loaded once its queue drains). Routing minimises
+    queue depth plus a swap penalty for nodes that would have to load a
+    different checkpoint, so same-model prompts stick to warm GPUs unless
+    those are backed up by more than the cost of a reload.
+
+    A background thread samples /queue and /system_stats on every node.
+    Nodes that fail COMFYUI_EJECT_AFTER_FAILURES consecutive checks (or
+    submissions) are ejected from routing and re-admitted on the first
+    successful check, so one wedged GPU box cannot stall all generations.
+
+    With a preemption policy, a prompt routed to a saturated node evicts
+    lower-priority prompts still pending there (see PreemptionPolicy).
+    """
+
+    def __init__(
+        self,
+        server_addresses: List[str],
+        health_check_interval: float = 5.0,
+        health_check_timeout: float = 5.0,
+        eject_after_failures: int = 3,
+        checkpoint_swap_penalty: float = 2.0,
+        preemption_policy: Optional[PreemptionPolicy] = None,
+    ):
+        if not server_addresses:
+            raise ValueError("ComfyUIPool requires at least one server address")
+
+        self.nodes = [ComfyUINode(address) for address in server_addresses]
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.eject_after_failures = eject_after_failures
+        self.checkpoint_swap_penalty = checkpoint_swap_penalty
+        self.preemption_policy = preemption_policy
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def ensure_started(self):
+        """Start the health check thread (once per process, restarted after fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(
+                target=self._health_loop, name="comfyui-pool-health", daemon=True
+            ).start()
+
+    def _health_loop(self):
+        with ThreadPoolExecutor(
+            max_workers=len(self.nodes), thread_name_prefix="comfyui-pool-probe"
+        ) as probes:
+            while True:
+                self.check_all(probes)
+                time.sleep(self.health_check_interval)
+
+    def check_all(self, probes: ThreadPoolExecutor) -> List[bool]:
+        """
+        Check every node at once, so a wedged node holding its probe for the
+        full timeout does not delay the samples of the others
+        """
+        return list(probes.map(self.check_health, self.nodes))
+
+    def check_health(self, node: ComfyUINode) -> bool:
+        """
+        Sample a node's queue depth and device stats
+
+        Returns:
+            True if the node responded
+        """
+        try:
+            queue = node.service.get_queue(timeout=self.health_check_timeout)
+            stats = node.service.get_system_stats(timeout=self.health_check_timeout)
+        except Exception as e:
+            self.record_failure(node, f"health check failed: {e}")
+            return False
+
+        devices = stats.get("devices") or []
+        with self._lock:
+            node.queue_remaining = len(queue.get("queue_running", [])) + len(
+                queue.get("queue_pending", [])
+            )
+            node.dispatched_since_check = 0
+            node.vram_free = (
+                sum(d.get("vram_free", 0) for d in devices) if devices else None
+            )
+            node.last_checked = time.time()
+            node.consecutive_failures = 0
+            if not node.healthy:
+                node.healthy = True
+                logger.info(f"ComfyUI node re-admitted: {node.address}")
+        COMFYUI_NODE_HEALTHY.labels(node=node.address).set(1)
+        COMFYUI_NODE_QUEUE_DEPTH.labels(node=node.address).set(node.queue_remaining)
+        return True
+
+    def record_failure(self, node: ComfyUINode, reason: str):
+        """Count a failure against a node and eject it past the threshold"""
+        with self._lock:
+            node.consecutive_failures += 1
+            if node.healthy and node.consecutive_failures >= self.eject_after_failures:
+                node.healthy = False
+                # Its loaded model is unknown once it comes back
+                node.checkpoint = None
+                COMFYUI_NODE_HEALTHY.labels(node=node.address).set(0)
+                logger.error(f"ComfyUI node ejected: {node.address} ({reason})")
+            else:
+                logger.warning(f"ComfyUI node {node.address}: {reason}")
+
+    def _score(self, node: ComfyUINode, checkpoint: Optional[str]) -> float:
+        swap = (
+            0.0
+            if checkpoint is None or node.checkpoint == checkpoint
+            else self.checkpoint_swap_penalty
+        )
+        return node.load + swap
+
+    def select_node(
+        self,
+        checkpoint: Optional[str] = None,
+        exclude: Optional[List[ComfyUINode]] = None,
+    ) -> ComfyUINode:
+        """
+        Pick the healthy node with the lowest load + checkpoint swap cost
+
+        Args:
+            checkpoint: Checkpoint the prompt loads (ckpt_name), if known
+            exclude: Nodes to skip
+
+        Raises:
+            ComfyUIConnectionError: If no healthy node is available
+        """
+        self.ensure_started()
+        exclude = exclude or []
+
+        with self._lock:
+            candidates = [n for n in self.nodes if n.healthy and n not in exclude]
+            if not candidates:
+                raise ComfyUIConnectionError("No healthy ComfyUI nodes available")
+
+            node = min(
+                candidates, key=lambda n: (self._score(n, checkpoint), n.in_flight)
+            )
+            node.dispatched_since_check += 1
+            return node
+
+    def _record_checkpoint(self, node: ComfyUINode, checkpoint: Optional[str]):
+        """Count a prompt a node accepted against the checkpoint it has loaded"""
+        if checkpoint is None:
+            return
+
+        with self._lock:
+            hit = node.checkpoint == checkpoint
+            if hit:
+                node.checkpoint_hits += 1
+            else:
+                node.checkpoint_misses += 1
+                node.checkpoint = checkpoint
+        COMFYUI_CHECKPOINT_DISPATCHES.labels(
+            node=node.address, result="hit" if hit else "miss"
+        ).inc()
+
+    def _on_queued(
+        self,
+        node: ComfyUINode,
+        checkpoint: Optional[str],
+        on_queued: Optional[QueuedCallback],
+    ) -> QueuedCallback:
+        """
+        Wrap a caller's on_queued so a node only takes on a checkpoint once
+        it has accepted a prompt for it; a failed submission loads nothing
+        """
+
+        def queued(address: str, prompt_id: str):
+            self._record_checkpoint(node, checkpoint)
+            if on_queued:
+                on_queued(address, prompt_id)
+
+        return queued
+
+    @contextmanager
+    def acquire(
+        self,
+        checkpoint: Optional[str] = None,
+        exclude: Optional[List[ComfyUINode]] = None,
+    ) -> Iterator[ComfyUINode]:
+        """Select a node and count the caller as in flight on it"""
+        node = self.select_node(checkpoint, exclude)
+        with self._lock:
+            node.in_flight += 1
+        try:
+            yield node
+        finally:
+            with self._lock:
+                node.in_flight -= 1
+
+    def _maybe_preempt(self, node: ComfyUINode, priority: Optional[int]):
+        """Evict lower-priority pending prompts from a saturated node"""
+        if self.preemption_policy is None or priority is None:
+            return
+
+        try:
+            victims = self.preemption_policy.select_victims(
+                node.address, node.load, priority
+            )
+            if not victims:
+                return
+
+            # Only prompts still waiting can be removed without losing GPU work
+            pending = {
+                item[1] for item in node.service.get_queue().get("queue_pending", [])
+            }
+            victims = [(gid, pid) for gid, pid in victims if pid in pending]
+            if not victims:
+                return
+
+            node.service.client.delete_from_queue([pid for _, pid in victims])
+            for generation_id, prompt_id in victims:
+                mark_preempted(generation_id)
+                logger.info(
+                    f"Preempted ComfyUI prompt {prompt_id} ({generation_id}) on {node.address}"
+                )
+
+            with self._lock:
+                node.queue_remaining = max(node.queue_remaining - len(victims), 0)
+        except Exception as e:
+            # Preemption is best effort; never fail the incoming prompt over it
+            logger.warning(f"Preemption on {node.address} failed: {e}")
+
+    def get_node(self, address: str) -> ComfyUINode:
+        """Look up a node by server address"""
+        address = address.rstrip("/")
+        for node in self.nodes:
+            if node.address == address:
+                return node
+        raise KeyError(f"Unknown ComfyUI node: {address}")
+
+    def generate_image(self, **kwargs) -> Dict[str, Any]:
+        """
+        Generate an image on the best node for its checkpoint
+
+        Accepts the same arguments as ComfyUIService.generate_image. Prompts
+        that cannot be submitted are retried on the next node.
+
+        Returns:
+            ComfyUIService.generate_image result (its 'node' is the serving node)
+        """
+        priority = kwargs.pop("priority", None)
+        on_queued = kwargs.pop("on_queued", None)
+        tried: List[ComfyUINode] = []
+
+        while True:
+            with self.acquire(checkpoint=kwargs.get("model"), exclude=tried) as node:
+                self._maybe_preempt(node, priority)
+                try:
+                    result = node.service.generate_image(
+                        **kwargs,
+                        on_queued=self._on_queued(node, kwargs.get("model"), on_queued),
+                    )
+                except ComfyUIConnectionError as e:
+                    # Nothing was queued, so it is safe to try another node
+                    self.record_failure(node, str(e))
+                    tried.append(node)
+                    continue
+
+            return result
+
+    def submit_image(self, **kwargs) -> Dict[str, Any]:
+        """
+        Queue an image prompt on the best node for its checkpoint without waiting
+
+        Accepts the same arguments as ComfyUIService.submit_image, plus
+        priority. Collect the result with wait_for_prompt.
+
+        Returns:
+            ComfyUIService.submit_image result (its 'node' is the serving node)
+        """
+        priority = kwargs.pop("priority", None)
+        on_queued = kwargs.pop("on_queued", None)
+        tried: List[ComfyUINode] = []
+
+        while True:
+            with self.acquire(checkpoint=kwargs.get("model"), exclude=tried) as node:
+                self._maybe_preempt(node, priority)
+                try:
+                    return node.service.submit_image(
+                        **kwargs,
+                        on_queued=self._on_queued(node, kwargs.get("model"), on_queued),
+                    )
+                except ComfyUIConnectionError as e:
+                    self.record_failure(node, str(e))
+                    tried.append(node)
+
+    def wait_for_prompt(
+        self,
+        address: str,
+        prompt_id: str,
+        timeout: int = 300,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
+        """Wait for a prompt submitted to a node (by any process) to finish"""
+        return self.get_node(address).service.wait_for_prompt(
+            prompt_id, timeout, cancel_check
+        )
+
+    def execute_workflow(
+        self,
+        workflow: Dict[str, Any],
+        checkpoint: Optional[str] = None,
+        timeout: int = 300,
+        on_queued: Optional[QueuedCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+        priority: Optional[int] = None,
+    ) -> Tuple[ComfyUINode, str, Dict]:
+        """
+        Run a prebuilt workflow on the best node for its checkpoint
+
+        Returns:
+            (node, prompt_id, history entry) tuple
+        """
+        tried: List[ComfyUINode] = []
+
+        while True:
+            with self.acquire(checkpoint=checkpoint, exclude=tried) as node:
+                self._maybe_preempt(node, priority)
+                try:
+                    prompt_id, result = node.service.execute_workflow(
+                        workflow,
+                        timeout,
+                        on_queued=self._on_queued(node, checkpoint, on_queued),
+                        cancel_check=cancel_check,
+                    )
+                except ComfyUIConnectionError as e:
+                    self.record_failure(node, str(e))
+                    tried.append(node)
+                    continue
+
+            return node, prompt_id, result
+
+    def stream_output(
+        self, address: str, file_info: Dict[str, Any], chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        """Stream an output file from the node that produced it"""
+        return self.get_node(address).service.stream_output(file_info, chunk_size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of every node's health, load and checkpoint cache hit rate"""
+        with self._lock:
+            hits = sum(n.checkpoint_hits for n in self.nodes)
+            misses = sum(n.checkpoint_misses for n in self.nodes)
+            return {
+                "nodes": [node.to_dict() for node in self.nodes],
+                "checkpoint_hits": hits,
+                "checkpoint_misses": misses,
+                "checkpoint_hit_rate": (
+                    hits / (hits + misses) if hits + misses else None
+                ),
+            }
+
+
+# Global instance
+comfyui_pool = ComfyUIPool(
+    settings.COMFYUI_URLS or [settings.COMFYUI_URL],
+    health_check_interval=settings.COMFYUI_HEALTH_CHECK_INTERVAL_SECONDS,
+    health_check_timeout=settings.COMFYUI_HEALTH_CHECK_TIMEOUT_SECONDS,
+    eject_after_failures=settings.COMFYUI_EJECT_AFTER_FAILURES,
+    checkpoint_swap_penalty=settings.COMFYUI_CHECKPOINT_SWAP_PENALTY,
+    preemption_policy=(
+        PreemptionPolicy(
+            saturation_depth=settings.GENERATION_PREEMPT_SATURATION_DEPTH,
+            max_victims=settings.GENERATION_PREEMPT_MAX_VICTIMS,
+        )
+        if settings.GENERATION_PREEMPTION_ENABLED
+        else None
+    ),
+)
@@ -4,19 +4,47 @@ Handles image generation via ComfyUI API
 """
 import json
 import uuid
-import urllib.request
-import urllib.error
 import time
-import websocket
 import logging
-from typing import Optional, Dict, Any
-import os
-import tempfile
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Callable
 
 from app.core.config import settings
+from app.core.redis import sync_redis_client
+from app.services.comfyui_client import ComfyUIClient, CancelCheck, PromptCancelled
+from app.services.comfyui_tracker import ComfyUICompletionTracker, ProgressCallback
 
 logger = logging.getLogger(__name__)
 
+# Called with (node address, prompt_id) as soon as a prompt is accepted
+QueuedCallback = Callable[[str, str], None]
+
+# History output keys that carry files (SaveImage, VHS video/gif and audio nodes)
+OUTPUT_KEYS = ("images", "gifs", "videos", "audio")
+
+# Finished prompts' history entries, handed from the queuing process to the collector
+COMPLETION_PREFIX = "jams:comfyui:done"
+COMPLETION_TTL_SECONDS = 3600
+
+
+def _completion_key(prompt_id: str) -> str:
+    return f"{COMPLETION_PREFIX}:{prompt_id}"
+
+
+def publish_completion(prompt_id: str, entry: Dict):
+    """Publish a finished prompt's history entry for wait_for_prompt"""
+    pipe = sync_redis_client.pipeline(transaction=False)
+    pipe.rpush(_completion_key(prompt_id), json.dumps(entry))
+    pipe.expire(_completion_key(prompt_id), COMPLETION_TTL_SECONDS)
+    pipe.execute()
+
+
+def raise_for_history_errors(result: Dict):
+    """Raise if a history entry records a failed or interrupted prompt"""
+    for event_type, data in (result.get("status") or {}).get("messages", []):
+        if event_type in ("execution_error", "execution_interrupted"):
+            detail = (data or {}).get("exception_message") or event_type
+            raise Exception(f"ComfyUI {event_type}: {detail}")
+
 
 class ComfyUIService:
     """
@@ -26,7 +54,25 @@ class ComfyUIService:
     def __init__(self, server_address: str = None):
         self.server_address = server_address or settings.COMFYUI_URL
         self.client_id = str(uuid.uuid4())
-    
+        self.client = ComfyUIClient(
+            self.server_address,
+            self.client_id,
+            max_connections=settings.COMFYUI_MAX_CONNECTIONS,
+            keepalive_timeout=settings.COMFYUI_KEEPALIVE_TIMEOUT_SECONDS,
+            timeout=settings.COMFYUI_TIMEOUT_SECONDS,
+        )
+        self.tracker = (
+            ComfyUICompletionTracker(
+                self.server_address,
+                self.client_id,
+                history_fetcher=self.get_history,
+                poll_interval=settings.COMFYUI_POLL_INTERVAL_SECONDS,
+                reconnect_delay=settings.COMFYUI_WS_RECONNECT_SECONDS,
+            )
+            if settings.COMFYUI_USE_WEBSOCKET
+            else None
+        )
+
     def queue_prompt(self, prompt: Dict[str, Any]) -> str:
         """
         Queue a prompt for generation
@@ -37,17 +83,7 @@ class ComfyUIService:
         Returns:
             Prompt ID
         """
-        p = {"prompt": prompt, "client_id": self.client_id}
-        data = json.dumps(p).encode('utf-8')
-        
-        try:
-            req = urllib.request.Request(f"{self.server_address}/prompt", data=data)
-            response = urllib.request.urlopen(req)
-            result = json.loads(response.read())
-            return result['prompt_id']
-        except urllib.error.URLError as e:
-            logger.error(f"Failed to queue prompt: {e}")
-            raise Exception(f"ComfyUI connection error: {str(e)}")
+        return self.client.queue_prompt(prompt)
     
     def get_image(self, filename: str, subfolder: str = "", folder_type: str = "output") -> bytes:
         """
@@ -61,15 +97,7 @@ class ComfyUIService:
         Returns:
             Image bytes
         """
-        data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-        url_values = urllib.parse.urlencode(data)
-        
-        try:
-            with urllib.request.urlopen(f"{self.server_address}/view?{url_values}") as response:
-                return response.read()
-        except urllib.error.URLError as e:
-            logger.error(f"Failed to get image: {e}")
-            raise Exception(f"Failed to retrieve image: {str(e)}")
+        return self.client.get_image(filename, subfolder, folder_type)
     
     def get_history(self, prompt_id: str) -> Dict:
         """
@@ -81,36 +109,171 @@ class ComfyUIService:
         Returns:
             History dictionary
         """
-        try:
-            with urllib.request.urlopen(f"{self.server_address}/history/{prompt_id}") as response:
-                return json.loads(response.read())
-        except urllib.error.URLError as e:
-            logger.error(f"Failed to get history: {e}")
-            return {}
+        return self.client.get_history(prompt_id)
     
-    def wait_for_completion(self, prompt_id: str, timeout: int = 300) -> Dict:
+    def get_queue(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Get the server's running and pending queue
+
+        Args:
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Dictionary with queue_running and queue_pending lists
+        """
+        return self.client.get_queue(timeout)
+
+    def get_system_stats(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Get system and device (VRAM) statistics
+
+        Args:
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Dictionary with system and devices info
+        """
+        return self.client.get_system_stats(timeout)
+
+    def wait_for_completion(
+        self,
+        prompt_id: str,
+        timeout: int = 300,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
         """
         Wait for generation to complete
+
+        Uses the WebSocket completion tracker when enabled and only falls
+        back to polling /history while the socket is down.
         
         Args:
             prompt_id: Prompt ID
             timeout: Maximum wait time in seconds
+            on_progress: Optional callback(event_type, data) for execution events
+            cancel_check: Optional callable returning a reason once the wait
+                should be abandoned (raises PromptCancelled)
             
         Returns:
             Generation result with image info
         """
-        start_time = time.time()
+        if self.tracker:
+            return self.tracker.wait(
+                prompt_id, timeout, on_progress=on_progress, cancel_check=cancel_check
+            )
         
-        while time.time() - start_time < timeout:
-            history = self.get_history(prompt_id)
-            
-            if prompt_id in history:
-                return history[prompt_id]
-            
-            time.sleep(1)
-        
-        raise TimeoutError(f"Generation timed out after {timeout} seconds")
+        return self.client.wait_for_completion(
+            prompt_id,
+            timeout,
+            poll_interval=settings.COMFYUI_POLL_INTERVAL_SECONDS,
+            cancel_check=cancel_check,
+        )
     
+    def wait_for_prompt(
+        self,
+        prompt_id: str,
+        timeout: int = 300,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
+        """
+        Wait for a prompt queued by another process
+
+        ComfyUI only sends execution events to the client ID that queued a
+        prompt. With the tracker enabled, the queuing process publishes the
+        prompt's history entry to Redis when it finishes (see submit_image)
+        and this blocks on that; /history is only read every
+        COMFYUI_COLLECT_HISTORY_CHECK_SECONDS in case the publisher died.
+        Without the tracker, /history is polled.
+
+        Args:
+            prompt_id: Prompt ID
+            timeout: Maximum wait time in seconds
+            cancel_check: Optional callable returning a reason to abandon the wait
+
+        Returns:
+            History entry for the prompt
+        """
+        if self.tracker:
+            result = self._wait_for_completion_notice(prompt_id, timeout, cancel_check)
+        else:
+            result = self.client.wait_for_completion(
+                prompt_id,
+                timeout,
+                poll_interval=settings.COMFYUI_POLL_INTERVAL_SECONDS,
+                cancel_check=cancel_check,
+            )
+
+        # Failed and interrupted prompts still land in history
+        raise_for_history_errors(result)
+        return result
+
+    def _wait_for_completion_notice(
+        self, prompt_id: str, timeout: int, cancel_check: Optional[CancelCheck]
+    ) -> Dict:
+        key = _completion_key(prompt_id)
+        deadline = time.monotonic() + timeout
+        history_check = (
+            time.monotonic() + settings.COMFYUI_COLLECT_HISTORY_CHECK_SECONDS
+        )
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Generation timed out after {timeout} seconds")
+
+            reason = cancel_check() if cancel_check else None
+            if reason:
+                raise PromptCancelled(prompt_id, reason)
+
+            # Rotating the one-entry list onto itself leaves it for a retried collect
+            notice = sync_redis_client.blmove(
+                key,
+                key,
+                min(remaining, settings.COMFYUI_POLL_INTERVAL_SECONDS),
+                "RIGHT",
+                "LEFT",
+            )
+            if notice:
+                result = json.loads(notice)
+                if not result.get("outputs"):
+                    # Fully cached prompts emit no "executed" events
+                    result = self.get_history(prompt_id).get(prompt_id, result)
+                return result
+
+            if time.monotonic() >= history_check:
+                history = self.get_history(prompt_id)
+                if prompt_id in history:
+                    return history[prompt_id]
+                history_check = (
+                    time.monotonic() + settings.COMFYUI_COLLECT_HISTORY_CHECK_SECONDS
+                )
+
+    def cancel_prompt(self, prompt_id: str) -> str:
+        """
+        Remove a queued prompt or interrupt it if it is already running
+
+        Args:
+            prompt_id: Prompt ID
+
+        Returns:
+            'removed', 'interrupted' or 'not_found'
+        """
+        queue = self.get_queue()
+
+        # Queue entries are [number, prompt_id, prompt, extra_data, outputs]
+        if any(item[1] == prompt_id for item in queue.get("queue_pending", [])):
+            self.client.delete_from_queue([prompt_id])
+            logger.info(f"Removed queued ComfyUI prompt: {prompt_id}")
+            return "removed"
+
+        if any(item[1] == prompt_id for item in queue.get("queue_running", [])):
+            self.client.interrupt(prompt_id)
+            logger.info(f"Interrupted running ComfyUI prompt: {prompt_id}")
+            return "interrupted"
+
+        return "not_found"
+
     def generate_image(
         self,
         prompt: str,
@@ -123,7 +286,11 @@ class ComfyUIService:
         sampler: str = "euler_ancestral",
         scheduler: str = "normal",
         seed: int = -1,
-        safety_checker: bool = False
+        safety_checker: bool = False,
+        batch_size: int = 1,
+        on_queued: Optional[QueuedCallback] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
     ) -> Dict[str, Any]:
         """
         Generate an image using ComfyUI
@@ -140,9 +307,131 @@ class ComfyUIService:
             scheduler: Scheduler name
             seed: Random seed (-1 for random)
             safety_checker: Whether to enable safety checker (NSFW filter)
+            batch_size: Number of images sampled together in one latent batch
+            on_queued: Optional callback(node, prompt_id) once the prompt is accepted
+            on_progress: Optional callback(event_type, data) for execution events
+            cancel_check: Optional callable returning a reason to abandon the wait
             
         Returns:
-            Dictionary with generation info and image path
+            Dictionary with generation info and output file descriptors
+            (stream them with stream_output)
+        """
+        workflow, seed, metadata = self.build_image_request(
+            prompt,
+            negative_prompt,
+            model,
+            width,
+            height,
+            steps,
+            cfg,
+            sampler,
+            scheduler,
+            seed,
+            batch_size,
+        )
+
+        prompt_id, result = self.execute_workflow(
+            workflow,
+            on_queued=on_queued,
+            on_progress=on_progress,
+            cancel_check=cancel_check,
+        )
+
+        return {
+            "prompt_id": prompt_id,
+            "node": self.server_address,
+            "images": self.collect_outputs(result),
+            "seed": seed,
+            "metadata": metadata,
+        }
+
+    def submit_image(
+        self,
+        prompt: str,
+        negative_prompt: str = "",
+        model: str = "RealVisXL_V4.0.safetensors",
+        width: int = 1024,
+        height: int = 1024,
+        steps: int = 30,
+        cfg: float = 7.0,
+        sampler: str = "euler_ancestral",
+        scheduler: str = "normal",
+        seed: int = -1,
+        safety_checker: bool = False,
+        batch_size: int = 1,
+        on_queued: Optional[QueuedCallback] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue an image prompt without waiting for it
+
+        Takes the same arguments as generate_image. The prompt is collected
+        later with wait_for_prompt, possibly from another process. With the
+        WebSocket tracker enabled, on_progress still receives this prompt's
+        execution events in this process, and this process publishes its
+        completion for the collector.
+
+        Returns:
+            Dictionary with prompt_id, node, seed and metadata
+        """
+        workflow, seed, metadata = self.build_image_request(
+            prompt,
+            negative_prompt,
+            model,
+            width,
+            height,
+            steps,
+            cfg,
+            sampler,
+            scheduler,
+            seed,
+            batch_size,
+        )
+
+        if self.tracker:
+            self.tracker.ensure_started()
+
+        prompt_id = self.queue_prompt(workflow)
+        logger.info(f"Queued ComfyUI prompt: {prompt_id}")
+
+        if self.tracker:
+            self.tracker.watch(
+                prompt_id,
+                on_progress,
+                on_finish=publish_completion,
+                timeout=settings.GENERATION_COLLECT_TIMEOUT_SECONDS,
+            )
+
+        if on_queued:
+            on_queued(self.server_address, prompt_id)
+
+        return {
+            "prompt_id": prompt_id,
+            "node": self.server_address,
+            "seed": seed,
+            "metadata": metadata,
+        }
+
+    def build_image_request(
+        self,
+        prompt: str,
+        negative_prompt: str = "",
+        model: str = "RealVisXL_V4.0.safetensors",
+        width: int = 1024,
+        height: int = 1024,
+        steps: int = 30,
+        cfg: float = 7.0,
+        sampler: str = "euler_ancestral",
+        scheduler: str = "normal",
+        seed: int = -1,
+        batch_size: int = 1,
+        safety_checker: bool = False,
+    ) -> Tuple[Dict[str, Any], int, Dict[str, Any]]:
+        """
+        Resolve a random seed and build the workflow and metadata for an image prompt
+
+        Returns:
+            (workflow, seed, metadata) tuple
         """
         if seed == -1:
             seed = int(time.time())
@@ -158,59 +447,114 @@ class ComfyUIService:
             cfg=cfg,
             sampler=sampler,
             scheduler=scheduler,
-            seed=seed
+            seed=seed,
+            batch_size=batch_size,
         )
         
-        # Queue the prompt
+        metadata = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "model": model,
+            "width": width,
+            "height": height,
+            "steps": steps,
+            "cfg": cfg,
+            "sampler": sampler,
+            "scheduler": scheduler,
+            "batch_size": batch_size,
+        }
+        return workflow, seed, metadata
+    
+    def execute_workflow(
+        self,
+        workflow: Dict[str, Any],
+        timeout: int = 300,
+        on_queued: Optional[QueuedCallback] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Tuple[str, Dict]:
+        """
+        Queue a workflow and wait for it to finish
+
+        Args:
+            workflow: ComfyUI workflow prompt dictionary
+            timeout: Maximum wait time in seconds
+            on_queued: Optional callback(node, prompt_id) once the prompt is accepted
+            on_progress: Optional callback(event_type, data) for execution events
+            cancel_check: Optional callable returning a reason to abandon the wait
+
+        Returns:
+            (prompt_id, history entry) tuple
+        """
+        # Subscribe before queueing so no execution event is missed
+        if self.tracker:
+            self.tracker.ensure_started()
+
         prompt_id = self.queue_prompt(workflow)
         logger.info(f"Queued ComfyUI prompt: {prompt_id}")
-        
-        # Wait for completion
-        result = self.wait_for_completion(prompt_id)
-        
-        # Extract image info
-        outputs = result.get('outputs', {})
-        images = []
-        
+
+        if on_queued:
+            on_queued(self.server_address, prompt_id)
+
+        return prompt_id, self.wait_for_completion(
+            prompt_id, timeout, on_progress=on_progress, cancel_check=cancel_check
+        )
+
+    def collect_outputs(
+        self, result: Dict, node_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List the output files of a finished prompt without downloading them
+
+        Args:
+            result: History entry returned by wait_for_completion
+            node_ids: Only collect files from these output nodes (default: all)
+
+        Returns:
+            List of {filename, subfolder, type} dicts, in output order
+        """
+        outputs = result.get("outputs", {})
+        files = []
+
         for node_id, node_output in outputs.items():
-            if 'images' in node_output:
-                for image_info in node_output['images']:
-                    # Download image
-                    image_bytes = self.get_image(
-                        image_info['filename'],
-                        image_info.get('subfolder', ''),
-                        image_info.get('type', 'output')
-                    )
-                    
-                    # Save to temp file
-                    temp_file = tempfile.NamedTemporaryFile(
-                        delete=False,
-                        suffix='.png'
-                    )
-                    temp_file.write(image_bytes)
-                    temp_file.close()
-                    
-                    images.append(temp_file.name)
-        
-        return {
-            'prompt_id': prompt_id,
-            'images': images,
-            'seed': seed,
-            'metadata': {
-                'prompt': prompt,
-                'negative_prompt': negative_prompt,
-                'model': model,
-                'width': width,
-                'height': height,
-                'steps': steps,
-                'cfg': cfg,
-                'sampler': sampler,
-                'scheduler': scheduler,
-            }
-        }
-    
+            if node_ids is not None and node_id not in node_ids:
+                continue
+
+            for key in OUTPUT_KEYS:
+                for file_info in node_output.get(key, []):
+                    if isinstance(file_info, dict) and "filename" in file_info:
+                        files.append(
+                            {
+                                "filename": file_info["filename"],
+                                "subfolder": file_info.get("subfolder", ""),
+                                "type": file_info.get("type", "output"),
+                            }
+                        )
+
+        return files
+
+    def stream_output(
+        self, file_info: Dict[str, Any], chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Stream an output file (as listed by collect_outputs) in bounded chunks
+
+        Args:
+            file_info: {filename, subfolder, type} dict
+            chunk_size: Maximum bytes per chunk
+
+        Returns:
+            Iterator of raw file bytes
+        """
+        return self.client.iter_image(
+            file_info["filename"],
+            file_info.get("subfolder", ""),
+            file_info.get("type", "output"),
+            chunk_size,
+        )
+
+    @staticmethod
     def _build_workflow(
-        self,
         prompt: str,
         negative_prompt: str,
         model: str,
@@ -220,7 +564,8 @@ class ComfyUIService:
         cfg: float,
         sampler: str,
         scheduler: str,
-        seed: int
+        seed: int,
+        batch_size: int = 1,
     ) -> Dict:
         """
         Build ComfyUI workflow JSON
@@ -249,12 +594,8 @@ class ComfyUIService:
                 "class_type": "CheckpointLoaderSimple"
             },
             "5": {
-                "inputs": {
-                    "width": width,
-                    "height": height,
-                    "batch_size": 1
-                },
-                "class_type": "EmptyLatentImage"
+                "inputs": {"width": width, "height": height, "batch_size": batch_size},
+                "class_type": "EmptyLatentImage",
             },
             "6": {
                 "inputs": {
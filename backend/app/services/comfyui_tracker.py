@@ -0,0 +1,346 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Completion Tracker
+Tracks prompt completion over ComfyUI's WebSocket event stream
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, Callable, Tuple
+
+import websocket
+
+from app.services.comfyui_client import PromptCancelled, CancelCheck
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+# Called with (prompt_id, history entry) once a watched prompt finishes
+FinishCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class _TrackedPrompt:
+    """Per-prompt state assembled from WebSocket events"""
+
+    __slots__ = ("future", "outputs", "listeners", "waiters", "error")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.outputs: Dict[str, Any] = {}
+        self.listeners: list = []
+        self.waiters = 0
+        self.error: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    def history_entry(self) -> Dict[str, Any]:
+        """The prompt's outcome shaped like its /history entry"""
+        if self.error:
+            return {
+                "outputs": {},
+                "status": {"status_str": "error", "messages": [list(self.error)]},
+            }
+        return {"outputs": dict(self.outputs)}
+
+
+class ComfyUICompletionTracker:
+    """
+    Subscribes once to ``/ws?clientId=`` and demultiplexes execution events
+    to the prompts waiting on them.
+
+    ``executing`` with ``node=None`` (or ``execution_success``) marks a prompt
+    as finished, ``executed`` carries node outputs, and ``progress`` is fanned
+    out to per-prompt listeners. While the socket is down, waiters fall back to
+    polling ``/history`` so no completion is lost; so do watched prompts,
+    which are looked up whenever the socket drops or reconnects.
+    """
+
+    def __init__(
+        self,
+        server_address: str,
+        client_id: str,
+        history_fetcher: Callable[[str], Dict],
+        poll_interval: float = 1.0,
+        reconnect_delay: float = 2.0,
+        max_finished: int = 1024,
+    ):
+        base = server_address.rstrip("/")
+        if base.startswith("https://"):
+            self.ws_url = f"wss://{base[len('https://'):]}/ws?clientId={client_id}"
+        else:
+            self.ws_url = f"ws://{base.split('://', 1)[-1]}/ws?clientId={client_id}"
+
+        self.history_fetcher = history_fetcher
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_finished = max_finished
+
+        self._lock = threading.Lock()
+        self._prompts: "OrderedDict[str, _TrackedPrompt]" = OrderedDict()
+        # Watched prompt_id -> (deadline, on_finish), oldest first
+        self._watched: "OrderedDict[str, Tuple[float, FinishCallback]]" = OrderedDict()
+        self._connected = threading.Event()
+        self._epoch = 0
+        self._pid: Optional[int] = None
+        self._ws: Optional[websocket.WebSocketApp] = None
+
+    # Connection management
+
+    def ensure_started(self):
+        """Start the listener thread (once per process, restarted after fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._prompts.clear()
+            self._watched.clear()
+            self._connected = threading.Event()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="comfyui-ws", daemon=True).start()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def _run(self):
+        while True:
+            self._ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_close=self._on_close,
+                on_error=self._on_error,
+            )
+            # Reconnects are handled by this loop so on_open bumps the epoch
+            self._ws.run_forever(ping_interval=30, ping_timeout=10, reconnect=0)
+            self._connected.clear()
+            self._poll_watched()
+            time.sleep(self.reconnect_delay)
+
+    def _on_open(self, ws):
+        with self._lock:
+            self._epoch += 1
+        self._connected.set()
+        logger.info(f"ComfyUI WebSocket connected: {self.ws_url}")
+        # Watched prompts may have finished while the socket was down
+        self._poll_watched()
+
+    def _on_close(self, ws, status_code, message):
+        self._connected.clear()
+        logger.warning(f"ComfyUI WebSocket closed ({status_code}): {message}")
+
+    def _on_error(self, ws, error):
+        self._connected.clear()
+        logger.warning(f"ComfyUI WebSocket error: {error}")
+
+    # Event demultiplexing
+
+    def _get(self, prompt_id: str) -> _TrackedPrompt:
+        tracked = self._prompts.get(prompt_id)
+        if tracked is None:
+            tracked = self._prompts[prompt_id] = _TrackedPrompt()
+            self._evict()
+        return tracked
+
+    def _evict(self):
+        """
+        Forget the oldest prompts beyond max_finished, keeping unfinished
+        ones a caller is still waiting on or watching; events for prompts
+        queued by other clients, or cancelled out of the queue, never finish
+        """
+        excess = len(self._prompts) - self.max_finished
+        # Never the entry just created for the caller
+        for prompt_id, tracked in list(self._prompts.items())[:-1]:
+            if excess <= 0:
+                break
+            if not tracked.future.done() and (
+                tracked.waiters or tracked.listeners or prompt_id in self._watched
+            ):
+                continue
+            del self._prompts[prompt_id]
+            excess -= 1
+
+    def _on_message(self, ws, message):
+        if isinstance(message, bytes):
+            return  # binary preview frames
+
+        try:
+            event = json.loads(message)
+        except ValueError:
+            return
+
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return
+
+        with self._lock:
+            tracked = self._get(prompt_id)
+            listeners = list(tracked.listeners)
+
+            if event_type == "executed" and data.get("node") is not None:
+                tracked.outputs[data["node"]] = data.get("output") or {}
+            elif event_type in ("execution_error", "execution_interrupted"):
+                if not tracked.future.done():
+                    tracked.error = (event_type, data)
+                    detail = data.get("exception_message") or event_type
+                    tracked.future.set_exception(
+                        Exception(f"ComfyUI {event_type}: {detail}")
+                    )
+            elif (
+                event_type == "executing" and data.get("node") is None
+            ) or event_type == "execution_success":
+                if not tracked.future.done():
+                    tracked.future.set_result({"outputs": dict(tracked.outputs)})
+
+            watched = (
+                self._watched.pop(prompt_id, None) if tracked.future.done() else None
+            )
+
+        for listener in listeners:
+            try:
+                listener(event_type, data)
+            except Exception as e:
+                logger.error(f"Progress listener failed for {prompt_id}: {e}")
+
+        if watched:
+            self._finish(prompt_id, watched[1], tracked.history_entry())
+
+    def _finish(self, prompt_id: str, on_finish: FinishCallback, entry: Dict[str, Any]):
+        try:
+            on_finish(prompt_id, entry)
+        except Exception as e:
+            logger.error(f"Finish callback failed for {prompt_id}: {e}")
+
+    def _poll_watched(self):
+        """Look unfinished watched prompts up in /history"""
+        now = time.monotonic()
+        with self._lock:
+            for prompt_id, (deadline, _) in list(self._watched.items()):
+                if deadline < now:
+                    del self._watched[prompt_id]
+            pending = list(self._watched)
+
+        for prompt_id in pending:
+            try:
+                history = self.history_fetcher(prompt_id)
+            except Exception as e:
+                logger.warning(f"History lookup for watched prompts failed: {e}")
+                return
+            if prompt_id not in history:
+                continue
+            with self._lock:
+                watched = self._watched.pop(prompt_id, None)
+            if watched:
+                self._finish(prompt_id, watched[1], history[prompt_id])
+
+    # Waiting
+
+    def watch(
+        self,
+        prompt_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        on_finish: Optional[FinishCallback] = None,
+        timeout: int = 300,
+    ):
+        """
+        Follow a prompt's execution events without waiting
+
+        Used by processes that queue a prompt and leave collecting it to
+        another; ComfyUI only sends events to the client that queued it.
+
+        Args:
+            prompt_id: Prompt ID returned by queue_prompt
+            on_progress: Optional callback(event_type, data) for its events
+            on_finish: Optional callback(prompt_id, history entry), called
+                once when it finishes; from /history if the socket was down
+            timeout: Seconds after which an unfinished prompt is forgotten
+        """
+        self.ensure_started()
+        now = time.monotonic()
+        with self._lock:
+            tracked = self._get(prompt_id)
+            if on_progress:
+                tracked.listeners.append(on_progress)
+            if on_finish and not tracked.future.done():
+                self._watched[prompt_id] = (now + timeout, on_finish)
+                # Prompts that were cancelled out of the queue never finish
+                while self._watched and next(iter(self._watched.values()))[0] < now:
+                    self._watched.popitem(last=False)
+                on_finish = None
+
+        if on_finish:
+            self._finish(prompt_id, on_finish, tracked.history_entry())
+
+    def wait(
+        self,
+        prompt_id: str,
+        timeout: int = 300,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict:
+        """
+        Block until the prompt finishes
+
+        Args:
+            prompt_id: Prompt ID returned by queue_prompt
+            timeout: Maximum wait time in seconds
+            on_progress: Optional callback(event_type, data) for executing/progress/executed events
+            cancel_check: Optional callable, checked every poll interval, returning a
+                reason (e.g. "cancelled") once the wait should be abandoned
+
+        Returns:
+            History entry for the prompt (``{"outputs": {...}, ...}``)
+        """
+        self.ensure_started()
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            tracked = self._get(prompt_id)
+            tracked.waiters += 1
+            if on_progress:
+                tracked.listeners.append(on_progress)
+            epoch = self._epoch
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Generation timed out after {timeout} seconds")
+
+                reason = cancel_check() if cancel_check else None
+                if reason:
+                    raise PromptCancelled(prompt_id, reason)
+
+                if self.connected and epoch == self._epoch:
+                    try:
+                        result = tracked.future.result(
+                            timeout=min(remaining, self.poll_interval)
+                        )
+                    except FutureTimeoutError:
+                        continue
+                    if not result["outputs"]:
+                        # Fully cached prompts emit no "executed" events
+                        result = self.history_fetcher(prompt_id).get(prompt_id, result)
+                    return result
+
+                # Socket down (or reconnected and may have missed events): poll
+                history = self.history_fetcher(prompt_id)
+                if prompt_id in history:
+                    return history[prompt_id]
+                epoch = self._epoch
+                if not self.connected:
+                    time.sleep(
+                        min(self.poll_interval, max(deadline - time.monotonic(), 0))
+                    )
+        finally:
+            with self._lock:
+                tracked.waiters -= 1
+                if on_progress and on_progress in tracked.listeners:
+                    tracked.listeners.remove(on_progress)
@@ -0,0 +1,340 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Fair-Share Generation Scheduler
+Weighted fair queueing across tenants and users in front of the GPU workers
+"""
+
+import json
+import time
+import logging
+from typing import Optional, Dict, Any, List
+
+from celery import Celery
+
+from app.core.config import settings
+from app.core.metrics import (
+    SCHEDULER_QUEUE_DEPTH,
+    SCHEDULER_QUEUE_POSITION,
+    SCHEDULER_WAIT_SECONDS,
+)
+from app.core.redis import sync_redis_client
+from app.services.generation_control import DEFAULT_PRIORITY, broker_priority
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_PREFIX = "jams:sched"
+
+# Adds a job to its (tenant, user) flow. A flow that was idle restarts at
+# the current virtual time so it cannot bank credit while away. Returns the
+# estimated queue position: queued jobs whose (tenant-level) finish tag is
+# smaller than this job's.
+_ENQUEUE = """
+local P = KEYS[1]
+local job, tenant, user = ARGV[1], ARGV[2], ARGV[3]
+local cost, tw, uw = tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6])
+
+redis.call('HSET', P .. ':tw', tenant, tw)
+redis.call('HSET', P .. ':uw:' .. tenant, user, uw)
+redis.call('HSET', P .. ':cap', tenant, ARGV[7])
+
+local ukey = P .. ':users:' .. tenant
+redis.call('RPUSH', P .. ':q:' .. tenant .. ':' .. user, job)
+if not redis.call('ZSCORE', ukey, user) then
+    local saved = tonumber(redis.call('HGET', P .. ':uvt:' .. tenant, user) or '0')
+    local floor
+    local first = redis.call('ZRANGE', ukey, 0, 0, 'WITHSCORES')
+    if #first > 0 then
+        floor = tonumber(first[2])
+    else
+        floor = tonumber(redis.call('HGET', P .. ':uvtime', tenant) or '0')
+    end
+    redis.call('ZADD', ukey, math.max(saved, floor), user)
+end
+
+if not redis.call('ZSCORE', P .. ':tenants', tenant) then
+    local saved = tonumber(redis.call('HGET', P .. ':tvt', tenant) or '0')
+    local vtime = tonumber(redis.call('GET', P .. ':vtime') or '0')
+    redis.call('ZADD', P .. ':tenants', math.max(saved, vtime), tenant)
+end
+
+local start = tonumber(redis.call('ZSCORE', P .. ':tenants', tenant))
+local tail = tonumber(redis.call('HGET', P .. ':tail', tenant) or '0')
+local tag = math.max(tail, start) + cost / tw
+redis.call('HSET', P .. ':tail', tenant, tag)
+redis.call('ZADD', P .. ':tags', tag, job)
+
+redis.call('HSET', P .. ':job:' .. job,
+    'task', ARGV[9], 'kwargs', ARGV[10], 'priority', ARGV[11],
+    'tenant', tenant, 'user', user, 'cost', cost, 'plan', ARGV[12], 'enqueued_at', ARGV[8])
+local depth = redis.call('HINCRBY', P .. ':depth', tenant, 1)
+
+return {redis.call('ZCOUNT', P .. ':tags', '-inf', '(' .. tag), depth}
+"""
+
+# Pops up to ARGV[4] jobs while global in-flight is under ARGV[2]: the
+# backlogged tenant with the smallest virtual time that is under its cap,
+# then that tenant's user with the smallest virtual time. Each dispatch
+# advances both clocks by cost / weight and takes a lease on the job.
+_DISPATCH = """
+local P = KEYS[1]
+local now, max_in_flight = tonumber(ARGV[1]), tonumber(ARGV[2])
+local lease, limit = tonumber(ARGV[3]), tonumber(ARGV[4])
+
+-- Reclaim slots held by workers that died without releasing them
+for _, job in ipairs(redis.call('ZRANGEBYSCORE', P .. ':running', '-inf', now)) do
+    local t = redis.call('HGET', P .. ':runtenant', job)
+    if t then redis.call('ZREM', P .. ':running:' .. t, job) end
+    redis.call('HDEL', P .. ':runtenant', job)
+    redis.call('ZREM', P .. ':running', job)
+end
+
+local out = {}
+while #out < limit * 2 do
+    if redis.call('ZCARD', P .. ':running') >= max_in_flight then break end
+
+    local tenant, tvt
+    local tenants = redis.call('ZRANGE', P .. ':tenants', 0, -1, 'WITHSCORES')
+    for i = 1, #tenants, 2 do
+        local cap = tonumber(redis.call('HGET', P .. ':cap', tenants[i]) or '0')
+        if cap <= 0 or redis.call('ZCARD', P .. ':running:' .. tenants[i]) < cap then
+            tenant, tvt = tenants[i], tonumber(tenants[i + 1])
+            break
+        end
+    end
+    if not tenant then break end
+
+    local ukey = P .. ':users:' .. tenant
+    local first = redis.call('ZRANGE', ukey, 0, 0, 'WITHSCORES')
+    local user, uvt = first[1], tonumber(first[2])
+    local qkey = P .. ':q:' .. tenant .. ':' .. user
+    local job = redis.call('LPOP', qkey)
+
+    if job then
+        local jkey = P .. ':job:' .. job
+        local cost = tonumber(redis.call('HGET', jkey, 'cost') or '1')
+        local tw = tonumber(redis.call('HGET', P .. ':tw', tenant) or '1')
+        local uw = tonumber(redis.call('HGET', P .. ':uw:' .. tenant, user) or '1')
+
+        redis.call('SET', P .. ':vtime', tvt)
+        redis.call('HSET', P .. ':uvtime', tenant, uvt)
+        uvt = uvt + cost / uw
+        tvt = tvt + cost / tw
+
+        redis.call('ZADD', P .. ':running', now + lease, job)
+        redis.call('ZADD', P .. ':running:' .. tenant, now + lease, job)
+        redis.call('HSET', P .. ':runtenant', job, tenant)
+        redis.call('ZREM', P .. ':tags', job)
+        redis.call('HINCRBY', P .. ':depth', tenant, -1)
+
+        table.insert(out, job)
+        table.insert(out, redis.call('HGETALL', jkey))
+        redis.call('DEL', jkey)
+    end
+
+    if redis.call('LLEN', qkey) > 0 then
+        redis.call('ZADD', ukey, uvt, user)
+    else
+        redis.call('ZREM', ukey, user)
+        redis.call('HSET', P .. ':uvt:' .. tenant, user, uvt)
+    end
+    if redis.call('ZCARD', ukey) > 0 then
+        redis.call('ZADD', P .. ':tenants', tvt, tenant)
+    else
+        redis.call('ZREM', P .. ':tenants', tenant)
+        redis.call('HSET', P .. ':tvt', tenant, tvt)
+    end
+end
+return out
+"""
+
+_RELEASE = """
+local P = KEYS[1]
+local tenant = redis.call('HGET', P .. ':runtenant', ARGV[1])
+if tenant then redis.call('ZREM', P .. ':running:' .. tenant, ARGV[1]) end
+redis.call('HDEL', P .. ':runtenant', ARGV[1])
+return redis.call('ZREM', P .. ':running', ARGV[1])
+"""
+
+
+class FairScheduler:
+    """
+    Holds generation jobs in Redis and releases them to the Celery broker
+    in weighted-fair order.
+
+    Tenants share GPU capacity in proportion to their weight (tenant
+    settings ``scheduler_weight``), and within a tenant users share it in
+    proportion to their subscription plan's weight, so a single heavy user
+    delays only their own jobs. Only ``max_in_flight`` jobs are released at
+    a time (about the number of GPU worker slots), each tenant is capped at
+    its own concurrency limit, and everything else waits here where its
+    order can still be decided. Dispatch is a Lua script, so any number of
+    API processes and workers may pump it concurrently.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        tenant_max_in_flight: int = 2,
+        lease_seconds: int = 3900,
+        plan_weights: Optional[Dict[str, float]] = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.tenant_max_in_flight = tenant_max_in_flight
+        self.lease_seconds = lease_seconds
+        self.plan_weights = plan_weights or {"free": 1}
+        self._enqueue = sync_redis_client.register_script(_ENQUEUE)
+        self._dispatch = sync_redis_client.register_script(_DISPATCH)
+        self._release = sync_redis_client.register_script(_RELEASE)
+
+    def plan_weight(self, plan: Optional[str]) -> float:
+        return float(
+            self.plan_weights.get(plan or "free", self.plan_weights.get("free", 1))
+        )
+
+    def enqueue(
+        self,
+        job_id: str,
+        task_name: str,
+        kwargs: Dict[str, Any],
+        tenant_id: str,
+        user_id: str,
+        plan: Optional[str] = None,
+        cost: int = 1,
+        priority: int = DEFAULT_PRIORITY,
+        tenant_weight: float = 1.0,
+        tenant_max_in_flight: Optional[int] = None,
+    ) -> int:
+        """
+        Queue a job for fair dispatch
+
+        Args:
+            job_id: Celery task ID the job will be published under
+            task_name: Registered Celery task name
+            kwargs: Task keyword arguments (JSON-serialisable)
+            tenant_id: Tenant ID
+            user_id: User ID
+            plan: User's subscription plan (sets their weight within the tenant)
+            cost: Relative GPU cost (images rendered)
+            priority: JAMS priority passed through to the broker message
+            tenant_weight: Tenant's share relative to other tenants
+            tenant_max_in_flight: Tenant concurrency cap (default from settings; 0 = none)
+
+        Returns:
+            Estimated number of queued jobs ahead of this one
+        """
+        cap = (
+            self.tenant_max_in_flight
+            if tenant_max_in_flight is None
+            else tenant_max_in_flight
+        )
+        position, depth = self._enqueue(
+            keys=[SCHEDULER_PREFIX],
+            args=[
+                job_id,
+                tenant_id,
+                user_id,
+                cost,
+                tenant_weight,
+                self.plan_weight(plan),
+                cap,
+                time.time(),
+                task_name,
+                json.dumps(kwargs),
+                priority,
+                plan or "free",
+            ],
+        )
+        SCHEDULER_QUEUE_POSITION.labels(plan=plan or "free").observe(position)
+        SCHEDULER_QUEUE_DEPTH.labels(tenant=tenant_id).set(depth)
+        return int(position)
+
+    def _requeue(self, job_id: str, job: Dict[str, str]):
+        """Put back a popped job whose publish failed (at the back of its flow)"""
+        tenant = job["tenant"]
+        self.release(job_id)
+        self.enqueue(
+            job_id,
+            job["task"],
+            json.loads(job["kwargs"]),
+            tenant,
+            job["user"],
+            plan=job["plan"],
+            cost=int(float(job["cost"])),
+            priority=int(job["priority"]),
+            tenant_weight=float(
+                sync_redis_client.hget(f"{SCHEDULER_PREFIX}:tw", tenant) or 1
+            ),
+            tenant_max_in_flight=int(
+                sync_redis_client.hget(f"{SCHEDULER_PREFIX}:cap", tenant) or 0
+            ),
+        )
+
+    def dispatch(self, app: Celery, limit: int = 32) -> List[str]:
+        """
+        Publish every job that fits under the in-flight limits
+
+        Returns:
+            Dispatched job IDs
+        """
+        now = time.time()
+        popped = self._dispatch(
+            keys=[SCHEDULER_PREFIX],
+            args=[now, self.max_in_flight, self.lease_seconds, limit],
+        )
+
+        dispatched = []
+        for job_id, fields in zip(popped[::2], popped[1::2]):
+            job = dict(zip(fields[::2], fields[1::2]))
+            try:
+                app.send_task(
+                    job["task"],
+                    kwargs=json.loads(job["kwargs"]),
+                    task_id=job_id,
+                    priority=broker_priority(int(job["priority"])),
+                )
+            except Exception as e:
+                logger.error(f"Failed to publish scheduled job {job_id}: {e}")
+                self._requeue(job_id, job)
+                continue
+
+            SCHEDULER_WAIT_SECONDS.labels(plan=job["plan"]).observe(
+                now - float(job["enqueued_at"])
+            )
+            dispatched.append(job_id)
+
+        if popped:
+            for tenant, depth in sync_redis_client.hgetall(
+                f"{SCHEDULER_PREFIX}:depth"
+            ).items():
+                SCHEDULER_QUEUE_DEPTH.labels(tenant=tenant).set(int(depth))
+        return dispatched
+
+    def release(self, job_id: str) -> bool:
+        """Free a job's in-flight slot once it has finished"""
+        return bool(self._release(keys=[SCHEDULER_PREFIX], args=[job_id]))
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Estimated number of jobs ahead of a queued job (None once dispatched)"""
+        tag = sync_redis_client.zscore(f"{SCHEDULER_PREFIX}:tags", job_id)
+        if tag is None:
+            return None
+        return sync_redis_client.zcount(f"{SCHEDULER_PREFIX}:tags", "-inf", f"({tag}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queued and running job counts per tenant"""
+        depth = sync_redis_client.hgetall(f"{SCHEDULER_PREFIX}:depth")
+        return {
+            "queued": {
+                tenant: int(count) for tenant, count in depth.items() if int(count) > 0
+            },
+            "running": sync_redis_client.zcard(f"{SCHEDULER_PREFIX}:running"),
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+# Global instance
+fair_scheduler = FairScheduler(
+    max_in_flight=settings.SCHEDULER_MAX_IN_FLIGHT,
+    tenant_max_in_flight=settings.SCHEDULER_TENANT_MAX_IN_FLIGHT,
+    lease_seconds=settings.SCHEDULER_LEASE_SECONDS,
+    plan_weights=settings.SCHEDULER_PLAN_WEIGHTS,
+)
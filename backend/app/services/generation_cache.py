@@ -0,0 +1,153 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Result Cache
+Content-addressed cache of deterministic (explicit seed) generation results
+"""
+
+import hashlib
+import json
+import time
+import logging
+from typing import Optional, Dict, Any
+
+from app.core.config import settings
+from app.core.metrics import GENERATION_CACHE_LOOKUPS
+from app.core.redis import redis_client, sync_redis_client
+from app.services.comfyui_service import ComfyUIService
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "jams:gencache"
+
+
+def workflow_cache_key(workflow: Dict[str, Any]) -> str:
+    """Canonical SHA-256 of a ComfyUI workflow"""
+    canonical = json.dumps(
+        workflow, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def image_cache_key(
+    prompt: str,
+    negative_prompt: str,
+    model: str,
+    width: int,
+    height: int,
+    steps: int,
+    cfg: float,
+    sampler: str,
+    scheduler: str,
+    seed: int,
+    batch_size: int = 1,
+    **_,
+) -> Optional[str]:
+    """
+    Cache key for an image request, or None if its output is not deterministic
+
+    The key hashes the exact workflow that would be submitted, so anything
+    that changes the workflow (including _build_workflow itself) changes it.
+    """
+    if seed == -1:
+        return None
+
+    return workflow_cache_key(
+        ComfyUIService._build_workflow(
+            prompt=prompt,
+            negative_prompt=negative_prompt or "",
+            model=model,
+            width=width,
+            height=height,
+            steps=steps,
+            cfg=float(cfg),
+            sampler=sampler,
+            scheduler=scheduler,
+            seed=seed,
+            batch_size=batch_size,
+        )
+    )
+
+
+class GenerationCache:
+    """
+    Per-tenant result cache stored in Redis.
+
+    Each entry lives under ``jams:gencache:{tenant}:{hash}`` with a TTL; a
+    per-tenant sorted set scored by last access time bounds the number of
+    entries, evicting least-recently-used ones first. Hit/miss counts are
+    kept per tenant in Redis and exported as Prometheus counters.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries_per_tenant: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_tenant = max_entries_per_tenant
+
+    def _entry_key(self, tenant_id: str, key: str) -> str:
+        return f"{CACHE_PREFIX}:{tenant_id}:{key}"
+
+    def _lru_key(self, tenant_id: str) -> str:
+        return f"{CACHE_PREFIX}:{tenant_id}:lru"
+
+    def _stats_key(self, tenant_id: str) -> str:
+        return f"{CACHE_PREFIX}:{tenant_id}:stats"
+
+    async def get(self, tenant_id: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result and refresh its recency
+
+        Returns:
+            Cached result ({output_urls, metadata, ...}) or None
+        """
+        raw = await redis_client.get(self._entry_key(tenant_id, key))
+        result = "hit" if raw else "miss"
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hincrby(self._stats_key(tenant_id), "hits" if raw else "misses", 1)
+        if raw:
+            pipe.expire(self._entry_key(tenant_id, key), self.ttl_seconds)
+            pipe.zadd(self._lru_key(tenant_id), {key: time.time()})
+        await pipe.execute()
+
+        GENERATION_CACHE_LOOKUPS.labels(result=result).inc()
+        return json.loads(raw) if raw else None
+
+    def set(self, tenant_id: str, key: str, value: Dict[str, Any]):
+        """Store a result (from a Celery task) and evict LRU entries past the cap"""
+        lru_key = self._lru_key(tenant_id)
+
+        pipe = sync_redis_client.pipeline(transaction=False)
+        pipe.set(
+            self._entry_key(tenant_id, key), json.dumps(value), ex=self.ttl_seconds
+        )
+        pipe.zadd(lru_key, {key: time.time()})
+        pipe.zcard(lru_key)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries_per_tenant
+        if overflow > 0:
+            evicted = [
+                member for member, _ in sync_redis_client.zpopmin(lru_key, overflow)
+            ]
+            if evicted:
+                sync_redis_client.delete(
+                    *(self._entry_key(tenant_id, k) for k in evicted)
+                )
+                logger.info(
+                    f"Evicted {len(evicted)} cached generations for tenant {tenant_id}"
+                )
+
+    async def stats(self, tenant_id: str) -> Dict[str, int]:
+        """Hit/miss counters and current size for a tenant"""
+        counters = await redis_client.hgetall(self._stats_key(tenant_id))
+        size = await redis_client.zcard(self._lru_key(tenant_id))
+        return {
+            "hits": int(counters.get("hits", 0)),
+            "misses": int(counters.get("misses", 0)),
+            "entries": size,
+        }
+
+
+# Global instance
+generation_cache = GenerationCache(
+    ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+    max_entries_per_tenant=settings.GENERATION_CACHE_MAX_ENTRIES_PER_TENANT,
+)
@@ -0,0 +1,251 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Control
+Cancellation flags, dispatch tracking and the ComfyUI preemption policy
+"""
+
+import logging
+import uuid
+from typing import Optional, Dict, List, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.redis import redis_client, sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+CONTROL_PREFIX = "jams:generation"
+PENDING_PREFIX = "jams:comfyui:pending"
+
+# Priorities range 0-9 with higher meaning more urgent; tenants can override
+# the default via settings['generation_priority']
+DEFAULT_PRIORITY = 5
+MAX_PRIORITY = 9
+
+# Flags and dispatch records outlive any generation's time limit
+CONTROL_TTL_SECONDS = 2 * 3600
+
+
+def broker_priority(priority: int) -> int:
+    """
+    Map a JAMS priority to a Celery message priority
+
+    The Redis transport pops priority 0 first, so the scale is inverted.
+    """
+    return MAX_PRIORITY - max(0, min(priority, MAX_PRIORITY))
+
+
+def _dispatch_key(generation_id: str) -> str:
+    return f"{CONTROL_PREFIX}:{generation_id}:dispatch"
+
+
+def _cancel_key(generation_id: str) -> str:
+    return f"{CONTROL_PREFIX}:{generation_id}:cancel"
+
+
+def _pending_key(node: str) -> str:
+    return f"{PENDING_PREFIX}:{node}"
+
+
+def _lock_key(generation_id: str) -> str:
+    return f"{CONTROL_PREFIX}:{generation_id}:lock"
+
+
+# Delete the lock only if it still holds the caller's token
+_UNLOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_unlock = sync_redis_client.register_script(_UNLOCK)
+
+# Delete the cancel flag only if it is a preemption; return what is left
+_CLEAR_PREEMPTION = """
+local reason = redis.call('GET', KEYS[1])
+if reason == 'preempted' then
+    redis.call('DEL', KEYS[1])
+    return false
+end
+return reason
+"""
+_clear_preemption = sync_redis_client.register_script(_CLEAR_PREEMPTION)
+
+
+def record_dispatch(
+    generation_id: str,
+    node: str,
+    prompt_id: str,
+    priority: int = DEFAULT_PRIORITY,
+    shared_with: Sequence[str] = (),
+):
+    """
+    Remember where a generation's prompt was queued (called from workers)
+
+    A prompt rendering several generations (a grid group) is recorded under
+    each of them with the whole group in shared_with; it is never preempted
+    and is only removed from the node once every generation in it is
+    cancelled.
+    """
+    mapping = {"node": node, "prompt_id": prompt_id, "priority": priority}
+    if shared_with:
+        mapping["shared_with"] = ",".join(shared_with)
+
+    pipe = sync_redis_client.pipeline(transaction=False)
+    pipe.hset(_dispatch_key(generation_id), mapping=mapping)
+    pipe.expire(_dispatch_key(generation_id), CONTROL_TTL_SECONDS)
+    if not shared_with:
+        pipe.zadd(_pending_key(node), {f"{generation_id}:{prompt_id}": priority})
+    pipe.execute()
+
+
+def clear_dispatch(generation_id: str):
+    """Forget a generation's prompt once it has finished, failed or been removed"""
+    dispatch = sync_redis_client.hgetall(_dispatch_key(generation_id))
+    pipe = sync_redis_client.pipeline(transaction=False)
+    if dispatch:
+        pipe.zrem(
+            _pending_key(dispatch["node"]), f"{generation_id}:{dispatch['prompt_id']}"
+        )
+    pipe.delete(_dispatch_key(generation_id))
+    pipe.execute()
+
+
+def cancel_reason(generation_id: str) -> Optional[str]:
+    """'cancelled' or 'preempted' if the generation should stop, else None"""
+    return sync_redis_client.get(_cancel_key(generation_id))
+
+
+async def get_cancel_reason(generation_id: str) -> Optional[str]:
+    """cancel_reason for callers on an event loop"""
+    return await redis_client.get(_cancel_key(generation_id))
+
+
+def group_cancel_reason(generation_ids: Sequence[str]) -> Optional[str]:
+    """'cancelled' once every generation sharing a prompt is cancelled, else None"""
+    reasons = sync_redis_client.mget([_cancel_key(g) for g in generation_ids])
+    if all(reason == "cancelled" for reason in reasons):
+        return "cancelled"
+    return None
+
+
+def clear_preemption(generation_id: str) -> Optional[str]:
+    """
+    Drop a preemption flag before the generation is retried
+
+    The flag is only deleted while it reads 'preempted', in one step with
+    the read, so a user cancel that lands meanwhile is never lost.
+
+    Returns:
+        'cancelled' if the generation should not start, else None
+    """
+    return _clear_preemption(keys=[_cancel_key(generation_id)])
+
+
+def mark_preempted(generation_id: str):
+    """Flag a generation as preempted unless the user already cancelled it"""
+    sync_redis_client.set(
+        _cancel_key(generation_id), "preempted", ex=CONTROL_TTL_SECONDS, nx=True
+    )
+
+
+async def request_cancel(generation_id: str) -> Optional[Dict[str, str]]:
+    """
+    Flag a generation as cancelled
+
+    Workers check the flag before starting and while waiting on ComfyUI.
+
+    Returns:
+        The generation's dispatch record ({node, prompt_id, priority}) if a
+        prompt is currently queued for it and may be stopped, else None; a
+        shared prompt is left running while others in it are not cancelled
+    """
+    await redis_client.set(
+        _cancel_key(generation_id), "cancelled", ex=CONTROL_TTL_SECONDS
+    )
+    dispatch = await redis_client.hgetall(_dispatch_key(generation_id))
+    if dispatch.get("shared_with"):
+        group = dispatch["shared_with"].split(",")
+        reasons = await redis_client.mget([_cancel_key(g) for g in group])
+        if any(reason != "cancelled" for reason in reasons):
+            return None
+    return dispatch or None
+
+
+def acquire_generation_lock(generation_id: str) -> Optional[str]:
+    """
+    Mark a generation as running on this worker
+
+    Brokers redeliver messages (a worker lost its connection, a visibility
+    timeout passed), so a second copy of a job can arrive while the first
+    is still rendering; its worker drops it when this returns None.
+
+    Returns:
+        Token to pass to release_generation_lock, or None if the
+        generation is already running
+    """
+    token = uuid.uuid4().hex
+    acquired = sync_redis_client.set(
+        _lock_key(generation_id),
+        token,
+        ex=settings.GENERATION_LOCK_TTL_SECONDS,
+        nx=True,
+    )
+    return token if acquired else None
+
+
+def release_generation_lock(generation_id: str, token: Optional[str]):
+    """Release a lock taken by acquire_generation_lock (no-op for other holders)"""
+    if token:
+        _unlock(keys=[_lock_key(generation_id)], args=[token])
+
+
+class PreemptionPolicy:
+    """
+    Chooses queued prompts to evict when a node's queue is saturated.
+
+    A prompt may only be preempted by one of strictly higher priority, and
+    only while it is still pending on the node; running prompts are never
+    interrupted. Evicted generations are flagged 'preempted' so their worker
+    re-queues them instead of failing.
+    """
+
+    def __init__(self, saturation_depth: int = 8, max_victims: int = 1):
+        self.saturation_depth = saturation_depth
+        self.max_victims = max_victims
+
+    def select_victims(
+        self, node: str, node_load: int, priority: int
+    ) -> List[Tuple[str, str]]:
+        """
+        Args:
+            node: Node address the new prompt is about to be sent to
+            node_load: The node's current queue depth
+            priority: Priority of the new prompt
+
+        Returns:
+            (generation_id, prompt_id) pairs to evict, lowest priority first
+        """
+        if node_load < self.saturation_depth:
+            return []
+
+        key = _pending_key(node)
+        while True:
+            members = sync_redis_client.zrangebyscore(
+                key, "-inf", f"({priority}", start=0, num=self.max_victims
+            )
+            victims = [tuple(member.split(":", 1)) for member in members]
+
+            # A worker that died never cleared its entry; once its dispatch
+            # record has expired the generation is no longer waiting on this
+            # prompt and must not be flagged
+            pipe = sync_redis_client.pipeline(transaction=False)
+            for generation_id, _ in victims:
+                pipe.hget(_dispatch_key(generation_id), "prompt_id")
+            current = pipe.execute()
+            stale = [
+                member
+                for member, (_, prompt_id), recorded in zip(members, victims, current)
+                if recorded != prompt_id
+            ]
+            if not stale:
+                return victims
+            sync_redis_client.zrem(key, *stale)
@@ -0,0 +1,121 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Progress Events
+Fans generation status changes out from Redis pub/sub to streaming API clients
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.services.generation_status import events_channel
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationEventHub:
+    """
+    Per-process fan-out of generation events.
+
+    Workers publish every hot-status change on the generation's channel
+    (see GenerationStatusStore), so any API replica can serve any
+    subscriber. Each replica holds one pub/sub connection, subscribed only
+    to channels its clients are watching, and one reader task that hands
+    each message to those clients' queues; thousands of open streams cost
+    one Redis connection, not one each.
+
+    Pub/sub is fire-and-forget: a message published while the connection
+    is reconnecting, or that overflows a slow client's queue, is dropped.
+    Events carry whole field values rather than deltas, so streams recover
+    by re-reading the hot status on their heartbeat.
+    """
+
+    def __init__(self, queue_size: int = 64):
+        self.queue_size = queue_size
+        self._pubsub = None
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, generation_id: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Receive a generation's events while the context is open
+
+        Yields:
+            Queue of event dicts (a subset of status, progress, output_url,
+            output_urls and error_message)
+        """
+        channel = events_channel(generation_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = redis_client.pubsub()
+            listeners = self._listeners.setdefault(channel, set())
+            if not listeners:
+                await self._pubsub.subscribe(channel)
+            listeners.add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read(self._pubsub))
+
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                listeners = self._listeners.get(channel, set())
+                listeners.discard(queue)
+                if not listeners:
+                    self._listeners.pop(channel, None)
+                    try:
+                        await self._pubsub.unsubscribe(channel)
+                    except Exception as e:
+                        logger.warning(f"Failed to unsubscribe from {channel}: {e}")
+
+    async def _read(self, pubsub):
+        while self._pubsub is pubsub:
+            try:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The connection re-subscribes its channels when it reconnects
+                logger.warning(f"Generation event subscription failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+
+            if not message or message.get("type") != "message":
+                continue
+
+            try:
+                event = json.loads(message["data"])
+            except ValueError:
+                continue
+            for queue in self._listeners.get(message["channel"], ()):
+                if not queue.full():
+                    queue.put_nowait(event)
+
+    async def close(self):
+        """Stop the reader and close the pub/sub connection"""
+        pubsub, self._pubsub = self._pubsub, None
+        if self._reader is not None:
+            # A cancel can land inside the client's own error handling and
+            # be swallowed; the reader also stops once _pubsub changes
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if pubsub is not None:
+            await pubsub.close()
+        self._listeners.clear()
+
+
+# Global instance
+generation_events = GenerationEventHub(queue_size=settings.GENERATION_EVENTS_QUEUE_SIZE)
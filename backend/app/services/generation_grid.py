@@ -0,0 +1,79 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Parameter Grid Planning
+Expands seed/cfg/steps sweeps into cells and packs them into batched ComfyUI prompts
+"""
+
+import itertools
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+# Axes a grid may sweep, mapped to the image parameter they vary
+GRID_AXES = ("seed", "cfg", "steps")
+
+
+def expand_grid(
+    base: Dict[str, Any],
+    seeds: Optional[Sequence[int]] = None,
+    cfgs: Optional[Sequence[float]] = None,
+    steps: Optional[Sequence[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of the given axes over a base image request
+
+    Axes left empty keep the base value. Random seeds (-1) are resolved to
+    concrete seeds once per seed-axis value, so every cell is reproducible
+    and cells that differ only in cfg or steps share a seed, which is what
+    lets the grid show what cfg or steps did.
+
+    Args:
+        base: Image parameters (ImageGenerationRequest fields)
+        seeds: Seed axis
+        cfgs: CFG scale axis
+        steps: Sampling steps axis
+
+    Returns:
+        Cell parameter dicts in row-major order (seed slowest, steps fastest)
+    """
+    random_seed = int(time.time())
+    axes = [
+        [
+            random_seed + index if seed == -1 else seed
+            for index, seed in enumerate(seeds or [base["seed"]])
+        ],
+        list(cfgs) if cfgs else [base["cfg"]],
+        list(steps) if steps else [base["steps"]],
+    ]
+
+    return [
+        {**base, **dict(zip(GRID_AXES, values))} for values in itertools.product(*axes)
+    ]
+
+
+def plan_grid_prompts(cells: List[Dict[str, Any]], max_batch: int) -> List[List[int]]:
+    """
+    Pack cells into as few ComfyUI prompts as possible
+
+    Cells sharing a checkpoint go in the same prompt (one model load, one
+    sampler branch each) until the prompt holds max_batch images.
+
+    Returns:
+        Lists of cell indices, one per prompt
+    """
+    by_model: Dict[str, List[int]] = {}
+    for index, cell in enumerate(cells):
+        by_model.setdefault(cell["model"], []).append(index)
+
+    prompts: List[List[int]] = []
+    for indices in by_model.values():
+        current: List[int] = []
+        images = 0
+        for index in indices:
+            size = cells[index].get("batch_size", 1)
+            if current and images + size > max_batch:
+                prompts.append(current)
+                current, images = [], 0
+            current.append(index)
+            images += size
+        if current:
+            prompts.append(current)
+    return prompts
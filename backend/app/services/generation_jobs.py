@@ -0,0 +1,178 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Job Dispatch
+Publishes generation tasks to the Celery broker and tracks them in generation_jobs
+"""
+
+import uuid
+import logging
+from typing import Dict, Any, List, Optional
+
+from celery import Task
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import table, column, select, insert, update
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.fair_scheduler import fair_scheduler
+from app.services.generation_control import DEFAULT_PRIORITY, broker_priority
+
+logger = logging.getLogger(__name__)
+
+# Lightweight table constructs; these tables have no ORM models
+generation_jobs = table(
+    "generation_jobs",
+    column("id", UUID(as_uuid=False)),
+    column("tenant_id", UUID(as_uuid=False)),
+    column("user_id", UUID(as_uuid=False)),
+    column("generation_id", UUID(as_uuid=False)),
+    column("celery_task_id"),
+    column("status"),
+    column("queue_position"),
+    column("started_at"),
+    column("completed_at"),
+)
+
+subscriptions = table(
+    "subscriptions",
+    column("tenant_id", UUID(as_uuid=False)),
+    column("user_id", UUID(as_uuid=False)),
+    column("plan"),
+    column("status"),
+    column("created_at"),
+)
+
+
+async def get_user_plan(db: AsyncSession, tenant_id: str, user_id: str) -> str:
+    """The user's active subscription plan ('free' without one)"""
+    result = await db.execute(
+        select(subscriptions.c.plan)
+        .where(
+            subscriptions.c.tenant_id == tenant_id,
+            subscriptions.c.user_id == user_id,
+            subscriptions.c.status == "active",
+        )
+        .order_by(subscriptions.c.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none() or "free"
+
+
+async def dispatch_generation(
+    db: AsyncSession,
+    task: Task,
+    generation_ids: List[str],
+    tenant_id: str,
+    user_id: str,
+    kwargs: Dict[str, Any],
+    priority: int = DEFAULT_PRIORITY,
+    cost: int = 1,
+    tenant_settings: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Record a job and hand its task to the fair-share scheduler
+
+    The generation_jobs rows are committed before anything is published so
+    a worker never picks up a task whose job it cannot find. With the
+    scheduler enabled the job waits in Redis until weighted fair queueing
+    releases it; otherwise it is published straight away. Queue and routing
+    key come from the Celery app's task_routes.
+
+    Args:
+        db: Request database session
+        task: Celery task to run
+        generation_ids: Generations the task renders (one job row each)
+        tenant_id: Tenant ID
+        user_id: User ID
+        kwargs: Task keyword arguments
+        priority: JAMS priority (0-9, higher is more urgent)
+        cost: Relative GPU cost (images rendered)
+        tenant_settings: Tenant settings (scheduler_weight, max_concurrent_generations)
+
+    Returns:
+        Celery task ID
+    """
+    task_id = str(uuid.uuid4())
+
+    await db.execute(
+        insert(generation_jobs).values(
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "tenant_id": tenant_id,
+                    "user_id": user_id,
+                    "generation_id": generation_id,
+                    "celery_task_id": task_id,
+                    "status": "queued",
+                }
+                for generation_id in generation_ids
+            ]
+        )
+    )
+    await db.commit()
+
+    try:
+        if settings.SCHEDULER_ENABLED:
+            tenant_settings = tenant_settings or {}
+            position = await run_in_threadpool(
+                fair_scheduler.enqueue,
+                task_id,
+                task.name,
+                kwargs,
+                tenant_id,
+                user_id,
+                plan=await get_user_plan(db, tenant_id, user_id),
+                cost=cost,
+                priority=priority,
+                tenant_weight=float(tenant_settings.get("scheduler_weight", 1)),
+                tenant_max_in_flight=tenant_settings.get("max_concurrent_generations"),
+            )
+
+            await db.execute(
+                update(generation_jobs)
+                .where(generation_jobs.c.celery_task_id == task_id)
+                .values(queue_position=position)
+            )
+            await db.commit()
+        else:
+            await run_in_threadpool(
+                task.apply_async,
+                kwargs=kwargs,
+                task_id=task_id,
+                priority=broker_priority(priority),
+            )
+    except Exception as e:
+        logger.error(f"Failed to queue {task.name} task {task_id}: {e}")
+        await db.execute(
+            update(generation_jobs)
+            .where(generation_jobs.c.celery_task_id == task_id)
+            .values(status="failed")
+        )
+        await db.commit()
+        raise
+
+    if settings.SCHEDULER_ENABLED:
+        try:
+            # Broker publishes block, so keep them off the event loop
+            await run_in_threadpool(fair_scheduler.dispatch, task.app)
+        except Exception as e:
+            # The job stays scheduled; the workers' pump publishes it later
+            logger.warning(f"Scheduler dispatch after queueing {task_id} failed: {e}")
+
+    return task_id
+
+
+async def get_queue_position(db: AsyncSession, generation_id: str) -> Optional[int]:
+    """Live estimated queue position of a queued generation, if it is scheduled"""
+    result = await db.execute(
+        select(generation_jobs.c.celery_task_id)
+        .where(
+            generation_jobs.c.generation_id == generation_id,
+            generation_jobs.c.status == "queued",
+        )
+        .limit(1)
+    )
+    task_id = result.scalar_one_or_none()
+    if not task_id:
+        return None
+    return await run_in_threadpool(fair_scheduler.position, task_id)
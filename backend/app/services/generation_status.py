@@ -0,0 +1,488 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Hot Generation Status
+In-flight generation state in Redis; terminal states flushed to Postgres in batches
+"""
+
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from redis.exceptions import ResponseError
+from sqlalchemy import (
+    table,
+    column,
+    update,
+    bindparam,
+    func,
+    literal_column,
+    Integer,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+
+from app.core.config import settings
+from app.core.database import sync_session
+from app.core.metrics import GENERATION_STATUS_FLUSH_ROWS
+from app.core.redis import redis_client, sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+STATUS_PREFIX = "jams:status"
+FLUSH_STREAM = f"{STATUS_PREFIX}:flush"
+VERSION_PREFIX = f"{STATUS_PREFIX}:version:"
+FLUSH_GROUP = "flushers"
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Hash fields stored JSON-encoded
+JSON_FIELDS = ("output_urls", "metadata")
+
+# Fields published to progress subscribers (see generation_events)
+EVENT_FIELDS = ("status", "progress", "output_url", "output_urls", "error_message")
+
+# Columns a terminal flush may set; generations has an ORM model, but the
+# flush is a bulk executemany and only needs these
+generations = table(
+    "generations",
+    column("id", UUID),
+    column("status", Text),
+    column("output_url", Text),
+    column("output_urls", ARRAY(Text)),
+    column("error_message", Text),
+    column("processing_time_seconds", Integer),
+    column("metadata", JSONB),
+)
+
+
+def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        key: json.dumps(value) if key in JSON_FIELDS else str(value)
+        for key, value in fields.items()
+        if value is not None
+    }
+
+
+def _decode(fields: Dict[str, str]) -> Dict[str, Any]:
+    decoded: Dict[str, Any] = dict(fields)
+    for key in JSON_FIELDS:
+        if key in decoded:
+            decoded[key] = json.loads(decoded[key])
+    if "progress" in decoded:
+        decoded["progress"] = int(decoded["progress"])
+    return decoded
+
+
+def events_channel(generation_id: str) -> str:
+    """Pub/sub channel carrying a generation's status changes"""
+    return f"{STATUS_PREFIX}:events:{generation_id}"
+
+
+def _event(fields: Dict[str, Any]) -> Optional[str]:
+    event = {key: fields[key] for key in EVENT_FIELDS if fields.get(key) is not None}
+    return json.dumps(event) if event else None
+
+
+def _version() -> str:
+    # Any value a user has not had before; nanoseconds survive key expiry
+    return str(time.time_ns())
+
+
+# Bumps the change version of the user owning a status hash (KEYS[1]);
+# ARGV: version prefix, new version, TTL
+_TOUCH_OWNER = """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if user_id then
+    redis.call('SET', ARGV[1] .. user_id, ARGV[2], 'EX', ARGV[3])
+end
+"""
+
+
+def _flush_statement(keys: Iterable[str]):
+    """UPDATE for one shape of terminal record, run as an executemany"""
+    values = {}
+    for key in keys:
+        if key == "metadata":
+            # Merge, so post-processing results written first are kept
+            values["metadata"] = func.coalesce(
+                generations.c.metadata, literal_column("'{}'::jsonb")
+            ).op("||")(bindparam("b_metadata", type_=JSONB))
+        else:
+            values[key] = bindparam(f"b_{key}", type_=generations.c[key].type)
+
+    # Rows the API already moved to a terminal state (cancelled) stay as they are
+    return (
+        update(generations)
+        .where(
+            generations.c.id == bindparam("b_id", type_=UUID),
+            # Inline literals; expanding IN parameters can't be used with executemany
+            generations.c.status.notin_(
+                [literal_column(f"'{s}'") for s in TERMINAL_STATUSES]
+            ),
+        )
+        .values(values)
+    )
+
+
+def _annotate_statement():
+    """UPDATE merging metadata into rows whatever their status, as an executemany"""
+    return (
+        update(generations)
+        .where(generations.c.id == bindparam("b_id", type_=UUID))
+        .values(
+            metadata=func.coalesce(
+                generations.c.metadata, literal_column("'{}'::jsonb")
+            ).op("||")(bindparam("b_metadata", type_=JSONB))
+        )
+    )
+
+
+class GenerationStatusStore:
+    """
+    In-flight generation state kept in Redis hashes.
+
+    The API writes the generation row once, at creation, and a hash under
+    ``jams:status:{generation_id}`` next to it. Workers move the hash
+    through processing (node, progress percent) without touching Postgres.
+    A terminal state is written to the hash and appended to a Redis stream;
+    flushers drain the stream into Postgres in batches, one transaction
+    per batch, then drop the hashes so Postgres is authoritative again.
+    Every change is also published on the generation's events channel
+    for streaming clients, and replaces the owner's change version, an
+    opaque token list responses derive their ETags from. Writers that
+    bypass this store call touch (or touch_sync) instead. Results that
+    arrive after a generation is terminal (post-processing) are merged
+    into its metadata by the same flush (see annotate).
+
+    The stream is read through a consumer group, so a batch claimed by a
+    flusher that dies before committing is re-claimed by another one.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        flush_batch_size: int,
+        flush_block_ms: int,
+        claim_idle_ms: int,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.flush_batch_size = flush_batch_size
+        self.flush_block_ms = flush_block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self._group_ready = False
+
+    def _key(self, generation_id: str) -> str:
+        return f"{STATUS_PREFIX}:{generation_id}"
+
+    # API side
+
+    async def create(self, generation, job_id: Optional[str] = None):
+        """
+        Start tracking a queued generation
+
+        A worker may already have picked the job up, so status and progress
+        are only set if it has not.
+        """
+        key = self._key(str(generation.id))
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(
+            key,
+            mapping=_encode(
+                {
+                    "tenant_id": generation.tenant_id,
+                    "user_id": generation.user_id,
+                    "type": generation.type,
+                    "prompt": generation.prompt,
+                    "created_at": generation.created_at.isoformat(),
+                    "job_id": job_id,
+                }
+            ),
+        )
+        pipe.hsetnx(key, "status", generation.status)
+        pipe.hsetnx(key, "progress", 0)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.set(
+            f"{VERSION_PREFIX}{generation.user_id}", _version(), ex=self.ttl_seconds
+        )
+        pipe.publish(
+            events_channel(str(generation.id)), _event({"status": generation.status})
+        )
+        await pipe.execute()
+
+    async def get(self, generation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Hot state of a generation
+
+        Returns:
+            Decoded hash, or None if the generation is not tracked (never
+            was, or its terminal state has been flushed)
+        """
+        fields = await redis_client.hgetall(self._key(generation_id))
+        return _decode(fields) if fields else None
+
+    async def get_many(self, generation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Hot state of several generations, keyed by ID (untracked ones omitted)"""
+        if not generation_ids:
+            return {}
+        pipe = redis_client.pipeline(transaction=False)
+        for generation_id in generation_ids:
+            pipe.hgetall(self._key(generation_id))
+        results = await pipe.execute()
+        return {
+            generation_id: _decode(fields)
+            for generation_id, fields in zip(generation_ids, results)
+            if fields
+        }
+
+    async def drop(
+        self, generation_id: str, user_id: str, status: Optional[str] = None
+    ):
+        """
+        Stop tracking a generation whose row the API has written directly
+
+        Args:
+            generation_id: Generation ID
+            user_id: Owner, whose change version is bumped
+            status: Status written, published to progress subscribers
+        """
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(self._key(generation_id))
+        pipe.set(f"{VERSION_PREFIX}{user_id}", _version(), ex=self.ttl_seconds)
+        if status:
+            pipe.publish(events_channel(generation_id), _event({"status": status}))
+        await pipe.execute()
+
+    async def version(self, user_id: str) -> str:
+        """Current change version of a user's generations (created if unset)"""
+        key = f"{VERSION_PREFIX}{user_id}"
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.set(key, _version(), ex=self.ttl_seconds, nx=True)
+        pipe.get(key)
+        _, version = await pipe.execute()
+        return version
+
+    async def touch(self, *user_ids: str):
+        """Bump the change version of users whose rows were written directly"""
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.set(f"{VERSION_PREFIX}{user_id}", _version(), ex=self.ttl_seconds)
+        await pipe.execute()
+
+    # Worker side
+
+    def touch_sync(self, *user_ids: str):
+        """touch, for worker code writing rows directly"""
+        pipe = sync_redis_client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.set(f"{VERSION_PREFIX}{user_id}", _version(), ex=self.ttl_seconds)
+        pipe.execute()
+
+    def current_status(self, generation_id: str) -> Optional[str]:
+        """Hot status of a generation, for workers (None if untracked)"""
+        return sync_redis_client.hget(self._key(generation_id), "status")
+
+    def set(self, generation_id: str, **fields):
+        """Update in-flight fields (status, progress, node, ...)"""
+        key = self._key(generation_id)
+        pipe = sync_redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping=_encode({**fields, "updated_at": time.time()}))
+        pipe.expire(key, self.ttl_seconds)
+        pipe.eval(_TOUCH_OWNER, 1, key, VERSION_PREFIX, _version(), self.ttl_seconds)
+        event = _event(fields)
+        if event:
+            pipe.publish(events_channel(generation_id), event)
+        pipe.execute()
+
+    def finish(self, generation_id: str, status: str, **values):
+        """
+        Record a terminal state and queue it for the next Postgres flush
+
+        Args:
+            generation_id: Generation ID
+            status: 'completed', 'failed' or 'cancelled'
+            values: Columns to write with it (output_url, output_urls,
+                error_message, processing_time_seconds, metadata)
+        """
+        key = self._key(generation_id)
+        hot = {
+            "status": status,
+            "output_url": values.get("output_url"),
+            "error_message": values.get("error_message"),
+            "updated_at": time.time(),
+        }
+        if status == "completed":
+            hot["progress"] = 100
+
+        pipe = sync_redis_client.pipeline(transaction=True)
+        pipe.hset(key, mapping=_encode(hot))
+        pipe.expire(key, self.ttl_seconds)
+        pipe.xadd(
+            FLUSH_STREAM,
+            {
+                "generation_id": generation_id,
+                "status": status,
+                "values": json.dumps(values),
+            },
+        )
+        pipe.eval(_TOUCH_OWNER, 1, key, VERSION_PREFIX, _version(), self.ttl_seconds)
+        pipe.publish(events_channel(generation_id), _event({**hot, **values}))
+        pipe.execute()
+
+    def annotate(
+        self, generation_id: str, user_id: Optional[str], metadata: Dict[str, Any]
+    ):
+        """
+        Merge keys into a generation's metadata with the next flush
+
+        Unlike finish, this is written whatever the row's status, so it
+        suits results produced after the generation completed.
+
+        Args:
+            generation_id: Generation ID
+            user_id: Owner, whose change version is bumped once it is written
+            metadata: Keys to merge
+        """
+        sync_redis_client.xadd(
+            FLUSH_STREAM,
+            {
+                "generation_id": generation_id,
+                "user_id": user_id or "",
+                "metadata": json.dumps(metadata),
+            },
+        )
+
+    # Flushing
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            sync_redis_client.xgroup_create(
+                FLUSH_STREAM, FLUSH_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def flush(self, consumer: str) -> int:
+        """
+        Write one batch of terminal states to Postgres
+
+        Entries another flusher claimed but never acknowledged are taken
+        first; otherwise this blocks up to flush_block_ms for new ones.
+
+        Returns:
+            Number of generations written
+        """
+        self._ensure_group()
+
+        _, entries, *_ = sync_redis_client.xautoclaim(
+            FLUSH_STREAM,
+            FLUSH_GROUP,
+            consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=self.flush_batch_size,
+        )
+        if not entries:
+            response = sync_redis_client.xreadgroup(
+                FLUSH_GROUP,
+                consumer,
+                {FLUSH_STREAM: ">"},
+                count=self.flush_batch_size,
+                block=self.flush_block_ms,
+            )
+            entries = response[0][1] if response else []
+        if not entries:
+            return 0
+
+        # Last record per generation wins; group rows by the columns they set.
+        # Annotations have no status and merge with each other instead
+        records = {}
+        annotations: Dict[str, Dict[str, Any]] = {}
+        annotated_owners = set()
+        for _, fields in entries:
+            if not fields:
+                continue
+            if "status" in fields:
+                records[fields["generation_id"]] = {
+                    "status": fields["status"],
+                    **json.loads(fields["values"]),
+                }
+            else:
+                annotations.setdefault(fields["generation_id"], {}).update(
+                    json.loads(fields["metadata"])
+                )
+                if fields.get("user_id"):
+                    annotated_owners.add(fields["user_id"])
+
+        shapes: Dict[tuple, List[Dict[str, Any]]] = {}
+        for generation_id, values in records.items():
+            shapes.setdefault(tuple(sorted(values)), []).append(
+                {
+                    "b_id": generation_id,
+                    **{f"b_{key}": value for key, value in values.items()},
+                }
+            )
+
+        if shapes or annotations:
+            with sync_session() as db:
+                for keys, rows in shapes.items():
+                    db.execute(_flush_statement(keys), rows)
+                if annotations:
+                    db.execute(
+                        _annotate_statement(),
+                        [
+                            {"b_id": generation_id, "b_metadata": metadata}
+                            for generation_id, metadata in annotations.items()
+                        ],
+                    )
+                db.commit()
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        pipe = sync_redis_client.pipeline(transaction=False)
+        pipe.xack(FLUSH_STREAM, FLUSH_GROUP, *entry_ids)
+        pipe.xdel(FLUSH_STREAM, *entry_ids)
+        # Lists merge hot fields into Postgres rows, so dropping them is a change
+        for generation_id in records:
+            pipe.eval(
+                _TOUCH_OWNER,
+                1,
+                self._key(generation_id),
+                VERSION_PREFIX,
+                _version(),
+                self.ttl_seconds,
+            )
+        if records:
+            pipe.delete(*(self._key(generation_id) for generation_id in records))
+        for user_id in annotated_owners:
+            pipe.set(f"{VERSION_PREFIX}{user_id}", _version(), ex=self.ttl_seconds)
+        pipe.execute()
+
+        written = len(records.keys() | annotations.keys())
+        GENERATION_STATUS_FLUSH_ROWS.observe(written)
+        return written
+
+    def run_flusher(self):
+        """Flush terminal states until the process exits (run in a daemon thread)"""
+        consumer = f"{socket.gethostname()}:{os.getpid()}"
+        while True:
+            try:
+                self.flush(consumer)
+            except Exception as e:
+                # Unacknowledged entries are re-claimed after claim_idle_ms
+                logger.warning(f"Generation status flush failed: {e}")
+                self._group_ready = False
+                time.sleep(self.flush_block_ms / 1000)
+
+
+# Global instance
+generation_status = GenerationStatusStore(
+    ttl_seconds=settings.GENERATION_STATUS_TTL_SECONDS,
+    flush_batch_size=settings.GENERATION_STATUS_FLUSH_BATCH_SIZE,
+    flush_block_ms=settings.GENERATION_STATUS_FLUSH_BLOCK_MS,
+    claim_idle_ms=settings.GENERATION_STATUS_FLUSH_CLAIM_IDLE_MS,
+)
@@ -0,0 +1,90 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Idempotency Keys
+Maps client Idempotency-Key headers to the resources their first request created
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_PREFIX = "jams:idempotency"
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """Hash of a request, so a reused key with a different payload is caught"""
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key records stored in Redis.
+
+    A request reserves its key with a short TTL before doing any work and
+    completes it with the ID of what it created, which keeps the record for
+    ttl_seconds. Until then retries see a pending record; if the request
+    fails, it releases the key so a retry can run again.
+    """
+
+    def __init__(self, ttl_seconds: int, pending_ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.pending_ttl_seconds = pending_ttl_seconds
+
+    def _key(self, scope: str, key: str) -> str:
+        return f"{IDEMPOTENCY_PREFIX}:{scope}:{key}"
+
+    async def reserve(
+        self, scope: str, key: str, fingerprint: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key for a new request
+
+        Args:
+            scope: Tenant, user and route the key is valid for
+            key: Client-supplied Idempotency-Key
+            fingerprint: request_fingerprint of the request
+
+        Returns:
+            None if the key was free and is now reserved, otherwise the
+            existing record ({fingerprint, resource_id}; resource_id is None
+            while the first request is still running)
+        """
+        record = {"fingerprint": fingerprint, "resource_id": None}
+        reserved = await redis_client.set(
+            self._key(scope, key),
+            json.dumps(record),
+            ex=self.pending_ttl_seconds,
+            nx=True,
+        )
+        if reserved:
+            return None
+
+        existing = await redis_client.get(self._key(scope, key))
+        # Expired between SET and GET: report it as pending so the client retries
+        return json.loads(existing) if existing else record
+
+    async def complete(self, scope: str, key: str, fingerprint: str, resource_id: str):
+        """Record what the request created; retries with the key get it back"""
+        await redis_client.set(
+            self._key(scope, key),
+            json.dumps({"fingerprint": fingerprint, "resource_id": resource_id}),
+            ex=self.ttl_seconds,
+        )
+
+    async def release(self, scope: str, key: str):
+        """Free a key whose request failed before creating anything"""
+        await redis_client.delete(self._key(scope, key))
+
+
+# Global instance
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    pending_ttl_seconds=settings.IDEMPOTENCY_PENDING_TTL_SECONDS,
+)
@@ -0,0 +1,185 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Image Post-Processing
+Re-encodes generated PNGs to WebP/AVIF and renders thumbnails in a process pool
+"""
+
+import io
+import os
+import uuid
+import threading
+import multiprocessing
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pillow_avif  # noqa: F401  (registers the AVIF codec on Pillow < 11.2)
+except ImportError:
+    pass
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+# (derivative name, format, longest edge or None for full size)
+Derivative = Tuple[str, str, Optional[int]]
+
+
+def avif_supported() -> bool:
+    return "AVIF" in Image.SAVE
+
+
+def encode_derivative(
+    image_bytes: bytes, fmt: str, max_edge: Optional[int], quality: int
+) -> bytes:
+    """
+    Encode one derivative of an image (runs in a worker process)
+
+    Args:
+        image_bytes: Source image (PNG from ComfyUI)
+        fmt: 'webp' or 'avif'
+        max_edge: Resize so the longest edge is at most this many pixels
+        quality: Encoder quality (0-100)
+
+    Returns:
+        Encoded image bytes
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if max_edge:
+            # draft() lets JPEG sources decode at reduced size; PNG ignores it
+            image.draft("RGB", (max_edge, max_edge))
+            image.thumbnail(
+                (max_edge, max_edge), Image.Resampling.LANCZOS, reducing_gap=2.0
+            )
+
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(out, format="AVIF", quality=quality, speed=6)
+        return out.getvalue()
+
+
+class ImagePostProcessor:
+    """
+    CPU-bound image work for finished generations.
+
+    Encoding runs in a process pool so it neither holds the GIL of the
+    worker that waits on ComfyUI nor blocks an event loop; uploads of the
+    resulting derivatives run concurrently on a small thread pool. Pools
+    are created lazily per process (and recreated after fork) using the
+    spawn start method, since forking a threaded worker is unsafe.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        upload_concurrency: int = 8,
+        thumbnail_sizes: Optional[List[int]] = None,
+        webp_quality: int = 80,
+        avif_quality: int = 55,
+        avif_enabled: bool = True,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.upload_concurrency = upload_concurrency
+        self.thumbnail_sizes = thumbnail_sizes or [256, 512]
+        self.webp_quality = webp_quality
+        self.avif_quality = avif_quality
+        self.avif_enabled = avif_enabled
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._uploads: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_pools(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._uploads = ThreadPoolExecutor(
+                max_workers=self.upload_concurrency,
+                thread_name_prefix="postprocess-upload",
+            )
+            self._pid = os.getpid()
+
+    def derivatives(self) -> List[Derivative]:
+        """Derivatives produced for every image"""
+        specs: List[Derivative] = [("webp", "webp", None)]
+        if self.avif_enabled and avif_supported():
+            specs.append(("avif", "avif", None))
+        specs.extend((f"thumb_{size}", "webp", size) for size in self.thumbnail_sizes)
+        return specs
+
+    def _quality(self, fmt: str) -> int:
+        return self.avif_quality if fmt == "avif" else self.webp_quality
+
+    def process(self, images: List[bytes], tenant_id: str) -> List[Dict[str, str]]:
+        """
+        Encode and upload every derivative of every image
+
+        Args:
+            images: Source images, in output order
+            tenant_id: Tenant ID for storage isolation
+
+        Returns:
+            One {derivative name: public URL} dict per source image
+        """
+        self._ensure_pools()
+        specs = self.derivatives()
+
+        # Fan all encodes out at once so a batch uses every core
+        encodes = [
+            [
+                self._processes.submit(
+                    encode_derivative, data, fmt, max_edge, self._quality(fmt)
+                )
+                for _, fmt, max_edge in specs
+            ]
+            for data in images
+        ]
+
+        uploads = []
+        for futures in encodes:
+            image_uploads = {}
+            for (name, fmt, _), future in zip(specs, futures):
+                image_uploads[name] = self._uploads.submit(
+                    storage_service.upload_bytes,
+                    future.result(),
+                    tenant_id=tenant_id,
+                    filename=f"{uuid.uuid4()}.{fmt}",
+                    content_type=CONTENT_TYPES[fmt],
+                )
+            uploads.append(image_uploads)
+
+        return [
+            {name: future.result() for name, future in image_uploads.items()}
+            for image_uploads in uploads
+        ]
+
+
+# Global instance
+image_postprocessor = ImagePostProcessor(
+    max_workers=settings.IMAGE_POSTPROCESS_WORKERS,
+    upload_concurrency=settings.IMAGE_POSTPROCESS_UPLOAD_CONCURRENCY,
+    thumbnail_sizes=settings.IMAGE_THUMBNAIL_SIZES,
+    webp_quality=settings.IMAGE_WEBP_QUALITY,
+    avif_quality=settings.IMAGE_AVIF_QUALITY,
+    avif_enabled=settings.IMAGE_AVIF_ENABLED,
+)
@@ -0,0 +1,248 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - LLM Service
+Streaming text generation against a llama.cpp server
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import TEXT_FIRST_TOKEN_SECONDS, TEXT_TOKENS_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+class LLMError(Exception):
+    """Raised when the llama.cpp server fails or cannot be reached"""
+
+
+class TokenStats:
+    """Timing of one generation's token stream"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.last_token_at: Optional[float] = None
+        self.tokens = 0
+        self.finish_reason: Optional[str] = None
+
+    def token(self):
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+            TEXT_FIRST_TOKEN_SECONDS.observe(now - self.started)
+        self.last_token_at = now
+        self.tokens += 1
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Decode rate after the first token (which also pays for the prompt)"""
+        if self.tokens < 2 or self.last_token_at == self.first_token_at:
+            return None
+        return (self.tokens - 1) / (self.last_token_at - self.first_token_at)
+
+    def as_metadata(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "tokens_per_second": (
+                round(self.tokens_per_second, 2) if self.tokens_per_second else None
+            ),
+            "time_to_first_token_seconds": (
+                round(self.time_to_first_token, 3)
+                if self.time_to_first_token is not None
+                else None
+            ),
+            "finish_reason": self.finish_reason,
+        }
+
+
+class AsyncLlamaCppClient:
+    """
+    Client for llama.cpp server's OpenAI-compatible chat endpoint, backed
+    by a shared aiohttp connection pool created lazily on the running
+    event loop.
+
+    Completions are always requested as a stream: the server applies the
+    model's chat template and sends each token as it is sampled, so the
+    first one arrives after prompt processing rather than after the whole
+    reply. The timeout bounds the wait for each token, not the reply.
+    """
+
+    def __init__(
+        self, server_address: str, max_connections: int = 32, timeout: float = 120.0
+    ):
+        self.server_address = server_address.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=self.server_address,
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, limit_per_host=self.max_connections
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=10, sock_read=self.timeout
+                ),
+            )
+        return self._session
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stats: Optional[TokenStats] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a reply token by token
+
+        Args:
+            prompt: User message
+            max_tokens: Most tokens to generate
+            temperature: Sampling temperature
+            stats: Receives token timings; tokens/sec is recorded to
+                metrics when the stream completes
+
+        Yields:
+            Text of each token, as sampled
+        """
+        stats = stats or TokenStats()
+        payload = {
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+
+        try:
+            async with self.session.post(
+                "/v1/chat/completions", json=payload
+            ) as response:
+                if response.status != 200:
+                    detail = (await response.text())[:500]
+                    raise LLMError(f"llama.cpp returned {response.status}: {detail}")
+
+                # Server-sent events, one JSON chunk per token
+                async for line in response.content:
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    if chunk.get("error"):
+                        raise LLMError(f"llama.cpp error: {chunk['error']}")
+                    for choice in chunk.get("choices") or ():
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            stats.token()
+                            yield content
+                        if choice.get("finish_reason"):
+                            stats.finish_reason = choice["finish_reason"]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"llama.cpp request failed: {e}")
+            raise LLMError(f"llama.cpp connection error: {str(e)}")
+
+        if stats.tokens_per_second:
+            TEXT_TOKENS_PER_SECOND.observe(stats.tokens_per_second)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class LlamaCppClient:
+    """
+    Blocking facade over AsyncLlamaCppClient for Celery workers.
+
+    Like ComfyUIClient, streams are driven on a private event loop running
+    in a daemon thread, so every task in the process shares one connection
+    pool instead of opening its own. The loop is recreated after fork().
+    """
+
+    def __init__(self, server_address: str, **client_kwargs):
+        self.server_address = server_address.rstrip("/")
+        self._client_kwargs = client_kwargs
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[AsyncLlamaCppClient] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop (once per process)"""
+        if self._pid == os.getpid() and self._loop is not None:
+            return self._loop
+
+        with self._lock:
+            if self._pid != os.getpid() or self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="llama-cpp-client", daemon=True
+                ).start()
+                self._async_client = AsyncLlamaCppClient(
+                    self.server_address, **self._client_kwargs
+                )
+                self._loop = loop
+                self._pid = os.getpid()
+
+        return self._loop
+
+    def iter_stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stats: Optional[TokenStats] = None,
+    ) -> Iterator[str]:
+        """
+        Blocking iterator over AsyncLlamaCppClient.stream
+
+        Tokens are pulled one at a time from the client loop.
+        """
+        loop = self._ensure_loop()
+        stream = self._async_client.stream(prompt, max_tokens, temperature, stats)
+
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(
+                        stream.__anext__(), loop
+                    ).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.aclose(), loop).result()
+
+
+# Global instances
+llm_client = AsyncLlamaCppClient(
+    settings.LLAMA_CPP_URL,
+    max_connections=settings.LLAMA_CPP_MAX_CONNECTIONS,
+    timeout=settings.LLAMA_CPP_TIMEOUT_SECONDS,
+)
+sync_llm_client = LlamaCppClient(
+    settings.LLAMA_CPP_URL,
+    max_connections=settings.LLAMA_CPP_MAX_CONNECTIONS,
+    timeout=settings.LLAMA_CPP_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,265 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Prompt Coalescer
+Merges compatible image requests into one batched ComfyUI prompt
+"""
+
+import threading
+import time
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.core.config import settings
+from app.services.comfyui_client import PromptCancelled
+from app.services.comfyui_pool import ComfyUIPool, comfyui_pool
+from app.services.comfyui_service import ComfyUIService
+
+logger = logging.getLogger(__name__)
+
+# Requests can only share a prompt when these sampling parameters match
+COALESCE_KEY_FIELDS = (
+    "model",
+    "width",
+    "height",
+    "steps",
+    "cfg",
+    "sampler",
+    "scheduler",
+)
+
+IMAGE_DEFAULTS = {
+    "negative_prompt": "",
+    "model": "RealVisXL_V4.0.safetensors",
+    "width": 1024,
+    "height": 1024,
+    "steps": 30,
+    "cfg": 7.0,
+    "sampler": "euler_ancestral",
+    "scheduler": "normal",
+    "seed": -1,
+    "batch_size": 1,
+}
+
+CHECKPOINT_NODE = "4"
+
+
+class CoalescedRequest:
+    """One caller's image request waiting to be merged"""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = {**IMAGE_DEFAULTS, **params}
+        self.params.pop("safety_checker", None)
+        self.on_queued = self.params.pop("on_queued", None)
+        self.cancel_check = self.params.pop("cancel_check", None)
+        self.priority = self.params.pop("priority", None)
+        self.random_seed = self.params["seed"] == -1
+        self.future: Future = Future()
+
+    @property
+    def key(self) -> Tuple:
+        return tuple(self.params[field] for field in COALESCE_KEY_FIELDS)
+
+    @property
+    def batch_size(self) -> int:
+        return self.params["batch_size"]
+
+
+def build_coalesced_workflow(
+    requests: List[CoalescedRequest], seed: Optional[int] = None
+) -> Tuple[Dict[str, Any], List[Tuple[str, int, int, int]]]:
+    """
+    Build one workflow serving several requests that share a coalesce key
+
+    All branches share a single CheckpointLoaderSimple. Requests with the
+    same prompt/negative prompt and a random seed are merged into one
+    branch whose EmptyLatentImage batch is the sum of their batch sizes;
+    every other request gets its own sampler branch.
+
+    Args:
+        requests: Requests with identical COALESCE_KEY_FIELDS
+        seed: Seed for random-seed requests (defaults to the current time)
+
+    Returns:
+        (workflow, slices) where slices[i] is (SaveImage node id, offset,
+        count, seed) locating request i's images in the prompt outputs
+    """
+    seed = int(time.time()) if seed is None else seed
+    branches: Dict[Tuple, List[int]] = {}
+
+    for index, request in enumerate(requests):
+        if request.random_seed:
+            branch_key = (
+                "random",
+                request.params["prompt"],
+                request.params["negative_prompt"],
+            )
+        else:
+            branch_key = ("seeded", index)
+        branches.setdefault(branch_key, []).append(index)
+
+    workflow: Dict[str, Any] = {}
+    slices: List[Optional[Tuple[str, int, int, int]]] = [None] * len(requests)
+
+    for branch_number, members in enumerate(branches.values()):
+        params = dict(requests[members[0]].params)
+        params["batch_size"] = sum(requests[i].batch_size for i in members)
+        if requests[members[0]].random_seed:
+            params["seed"] = seed
+
+        branch = ComfyUIService._build_workflow(**params)
+        prefix = f"b{branch_number}_"
+
+        for node_id, node in branch.items():
+            if node_id == CHECKPOINT_NODE:
+                workflow.setdefault(CHECKPOINT_NODE, node)
+                continue
+
+            inputs = {
+                name: (
+                    [
+                        value[0] if value[0] == CHECKPOINT_NODE else prefix + value[0],
+                        value[1],
+                    ]
+                    if isinstance(value, list)
+                    else value
+                )
+                for name, value in node["inputs"].items()
+            }
+            workflow[prefix + node_id] = {**node, "inputs": inputs}
+
+            if node["class_type"] == "SaveImage":
+                save_node = prefix + node_id
+
+        offset = 0
+        for i in members:
+            slices[i] = (save_node, offset, requests[i].batch_size, params["seed"])
+            offset += requests[i].batch_size
+
+    return workflow, slices
+
+
+class PromptCoalescer:
+    """
+    Collects image requests for a short window and submits each group of
+    compatible requests as one ComfyUI prompt.
+
+    Only requests submitted to the same process can be merged, so this pays
+    off for thread/async workers and bulk submitters (grids, batch APIs)
+    rather than a prefork Celery worker running one task per process.
+    """
+
+    def __init__(
+        self, pool: ComfyUIPool, window_seconds: float = 0.05, max_batch: int = 8
+    ):
+        self.pool = pool
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, List[CoalescedRequest]] = {}
+
+    def submit(self, **params) -> Future:
+        """
+        Queue an image request for coalescing
+
+        Accepts the same arguments as ComfyUIService.generate_image.
+
+        Returns:
+            Future resolving to a generate_image-style result for this request
+        """
+        request = CoalescedRequest(params)
+        key = request.key
+
+        with self._lock:
+            group = self._pending.setdefault(key, [])
+            group.append(request)
+            batch = sum(r.batch_size for r in group)
+
+            if batch >= self.max_batch:
+                self._pending.pop(key)
+                threading.Thread(target=self._run, args=(group,), daemon=True).start()
+            elif len(group) == 1:
+                timer = threading.Timer(self.window_seconds, self._flush, args=(key,))
+                timer.daemon = True
+                timer.start()
+
+        return request.future
+
+    def generate_image(
+        self, timeout: Optional[float] = None, **params
+    ) -> Dict[str, Any]:
+        """
+        Blocking variant of submit()
+
+        A cancel_check abandons only this caller's wait; the shared prompt
+        keeps running for the other requests merged into it.
+        """
+        cancel_check = params.get("cancel_check")
+        future = self.submit(**params)
+        if cancel_check is None:
+            return future.result(timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise FutureTimeoutError()
+            try:
+                return future.result(1.0 if remaining is None else min(remaining, 1.0))
+            except FutureTimeoutError:
+                reason = cancel_check()
+                if reason:
+                    raise PromptCancelled(None, reason)
+
+    def _flush(self, key: Tuple):
+        with self._lock:
+            group = self._pending.pop(key, None)
+        if group:
+            self._run(group)
+
+    def _run(self, requests: List[CoalescedRequest]):
+        try:
+            workflow, slices = build_coalesced_workflow(requests)
+            model = requests[0].params["model"]
+            priorities = [r.priority for r in requests if r.priority is not None]
+
+            # Only an unshared prompt may be cancelled or preempted on the node
+            single = requests[0] if len(requests) == 1 else None
+            node, prompt_id, result = self.pool.execute_workflow(
+                workflow,
+                checkpoint=model,
+                on_queued=single.on_queued if single else None,
+                cancel_check=single.cancel_check if single else None,
+                priority=max(priorities) if priorities else None,
+            )
+            logger.info(
+                f"Coalesced {len(requests)} image requests into ComfyUI prompt {prompt_id}"
+            )
+
+            for request, (save_node, offset, count, seed) in zip(requests, slices):
+                images = node.service.collect_outputs(result, [save_node])
+
+                request.future.set_result(
+                    {
+                        "prompt_id": prompt_id,
+                        "images": images[offset : offset + count],
+                        "seed": seed,
+                        "node": node.address,
+                        "metadata": {
+                            **{k: v for k, v in request.params.items() if k != "seed"},
+                            "coalesced_requests": len(requests),
+                        },
+                    }
+                )
+        except Exception as e:
+            logger.error(f"Coalesced ComfyUI prompt failed: {e}")
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+
+# Global instance
+prompt_coalescer = PromptCoalescer(
+    comfyui_pool,
+    window_seconds=settings.COMFYUI_COALESCE_WINDOW_MS / 1000,
+    max_batch=settings.COMFYUI_COALESCE_MAX_BATCH,
+)
@@ -2,18 +2,52 @@
 Jukeyman Autonomous Media Station (JAMS) - Cloudflare R2 Storage Service
 """
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
+import io
 import os
 import uuid
 import mimetypes
-from typing import Optional
+from typing import Optional, Iterable, Iterator
 import logging
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Streamed uploads buffer at most chunksize * max_concurrency bytes
+STREAM_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+)
+
+
+class _IterableStream(io.RawIOBase):
+    """
+    Read-only, non-seekable file object over an iterator of byte chunks
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
 
 class R2StorageService:
     """
@@ -96,7 +130,8 @@ class R2StorageService:
         file_bytes: bytes,
         tenant_id: str,
         filename: str,
-        content_type: str = "application/octet-stream"
+        content_type: str = "application/octet-stream",
+        cache_control: Optional[str] = None,
     ) -> str:
         """
         Upload bytes directly to R2
@@ -106,19 +141,22 @@ class R2StorageService:
             tenant_id: Tenant ID for organization
             filename: Filename with extension
             content_type: MIME type
+            cache_control: Optional Cache-Control header (e.g. for files rewritten in place)
             
         Returns:
             Public URL of the uploaded file
         """
         key = f"{tenant_id}/{filename}"
-        
+        extra = {"CacheControl": cache_control} if cache_control else {}
+
         try:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
                 Body=file_bytes,
                 ContentType=content_type,
-                ACL='public-read'
+                ACL="public-read",
+                **extra,
             )
             
             public_url = f"{self.public_url}/{key}"
@@ -130,6 +168,68 @@ class R2StorageService:
             logger.error(f"Failed to upload bytes to R2: {e}")
             raise Exception(f"Failed to upload bytes: {str(e)}")
     
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        tenant_id: str,
+        filename: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        Upload an iterator of byte chunks to R2 without touching local disk
+
+        Memory stays bounded by STREAM_TRANSFER_CONFIG regardless of the
+        total size, so this is safe for multi-hundred-MB video outputs.
+
+        Args:
+            chunks: Iterable of file content chunks
+            tenant_id: Tenant ID for organization
+            filename: Filename with extension
+            content_type: MIME type
+
+        Returns:
+            Public URL of the uploaded file
+        """
+        key = f"{tenant_id}/{filename}"
+
+        try:
+            self.s3_client.upload_fileobj(
+                io.BufferedReader(_IterableStream(chunks), buffer_size=1024 * 1024),
+                self.bucket_name,
+                key,
+                ExtraArgs={"ContentType": content_type, "ACL": "public-read"},
+                Config=STREAM_TRANSFER_CONFIG,
+            )
+
+            public_url = f"{self.public_url}/{key}"
+            logger.info(f"Streamed upload to R2: {public_url}")
+
+            return public_url
+
+        except ClientError as e:
+            logger.error(f"Failed to stream upload to R2: {e}")
+            raise Exception(f"Failed to upload stream: {str(e)}")
+
+    def download_bytes(self, url: str) -> bytes:
+        """
+        Download a file from R2 given its public URL
+
+        Args:
+            url: Public URL of the file
+
+        Returns:
+            File content as bytes
+        """
+        key = url.replace(f"{self.public_url}/", "")
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return response["Body"].read()
+
+        except ClientError as e:
+            logger.error(f"Failed to download file from R2: {e}")
+            raise Exception(f"Failed to download file: {str(e)}")
+
     def delete_file(self, url: str) -> bool:
         """
         Delete a file from R2 given its public URL
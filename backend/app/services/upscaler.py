@@ -0,0 +1,284 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Tiled Upscaler
+CPU image upscaling in overlapping tiles across a process pool, streamed out as PNG
+"""
+
+import os
+import struct
+import threading
+import multiprocessing
+import logging
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2  # Real-ESRGAN ONNX models run through OpenCV's DNN module
+except ImportError:
+    cv2 = None
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Compressed pixels are emitted in IDAT chunks of about this size
+PNG_CHUNK_BYTES = 256 * 1024
+
+# Model loaded once per pool process (see _init_worker)
+_model_path: Optional[str] = None
+_model = None
+
+
+def tile_spans(length: int, tile: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of tiles covering [0, length)
+
+    Tiles are spaced evenly, so neighbours overlap by at least `overlap`
+    and the last tile ends flush with the edge.
+    """
+    if length <= tile:
+        return [(0, length)]
+    count = -(-(length - overlap) // (tile - overlap))
+    return [
+        (start, start + tile)
+        for start in (round(i * (length - tile) / (count - 1)) for i in range(count))
+    ]
+
+
+def _init_worker(model_path: Optional[str]):
+    global _model_path
+    _model_path = model_path
+
+
+def _load_model():
+    global _model
+    if _model is None and _model_path:
+        if cv2 is None:
+            raise RuntimeError(
+                "UPSCALE_MODEL_PATH is set but opencv-python is not installed"
+            )
+        _model = cv2.dnn.readNetFromONNX(_model_path)
+    return _model
+
+
+def upscale_tile(tile: np.ndarray, scale: int) -> np.ndarray:
+    """
+    Upscale one RGB tile (runs in a worker process)
+
+    Uses the ONNX super-resolution model when one is configured, Lanczos
+    resampling otherwise. A model whose native scale differs from the
+    requested one has its output resampled to fit.
+    """
+    height, width = tile.shape[:2]
+    size = (width * scale, height * scale)
+
+    model = _load_model()
+    if model is None:
+        return np.asarray(Image.fromarray(tile).resize(size, Image.Resampling.LANCZOS))
+
+    model.setInput(tile.astype(np.float32).transpose(2, 0, 1)[np.newaxis] / 255.0)
+    output = model.forward()[0].transpose(1, 2, 0)
+    output = np.clip(output * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    if output.shape[:2] != (size[1], size[0]):
+        output = np.asarray(
+            Image.fromarray(output).resize(size, Image.Resampling.LANCZOS)
+        )
+    return output
+
+
+def feather(existing: np.ndarray, incoming: np.ndarray, axis: int) -> np.ndarray:
+    """Linear crossfade from existing to incoming along axis (0 rows, 1 columns)"""
+    count = existing.shape[axis]
+    shape = [1, 1, 1]
+    shape[axis] = count
+    ramp = ((np.arange(count, dtype=np.float32) + 0.5) / count).reshape(shape)
+    return (existing * (1.0 - ramp) + incoming * ramp + 0.5).astype(np.uint8)
+
+
+class PNGStreamWriter:
+    """
+    RGB PNG encoder fed a band of rows at a time
+
+    Rows use the Sub filter (which only looks left, so bands are encoded
+    independently) and one zlib stream; compressed data is returned as
+    IDAT chunks whenever enough has built up.
+    """
+
+    def __init__(self, width: int, height: int, compress_level: int = 6):
+        self.width = width
+        self.height = height
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+
+    @staticmethod
+    def _chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    def header(self) -> bytes:
+        ihdr = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return PNG_SIGNATURE + self._chunk(b"IHDR", ihdr)
+
+    def write(self, rows: np.ndarray) -> bytes:
+        raw = rows.reshape(len(rows), -1)
+        filtered = np.empty((len(raw), raw.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1  # Sub
+        filtered[:, 1:4] = raw[:, :3]
+        np.subtract(raw[:, 3:], raw[:, :-3], out=filtered[:, 4:])
+
+        self._pending += self._compressor.compress(filtered)
+        if len(self._pending) < PNG_CHUNK_BYTES:
+            return b""
+        chunk = self._chunk(b"IDAT", bytes(self._pending))
+        self._pending.clear()
+        return chunk
+
+    def close(self) -> bytes:
+        self._pending += self._compressor.flush()
+        return self._chunk(b"IDAT", bytes(self._pending)) + self._chunk(b"IEND", b"")
+
+
+class TiledUpscaler:
+    """
+    CPU upscaler that keeps memory bounded by tile size.
+
+    The source is cut into overlapping tiles that upscale in a process
+    pool, one band of tiles (a row of them) at a time with the next band
+    already queued. Each band is stitched into a strip, with overlaps
+    crossfaded left to right and against the bottom of the previous
+    strip, and its finished rows are PNG-encoded and yielded straight
+    away. Peak memory is the source image plus about two bands of tiles,
+    never the whole upscaled output, so 4x upscales of large renders run
+    on CPU-only nodes. Like the image post-processor, the pool is created
+    lazily per process with the spawn start method.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        tile_size: int = 256,
+        tile_overlap: int = 16,
+        model_path: Optional[str] = None,
+        compress_level: int = 6,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.model_path = model_path
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def _ensure_pool(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_path,),
+            )
+            self._pid = os.getpid()
+
+    def upscale(self, image: Image.Image, scale: int) -> Iterator[bytes]:
+        """
+        Upscale an image
+
+        Args:
+            image: Source image (converted to RGB)
+            scale: Integer upscale factor
+
+        Yields:
+            PNG bytes of the upscaled image, in order
+        """
+        self._ensure_pool()
+        pixels = np.asarray(image.convert("RGB"))
+        height, width = pixels.shape[:2]
+        rows = tile_spans(height, self.tile_size, self.tile_overlap)
+        cols = tile_spans(width, self.tile_size, self.tile_overlap)
+        out_width = width * scale
+
+        def submit(band: int):
+            y0, y1 = rows[band]
+            return [
+                self._processes.submit(upscale_tile, pixels[y0:y1, x0:x1], scale)
+                for x0, x1 in cols
+            ]
+
+        writer = PNGStreamWriter(out_width, height * scale, self.compress_level)
+        yield writer.header()
+
+        bands = deque(submit(band) for band in range(min(2, len(rows))))
+        carry = None
+        try:
+            for band, (y0, y1) in enumerate(rows):
+                futures = bands.popleft()
+                if band + 2 < len(rows):
+                    bands.append(submit(band + 2))
+
+                strip = np.empty(((y1 - y0) * scale, out_width, 3), dtype=np.uint8)
+                stitched = 0
+                for (x0, x1), future in zip(cols, futures):
+                    tile = future.result()
+                    overlap = stitched - x0 * scale
+                    if overlap > 0:
+                        strip[:, stitched - overlap : stitched] = feather(
+                            strip[:, stitched - overlap : stitched],
+                            tile[:, :overlap],
+                            axis=1,
+                        )
+                    strip[:, stitched : x1 * scale] = tile[:, max(overlap, 0) :]
+                    stitched = x1 * scale
+                del futures
+
+                # carry holds the previous strip's rows that this one overlaps
+                if carry is not None:
+                    strip[: len(carry)] = feather(carry, strip[: len(carry)], axis=0)
+
+                if band + 1 < len(rows):
+                    finished = (rows[band + 1][0] - y0) * scale
+                    carry = strip[finished:].copy()
+                else:
+                    finished = len(strip)
+                chunk = writer.write(strip[:finished])
+                if chunk:
+                    yield chunk
+
+            yield writer.close()
+
+        finally:
+            for futures in bands:
+                for future in futures:
+                    future.cancel()
+
+    def shutdown(self):
+        """Stop this process's tile workers"""
+        with self._lock:
+            if self._processes is not None and self._pid == os.getpid():
+                self._processes.shutdown()
+            self._processes = None
+            self._pid = None
+
+
+# Global instance
+upscaler = TiledUpscaler(
+    max_workers=settings.UPSCALE_WORKERS,
+    tile_size=settings.UPSCALE_TILE_SIZE,
+    tile_overlap=settings.UPSCALE_TILE_OVERLAP,
+    model_path=settings.UPSCALE_MODEL_PATH,
+)
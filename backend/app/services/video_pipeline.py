@@ -0,0 +1,664 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Video Pipeline
+Renders clips as overlapping segments across the ComfyUI pool and publishes them as HLS
+"""
+
+import logging
+import math
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.comfyui_client import PromptCancelled
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+# Output sizes; both edges are multiples of 8 for the latent space
+RESOLUTIONS = {
+    "480p": (848, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+PLAYLIST_NAME = "index.m3u8"
+PLAYLIST_CONTENT_TYPE = "application/vnd.apple.mpegurl"
+SEGMENT_CONTENT_TYPE = "video/mp2t"
+
+# Returns a reason once rendering should stop ('cancelled'), else None
+CancelCheck = Callable[[], Optional[str]]
+
+# Called with (segments published, total segments, playlist URL)
+SegmentCallback = Callable[[int, int, str], None]
+
+
+class Segment:
+    """A run of output frames rendered as one prompt"""
+
+    def __init__(self, index: int, start_frame: int, frames: int, overlap: int):
+        self.index = index
+        self.start_frame = start_frame  # First output frame this segment owns
+        self.frames = frames  # Output frames it owns
+        # Extra frames rendered past its end, crossfaded into the next segment
+        self.overlap = overlap
+
+    @property
+    def rendered_frames(self) -> int:
+        return self.frames + self.overlap
+
+    def __repr__(self) -> str:
+        return (
+            f"Segment({self.index}, start={self.start_frame}, "
+            f"frames={self.frames}, overlap={self.overlap})"
+        )
+
+
+def plan_segments(
+    total_frames: int, segment_frames: int, overlap_frames: int
+) -> List[Segment]:
+    """
+    Split a clip into segments of about segment_frames output frames
+
+    Every segment but the last also renders overlap_frames frames past its
+    end; those are crossfaded with the first frames of the next segment to
+    hide the seam. Frames are spread evenly, so no segment is shorter than
+    its overlap.
+
+    Args:
+        total_frames: Frames in the finished clip
+        segment_frames: Target output frames per segment
+        overlap_frames: Frames shared by consecutive segments
+
+    Returns:
+        Segments in timeline order
+    """
+    count = max(1, math.ceil(total_frames / segment_frames))
+    base, extra = divmod(total_frames, count)
+    overlap = min(overlap_frames, base // 2)
+
+    segments = []
+    start = 0
+    for index in range(count):
+        frames = base + (1 if index < extra else 0)
+        segments.append(
+            Segment(index, start, frames, overlap if index < count - 1 else 0)
+        )
+        start += frames
+    return segments
+
+
+def build_segment_workflow(
+    prompt: str,
+    negative_prompt: str,
+    model: str,
+    motion_module: str,
+    width: int,
+    height: int,
+    frames: int,
+    steps: int,
+    cfg: float,
+    seed: int,
+    filename_prefix: str,
+) -> Dict[str, Any]:
+    """
+    AnimateDiff workflow rendering one segment as a batch of frames
+
+    Every segment shares the clip's prompt and seed; the frames come back
+    as SaveImage outputs in order.
+    """
+    return {
+        "3": {
+            "inputs": {
+                "seed": seed,
+                "steps": steps,
+                "cfg": cfg,
+                "sampler_name": "euler_ancestral",
+                "scheduler": "normal",
+                "denoise": 1.0,
+                "model": ["10", 0],
+                "positive": ["6", 0],
+                "negative": ["7", 0],
+                "latent_image": ["5", 0],
+            },
+            "class_type": "KSampler",
+        },
+        "4": {"inputs": {"ckpt_name": model}, "class_type": "CheckpointLoaderSimple"},
+        "5": {
+            "inputs": {"width": width, "height": height, "batch_size": frames},
+            "class_type": "EmptyLatentImage",
+        },
+        "6": {
+            "inputs": {"text": prompt, "clip": ["4", 1]},
+            "class_type": "CLIPTextEncode",
+        },
+        "7": {
+            "inputs": {"text": negative_prompt, "clip": ["4", 1]},
+            "class_type": "CLIPTextEncode",
+        },
+        "8": {
+            "inputs": {"samples": ["3", 0], "vae": ["4", 2]},
+            "class_type": "VAEDecode",
+        },
+        "9": {
+            "inputs": {"filename_prefix": filename_prefix, "images": ["8", 0]},
+            "class_type": "SaveImage",
+        },
+        "10": {
+            "inputs": {
+                "model": ["4", 0],
+                "model_name": motion_module,
+                "beta_schedule": "autoselect",
+            },
+            "class_type": "ADE_AnimateDiffLoaderGen1",
+        },
+    }
+
+
+def blend_frames(previous_tail: List[str], head: List[str], out_dir: str) -> List[str]:
+    """
+    Crossfade the overlap between two segments
+
+    Frame j of the overlap weights the new segment by (j + 1) / (n + 1), so
+    the fade neither starts nor ends on a duplicated frame.
+
+    Returns:
+        Paths of the blended frames (written to out_dir)
+    """
+    blended = []
+    for j, (old_path, new_path) in enumerate(zip(previous_tail, head)):
+        with Image.open(old_path) as old, Image.open(new_path) as new:
+            new = new.convert("RGB")
+            old = old.convert("RGB").resize(new.size)
+            path = os.path.join(out_dir, f"blend_{j:05d}.png")
+            Image.blend(old, new, (j + 1) / (len(previous_tail) + 1)).save(
+                path, compress_level=1
+            )
+        blended.append(path)
+    return blended
+
+
+class FFmpegPool:
+    """
+    Bounded pool of ffmpeg subprocesses encoding HLS segments.
+
+    Each job crossfades a segment's overlap with the previous segment and
+    pipes the frames into one ffmpeg process that writes an MPEG-TS segment.
+    Threads only feed and wait on their subprocess, so the encodes
+    themselves run on separate cores.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        ffmpeg_path: str = "ffmpeg",
+        preset: str = "veryfast",
+        crf: int = 20,
+    ):
+        self.max_workers = max_workers
+        self.ffmpeg_path = ffmpeg_path
+        self.preset = preset
+        self.crf = crf
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ffmpeg"
+                )
+            return self._executor
+
+    def encode_segment(
+        self,
+        previous_tail: List[str],
+        frames: List[str],
+        out_path: str,
+        fps: int,
+        width: int,
+        height: int,
+        ts_offset: float,
+    ) -> Future:
+        """
+        Queue the encode of one HLS segment
+
+        Args:
+            previous_tail: Overlap frames rendered by the previous segment
+            frames: Frames this segment owns, in order
+            out_path: Where to write the .ts file
+            fps: Frame rate
+            width: Output width
+            height: Output height
+            ts_offset: Segment start on the clip timeline, in seconds
+
+        Returns:
+            Future resolving to out_path
+        """
+        return self._ensure_executor().submit(
+            self._encode, previous_tail, frames, out_path, fps, width, height, ts_offset
+        )
+
+    def _encode(
+        self,
+        previous_tail: List[str],
+        frames: List[str],
+        out_path: str,
+        fps: int,
+        width: int,
+        height: int,
+        ts_offset: float,
+    ) -> str:
+        if previous_tail:
+            blended = blend_frames(previous_tail, frames, os.path.dirname(frames[0]))
+            frames = blended + frames[len(blended) :]
+
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "image2pipe",
+            "-framerate",
+            str(fps),
+            "-c:v",
+            "png",
+            "-i",
+            "-",
+            "-vf",
+            f"scale={width}:{height}:flags=lanczos,format=yuv420p",
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.preset,
+            "-crf",
+            str(self.crf),
+            "-g",
+            str(fps),
+            "-output_ts_offset",
+            f"{ts_offset:.6f}",
+            "-f",
+            "mpegts",
+            out_path,
+        ]
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        try:
+            for path in frames:
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, process.stdin)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read()
+        process.wait()
+
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed ({process.returncode}): {stderr.decode(errors='replace').strip()}"
+            )
+        return out_path
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+class HLSPlaylist:
+    """Media playlist that grows as segments are published (EVENT type)"""
+
+    def __init__(self, target_duration: float):
+        self.target_duration = math.ceil(target_duration)
+        self.segments: List[tuple] = []
+        self.ended = False
+
+    def add(self, uri: str, duration: float):
+        self.segments.append((uri, duration))
+
+    def render(self) -> str:
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for uri, duration in self.segments:
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(uri)
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+
+class ComfyUISegmentRenderer:
+    """Renders a segment's frames as one prompt on the best ComfyUI node"""
+
+    def __init__(
+        self,
+        pool,
+        prompt: str,
+        negative_prompt: str,
+        model: str,
+        motion_module: str,
+        width: int,
+        height: int,
+        steps: int,
+        cfg: float,
+        seed: int,
+        timeout: int = 900,
+        priority: Optional[int] = None,
+    ):
+        self.pool = pool
+        self.prompt = prompt
+        self.negative_prompt = negative_prompt
+        self.model = model
+        self.motion_module = motion_module
+        self.width = width
+        self.height = height
+        self.steps = steps
+        self.cfg = cfg
+        self.seed = seed
+        self.timeout = timeout
+        self.priority = priority
+
+    def render(
+        self, segment: Segment, out_dir: str, cancel_check: Optional[CancelCheck] = None
+    ) -> List[str]:
+        """
+        Render a segment and download its frames
+
+        Returns:
+            Paths of the frame PNGs in out_dir, in order
+        """
+        workflow = build_segment_workflow(
+            self.prompt,
+            self.negative_prompt,
+            self.model,
+            self.motion_module,
+            self.width,
+            self.height,
+            segment.rendered_frames,
+            self.steps,
+            self.cfg,
+            self.seed,
+            f"jams_video_{segment.index:05d}",
+        )
+        queued = {}
+
+        try:
+            node, prompt_id, result = self.pool.execute_workflow(
+                workflow,
+                checkpoint=self.model,
+                timeout=self.timeout,
+                on_queued=lambda address, prompt_id: queued.update(
+                    address=address, prompt_id=prompt_id
+                ),
+                cancel_check=cancel_check,
+                priority=self.priority,
+            )
+        except PromptCancelled:
+            # Nothing waits for this segment any more; free the GPU
+            if queued:
+                try:
+                    self.pool.get_node(queued["address"]).service.cancel_prompt(
+                        queued["prompt_id"]
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to cancel video segment prompt {queued['prompt_id']}: {e}"
+                    )
+            raise
+
+        paths = []
+        for i, output in enumerate(node.service.collect_outputs(result)):
+            path = os.path.join(out_dir, f"{i:05d}.png")
+            with open(path, "wb") as f:
+                for chunk in node.service.stream_output(output):
+                    f.write(chunk)
+            paths.append(path)
+        return paths
+
+
+class VideoPipeline:
+    """
+    Renders a clip as overlapping segments in parallel and publishes it as HLS.
+
+    Up to render_concurrency segments render at once; the renderer spreads
+    them across the ComfyUI pool. Finished segments are handed to the
+    ffmpeg pool in timeline order, and each encoded segment is uploaded to
+    R2 and appended to the playlist as soon as it and every segment before
+    it are done, so playback can start before the clip is complete.
+    """
+
+    def __init__(self, storage, ffmpeg_pool: FFmpegPool, render_concurrency: int = 4):
+        self.storage = storage
+        self.ffmpeg_pool = ffmpeg_pool
+        self.render_concurrency = render_concurrency
+
+    def render(
+        self,
+        renderer,
+        segments: List[Segment],
+        fps: int,
+        width: int,
+        height: int,
+        tenant_id: str,
+        prefix: str,
+        on_segment: Optional[SegmentCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict[str, Any]:
+        """
+        Render, encode and publish a clip
+
+        Args:
+            renderer: Object with render(segment, out_dir, cancel_check) -> frame paths
+            segments: plan_segments output
+            fps: Frame rate
+            width: Output width
+            height: Output height
+            tenant_id: Tenant ID for storage isolation
+            prefix: Storage path of the clip's playlist and segments
+            on_segment: Optional callback after each published segment
+            cancel_check: Optional callable returning a reason to stop
+
+        Returns:
+            Dictionary with playlist_url and segment_urls
+        """
+        workdir = tempfile.mkdtemp(prefix="jams-video-")
+        stop = threading.Event()
+
+        def check() -> Optional[str]:
+            if stop.is_set():
+                return "cancelled"
+            return cancel_check() if cancel_check else None
+
+        def render_segment(segment: Segment) -> List[str]:
+            out_dir = os.path.join(workdir, f"{segment.index:05d}")
+            os.makedirs(out_dir, exist_ok=True)
+            return renderer.render(segment, out_dir, check)
+
+        playlist = HLSPlaylist(max(segment.frames for segment in segments) / fps)
+        playlist_url = None
+        segment_urls: List[str] = []
+        encodes: List[tuple] = []
+        renders = ThreadPoolExecutor(
+            max_workers=self.render_concurrency, thread_name_prefix="video-render"
+        )
+
+        def publish_playlist() -> str:
+            return self.storage.upload_bytes(
+                playlist.render().encode(),
+                tenant_id=tenant_id,
+                filename=f"{prefix}/{PLAYLIST_NAME}",
+                content_type=PLAYLIST_CONTENT_TYPE,
+                cache_control="no-cache",
+            )
+
+        def publish_ready(block: bool):
+            # Segments go out strictly in timeline order
+            nonlocal playlist_url
+            while len(segment_urls) < len(encodes):
+                segment, future = encodes[len(segment_urls)]
+                if not block and not future.done():
+                    return
+                with open(future.result(), "rb") as f:
+                    data = f.read()
+                name = f"segment_{segment.index:05d}.ts"
+                segment_urls.append(
+                    self.storage.upload_bytes(
+                        data,
+                        tenant_id=tenant_id,
+                        filename=f"{prefix}/{name}",
+                        content_type=SEGMENT_CONTENT_TYPE,
+                    )
+                )
+                playlist.add(name, segment.frames / fps)
+                playlist.ended = len(segment_urls) == len(segments)
+                playlist_url = publish_playlist()
+
+                # The previous segment's overlap frames have been blended in by now
+                if segment.index > 0:
+                    shutil.rmtree(
+                        os.path.join(workdir, f"{segment.index - 1:05d}"),
+                        ignore_errors=True,
+                    )
+                if on_segment:
+                    on_segment(len(segment_urls), len(segments), playlist_url)
+
+        try:
+            futures = [renders.submit(render_segment, segment) for segment in segments]
+            previous_tail: List[str] = []
+
+            for segment, future in zip(segments, futures):
+                frames = future.result()
+                if len(frames) < segment.rendered_frames:
+                    raise RuntimeError(
+                        f"Segment {segment.index} returned {len(frames)} "
+                        f"of {segment.rendered_frames} frames"
+                    )
+                encodes.append(
+                    (
+                        segment,
+                        self.ffmpeg_pool.encode_segment(
+                            previous_tail,
+                            frames[: segment.frames],
+                            os.path.join(workdir, f"segment_{segment.index:05d}.ts"),
+                            fps,
+                            width,
+                            height,
+                            ts_offset=segment.start_frame / fps,
+                        ),
+                    )
+                )
+                previous_tail = frames[segment.frames : segment.rendered_frames]
+                publish_ready(block=False)
+
+            publish_ready(block=True)
+
+        except Exception:
+            # Stop segments still rendering before their frames are deleted
+            stop.set()
+            raise
+
+        finally:
+            renders.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        return {
+            "playlist_url": playlist_url,
+            "segment_urls": segment_urls,
+        }
+
+    def generate(
+        self,
+        pool,
+        tenant_id: str,
+        prefix: str,
+        prompt: str,
+        negative_prompt: str = "",
+        duration: int = 10,
+        fps: int = 24,
+        resolution: str = "720p",
+        seed: int = -1,
+        priority: Optional[int] = None,
+        on_segment: Optional[SegmentCallback] = None,
+        cancel_check: Optional[CancelCheck] = None,
+    ) -> Dict[str, Any]:
+        """
+        Render a text-to-video clip on the ComfyUI pool
+
+        Returns:
+            Dictionary with playlist_url, segment_urls and metadata
+        """
+        width, height = RESOLUTIONS[resolution]
+        if seed == -1:
+            seed = random.randint(0, 2**32 - 1)
+        segments = plan_segments(
+            duration * fps,
+            round(settings.VIDEO_SEGMENT_SECONDS * fps),
+            settings.VIDEO_SEGMENT_OVERLAP_FRAMES,
+        )
+        renderer = ComfyUISegmentRenderer(
+            pool,
+            prompt=prompt,
+            negative_prompt=negative_prompt,
+            model=settings.VIDEO_CHECKPOINT,
+            motion_module=settings.VIDEO_MOTION_MODULE,
+            width=width,
+            height=height,
+            steps=settings.VIDEO_STEPS,
+            cfg=settings.VIDEO_CFG,
+            seed=seed,
+            timeout=settings.VIDEO_SEGMENT_TIMEOUT_SECONDS,
+            priority=priority,
+        )
+
+        result = self.render(
+            renderer,
+            segments,
+            fps,
+            width,
+            height,
+            tenant_id,
+            prefix,
+            on_segment=on_segment,
+            cancel_check=cancel_check,
+        )
+        result["metadata"] = {
+            "seed": seed,
+            "duration": duration,
+            "fps": fps,
+            "resolution": resolution,
+            "width": width,
+            "height": height,
+            "segments": len(segments),
+            "overlap_frames": segments[0].overlap,
+            "model": settings.VIDEO_CHECKPOINT,
+            "motion_module": settings.VIDEO_MOTION_MODULE,
+            "format": "hls",
+        }
+        return result
+
+
+# Global instance
+video_pipeline = VideoPipeline(
+    storage_service,
+    FFmpegPool(
+        max_workers=settings.VIDEO_FFMPEG_WORKERS,
+        ffmpeg_path=settings.VIDEO_FFMPEG_PATH,
+    ),
+    render_concurrency=settings.VIDEO_RENDER_CONCURRENCY,
+)
@@ -0,0 +1,368 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Voice Pipeline
+Sentence-chunked TTS synthesis, streamed out as MP3 while later sentences render
+"""
+
+import asyncio
+import io
+import logging
+import re
+import time
+import wave
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import VOICE_FIRST_AUDIO_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "audio/mpeg"
+
+# Encoder output is read (and yielded) in chunks of at most this size
+READ_CHUNK_BYTES = 16 * 1024
+
+SentenceCallback = Callable[[int, int], None]
+
+# Whitespace after terminal punctuation (optionally closed by a quote or
+# bracket) unless the next word is lowercase ('"Stop!" she said'), or a
+# line break
+_SENTENCE_BREAK = re.compile(
+    r'(?<=[.!?…])\s+(?![a-z])|(?<=[.!?…]["\'”’)\]])\s+(?![a-z])|\s*\n\s*'
+)
+
+# Where an over-long sentence may be broken, best first
+_CLAUSE_BREAKS = ("; ", ": ", ", ")
+
+
+class TTSError(Exception):
+    """Raised when a chunk could not be synthesized or encoded"""
+
+
+def split_sentences(text: str, max_chars: int) -> List[str]:
+    """
+    Split a script into synthesis chunks at sentence boundaries
+
+    Sentences longer than max_chars are broken at the last clause
+    punctuation before the limit, then at the last space, so no chunk
+    exceeds it. Chunks without any letters or digits are dropped.
+    """
+    chunks = []
+    for sentence in _SENTENCE_BREAK.split(text):
+        sentence = " ".join(sentence.split())
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(mark, 0, max_chars) for mark in _CLAUSE_BREAKS)
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if any(c.isalnum() for c in sentence):
+            chunks.append(sentence)
+    return chunks
+
+
+def wav_pcm(data: bytes):
+    """
+    Decode a 16-bit PCM WAV
+
+    Returns:
+        (sample_rate, channels, frames) tuple
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2:
+                raise TTSError(
+                    f"Expected 16-bit audio from the TTS server, got {wav.getsampwidth() * 8}-bit"
+                )
+            return (
+                wav.getframerate(),
+                wav.getnchannels(),
+                wav.readframes(wav.getnframes()),
+            )
+    except (wave.Error, EOFError) as e:
+        raise TTSError(f"Invalid WAV from the TTS server: {e}")
+
+
+class AsyncTTSClient:
+    """
+    Client for the Coqui TTS server's /api/tts endpoint, backed by a shared
+    aiohttp connection pool created lazily on the running event loop
+    """
+
+    def __init__(
+        self, server_address: str, max_connections: int = 32, timeout: float = 120.0
+    ):
+        self.server_address = server_address.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=self.server_address,
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, limit_per_host=self.max_connections
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def synthesize(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        speaker_wav: Optional[str] = None,
+    ) -> bytes:
+        """
+        Synthesize one chunk of text
+
+        Args:
+            text: Text to speak (one sentence or clause)
+            language: Language code for multilingual models (XTTS)
+            speaker_wav: Reference audio to clone the voice from
+
+        Returns:
+            WAV bytes
+        """
+        params = {"text": text}
+        if language:
+            params["language_id"] = language
+        if speaker_wav:
+            params["style_wav"] = speaker_wav
+
+        try:
+            async with self.session.get("/api/tts", params=params) as response:
+                response.raise_for_status()
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"TTS request failed: {e}")
+            raise TTSError(f"TTS connection error: {str(e)}")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class VoicePipeline:
+    """
+    Long-form speech synthesized sentence by sentence.
+
+    The script is split at sentence boundaries and up to `concurrency`
+    chunks synthesize at once. Results are fed, in order, to one ffmpeg
+    MP3 encoder whose output is yielded as soon as it is produced, so the
+    first audio is ready after one sentence rather than the whole script,
+    and at most `concurrency` synthesized chunks are held in memory
+    however long the script is. A single encoder keeps the MP3 stream
+    continuous across chunk boundaries.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_chunk_chars: int,
+        ffmpeg_path: str = "ffmpeg",
+        bitrate: str = "128k",
+    ):
+        self.concurrency = concurrency
+        self.max_chunk_chars = max_chunk_chars
+        self.ffmpeg_path = ffmpeg_path
+        self.bitrate = bitrate
+
+    async def _start_encoder(self, sample_rate: int, channels: int):
+        return await asyncio.create_subprocess_exec(
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            str(channels),
+            "-i",
+            "pipe:0",
+            "-c:a",
+            "libmp3lame",
+            "-b:a",
+            self.bitrate,
+            "-flush_packets",
+            "1",
+            "-f",
+            "mp3",
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+    async def stream(
+        self,
+        client: AsyncTTSClient,
+        text: str,
+        language: Optional[str] = None,
+        speaker_wav: Optional[str] = None,
+        on_sentence: Optional[SentenceCallback] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Synthesize a script as a stream of MP3 chunks
+
+        Args:
+            client: TTS client
+            text: Script to speak
+            language: Language code
+            speaker_wav: Reference audio to clone the voice from
+            on_sentence: Called with (chunks encoded, total chunks)
+
+        Yields:
+            Encoded MP3 bytes
+        """
+        sentences = split_sentences(text, self.max_chunk_chars)
+        if not sentences:
+            raise TTSError("Nothing to synthesize")
+
+        start = time.perf_counter()
+        pending = deque()
+        queued = 0
+
+        def fill():
+            nonlocal queued
+            while len(pending) < self.concurrency and queued < len(sentences):
+                pending.append(
+                    asyncio.create_task(
+                        client.synthesize(
+                            sentences[queued],
+                            language=language,
+                            speaker_wav=speaker_wav,
+                        )
+                    )
+                )
+                queued += 1
+
+        async def next_pcm():
+            data = await pending[0]
+            pending.popleft()
+            fill()
+            return wav_pcm(data)
+
+        process = None
+        feeder = None
+        fill()
+        try:
+            sample_rate, channels, pcm = await next_pcm()
+            process = await self._start_encoder(sample_rate, channels)
+
+            async def feed():
+                nonlocal pcm
+                try:
+                    for done in range(1, len(sentences) + 1):
+                        if done > 1:
+                            rate, count, pcm = await next_pcm()
+                            if (rate, count) != (sample_rate, channels):
+                                raise TTSError(
+                                    "TTS server changed audio format mid-script"
+                                )
+                        process.stdin.write(pcm)
+                        await process.stdin.drain()
+                        if on_sentence:
+                            on_sentence(done, len(sentences))
+                finally:
+                    process.stdin.close()
+
+            feeder = asyncio.create_task(feed())
+            first = True
+            while True:
+                chunk = await process.stdout.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if first:
+                    VOICE_FIRST_AUDIO_SECONDS.observe(time.perf_counter() - start)
+                    first = False
+                yield chunk
+
+            # Synthesis errors end the encoder's input early; surface them
+            await feeder
+            stderr = await process.stderr.read()
+            if await process.wait() != 0:
+                raise TTSError(
+                    f"MP3 encode failed: {stderr.decode(errors='replace')[-500:]}"
+                )
+
+        finally:
+            for task in pending:
+                task.cancel()
+            if feeder is not None and not feeder.done():
+                feeder.cancel()
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    async def render(
+        self,
+        client: AsyncTTSClient,
+        storage,
+        tenant_id: str,
+        filename: str,
+        text: str,
+        language: Optional[str] = None,
+        speaker_wav: Optional[str] = None,
+        on_sentence: Optional[SentenceCallback] = None,
+        listener: Optional[asyncio.Queue] = None,
+    ) -> str:
+        """
+        Synthesize a script into an MP3 streamed to storage as it encodes
+
+        Args:
+            client: TTS client
+            storage: Storage service with an async upload_stream
+            tenant_id: Tenant ID for organization
+            filename: Object name (e.g. voice/{generation_id}.mp3)
+            text: Script to speak
+            language: Language code
+            speaker_wav: Reference audio to clone the voice from
+            on_sentence: Called with (chunks encoded, total chunks)
+            listener: Queue that also receives every encoded chunk, then
+                None when the stream ends (successfully or not)
+
+        Returns:
+            Public URL of the uploaded MP3
+        """
+
+        async def chunks():
+            async with aclosing(
+                self.stream(client, text, language, speaker_wav, on_sentence)
+            ) as audio:
+                async for chunk in audio:
+                    if listener is not None:
+                        listener.put_nowait(chunk)
+                    yield chunk
+
+        try:
+            async with aclosing(chunks()) as audio:
+                return await storage.upload_stream(
+                    audio, tenant_id, filename, CONTENT_TYPE
+                )
+        finally:
+            if listener is not None:
+                listener.put_nowait(None)
+
+
+# Global instances
+tts_client = AsyncTTSClient(
+    settings.TTS_URL,
+    max_connections=settings.TTS_MAX_CONNECTIONS,
+    timeout=settings.TTS_TIMEOUT_SECONDS,
+)
+voice_pipeline = VoicePipeline(
+    concurrency=settings.TTS_CONCURRENCY,
+    max_chunk_chars=settings.TTS_MAX_CHUNK_CHARS,
+    ffmpeg_path=settings.TTS_FFMPEG_PATH,
+    bitrate=settings.TTS_MP3_BITRATE,
+)
@@ -0,0 +1,672 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Asyncio Generation Worker
+Consumes the Celery generation queue on one event loop, keeping hundreds of
+image jobs in flight per process
+
+Usage (from backend/, with GENERATION_WORKER_MODE=asyncio):
+    python -m app.tasks.async_worker
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from celery import Celery
+from sqlalchemy import select, update, func
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import PIPELINE_STAGE_SECONDS, start_worker_metrics_server
+from app.services.comfyui_client import (
+    AsyncComfyUIClient,
+    ComfyUIConnectionError,
+    PromptCancelled,
+)
+from app.services.comfyui_pool import ComfyUIPool, ComfyUINode
+from app.services.comfyui_service import raise_for_history_errors
+from app.services.fair_scheduler import fair_scheduler
+from app.services.generation_cache import generation_cache, image_cache_key
+from app.services.generation_control import (
+    DEFAULT_PRIORITY,
+    broker_priority,
+    record_dispatch,
+    clear_dispatch,
+    clear_preemption,
+    get_cancel_reason,
+    acquire_generation_lock,
+    release_generation_lock,
+)
+from app.services.generation_jobs import generation_jobs
+from app.services.generation_status import generation_status, TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Called with (node address, prompt_id) once a prompt is accepted
+AsyncQueuedCallback = Callable[[str, str], Awaitable[None]]
+
+# Returns a reason once a job should stop ('cancelled' or 'preempted')
+AsyncCancelCheck = Callable[[], Awaitable[Optional[str]]]
+
+# generate_image arguments that shape the ComfyUI prompt
+IMAGE_PARAMS = (
+    "prompt",
+    "negative_prompt",
+    "model",
+    "width",
+    "height",
+    "steps",
+    "cfg",
+    "sampler",
+    "scheduler",
+    "seed",
+    "batch_size",
+    "safety_checker",
+)
+
+
+class AsyncImagePipeline:
+    """
+    Submit, collect and upload stages of an image job as coroutines.
+
+    Each stage sits behind its own semaphore, so a burst of finished
+    prompts cannot starve submissions and uploads never open more R2
+    connections than configured. Prompts are collected by polling
+    /history, which costs a small request per poll interval instead of a
+    blocked worker process. Unlike ComfyUIPool.submit_image, submission
+    does not preempt queued prompts (that check makes blocking calls),
+    but prompts submitted here can still be preempted by other workers.
+    """
+
+    def __init__(
+        self,
+        pool: ComfyUIPool,
+        storage,
+        submit_concurrency: int = 16,
+        collect_concurrency: int = 64,
+        upload_concurrency: int = 32,
+        poll_interval: float = 1.0,
+        timeout: int = 300,
+    ):
+        self.pool = pool
+        self.storage = storage
+        self.submit_slots = asyncio.Semaphore(submit_concurrency)
+        self.collect_slots = asyncio.Semaphore(collect_concurrency)
+        self.upload_slots = asyncio.Semaphore(upload_concurrency)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._clients: Dict[str, AsyncComfyUIClient] = {}
+
+    def client(self, address: str) -> AsyncComfyUIClient:
+        """This loop's pooled client for a node"""
+        address = address.rstrip("/")
+        if address not in self._clients:
+            self._clients[address] = AsyncComfyUIClient(
+                address,
+                str(uuid.uuid4()),
+                max_connections=settings.COMFYUI_MAX_CONNECTIONS,
+                keepalive_timeout=settings.COMFYUI_KEEPALIVE_TIMEOUT_SECONDS,
+                timeout=settings.COMFYUI_TIMEOUT_SECONDS,
+            )
+        return self._clients[address]
+
+    async def submit(
+        self, params: Dict[str, Any], on_queued: Optional[AsyncQueuedCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue an image prompt on the best node for its checkpoint
+
+        Returns:
+            Dictionary with prompt_id, node, seed and metadata
+        """
+        start = time.perf_counter()
+        tried: List[ComfyUINode] = []
+
+        async with self.submit_slots:
+            try:
+                while True:
+                    with self.pool.acquire(
+                        checkpoint=params.get("model"), exclude=tried
+                    ) as node:
+                        workflow, seed, metadata = node.service.build_image_request(
+                            **params
+                        )
+                        try:
+                            prompt_id = await self.client(node.address).queue_prompt(
+                                workflow
+                            )
+                        except ComfyUIConnectionError as e:
+                            # Nothing was queued, so it is safe to try another node
+                            self.pool.record_failure(node, str(e))
+                            tried.append(node)
+                            continue
+                    break
+            finally:
+                PIPELINE_STAGE_SECONDS.labels(stage="submit").observe(
+                    time.perf_counter() - start
+                )
+
+        if on_queued:
+            await on_queued(node.address, prompt_id)
+
+        return {
+            "prompt_id": prompt_id,
+            "node": node.address,
+            "seed": seed,
+            "metadata": metadata,
+        }
+
+    async def collect(
+        self, node: str, prompt_id: str, cancel_check: Optional[AsyncCancelCheck] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Wait for a prompt to finish and list its output files
+
+        Raises:
+            PromptCancelled: If cancel_check returns a reason first
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        client = self.client(node)
+
+        try:
+            while True:
+                async with self.collect_slots:
+                    history = await client.get_history(prompt_id)
+
+                if prompt_id in history:
+                    result = history[prompt_id]
+                    raise_for_history_errors(result)
+                    return self.pool.get_node(node).service.collect_outputs(result)
+
+                reason = await cancel_check() if cancel_check else None
+                if reason:
+                    raise PromptCancelled(prompt_id, reason)
+
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Generation timed out after {self.timeout} seconds"
+                    )
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            PIPELINE_STAGE_SECONDS.labels(stage="collect").observe(
+                time.perf_counter() - start
+            )
+
+    async def upload(
+        self, node: str, images: List[Dict[str, Any]], tenant_id: str
+    ) -> List[str]:
+        """Stream a finished prompt's outputs from ComfyUI into R2, in output order"""
+        start = time.perf_counter()
+        client = self.client(node)
+
+        async def upload_one(output: Dict[str, Any]) -> str:
+            ext = os.path.splitext(output["filename"])[1] or ".png"
+            content_type = mimetypes.guess_type(output["filename"])[0] or "image/png"
+            async with self.upload_slots:
+                return await self.storage.upload_stream(
+                    client.stream_image(
+                        output["filename"],
+                        output.get("subfolder", ""),
+                        output.get("type", "output"),
+                    ),
+                    tenant_id=tenant_id,
+                    filename=f"{uuid.uuid4()}{ext}",
+                    content_type=content_type,
+                )
+
+        try:
+            return list(
+                await asyncio.gather(*(upload_one(output) for output in images))
+            )
+        finally:
+            PIPELINE_STAGE_SECONDS.labels(stage="upload").observe(
+                time.perf_counter() - start
+            )
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+
+
+class AsyncGenerationWorker:
+    """
+    Asyncio consumer of the Celery generation queue.
+
+    A kombu consumer thread receives task messages (prefetching up to
+    max_jobs) and hands them to the event loop. Acknowledgements go back
+    through that thread once a job is done, so jobs are acked late and an
+    unfinished one is redelivered if the process dies. generate_image runs
+    natively through AsyncImagePipeline with async DB and R2 clients; any
+    other task that arrives on the queue is forwarded unchanged to the
+    'default' queue for a Celery worker.
+    """
+
+    def __init__(
+        self,
+        app: Celery,
+        pipeline: AsyncImagePipeline,
+        queues: List[str],
+        max_jobs: int = 256,
+        db_concurrency: int = 10,
+    ):
+        self.app = app
+        self.pipeline = pipeline
+        self.queue_names = queues
+        self.max_jobs = max_jobs
+        self.db_slots = asyncio.Semaphore(db_concurrency)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = threading.Event()
+        self._acks: queue.Queue = queue.Queue()
+        self._in_flight = 0
+
+    # Broker (consumer thread)
+
+    def _consume(self):
+        queues = [self.app.amqp.queues[name] for name in self.queue_names]
+
+        with self.app.connection_for_read() as connection:
+            consumer = connection.Consumer(
+                queues,
+                callbacks=[self._on_message],
+                accept=["json"],
+                prefetch_count=self.max_jobs,
+            )
+            consumer.consume()
+            logger.info(
+                f"Async worker consuming {', '.join(self.queue_names)} "
+                f"({self.max_jobs} jobs in flight)"
+            )
+
+            consuming = True
+            while consuming or self._in_flight:
+                if consuming and self._stopping.is_set():
+                    consumer.cancel()
+                    consuming = False
+                    logger.info(
+                        f"Async worker stopping, waiting for {self._in_flight} jobs"
+                    )
+
+                self._flush_acks()
+                if consuming:
+                    try:
+                        connection.drain_events(timeout=0.5)
+                    except socket.timeout:
+                        pass
+                else:
+                    time.sleep(0.1)
+
+            self._flush_acks()
+
+    def _on_message(self, body, message):
+        self._in_flight += 1
+        args, kwargs, _ = body
+        headers = message.headers
+        asyncio.run_coroutine_threadsafe(
+            self._handle(
+                message,
+                headers["task"],
+                headers["id"],
+                args,
+                kwargs,
+                headers,
+                message.properties.get("priority"),
+            ),
+            self.loop,
+        )
+
+    def _flush_acks(self):
+        while True:
+            try:
+                message = self._acks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                message.ack()
+            except Exception as e:
+                logger.warning(f"Failed to ack message: {e}")
+            self._in_flight -= 1
+
+    # Jobs (event loop)
+
+    async def _handle(
+        self,
+        message,
+        task_name: str,
+        task_id: str,
+        args: list,
+        kwargs: dict,
+        headers: dict,
+        priority: Optional[int],
+    ):
+        try:
+            eta = headers.get("eta")
+            if eta:
+                delay = (
+                    datetime.fromisoformat(eta) - datetime.now(timezone.utc)
+                ).total_seconds()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if task_name == "generate_image":
+                await self._run_image_job(task_id, kwargs)
+            else:
+                await asyncio.to_thread(
+                    self.app.send_task,
+                    task_name,
+                    args=args,
+                    kwargs=kwargs,
+                    task_id=task_id,
+                    queue="default",
+                    routing_key="default",
+                    priority=priority,
+                    retries=headers.get("retries") or 0,
+                )
+                logger.info(
+                    f"Forwarded {task_name} task {task_id} to the default queue"
+                )
+        except Exception as e:
+            logger.error(
+                f"Async worker failed handling {task_name} task {task_id}: {e}",
+                exc_info=True,
+            )
+        finally:
+            self._acks.put(message)
+
+    async def _run_image_job(self, job_id: str, kwargs: Dict[str, Any]):
+        """generate_image, unless another delivery of it is already running"""
+        generation_id = kwargs["generation_id"]
+        lock = await asyncio.to_thread(acquire_generation_lock, generation_id)
+        if lock is None:
+            logger.warning(
+                f"Dropping duplicate delivery of image generation {generation_id}"
+            )
+            return
+        try:
+            await self._image_job(job_id, kwargs, lock)
+        finally:
+            await asyncio.to_thread(release_generation_lock, generation_id, lock)
+
+    async def _image_job(self, job_id: str, kwargs: Dict[str, Any], lock: str):
+        """generate_image through submit -> collect -> upload -> finalize"""
+        from app.models.generation import Generation
+
+        generation_id = kwargs["generation_id"]
+        tenant_id = kwargs["tenant_id"]
+        priority = kwargs.get("priority", DEFAULT_PRIORITY)
+        start_time = time.time()
+
+        await self._update_jobs(job_id, status="processing", started_at=func.now())
+
+        async with self.db_slots, AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Generation).where(Generation.id == generation_id)
+            )
+            generation = result.scalar_one_or_none()
+            if not generation:
+                logger.error(f"Generation not found: {generation_id}")
+                await self._finish_job(job_id, "completed")
+                return
+
+            # A redelivery whose first run finished (flushed or not) is dropped
+            finished = generation.status
+            if finished not in TERMINAL_STATUSES:
+                finished = (await generation_status.get(generation_id) or {}).get(
+                    "status"
+                )
+            if finished in TERMINAL_STATUSES:
+                logger.info(f"Skipping {finished} image generation: {generation_id}")
+                await self._finish_job(job_id, finished)
+                return
+
+            if await asyncio.to_thread(clear_preemption, generation_id) == "cancelled":
+                logger.info(f"Skipping cancelled image generation: {generation_id}")
+                await self._finish_job(job_id, "cancelled")
+                return
+
+        await asyncio.to_thread(
+            generation_status.set, generation_id, status="processing", progress=0
+        )
+        logger.info(f"Starting image generation: {generation_id}")
+
+        params = {key: kwargs[key] for key in IMAGE_PARAMS if key in kwargs}
+
+        async def on_queued(node: str, prompt_id: str):
+            await asyncio.to_thread(
+                record_dispatch, generation_id, node, prompt_id, priority
+            )
+            await asyncio.to_thread(
+                generation_status.set, generation_id, node=node, progress=10
+            )
+
+        try:
+            submitted = await self.pipeline.submit(params, on_queued=on_queued)
+            try:
+                images = await self.pipeline.collect(
+                    submitted["node"],
+                    submitted["prompt_id"],
+                    cancel_check=lambda: get_cancel_reason(generation_id),
+                )
+            finally:
+                await asyncio.to_thread(clear_dispatch, generation_id)
+
+            await self._release_slot(job_id)
+            await asyncio.to_thread(generation_status.set, generation_id, progress=80)
+            output_urls = await self.pipeline.upload(
+                submitted["node"], images, tenant_id
+            )
+
+        except Exception as e:
+            reason = (
+                e.reason
+                if isinstance(e, PromptCancelled)
+                else await get_cancel_reason(generation_id)
+            )
+
+            if reason == "cancelled":
+                logger.info(f"Image generation cancelled: {generation_id}")
+                await self._finish_generation(
+                    generation_id,
+                    "cancelled",
+                    processing_time_seconds=int(time.time() - start_time),
+                )
+                await self._finish_job(job_id, "cancelled")
+                return
+
+            if reason == "preempted":
+                # Resubmit under the job's task ID so its row and scheduler slot carry over
+                logger.info(f"Image generation preempted, re-queueing: {generation_id}")
+                await asyncio.to_thread(
+                    generation_status.set, generation_id, status="queued", progress=0
+                )
+                await self._update_jobs(job_id, status="queued", started_at=None)
+                await asyncio.to_thread(release_generation_lock, generation_id, lock)
+                await asyncio.to_thread(
+                    self.app.send_task,
+                    "generate_image",
+                    kwargs=kwargs,
+                    task_id=job_id,
+                    countdown=settings.GENERATION_PREEMPT_RETRY_SECONDS,
+                    priority=broker_priority(priority),
+                )
+                return
+
+            logger.error(f"Image generation failed: {e}", exc_info=True)
+            await self._finish_generation(
+                generation_id,
+                "failed",
+                error_message=str(e),
+                processing_time_seconds=int(time.time() - start_time),
+            )
+            await self._finish_job(job_id, "failed")
+            return
+
+        start = time.perf_counter()
+        await self._finish_generation(
+            generation_id,
+            "completed",
+            output_url=output_urls[0] if output_urls else None,
+            output_urls=output_urls,
+            processing_time_seconds=int(time.time() - start_time),
+            metadata=submitted["metadata"],
+        )
+        await self._finish_job(job_id, "completed")
+        PIPELINE_STAGE_SECONDS.labels(stage="finalize").observe(
+            time.perf_counter() - start
+        )
+        logger.info(f"Image generation completed: {generation_id}")
+
+        # Remember deterministic results so identical requests skip the GPU
+        cache_key = image_cache_key(**kwargs)
+        if settings.GENERATION_CACHE_ENABLED and cache_key:
+            try:
+                await asyncio.to_thread(
+                    generation_cache.set,
+                    tenant_id,
+                    cache_key,
+                    {
+                        "output_urls": output_urls,
+                        "metadata": submitted["metadata"],
+                        "source_generation_id": generation_id,
+                    },
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache generation {generation_id}: {e}")
+
+        if settings.IMAGE_POSTPROCESS_ENABLED and output_urls:
+            await asyncio.to_thread(
+                self.app.send_task,
+                "postprocess_image",
+                args=[generation_id, tenant_id, output_urls, kwargs["user_id"]],
+            )
+
+    # Bookkeeping
+
+    async def _finish_generation(self, generation_id: str, status: str, **values):
+        """Record a terminal state; the status flusher writes it to Postgres"""
+        try:
+            await asyncio.to_thread(
+                generation_status.finish, generation_id, status, **values
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to record {status} for generation {generation_id}: {e}"
+            )
+
+    async def _update_jobs(self, job_id: str, **values):
+        try:
+            async with self.db_slots, AsyncSessionLocal() as db:
+                await db.execute(
+                    update(generation_jobs)
+                    .where(generation_jobs.c.celery_task_id == job_id)
+                    .values(**values)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to update generation_jobs for task {job_id}: {e}")
+
+    async def _release_slot(self, job_id: str):
+        """Hand a job's GPU slot to the next job in fair-share order"""
+        if not settings.SCHEDULER_ENABLED:
+            return
+        try:
+            await asyncio.to_thread(fair_scheduler.release, job_id)
+            await asyncio.to_thread(fair_scheduler.dispatch, self.app)
+        except Exception as e:
+            logger.warning(f"Failed to release scheduler slot for {job_id}: {e}")
+
+    async def _finish_job(self, job_id: str, status: str):
+        await self._update_jobs(job_id, status=status, completed_at=func.now())
+        await self._release_slot(job_id)
+
+    async def _pump_scheduler(self):
+        # Same backstop as the Celery workers' scheduler pump thread
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_PUMP_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(fair_scheduler.dispatch, self.app)
+            except Exception as e:
+                logger.warning(f"Scheduler dispatch failed: {e}")
+
+    # Lifecycle
+
+    def stop(self):
+        """Stop taking new messages; run() returns once in-flight jobs finish"""
+        self._stopping.set()
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(sig, self.stop)
+
+        pump = (
+            asyncio.create_task(self._pump_scheduler())
+            if settings.SCHEDULER_ENABLED
+            else None
+        )
+        threading.Thread(
+            target=generation_status.run_flusher, name="status-flusher", daemon=True
+        ).start()
+        try:
+            await asyncio.to_thread(self._consume)
+        finally:
+            if pump:
+                pump.cancel()
+            await self.pipeline.aclose()
+
+
+def main():
+    from app.services.async_storage_service import async_storage_service
+    from app.services.comfyui_pool import comfyui_pool
+    from app.tasks.generation_tasks import celery_app
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    if settings.GENERATION_WORKER_MODE != "asyncio":
+        raise SystemExit(
+            f"GENERATION_WORKER_MODE is '{settings.GENERATION_WORKER_MODE}'; "
+            "set it to 'asyncio' to run the async worker"
+        )
+
+    try:
+        start_worker_metrics_server(settings.WORKER_METRICS_PORT)
+    except OSError as e:
+        logger.warning(f"Worker metrics server not started: {e}")
+
+    async def run():
+        pipeline = AsyncImagePipeline(
+            comfyui_pool,
+            async_storage_service,
+            submit_concurrency=settings.ASYNC_WORKER_SUBMIT_CONCURRENCY,
+            collect_concurrency=settings.ASYNC_WORKER_COLLECT_CONCURRENCY,
+            upload_concurrency=settings.ASYNC_WORKER_UPLOAD_CONCURRENCY,
+            poll_interval=settings.COMFYUI_POLL_INTERVAL_SECONDS,
+            timeout=settings.GENERATION_COLLECT_TIMEOUT_SECONDS,
+        )
+        worker = AsyncGenerationWorker(
+            celery_app,
+            pipeline,
+            queues=["generation"],
+            max_jobs=settings.ASYNC_WORKER_MAX_JOBS,
+            db_concurrency=settings.ASYNC_WORKER_DB_CONCURRENCY,
+        )
+        try:
+            await worker.run()
+        finally:
+            await async_storage_service.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,58 @@
 """
 Jukeyman Autonomous Media Station (JAMS) - Celery Generation Tasks
 """
-from celery import Celery
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from celery import Celery, chain
+from celery.exceptions import Ignore
+from celery.signals import (
+    task_prerun,
+    task_postrun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from contextlib import contextmanager
+from kombu import Exchange, Queue
+from sqlalchemy import update, func
+from typing import Optional
+import asyncio
+import io
 import logging
+import mimetypes
+import os
+import threading
 import time
+import uuid
 
 from app.core.config import settings
-from app.services.comfyui_service import comfyui_service
+from app.core.database import (
+    init_sync_engine,
+    dispose_sync_engine,
+    new_sync_session,
+    sync_session,
+)
+from app.core.metrics import PIPELINE_STAGE_SECONDS, start_worker_metrics_server
+from app.services.comfyui_client import PromptCancelled
+from app.services.comfyui_pool import comfyui_pool
+from app.services.prompt_coalescer import (
+    prompt_coalescer,
+    CoalescedRequest,
+    build_coalesced_workflow,
+)
+from app.services.generation_cache import generation_cache, image_cache_key
+from app.services.generation_control import (
+    DEFAULT_PRIORITY,
+    broker_priority,
+    record_dispatch,
+    clear_dispatch,
+    cancel_reason,
+    group_cancel_reason,
+    clear_preemption,
+    acquire_generation_lock,
+    release_generation_lock,
+)
+from app.services.fair_scheduler import fair_scheduler
+from app.services.generation_jobs import generation_jobs
+from app.services.generation_status import generation_status, TERMINAL_STATUSES
 from app.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
@@ -30,14 +74,231 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max
     task_soft_time_limit=3000,  # 50 minutes soft limit
+    # GPU-bound generation and CPU-bound post-processing run on separate
+    # workers so neither starves the other; image jobs move through the
+    # generation (submit), collect, upload and finalize queues so each
+    # stage can be given its own concurrency
+    task_queues=(
+        Queue("default", Exchange("jams", type="topic"), routing_key="default"),
+        Queue("generation", Exchange("jams", type="topic"), routing_key="generation.#"),
+        Queue("collect", Exchange("jams", type="topic"), routing_key="collect.#"),
+        Queue("upload", Exchange("jams", type="topic"), routing_key="upload.#"),
+        Queue("finalize", Exchange("jams", type="topic"), routing_key="finalize.#"),
+        Queue(
+            "postprocess", Exchange("jams", type="topic"), routing_key="postprocess.#"
+        ),
+    ),
+    task_default_queue="default",
+    task_default_exchange="jams",
+    task_default_routing_key="default",
+    task_routes={
+        "generate_image": {"queue": "generation", "routing_key": "generation.image"},
+        "generate_image_grid": {
+            "queue": "generation",
+            "routing_key": "generation.grid",
+        },
+        "generate_video": {"queue": "generation", "routing_key": "generation.video"},
+        "generate_voice": {"queue": "generation", "routing_key": "generation.voice"},
+        "generate_text": {"queue": "generation", "routing_key": "generation.text"},
+        "upscale_image": {"queue": "postprocess", "routing_key": "postprocess.upscale"},
+        "collect_image": {"queue": "collect", "routing_key": "collect.image"},
+        "upload_image": {"queue": "upload", "routing_key": "upload.image"},
+        "finalize_image": {"queue": "finalize", "routing_key": "finalize.image"},
+        "postprocess_image": {
+            "queue": "postprocess",
+            "routing_key": "postprocess.image",
+        },
+    },
+    # Message priorities (0 is served first on Redis); prefetching a single
+    # message keeps a worker from sitting on low-priority work
+    task_default_priority=4,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    worker_prefetch_multiplier=1,
 )
 
+# Tasks dispatched with generation_jobs rows (see services.generation_jobs)
+JOB_TRACKED_TASKS = {
+    "generate_image",
+    "generate_image_grid",
+    "generate_video",
+    "generate_voice",
+    "generate_text",
+}
+
+
+def pump_scheduler():
+    """Publish whatever the fair-share scheduler has room for"""
+    try:
+        fair_scheduler.dispatch(celery_app)
+    except Exception as e:
+        logger.warning(f"Scheduler dispatch failed: {e}")
+
+
+def _scheduler_pump_loop():
+    # Backstop for slots reclaimed from dead workers and failed publishes;
+    # normally jobs are dispatched on enqueue and on completion
+    while True:
+        time.sleep(settings.SCHEDULER_PUMP_INTERVAL_SECONDS)
+        pump_scheduler()
+
+
+@worker_init.connect
+def start_metrics_server(**_):
+    """Serve worker metrics (aggregated across prefork children when multiprocess)"""
+    try:
+        start_worker_metrics_server(settings.WORKER_METRICS_PORT)
+    except OSError as e:
+        logger.warning(f"Worker metrics server not started: {e}")
+
+
+@worker_init.connect
+def start_scheduler_pump(**_):
+    if settings.SCHEDULER_ENABLED:
+        threading.Thread(
+            target=_scheduler_pump_loop, name="scheduler-pump", daemon=True
+        ).start()
+
+
+@worker_init.connect
+def start_status_flusher(**_):
+    threading.Thread(
+        target=generation_status.run_flusher, name="status-flusher", daemon=True
+    ).start()
+
+
+@worker_process_init.connect
+def init_worker_process(**_):
+    """Give each worker process its own pooled database engine"""
+    init_sync_engine()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**_):
+    dispose_sync_engine()
+
 
 def get_sync_db():
-    """Get synchronous database session for Celery tasks"""
-    engine = create_engine(settings.DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    """Get a synchronous database session from this worker's pooled engine"""
+    return new_sync_session()
+
+
+def _update_jobs(task_id: str, **values):
+    try:
+        with sync_session() as db:
+            db.execute(
+                update(generation_jobs)
+                .where(generation_jobs.c.celery_task_id == task_id)
+                .values(**values)
+            )
+            db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to update generation_jobs for task {task_id}: {e}")
+
+
+@task_prerun.connect
+def mark_job_started(task_id=None, task=None, **_):
+    """Move a dispatched job to processing when a worker picks it up"""
+    if task.name in JOB_TRACKED_TASKS:
+        _update_jobs(task_id, status="processing", started_at=func.now())
+
+
+def _finished_status(generation) -> Optional[str]:
+    """
+    Terminal status of a generation, from its row or its not yet flushed
+    hot status; a redelivered job whose first run already finished and
+    released its lock stops here
+    """
+    if generation.status in TERMINAL_STATUSES:
+        return generation.status
+    status = generation_status.current_status(str(generation.id))
+    return status if status in TERMINAL_STATUSES else None
+
+
+def _release_slot(job_id: str):
+    """Hand a job's GPU slot to the next job in fair-share order"""
+    if not settings.SCHEDULER_ENABLED:
+        return
+    try:
+        fair_scheduler.release(job_id)
+    except Exception as e:
+        logger.warning(f"Failed to release scheduler slot for {job_id}: {e}")
+    pump_scheduler()
+
+
+def _finish_job(job_id: str, status: str):
+    """Record a job's terminal state and free its slot if it still holds one"""
+    _update_jobs(job_id, status=status, completed_at=func.now())
+    _release_slot(job_id)
+
+
+@task_postrun.connect
+def mark_job_finished(task_id=None, task=None, retval=None, state=None, **_):
+    """Record a job's terminal state (or send it back to queued on retry)"""
+    if task.name not in JOB_TRACKED_TASKS:
+        return
+
+    if state == "RETRY":
+        _update_jobs(task_id, status="queued", started_at=None)
+        return
+
+    if state == "SUCCESS":
+        status = retval.get("status") if isinstance(retval, dict) else None
+        if status in ("pipelined", "duplicate"):
+            # The collect/upload/finalize stages (or the original delivery) finish the job
+            return
+        _finish_job(task_id, status if status in TERMINAL_STATUSES else "completed")
+    else:
+        _finish_job(task_id, "failed")
+
+
+@contextmanager
+def _timed_stage(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PIPELINE_STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def _fail_job(job: dict, stage: str, error: Exception):
+    """Mark a pipelined generation and its job failed"""
+    logger.error(
+        f"Image {stage} failed for {job['generation_id']}: {error}", exc_info=True
+    )
+    try:
+        generation_status.finish(
+            job["generation_id"],
+            "failed",
+            error_message=str(error),
+            processing_time_seconds=int(time.time() - job["started_at"]),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to mark generation {job['generation_id']} failed: {e}")
+    _finish_job(job["job_id"], "failed")
+    release_generation_lock(job["generation_id"], job.get("lock"))
+
+
+def _start_pipeline(job: dict, *stages):
+    """Chain the remaining stages of an image job, at the job's broker priority"""
+    priority = broker_priority(job["priority"])
+    chain(*(stage.set(priority=priority) for stage in stages)).apply_async()
+
+
+def upload_output(node: str, output: dict, tenant_id: str) -> str:
+    """Pipe one ComfyUI output file into R2 and return its public URL"""
+    ext = os.path.splitext(output["filename"])[1] or ".png"
+    content_type = mimetypes.guess_type(output["filename"])[0] or "image/png"
+
+    return storage_service.upload_stream(
+        comfyui_pool.stream_output(node, output),
+        tenant_id=tenant_id,
+        filename=f"{uuid.uuid4()}{ext}",
+        content_type=content_type,
+    )
 
 
 @celery_app.task(bind=True, name='generate_image')
@@ -56,30 +317,58 @@ def generate_image_task(
     sampler: str,
     scheduler: str,
     seed: int,
-    safety_checker: bool
+    safety_checker: bool,
+    batch_size: int = 1,
+    priority: int = DEFAULT_PRIORITY,
 ):
     """
     Background task for image generation
+
+    This is the submit stage of the image pipeline: it queues the prompt on
+    the best ComfyUI node and chains collect -> upload -> finalize, so GPU
+    worker slots never wait on ComfyUI or R2. Coalesced prompts have to be
+    split by the worker that batched them, so with coalescing enabled the
+    prompt is collected here and only upload and finalize are chained.
+
+    In-flight status lives in the hot-status store; Postgres is written
+    once the job reaches a terminal state. A per-generation lock, held
+    until finalize, drops redelivered copies of a job that is running.
     """
     from app.models.generation import Generation
     
+    lock = acquire_generation_lock(generation_id)
+    if lock is None:
+        logger.warning(
+            f"Dropping duplicate delivery of image generation {generation_id}"
+        )
+        return {"generation_id": generation_id, "status": "duplicate"}
+
     db = get_sync_db()
     start_time = time.time()
+    generation = None
+    handed_off = False
+    pipelined = False
     
     try:
-        # Update status to processing
         generation = db.query(Generation).filter(Generation.id == generation_id).first()
         if not generation:
             logger.error(f"Generation not found: {generation_id}")
             return
-        
-        generation.status = 'processing'
-        db.commit()
-        
+
+        finished = _finished_status(generation)
+        if finished:
+            logger.info(f"Skipping {finished} image generation: {generation_id}")
+            return {"generation_id": generation_id, "status": finished}
+        if clear_preemption(generation_id) == "cancelled":
+            logger.info(f"Skipping cancelled image generation: {generation_id}")
+            return {"generation_id": generation_id, "status": "cancelled"}
+        db.close()
+
+        generation_status.set(generation_id, status="processing", progress=0)
+
         logger.info(f"Starting image generation: {generation_id}")
         
-        # Generate image with ComfyUI
-        result = comfyui_service.generate_image(
+        params = dict(
             prompt=prompt,
             negative_prompt=negative_prompt,
             model=model,
@@ -90,77 +379,850 @@ def generate_image_task(
             sampler=sampler,
             scheduler=scheduler,
             seed=seed,
-            safety_checker=safety_checker
+            safety_checker=safety_checker,
+            batch_size=batch_size,
+            priority=priority,
         )
-        
-        # Upload to R2
-        output_urls = []
-        for image_path in result['images']:
-            url = storage_service.upload_file(
-                file_path=image_path,
+        # Payload handed from stage to stage; task_kwargs resubmits the job
+        # if its prompt is preempted and keys the result cache
+        job = {
+            "job_id": self.request.id,
+            "generation_id": generation_id,
+            "tenant_id": tenant_id,
+            "priority": priority,
+            "started_at": start_time,
+            "lock": lock,
+            "task_kwargs": dict(
+                params,
+                generation_id=generation_id,
                 tenant_id=tenant_id,
-                content_type='image/png'
-            )
-            output_urls.append(url)
-        
-        # Update generation record
-        generation.status = 'completed'
-        generation.output_url = output_urls[0] if output_urls else None
-        generation.output_urls = output_urls
-        generation.processing_time_seconds = int(time.time() - start_time)
-        generation.metadata = result.get('metadata', {})
-        db.commit()
-        
-        logger.info(f"Image generation completed: {generation_id}")
+                user_id=user_id,
+            ),
+        }
+
+        def on_queued(node: str, prompt_id: str):
+            record_dispatch(generation_id, node, prompt_id, priority)
+            generation_status.set(generation_id, node=node, progress=10)
+
+        def on_progress(event_type: str, data: dict):
+            # Sampler steps fill the range between queued (10) and collected (80)
+            if event_type == "progress" and data.get("max"):
+                generation_status.set(
+                    generation_id, progress=10 + int(70 * data["value"] / data["max"])
+                )
+
+        with _timed_stage("submit"):
+            if settings.COMFYUI_COALESCE_ENABLED:
+                result = prompt_coalescer.generate_image(
+                    **params,
+                    on_queued=on_queued,
+                    cancel_check=lambda: cancel_reason(generation_id),
+                )
+                job.update(
+                    node=result["node"],
+                    images=result["images"],
+                    metadata=result.get("metadata", {}),
+                )
+                _start_pipeline(job, upload_image_task.s(job), finalize_image_task.s())
+                pipelined = True
+                _release_slot(self.request.id)
+            else:
+                submitted = comfyui_pool.submit_image(
+                    **params, on_queued=on_queued, on_progress=on_progress
+                )
+                job.update(
+                    node=submitted["node"],
+                    prompt_id=submitted["prompt_id"],
+                    metadata=submitted["metadata"],
+                )
+                _start_pipeline(
+                    job,
+                    collect_image_task.s(job),
+                    upload_image_task.s(),
+                    finalize_image_task.s(),
+                )
+                # The collect stage clears the dispatch record once the prompt finishes
+                handed_off = pipelined = True
         
         return {
-            'generation_id': generation_id,
-            'status': 'completed',
-            'output_urls': output_urls
+            "generation_id": generation_id,
+            "status": "pipelined",
+            "prompt_id": job.get("prompt_id"),
         }
     
     except Exception as e:
+        # An interrupted prompt surfaces as an execution error before the
+        # waiter notices the flag, so consult it for any failure
+        reason = (
+            e.reason if isinstance(e, PromptCancelled) else cancel_reason(generation_id)
+        )
+
+        if reason == "cancelled":
+            logger.info(f"Image generation cancelled: {generation_id}")
+            if generation:
+                generation_status.finish(
+                    generation_id,
+                    "cancelled",
+                    processing_time_seconds=int(time.time() - start_time),
+                )
+            return {"generation_id": generation_id, "status": "cancelled"}
+
+        if reason == "preempted":
+            logger.info(f"Image generation preempted, re-queueing: {generation_id}")
+            if generation:
+                generation_status.set(generation_id, status="queued", progress=0)
+            raise self.retry(
+                exc=e,
+                countdown=settings.GENERATION_PREEMPT_RETRY_SECONDS,
+                max_retries=None,
+            )
+
         logger.error(f"Image generation failed: {e}", exc_info=True)
         
-        # Update status to failed
         if generation:
-            generation.status = 'failed'
-            generation.error_message = str(e)
-            generation.processing_time_seconds = int(time.time() - start_time)
-            db.commit()
+            generation_status.finish(
+                generation_id,
+                "failed",
+                error_message=str(e),
+                processing_time_seconds=int(time.time() - start_time),
+            )
         
         raise
     
     finally:
+        if not handed_off:
+            clear_dispatch(generation_id)
+        if not pipelined:
+            release_generation_lock(generation_id, lock)
+        db.close()
+
+
+@celery_app.task(bind=True, name="collect_image")
+def collect_image_task(self, job: dict):
+    """
+    Collect stage: wait for a submitted prompt and list its outputs
+
+    The submitting worker's WebSocket tracker publishes the prompt's
+    completion, so waiting is a blocking Redis read and this queue runs on
+    a wide thread pool.
+    The job's GPU slot is released as soon as its prompt leaves ComfyUI.
+    """
+    generation_id = job["generation_id"]
+
+    try:
+        with _timed_stage("collect"):
+            result = comfyui_pool.wait_for_prompt(
+                job["node"],
+                job["prompt_id"],
+                timeout=settings.GENERATION_COLLECT_TIMEOUT_SECONDS,
+                cancel_check=lambda: cancel_reason(generation_id),
+            )
+            images = comfyui_pool.get_node(job["node"]).service.collect_outputs(result)
+
+    except Exception as e:
+        reason = (
+            e.reason if isinstance(e, PromptCancelled) else cancel_reason(generation_id)
+        )
+
+        if reason == "cancelled":
+            logger.info(f"Image generation cancelled: {generation_id}")
+            generation_status.finish(
+                generation_id,
+                "cancelled",
+                processing_time_seconds=int(time.time() - job["started_at"]),
+            )
+            _finish_job(job["job_id"], "cancelled")
+            release_generation_lock(generation_id, job.get("lock"))
+            raise Ignore()
+
+        if reason == "preempted":
+            # Resubmit under the job's task ID so its row and scheduler slot carry over
+            logger.info(f"Image generation preempted, re-queueing: {generation_id}")
+            generation_status.set(generation_id, status="queued", progress=0)
+            _update_jobs(job["job_id"], status="queued", started_at=None)
+            release_generation_lock(generation_id, job.get("lock"))
+            generate_image_task.apply_async(
+                kwargs=job["task_kwargs"],
+                task_id=job["job_id"],
+                countdown=settings.GENERATION_PREEMPT_RETRY_SECONDS,
+                priority=broker_priority(job["priority"]),
+            )
+            raise Ignore()
+
+        _fail_job(job, "collect", e)
+        raise
+
+    finally:
+        clear_dispatch(generation_id)
+
+    _release_slot(job["job_id"])
+    generation_status.set(generation_id, progress=80)
+    return {**job, "images": images}
+
+
+@celery_app.task(
+    bind=True,
+    name="upload_image",
+    max_retries=settings.GENERATION_UPLOAD_MAX_RETRIES,
+    default_retry_delay=5,
+)
+def upload_image_task(self, job: dict):
+    """
+    Upload stage: stream a finished prompt's outputs from ComfyUI into R2
+
+    Outputs stay on the ComfyUI node, so transient failures are retried.
+    """
+    try:
+        with _timed_stage("upload"):
+            output_urls = [
+                upload_output(job["node"], output, job["tenant_id"])
+                for output in job["images"]
+            ]
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Upload for {job['generation_id']} failed, retrying: {e}")
+            raise self.retry(exc=e)
+        _fail_job(job, "upload", e)
+        raise
+
+    generation_status.set(job["generation_id"], progress=95)
+    return {**job, "output_urls": output_urls}
+
+
+@celery_app.task(bind=True, name="finalize_image")
+def finalize_image_task(self, job: dict):
+    """
+    Finalize stage: record the outputs, cache them and start post-processing
+
+    The generation row itself is written by the next batched status flush.
+    """
+    generation_id = job["generation_id"]
+    output_urls = job["output_urls"]
+
+    try:
+        with _timed_stage("finalize"):
+            generation_status.finish(
+                generation_id,
+                "completed",
+                output_url=output_urls[0] if output_urls else None,
+                output_urls=output_urls,
+                processing_time_seconds=int(time.time() - job["started_at"]),
+                metadata=job.get("metadata", {}),
+            )
+    except Exception as e:
+        _fail_job(job, "finalize", e)
+        raise
+
+    _finish_job(job["job_id"], "completed")
+    release_generation_lock(generation_id, job.get("lock"))
+    logger.info(f"Image generation completed: {generation_id}")
+
+    # Remember deterministic results so identical requests skip the GPU
+    cache_key = image_cache_key(**job["task_kwargs"])
+    if settings.GENERATION_CACHE_ENABLED and cache_key:
+        try:
+            generation_cache.set(
+                job["tenant_id"],
+                cache_key,
+                {
+                    "output_urls": output_urls,
+                    "metadata": job.get("metadata", {}),
+                    "source_generation_id": generation_id,
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache generation {generation_id}: {e}")
+
+    if settings.IMAGE_POSTPROCESS_ENABLED and output_urls:
+        postprocess_image_task.delay(
+            generation_id, job["tenant_id"], output_urls, job["task_kwargs"]["user_id"]
+        )
+
+    return {
+        "generation_id": generation_id,
+        "status": "completed",
+        "output_urls": output_urls,
+    }
+
+
+@celery_app.task(bind=True, name="generate_image_grid")
+def generate_image_grid_task(self, grid_id: str, tenant_id: str, cells: list):
+    """
+    Background task rendering a group of grid cells as one batched prompt
+
+    Args:
+        grid_id: Grid the cells belong to
+        tenant_id: Tenant ID
+        cells: [{generation_id, params}] sharing a checkpoint
+    """
+    from app.models.generation import Generation
+
+    # Cells are dispatched in fixed groups, so the first one stands for the group
+    lock_id = cells[0]["generation_id"]
+    lock = acquire_generation_lock(lock_id)
+    if lock is None:
+        logger.warning(f"Dropping duplicate delivery of grid {grid_id} cells")
+        return {"grid_id": grid_id, "status": "duplicate"}
+
+    db = get_sync_db()
+    start_time = time.time()
+    live = []
+    generations = {}
+
+    try:
+        ids = [cell["generation_id"] for cell in cells]
+        generations = {
+            str(g.id): g
+            for g in db.query(Generation).filter(Generation.id.in_(ids)).all()
+        }
+        # A redelivered group skips cells its first run already finished
+        live = [
+            cell
+            for cell in cells
+            if cell["generation_id"] in generations
+            and not _finished_status(generations[cell["generation_id"]])
+            and cancel_reason(cell["generation_id"]) != "cancelled"
+        ]
+        if not live:
+            logger.info(f"Nothing left to render for grid {grid_id}")
+            return {"grid_id": grid_id, "status": "cancelled"}
+
+        db.close()
+
+        # The API inserts grid rows in bulk without hot status; start it here
+        for cell in live:
+            generation = generations[cell["generation_id"]]
+            generation_status.set(
+                cell["generation_id"],
+                status="processing",
+                progress=0,
+                tenant_id=generation.tenant_id,
+                user_id=generation.user_id,
+                type=generation.type,
+                prompt=generation.prompt,
+                created_at=generation.created_at.isoformat(),
+            )
+
+        live_ids = [cell["generation_id"] for cell in live]
+
+        def on_queued(node: str, prompt_id: str):
+            # Recorded under every cell so cancelling them all stops the prompt
+            for generation_id in live_ids:
+                record_dispatch(generation_id, node, prompt_id, shared_with=live_ids)
+
+        requests = [CoalescedRequest(cell["params"]) for cell in live]
+        workflow, slices = build_coalesced_workflow(requests)
+        node, prompt_id, result = comfyui_pool.execute_workflow(
+            workflow,
+            checkpoint=requests[0].params["model"],
+            on_queued=on_queued,
+            cancel_check=lambda: group_cancel_reason(live_ids),
+        )
+        logger.info(
+            f"Rendered {len(live)} cells of grid {grid_id} in ComfyUI prompt {prompt_id}"
+        )
+
+        completed = []
+        for cell, request, (save_node, offset, count, seed) in zip(
+            live, requests, slices
+        ):
+            if cancel_reason(cell["generation_id"]) == "cancelled":
+                # Cancelled while the rest of its group kept rendering
+                continue
+
+            images = node.service.collect_outputs(result, [save_node])[
+                offset : offset + count
+            ]
+            output_urls = [
+                upload_output(node.address, output, tenant_id) for output in images
+            ]
+
+            generation_status.finish(
+                cell["generation_id"],
+                "completed",
+                output_url=output_urls[0] if output_urls else None,
+                output_urls=output_urls,
+                processing_time_seconds=int(time.time() - start_time),
+                metadata={
+                    **request.params,
+                    "seed": seed,
+                    "grid_id": grid_id,
+                    "coalesced_requests": len(live),
+                },
+            )
+            completed.append((cell["generation_id"], output_urls))
+
+        if settings.IMAGE_POSTPROCESS_ENABLED:
+            for generation_id, output_urls in completed:
+                if output_urls:
+                    postprocess_image_task.delay(
+                        generation_id,
+                        tenant_id,
+                        output_urls,
+                        str(generations[generation_id].user_id),
+                    )
+
+        return {
+            "grid_id": grid_id,
+            "status": "completed",
+            "generation_ids": [generation_id for generation_id, _ in completed],
+        }
+
+    except Exception as e:
+        # An interrupted prompt surfaces as an execution error before the
+        # waiter notices the flags, so consult them for any failure
+        if live and (
+            isinstance(e, PromptCancelled)
+            or group_cancel_reason([cell["generation_id"] for cell in live])
+        ):
+            logger.info(f"Grid generation cancelled for {grid_id}")
+            for cell in live:
+                generation_status.finish(
+                    cell["generation_id"],
+                    "cancelled",
+                    processing_time_seconds=int(time.time() - start_time),
+                )
+            return {"grid_id": grid_id, "status": "cancelled"}
+
+        logger.error(f"Grid generation failed for {grid_id}: {e}", exc_info=True)
+
+        for cell in live:
+            generation_status.finish(
+                cell["generation_id"],
+                "failed",
+                error_message=str(e),
+                processing_time_seconds=int(time.time() - start_time),
+            )
+
+        raise
+
+    finally:
+        for cell in live:
+            clear_dispatch(cell["generation_id"])
+        release_generation_lock(lock_id, lock)
         db.close()
 
 
+@celery_app.task(
+    bind=True, name="postprocess_image", max_retries=3, default_retry_delay=30
+)
+def postprocess_image_task(
+    self,
+    generation_id: str,
+    tenant_id: str,
+    output_urls: list,
+    user_id: Optional[str] = None,
+):
+    """
+    Background task producing WebP/AVIF copies and thumbnails of image outputs
+
+    Runs on the 'postprocess' queue; the encoding itself happens in the
+    image post-processor's process pool. The results are merged into the
+    generation's metadata by the next status flush.
+    """
+    from app.services.image_postprocess import image_postprocessor
+
+    start_time = time.time()
+
+    try:
+        images = [storage_service.download_bytes(url) for url in output_urls]
+        derivatives = image_postprocessor.process(images, tenant_id)
+
+        generation_status.annotate(
+            generation_id,
+            user_id,
+            {
+                "derivatives": derivatives,
+                "thumbnail_url": (
+                    derivatives[0].get("thumb_256") if derivatives else None
+                ),
+            },
+        )
+
+        logger.info(
+            f"Post-processed {len(images)} images for {generation_id} "
+            f"in {time.time() - start_time:.2f}s"
+        )
+
+        return {"generation_id": generation_id, "derivatives": derivatives}
+
+    except Exception as e:
+        # Originals are already stored, so the generation stays completed
+        logger.error(
+            f"Image post-processing failed for {generation_id}: {e}", exc_info=True
+        )
+        raise self.retry(exc=e)
+
+
 @celery_app.task(bind=True, name='generate_video')
-def generate_video_task(self, generation_id: str, tenant_id: str, **kwargs):
+def generate_video_task(
+    self,
+    generation_id: str,
+    tenant_id: str,
+    user_id: str,
+    prompt: str,
+    negative_prompt: str = "",
+    duration: int = 10,
+    fps: int = 24,
+    resolution: str = "720p",
+    seed: int = -1,
+    priority: int = DEFAULT_PRIORITY,
+):
     """
     Background task for video generation
+
+    The clip is split into overlapping segments that render in parallel
+    across the ComfyUI pool; the playlist URL is published to the hot
+    status as soon as the first HLS segment is in R2.
     """
-    logger.info(f"Video generation task: {generation_id}")
-    # TODO: Implement video generation with Open-Sora
-    return {"status": "pending"}
+    from app.models.generation import Generation
+    from app.services.video_pipeline import video_pipeline
+
+    lock = acquire_generation_lock(generation_id)
+    if lock is None:
+        logger.warning(
+            f"Dropping duplicate delivery of video generation {generation_id}"
+        )
+        return {"generation_id": generation_id, "status": "duplicate"}
+
+    start_time = time.time()
+
+    try:
+        with sync_session() as db:
+            generation = (
+                db.query(Generation).filter(Generation.id == generation_id).first()
+            )
+            if not generation:
+                logger.error(f"Generation not found: {generation_id}")
+                return
+            finished = _finished_status(generation)
+            if finished:
+                logger.info(f"Skipping {finished} video generation: {generation_id}")
+                return {"generation_id": generation_id, "status": finished}
+            if clear_preemption(generation_id) == "cancelled":
+                logger.info(f"Skipping cancelled video generation: {generation_id}")
+                return {"generation_id": generation_id, "status": "cancelled"}
+
+        generation_status.set(generation_id, status="processing", progress=0)
+        logger.info(f"Starting video generation: {generation_id}")
+
+        def on_segment(published: int, total: int, playlist_url: str):
+            generation_status.set(
+                generation_id,
+                progress=int(published * 100 / total),
+                output_url=playlist_url,
+            )
+
+        result = video_pipeline.generate(
+            comfyui_pool,
+            tenant_id,
+            prefix=f"video/{generation_id}",
+            prompt=prompt,
+            negative_prompt=negative_prompt,
+            duration=duration,
+            fps=fps,
+            resolution=resolution,
+            seed=seed,
+            priority=priority,
+            on_segment=on_segment,
+            cancel_check=lambda: cancel_reason(generation_id),
+        )
+
+        generation_status.finish(
+            generation_id,
+            "completed",
+            output_url=result["playlist_url"],
+            output_urls=[result["playlist_url"]],
+            processing_time_seconds=int(time.time() - start_time),
+            metadata=result["metadata"],
+        )
+        logger.info(f"Video generation completed: {generation_id}")
+
+        return {
+            "generation_id": generation_id,
+            "status": "completed",
+            "output_url": result["playlist_url"],
+        }
+
+    except Exception as e:
+        reason = (
+            e.reason if isinstance(e, PromptCancelled) else cancel_reason(generation_id)
+        )
+
+        if reason == "cancelled":
+            logger.info(f"Video generation cancelled: {generation_id}")
+            generation_status.finish(
+                generation_id,
+                "cancelled",
+                processing_time_seconds=int(time.time() - start_time),
+            )
+            return {"generation_id": generation_id, "status": "cancelled"}
+
+        logger.error(f"Video generation failed: {e}", exc_info=True)
+        generation_status.finish(
+            generation_id,
+            "failed",
+            error_message=str(e),
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        raise
+
+    finally:
+        release_generation_lock(generation_id, lock)
 
 
 @celery_app.task(bind=True, name='generate_voice')
-def generate_voice_task(self, generation_id: str, tenant_id: str, **kwargs):
+def generate_voice_task(
+    self,
+    generation_id: str,
+    tenant_id: str,
+    user_id: str,
+    text: str,
+    language: str = "en",
+    reference_audio_url: Optional[str] = None,
+):
     """
     Background task for voice generation
+
+    The script is synthesized sentence by sentence against TTS_URL and
+    streamed to R2 as one MP3 while later sentences are still rendering;
+    progress counts encoded sentences.
+    """
+    from app.models.generation import Generation
+    from app.services.async_storage_service import AsyncR2StorageService
+    from app.services.voice_pipeline import AsyncTTSClient, voice_pipeline
+
+    lock = acquire_generation_lock(generation_id)
+    if lock is None:
+        logger.warning(
+            f"Dropping duplicate delivery of voice generation {generation_id}"
+        )
+        return {"generation_id": generation_id, "status": "duplicate"}
+
+    start_time = time.time()
+
+    try:
+        with sync_session() as db:
+            generation = (
+                db.query(Generation).filter(Generation.id == generation_id).first()
+            )
+            if not generation:
+                logger.error(f"Generation not found: {generation_id}")
+                return
+            finished = _finished_status(generation)
+            if finished:
+                logger.info(f"Skipping {finished} voice generation: {generation_id}")
+                return {"generation_id": generation_id, "status": finished}
+            if clear_preemption(generation_id) == "cancelled":
+                logger.info(f"Skipping cancelled voice generation: {generation_id}")
+                return {"generation_id": generation_id, "status": "cancelled"}
+
+        generation_status.set(generation_id, status="processing", progress=0)
+        logger.info(f"Starting voice generation: {generation_id}")
+
+        def on_sentence(done: int, total: int):
+            generation_status.set(generation_id, progress=int(done * 100 / total))
+
+        async def render() -> str:
+            # Each task runs its own event loop, so its HTTP pools are its own too
+            client = AsyncTTSClient(
+                settings.TTS_URL,
+                max_connections=settings.TTS_CONCURRENCY,
+                timeout=settings.TTS_TIMEOUT_SECONDS,
+            )
+            storage = AsyncR2StorageService(max_connections=2)
+            try:
+                return await voice_pipeline.render(
+                    client,
+                    storage,
+                    tenant_id,
+                    f"voice/{generation_id}.mp3",
+                    text,
+                    language=language,
+                    speaker_wav=reference_audio_url,
+                    on_sentence=on_sentence,
+                )
+            finally:
+                await client.close()
+                await storage.close()
+
+        output_url = asyncio.run(render())
+
+        generation_status.finish(
+            generation_id,
+            "completed",
+            output_url=output_url,
+            output_urls=[output_url],
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        logger.info(f"Voice generation completed: {generation_id}")
+
+        return {
+            "generation_id": generation_id,
+            "status": "completed",
+            "output_url": output_url,
+        }
+
+    except Exception as e:
+        logger.error(f"Voice generation failed: {e}", exc_info=True)
+        generation_status.finish(
+            generation_id,
+            "failed",
+            error_message=str(e),
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        raise
+
+    finally:
+        release_generation_lock(generation_id, lock)
+
+
+@celery_app.task(bind=True, name="generate_text")
+def generate_text_task(
+    self,
+    generation_id: str,
+    tenant_id: str,
+    user_id: str,
+    prompt: str,
+    max_tokens: int = 2000,
+    temperature: float = 0.7,
+):
+    """
+    Background task for text generation
+
+    The completion is streamed from LLAMA_CPP_URL, with progress counting
+    tokens against max_tokens; the text is uploaded to R2 and the
+    generation finished in one write once it is done.
     """
-    logger.info(f"Voice generation task: {generation_id}")
-    # TODO: Implement voice generation with Coqui TTS
-    return {"status": "pending"}
+    from app.models.generation import Generation
+    from app.services.llm_service import (
+        TokenStats,
+        sync_llm_client,
+        CONTENT_TYPE as TEXT_CONTENT_TYPE,
+    )
+
+    lock = acquire_generation_lock(generation_id)
+    if lock is None:
+        logger.warning(
+            f"Dropping duplicate delivery of text generation {generation_id}"
+        )
+        return {"generation_id": generation_id, "status": "duplicate"}
+
+    start_time = time.time()
+
+    try:
+        with sync_session() as db:
+            generation = (
+                db.query(Generation).filter(Generation.id == generation_id).first()
+            )
+            if not generation:
+                logger.error(f"Generation not found: {generation_id}")
+                generation_status.finish(
+                    generation_id, "failed", error_message="Generation not found"
+                )
+                return {"generation_id": generation_id, "status": "failed"}
+            finished = _finished_status(generation)
+            if finished:
+                logger.info(f"Skipping {finished} text generation: {generation_id}")
+                return {"generation_id": generation_id, "status": finished}
+            if clear_preemption(generation_id) == "cancelled":
+                logger.info(f"Skipping cancelled text generation: {generation_id}")
+                return {"generation_id": generation_id, "status": "cancelled"}
+
+        generation_status.set(generation_id, status="processing", progress=0)
+        logger.info(f"Starting text generation: {generation_id}")
+
+        stats = TokenStats()
+
+        # The process-wide client keeps its connection pool across tasks
+        tokens = []
+        reported = 0
+        for token in sync_llm_client.iter_stream(
+            prompt, max_tokens, temperature, stats
+        ):
+            tokens.append(token)
+            # Every tenth of max_tokens, not every token
+            progress = len(tokens) * 10 // max_tokens * 10
+            if progress > reported:
+                generation_status.set(generation_id, progress=progress)
+                reported = progress
+        text = "".join(tokens)
+
+        output_url = storage_service.upload_bytes(
+            text.encode(), tenant_id, f"text/{generation_id}.txt", TEXT_CONTENT_TYPE
+        )
+
+        generation_status.finish(
+            generation_id,
+            "completed",
+            output_url=output_url,
+            output_urls=[output_url],
+            processing_time_seconds=int(time.time() - start_time),
+            metadata=stats.as_metadata(),
+        )
+        logger.info(
+            f"Text generation completed: {generation_id} ({stats.tokens} tokens, "
+            f"first after {stats.time_to_first_token or 0:.2f}s, "
+            f"{stats.tokens_per_second or 0:.1f} tokens/s)"
+        )
+
+        return {
+            "generation_id": generation_id,
+            "status": "completed",
+            "output_url": output_url,
+        }
+
+    except Exception as e:
+        logger.error(f"Text generation failed: {e}", exc_info=True)
+        generation_status.finish(
+            generation_id,
+            "failed",
+            error_message=str(e),
+            processing_time_seconds=int(time.time() - start_time),
+        )
+        raise
+
+    finally:
+        release_generation_lock(generation_id, lock)
 
 
 @celery_app.task(bind=True, name='upscale_image')
-def upscale_image_task(self, image_url: str, tenant_id: str):
+def upscale_image_task(self, image_url: str, tenant_id: str, scale: int = 4):
     """
-    Background task for image upscaling with Real-ESRGAN
+    Background task for CPU image upscaling with the tiled upscaler
+
+    Tiles are upscaled across a process pool, with the ONNX model at
+    UPSCALE_MODEL_PATH when one is configured and Lanczos otherwise. Runs
+    on the CPU 'postprocess' queue so GPU nodes stay on diffusion, and the
+    PNG is streamed to R2 as its rows are finished.
     """
-    logger.info(f"Upscaling image: {image_url}")
-    # TODO: Implement upscaling with Real-ESRGAN
-    return {"status": "pending"}
+    from PIL import Image
+    from app.services.upscaler import upscaler
+
+    if not 1 < scale <= settings.UPSCALE_MAX_SCALE:
+        raise ValueError(
+            f"Upscale factor must be between 2 and {settings.UPSCALE_MAX_SCALE}"
+        )
+
+    logger.info(f"Upscaling image {scale}x: {image_url}")
+    start_time = time.time()
+
+    image = Image.open(io.BytesIO(storage_service.download_bytes(image_url)))
+    if image.width * image.height > settings.UPSCALE_MAX_INPUT_PIXELS:
+        raise ValueError(f"Image too large to upscale: {image.width}x{image.height}")
+
+    output_url = storage_service.upload_stream(
+        upscaler.upscale(image, scale),
+        tenant_id=tenant_id,
+        filename=f"upscaled/{uuid.uuid4()}.png",
+        content_type="image/png",
+    )
+
+    logger.info(f"Upscaled image in {time.time() - start_time:.2f}s: {output_url}")
+    return {
+        "status": "completed",
+        "output_url": output_url,
+        "width": image.width * scale,
+        "height": image.height * scale,
+    }
 
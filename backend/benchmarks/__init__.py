@@ -0,0 +1,3 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Benchmarks
+"""
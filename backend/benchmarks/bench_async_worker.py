@@ -0,0 +1,139 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Asyncio Worker Benchmark
+
+Image jobs per second per worker process: a prefork Celery process runs
+one job at a time (submit, wait, upload), while the asyncio worker keeps up
+to --max-jobs in flight through AsyncImagePipeline's stage semaphores.
+Both drive the same ComfyUI node; R2 is stood in for by draining each
+output and sleeping --upload-ms.
+
+Usage (from backend/):
+    python -m benchmarks.comfyui_standin --port 8188 --render-seconds 2 &
+    python -m benchmarks.bench_async_worker --url http://127.0.0.1:8188 --jobs 1000
+
+Without --url an in-process stand-in is started, which shares the GIL with
+the worker and understates the async numbers.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.comfyui_pool import ComfyUIPool
+from app.tasks.async_worker import AsyncImagePipeline
+from benchmarks.comfyui_standin import start_standin
+
+
+class StandinStorage:
+    """Drains the upload stream and waits like an R2 PUT would"""
+
+    def __init__(self, upload_seconds: float):
+        self.upload_seconds = upload_seconds
+
+    async def upload_stream(
+        self, chunks, tenant_id: str, filename: str, content_type: str = ""
+    ) -> str:
+        async for _ in chunks:
+            pass
+        await asyncio.sleep(self.upload_seconds)
+        return f"https://r2.invalid/{tenant_id}/{filename}"
+
+
+def bench_prefork_process(pool: ComfyUIPool, jobs: int, upload_seconds: float):
+    start = time.perf_counter()
+    for i in range(jobs):
+        submitted = pool.submit_image(prompt=f"benchmark {i}", seed=i, steps=1)
+        result = pool.wait_for_prompt(submitted["node"], submitted["prompt_id"])
+        for output in pool.get_node(submitted["node"]).service.collect_outputs(result):
+            for _ in pool.stream_output(submitted["node"], output):
+                pass
+            time.sleep(upload_seconds)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'prefork (1 job)':<22} {jobs / elapsed:>9.2f} jobs/s per process   "
+        f"({jobs} jobs, {elapsed:.1f} s)"
+    )
+
+
+async def bench_async_process(pool: ComfyUIPool, args):
+    pipeline = AsyncImagePipeline(
+        pool,
+        StandinStorage(args.upload_ms / 1000),
+        submit_concurrency=args.submit_concurrency,
+        collect_concurrency=args.collect_concurrency,
+        upload_concurrency=args.upload_concurrency,
+        poll_interval=args.poll_ms / 1000,
+    )
+    jobs = asyncio.Semaphore(args.max_jobs)
+
+    async def job(i: int):
+        async with jobs:
+            submitted = await pipeline.submit(
+                {"prompt": f"benchmark {i}", "seed": i, "steps": 1}
+            )
+            images = await pipeline.collect(submitted["node"], submitted["prompt_id"])
+            await pipeline.upload(submitted["node"], images, "bench")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(job(i) for i in range(args.jobs)))
+    elapsed = time.perf_counter() - start
+    await pipeline.aclose()
+    print(
+        f"{f'asyncio ({args.max_jobs} jobs)':<22} {args.jobs / elapsed:>9.2f} jobs/s per process   "
+        f"({args.jobs} jobs, {elapsed:.1f} s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--prefork-jobs", type=int, default=10)
+    parser.add_argument("--max-jobs", type=int, default=settings.ASYNC_WORKER_MAX_JOBS)
+    parser.add_argument(
+        "--render-ms",
+        type=float,
+        default=1000,
+        help="Stand-in render time (ignored with --url)",
+    )
+    parser.add_argument("--upload-ms", type=float, default=300)
+    parser.add_argument("--poll-ms", type=float, default=250)
+    parser.add_argument(
+        "--submit-concurrency",
+        type=int,
+        default=settings.ASYNC_WORKER_SUBMIT_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--collect-concurrency",
+        type=int,
+        default=settings.ASYNC_WORKER_COLLECT_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=settings.ASYNC_WORKER_UPLOAD_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--url", help="Benchmark a real ComfyUI server (or external stand-in)"
+    )
+    args = parser.parse_args()
+
+    settings.COMFYUI_POLL_INTERVAL_SECONDS = args.poll_ms / 1000
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_standin(render_seconds=args.render_ms / 1000)
+    pool = ComfyUIPool([base_url])
+
+    print(
+        f"upload {args.upload_ms:.0f} ms, poll {args.poll_ms:.0f} ms, target {base_url}"
+    )
+    bench_prefork_process(pool, args.prefork_jobs, args.upload_ms / 1000)
+    asyncio.run(bench_async_process(pool, args))
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
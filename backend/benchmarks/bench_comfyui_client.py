@@ -0,0 +1,117 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Client Benchmark
+
+Compares the legacy per-call urllib connections against the pooled
+keep-alive client on /history polling, the hottest ComfyUI call.
+
+Usage (from backend/):
+    python -m benchmarks.comfyui_standin --port 8188 &
+    python -m benchmarks.bench_comfyui_client --url http://127.0.0.1:8188
+
+Without --url an in-process stand-in is started, which shares the GIL with
+the clients and understates the pooled numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app.services.comfyui_client import AsyncComfyUIClient, ComfyUIClient
+from benchmarks.comfyui_standin import start_standin
+
+
+def report(name: str, latencies: List[float], elapsed: float):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<22} {len(latencies) / elapsed:>10.0f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms"
+    )
+
+
+def bench_urllib(base_url: str, prompt_id: str, requests: int, concurrency: int):
+    def call(_):
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/history/{prompt_id}") as response:
+            json.loads(response.read())
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(call, range(requests)))
+    report("urllib (per call)", latencies, time.perf_counter() - start)
+
+
+def bench_sync_pooled(base_url: str, prompt_id: str, requests: int, concurrency: int):
+    client = ComfyUIClient(base_url, "bench", max_connections=concurrency)
+    client.get_history(prompt_id)  # warm the pool
+
+    def call(_):
+        start = time.perf_counter()
+        client.get_history(prompt_id)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(call, range(requests)))
+    report("ComfyUIClient (sync)", latencies, time.perf_counter() - start)
+    client.close()
+
+
+async def bench_async_pooled(
+    base_url: str, prompt_id: str, requests: int, concurrency: int
+):
+    client = AsyncComfyUIClient(base_url, "bench", max_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    await client.get_history(prompt_id)
+
+    async def call():
+        async with semaphore:
+            start = time.perf_counter()
+            await client.get_history(prompt_id)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(call() for _ in range(requests)))
+    report("AsyncComfyUIClient", list(latencies), time.perf_counter() - start)
+    await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--url", help="Benchmark a real ComfyUI server instead of the stand-in"
+    )
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_standin()
+
+    setup_client = ComfyUIClient(base_url, "bench")
+    prompt_id = setup_client.queue_prompt({})
+    setup_client.close()
+
+    print(
+        f"{args.requests} GET /history requests, concurrency {args.concurrency}, target {base_url}"
+    )
+    bench_urllib(base_url, prompt_id, args.requests, args.concurrency)
+    bench_sync_pooled(base_url, prompt_id, args.requests, args.concurrency)
+    asyncio.run(
+        bench_async_pooled(base_url, prompt_id, args.requests, args.concurrency)
+    )
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation List Pagination Benchmark
+
+Fills a scratch copy of the generations table (schema jams_bench) with
+--rows generations for one user and times list_generations' page query
+at each --depths offset, two ways: the old query (every column, OFFSET
+into created_at order) and the keyset query (the response's columns
+only, continuing after the previous page's (created_at, id)). Both run
+against idx_generations_tenant_user_created as in database/schema.sql,
+and each keyset page is checked against the OFFSET page at that depth.
+
+Several rows share each created_at, so the id tie-break is exercised.
+
+Usage (from backend/; defaults to settings.DATABASE_URL):
+    python -m benchmarks.bench_list_pagination --rows 1000000 --depths 0 1000 100000 999000
+    python -m benchmarks.bench_list_pagination --dsn postgresql:///scratch --type video --keep
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import asyncpg
+
+from app.core.config import settings
+
+SCHEMA = "jams_bench"
+
+CREATE = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.generations (
+    id UUID PRIMARY KEY,
+    tenant_id UUID NOT NULL,
+    user_id UUID NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    status VARCHAR(50) NOT NULL DEFAULT 'queued',
+    prompt TEXT NOT NULL,
+    negative_prompt TEXT,
+    model VARCHAR(255) NOT NULL,
+    parameters JSONB DEFAULT '{{}}',
+    output_url TEXT,
+    output_urls TEXT[],
+    error_message TEXT,
+    processing_time_seconds INTEGER,
+    cost_credits INTEGER DEFAULT 1,
+    metadata JSONB DEFAULT '{{}}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Four generations a second, mostly images, with realistically sized JSONB
+POPULATE = f"""
+INSERT INTO {SCHEMA}.generations (
+    id, tenant_id, user_id, type, status, prompt, model, parameters,
+    output_url, output_urls, metadata, created_at
+)
+SELECT
+    gen_random_uuid(), $1, $2,
+    (ARRAY['image', 'image', 'image', 'image', 'image', 'image', 'image',
+           'video', 'voice', 'text'])[1 + i % 10],
+    'completed',
+    'a lighthouse on a sea cliff at dusk, volumetric fog, 35mm film, variation ' || i,
+    'sdxl_base_1.0',
+    jsonb_build_object(
+        'width', 1024, 'height', 1024, 'steps', 30, 'cfg', 7.0, 'seed', i,
+        'sampler', 'euler_ancestral', 'scheduler', 'normal',
+        'negative_prompt', repeat('blurry, lowres, ', 12)
+    ),
+    'https://cdn.example/' || i || '.png',
+    ARRAY['https://cdn.example/' || i || '.png'],
+    jsonb_build_object(
+        'thumbnail_url', 'https://cdn.example/' || i || '_thumb.webp',
+        'node', 'http://comfyui-3:8188', 'prompt_id', md5(i::text), 'history', repeat('x', 400)
+    ),
+    now() - (i / 4) * interval '1 second'
+FROM generate_series(1, $3) AS i
+"""
+
+INDEX = f"""
+CREATE INDEX idx_generations_tenant_user_created
+    ON {SCHEMA}.generations(tenant_id, user_id, created_at DESC, id DESC);
+ANALYZE {SCHEMA}.generations;
+"""
+
+# The pre-keyset list query
+OFFSET_PAGE = f"""
+SELECT * FROM {SCHEMA}.generations
+WHERE tenant_id = $1 AND user_id = $2 {{type_filter}}
+ORDER BY created_at DESC
+OFFSET $3 LIMIT $4
+"""
+
+# What list_generations issues now (projected columns, keyset on (created_at, id))
+KEYSET_PAGE = f"""
+SELECT id, status, type, prompt, output_url,
+    metadata ->> 'thumbnail_url' AS thumbnail_url, created_at
+FROM {SCHEMA}.generations
+WHERE tenant_id = $1 AND user_id = $2 {{type_filter}} AND (created_at, id) < ($3, $4)
+ORDER BY created_at DESC, id DESC
+LIMIT $5
+"""
+
+FIRST_KEYSET_PAGE = f"""
+SELECT id, status, type, prompt, output_url,
+    metadata ->> 'thumbnail_url' AS thumbnail_url, created_at
+FROM {SCHEMA}.generations
+WHERE tenant_id = $1 AND user_id = $2 {{type_filter}}
+ORDER BY created_at DESC, id DESC
+LIMIT $3
+"""
+
+# Row just before a depth, i.e. the cursor a client paging that far holds
+CURSOR_AT = f"""
+SELECT created_at, id FROM {SCHEMA}.generations
+WHERE tenant_id = $1 AND user_id = $2 {{type_filter}}
+ORDER BY created_at DESC, id DESC
+OFFSET $3 LIMIT 1
+"""
+
+# Reference page for the correctness check
+OFFSET_IDS = f"""
+SELECT id FROM {SCHEMA}.generations
+WHERE tenant_id = $1 AND user_id = $2 {{type_filter}}
+ORDER BY created_at DESC, id DESC
+OFFSET $3 LIMIT $4
+"""
+
+
+async def timed(conn: asyncpg.Connection, query: str, args, repeat: int):
+    samples = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = await conn.fetch(query, *args)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return (
+        statistics.median(samples),
+        samples[max(0, int(len(samples) * 0.95) - 1)],
+        rows,
+    )
+
+
+async def main_async(args):
+    conn = await asyncpg.connect(args.dsn)
+    tenant_id, user_id = uuid.uuid4(), uuid.uuid4()
+
+    try:
+        if args.reuse:
+            tenant_id, user_id = await conn.fetchrow(
+                f"SELECT tenant_id, user_id FROM {SCHEMA}.generations LIMIT 1"
+            )
+        else:
+            start = time.perf_counter()
+            await conn.execute(CREATE)
+            await conn.execute(POPULATE, tenant_id, user_id, args.rows)
+            await conn.execute(INDEX)
+            print(f"Loaded {args.rows} rows in {time.perf_counter() - start:.1f} s")
+
+        type_filter = ""
+        base_args = [tenant_id, user_id]
+        if args.type:
+            type_filter = "AND type = $%d"
+            base_args.append(args.type)
+
+        def sql(template: str) -> str:
+            # The type parameter goes after tenant and user; renumber the rest
+            if not args.type:
+                return template.format(type_filter="")
+            for n in range(9, 2, -1):
+                template = template.replace(f"${n}", f"${n + 1}")
+            return template.format(type_filter=type_filter % 3)
+
+        total = await conn.fetchval(
+            sql(
+                f"SELECT count(*) FROM {SCHEMA}.generations "
+                "WHERE tenant_id = $1 AND user_id = $2 {type_filter}"
+            ),
+            *base_args,
+        )
+        print(
+            f"{total} matching rows, page size {args.limit}, "
+            f"{args.repeat} runs per query (median / p95)"
+        )
+
+        for depth in args.depths:
+            if depth >= total:
+                print(f"depth {depth:>9}: past the end, skipped")
+                continue
+
+            offset_median, offset_p95, _ = await timed(
+                conn, sql(OFFSET_PAGE), [*base_args, depth, args.limit], args.repeat
+            )
+
+            if depth == 0:
+                keyset_query, keyset_args = sql(FIRST_KEYSET_PAGE), [
+                    *base_args,
+                    args.limit,
+                ]
+            else:
+                created_at, last_id = await conn.fetchrow(
+                    sql(CURSOR_AT), *base_args, depth - 1
+                )
+                keyset_query, keyset_args = sql(KEYSET_PAGE), [
+                    *base_args,
+                    created_at,
+                    last_id,
+                    args.limit,
+                ]
+            keyset_median, keyset_p95, rows = await timed(
+                conn, keyset_query, keyset_args, args.repeat
+            )
+
+            expected = [
+                r["id"]
+                for r in await conn.fetch(
+                    sql(OFFSET_IDS), *base_args, depth, args.limit
+                )
+            ]
+            check = "ok" if [r["id"] for r in rows] == expected else "MISMATCH"
+
+            print(
+                f"depth {depth:>9}:  offset {offset_median:>8.2f} / {offset_p95:>8.2f} ms   "
+                f"keyset {keyset_median:>6.2f} / {keyset_p95:>6.2f} ms   {check}"
+            )
+
+            if args.explain and depth == max(d for d in args.depths if d < total):
+                plan = await conn.fetch(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {keyset_query}", *keyset_args
+                )
+                print("\n".join(row[0] for row in plan))
+
+    finally:
+        if not args.keep and not args.reuse:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--depths",
+        type=int,
+        nargs="+",
+        default=[0, 1000, 10000, 100000, 500000, 999000],
+    )
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--type", help="Also filter on generation type")
+    parser.add_argument(
+        "--explain", action="store_true", help="Show the deepest keyset page's plan"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Leave the scratch schema for --reuse"
+    )
+    parser.add_argument(
+        "--reuse", action="store_true", help="Use the rows a --keep run left"
+    )
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
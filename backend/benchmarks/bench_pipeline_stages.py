@@ -0,0 +1,176 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Image Pipeline Stage Benchmark
+
+Runs image jobs against the ComfyUI stand-in twice: serially inside each
+GPU worker slot (submit -> wait -> upload in one task, the old flow) and as
+independent submit, collect and upload stages, each with its own pool.
+Both modes allow --gpu-slots prompts in flight, like the fair-share
+scheduler; the staged mode frees a slot when the prompt finishes instead of
+after its upload. Submit times include waiting for a free slot.
+
+R2 is stood in for by draining each output from the node and sleeping
+--upload-ms, so vary that to see how upload latency stops costing GPU time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline_stages --jobs 200 --render-ms 200 --upload-ms 300
+    python -m benchmarks.bench_pipeline_stages --collect-concurrency 8 --upload-concurrency 4
+"""
+
+import argparse
+import queue
+import statistics
+import threading
+import time
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+from app.services.comfyui_pool import ComfyUIPool
+from benchmarks.comfyui_standin import start_standin
+
+
+class Stage:
+    """Worker threads moving jobs from one queue to the next, like one Celery queue"""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        concurrency: int,
+        outbox: Optional[queue.Queue] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.inbox: queue.Queue = queue.Queue()
+        self.outbox = outbox
+        self.seconds: List[float] = []
+        for _ in range(concurrency):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            item = self.inbox.get()
+            start = time.perf_counter()
+            result = self.fn(item)
+            self.seconds.append(time.perf_counter() - start)
+            if self.outbox is not None:
+                self.outbox.put(result)
+
+
+def report(name: str, jobs: int, elapsed: float, stages: List[Stage]):
+    print(f"{name:<10} {jobs / elapsed:>8.2f} jobs/s   {elapsed:>7.2f} s total")
+    for stage in stages:
+        seconds = sorted(stage.seconds)
+        p99 = seconds[max(int(len(seconds) * 0.99) - 1, 0)]
+        print(
+            f"  {stage.name:<8} p50 {statistics.median(seconds) * 1000:>8.1f} ms   "
+            f"p99 {p99 * 1000:>8.1f} ms"
+        )
+
+
+def make_steps(pool: ComfyUIPool, slots: threading.Semaphore, upload_seconds: float):
+    def submit(i: int):
+        slots.acquire()
+        return pool.submit_image(prompt=f"benchmark {i}", seed=i, steps=1)
+
+    def collect(submitted: dict):
+        try:
+            result = pool.wait_for_prompt(submitted["node"], submitted["prompt_id"])
+            return submitted["node"], pool.get_node(
+                submitted["node"]
+            ).service.collect_outputs(result)
+        finally:
+            slots.release()
+
+    def upload(collected: tuple):
+        node, images = collected
+        for output in images:
+            for _ in pool.stream_output(node, output):
+                pass
+            time.sleep(upload_seconds)
+        return len(images)
+
+    return submit, collect, upload
+
+
+def bench_serial(pool: ComfyUIPool, args) -> None:
+    """Each GPU slot runs submit, collect and upload back to back"""
+    slots = threading.Semaphore(args.gpu_slots)
+    submit, collect, upload = make_steps(pool, slots, args.upload_ms / 1000)
+    done: queue.Queue = queue.Queue()
+    stage = Stage("job", lambda i: upload(collect(submit(i))), args.gpu_slots, done)
+
+    start = time.perf_counter()
+    for i in range(args.jobs):
+        stage.inbox.put(i)
+    for _ in range(args.jobs):
+        done.get()
+    report("serial", args.jobs, time.perf_counter() - start, [stage])
+
+
+def bench_staged(pool: ComfyUIPool, args) -> None:
+    """Submit, collect and upload drain their own queues at their own concurrency"""
+    slots = threading.Semaphore(args.gpu_slots)
+    submit, collect, upload = make_steps(pool, slots, args.upload_ms / 1000)
+    done: queue.Queue = queue.Queue()
+    upload_stage = Stage("upload", upload, args.upload_concurrency, done)
+    collect_stage = Stage(
+        "collect", collect, args.collect_concurrency, upload_stage.inbox
+    )
+    submit_stage = Stage("submit", submit, args.submit_concurrency, collect_stage.inbox)
+
+    start = time.perf_counter()
+    for i in range(args.jobs):
+        submit_stage.inbox.put(i)
+    for _ in range(args.jobs):
+        done.get()
+    report(
+        "staged",
+        args.jobs,
+        time.perf_counter() - start,
+        [submit_stage, collect_stage, upload_stage],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument(
+        "--gpu-slots",
+        type=int,
+        default=2,
+        help="Prompts in flight (SCHEDULER_MAX_IN_FLIGHT)",
+    )
+    parser.add_argument("--render-ms", type=float, default=200)
+    parser.add_argument(
+        "--upload-ms",
+        type=float,
+        default=300,
+        help="Simulated R2 upload time per output",
+    )
+    parser.add_argument(
+        "--poll-ms",
+        type=float,
+        default=20,
+        help="History poll interval while collecting",
+    )
+    parser.add_argument("--submit-concurrency", type=int, default=2)
+    parser.add_argument("--collect-concurrency", type=int, default=64)
+    parser.add_argument("--upload-concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    settings.COMFYUI_POLL_INTERVAL_SECONDS = args.poll_ms / 1000
+    server, base_url = start_standin(render_seconds=args.render_ms / 1000)
+    pool = ComfyUIPool([base_url])
+
+    print(
+        f"{args.jobs} jobs, {args.gpu_slots} GPU slots, render {args.render_ms:.0f} ms, "
+        f"upload {args.upload_ms:.0f} ms, target {base_url}"
+    )
+    bench_serial(pool, args)
+    bench_staged(pool, args)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
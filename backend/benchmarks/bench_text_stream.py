@@ -0,0 +1,120 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Streaming Text Benchmark
+
+Generates --requests completions of --tokens tokens, --concurrency at a
+time, two ways: as whole replies (stream off, nothing can be shown until
+the last token is sampled) and through AsyncLlamaCppClient's token
+stream over its shared connection pool. Reports time to first token and
+to the full reply (median / p95) and each stream's tokens per second.
+
+Usage (from backend/):
+    python -m benchmarks.llama_standin --port 8080 &
+    python -m benchmarks.bench_text_stream --url http://127.0.0.1:8080 --tokens 400 --concurrency 8
+
+Without --url an in-process stand-in is started.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.llm_service import AsyncLlamaCppClient, TokenStats
+from benchmarks.llama_standin import start_standin
+
+PROMPT = "Write the opening of a radio drama about a numbers station heard at midnight."
+
+
+def summary(samples) -> str:
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    return f"{statistics.median(samples):>7.2f} / {p95:>7.2f} s"
+
+
+async def whole(client: AsyncLlamaCppClient, tokens: int):
+    start = time.perf_counter()
+    payload = {
+        "messages": [{"role": "user", "content": PROMPT}],
+        "max_tokens": tokens,
+        "stream": False,
+    }
+    async with client.session.post("/v1/chat/completions", json=payload) as response:
+        await response.json()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, None
+
+
+async def streamed(client: AsyncLlamaCppClient, tokens: int):
+    start = time.perf_counter()
+    stats = TokenStats()
+    async for _ in client.stream(PROMPT, tokens, 0.7, stats):
+        pass
+    return (
+        stats.time_to_first_token,
+        time.perf_counter() - start,
+        stats.tokens_per_second,
+    )
+
+
+async def bench(name: str, client: AsyncLlamaCppClient, run, args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one():
+        async with semaphore:
+            return await run(client, args.tokens)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    rates = [rate for _, _, rate in results if rate]
+    print(
+        f"{name:<8} first token {summary(r[0] for r in results)}  "
+        f"full reply {summary(r[1] for r in results)}  "
+        f"{f'{statistics.median(rates):>6.1f} tokens/s' if rates else '':<15}  "
+        f"wall {elapsed:>6.2f} s"
+    )
+
+
+async def main_async(args, base_url: str):
+    client = AsyncLlamaCppClient(base_url, max_connections=args.concurrency)
+    try:
+        await bench("whole", client, whole, args)
+        await bench("stream", client, streamed, args)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=300, help="Tokens per completion")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=4,
+        help="Stand-in parallel slots (ignored with --url)",
+    )
+    parser.add_argument(
+        "--url", help="Benchmark a real llama.cpp server (or external stand-in)"
+    )
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not args.url:
+        server, base_url = start_standin(slots=args.slots)
+
+    print(
+        f"{args.requests} completions of {args.tokens} tokens, "
+        f"concurrency {args.concurrency}, target {base_url}"
+    )
+    asyncio.run(main_async(args, base_url))
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Tiled Upscaler Benchmark
+
+Upscales a synthetic --size x --size render by --scale with TiledUpscaler
+at each --workers count and reports output megapixels per second, the
+same per core, and peak memory of the driving process and its tile
+processes. The baseline resizes the whole image at once with Pillow and
+encodes it to PNG in memory, which is what the tiled engine replaces.
+Every run happens in a fresh process so peak memory figures are its own.
+
+Tiles run through Lanczos unless --model points at a Real-ESRGAN ONNX
+model (needs opencv-python).
+
+Usage (from backend/):
+    python -m benchmarks.bench_upscale --size 2048 --scale 4 --workers 1 2 4 8
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.upscaler import TiledUpscaler
+
+
+def source_image(size: int) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize((size, size))
+    return Image.merge(
+        "RGB", (gradient, gradient.rotate(90), Image.effect_noise((size, size), 24))
+    )
+
+
+def peak_mib(who) -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def run_baseline(size: int, scale: int):
+    image = source_image(size)
+    start = time.perf_counter()
+    output = image.resize((size * scale, size * scale), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    output.save(buffer, format="PNG", compress_level=6)
+    return (
+        time.perf_counter() - start,
+        len(buffer.getvalue()),
+        peak_mib(resource.RUSAGE_SELF),
+        0.0,
+    )
+
+
+def run_tiled(
+    size: int, scale: int, workers: int, tile_size: int, overlap: int, model: str
+):
+    image = source_image(size)
+    upscaler = TiledUpscaler(
+        max_workers=workers, tile_size=tile_size, tile_overlap=overlap, model_path=model
+    )
+    # Warm the pool up before timing, as a long-running worker would have
+    list(upscaler.upscale(Image.new("RGB", (tile_size * workers, tile_size)), scale))
+
+    start = time.perf_counter()
+    size_bytes = sum(len(chunk) for chunk in upscaler.upscale(image, scale))
+    elapsed = time.perf_counter() - start
+    upscaler.shutdown()
+    return (
+        elapsed,
+        size_bytes,
+        peak_mib(resource.RUSAGE_SELF),
+        peak_mib(resource.RUSAGE_CHILDREN),
+    )
+
+
+def report(name: str, cores: int, result, output_mp: float):
+    elapsed, size_bytes, parent, children = result
+    print(
+        f"{name:<16} {elapsed:>7.2f} s  {output_mp / elapsed:>7.2f} MP/s  "
+        f"{output_mp / elapsed / cores:>7.2f} MP/s/core  "
+        f"peak {parent:>7.1f} MiB (+{children:.1f} MiB per tile process)  "
+        f"{size_bytes / 2**20:.1f} MiB PNG"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--size", type=int, default=2048, help="Source edge length in pixels"
+    )
+    parser.add_argument("--scale", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--tile-size", type=int, default=settings.UPSCALE_TILE_SIZE)
+    parser.add_argument("--overlap", type=int, default=settings.UPSCALE_TILE_OVERLAP)
+    parser.add_argument(
+        "--model", default=settings.UPSCALE_MODEL_PATH, help="Real-ESRGAN ONNX model"
+    )
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    output_mp = (args.size * args.scale) ** 2 / 1e6
+    print(
+        f"{args.size}x{args.size} -> "
+        f"{args.size * args.scale}x{args.size * args.scale} ({output_mp:.1f} MP), "
+        f"tiles {args.tile_size}px / {args.overlap}px overlap, "
+        f"{'model ' + args.model if args.model else 'Lanczos'}"
+    )
+
+    def isolated(fn, *fn_args):
+        # A fresh process per run, so each ru_maxrss is its own
+        with ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            return executor.submit(fn, *fn_args).result()
+
+    if not args.skip_baseline:
+        report(
+            "whole image", 1, isolated(run_baseline, args.size, args.scale), output_mp
+        )
+    for workers in args.workers:
+        result = isolated(
+            run_tiled,
+            args.size,
+            args.scale,
+            workers,
+            args.tile_size,
+            args.overlap,
+            args.model,
+        )
+        report(f"tiled x{workers}", workers, result, output_mp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Segmented Video Benchmark
+
+Renders one clip through VideoPipeline twice: as a single segment on one
+GPU (the whole clip is one prompt, encoded once at the end) and as
+overlapping segments spread over --gpus stand-in GPUs with --ffmpeg-workers
+encoders. Reports total time and time until the first HLS segment is
+playable.
+
+Frames come from a stand-in generator that holds a "GPU" for --frame-ms per
+frame and writes a synthetic moving gradient; storage is a local directory.
+With --verify the finished playlist is decoded with ffmpeg to check every
+frame is there.
+
+Usage (from backend/, needs ffmpeg with libx264):
+    python -m benchmarks.bench_video_segments --duration 20 --fps 24 --gpus 4
+    python -m benchmarks.bench_video_segments --frame-ms 40 --resolution 720p --verify
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from PIL import Image, ImageChops
+
+from app.core.config import settings
+from app.services.video_pipeline import (
+    RESOLUTIONS,
+    FFmpegPool,
+    VideoPipeline,
+    plan_segments,
+)
+
+
+class StandinFrameRenderer:
+    """Renders a segment by holding one of --gpus slots, then writing gradient frames"""
+
+    def __init__(self, width: int, height: int, frame_seconds: float, gpus: int):
+        self.width = width
+        self.height = height
+        self.frame_seconds = frame_seconds
+        self.gpus = threading.Semaphore(gpus)
+        gradient = Image.linear_gradient("L")
+        self.base = Image.merge(
+            "RGB",
+            (
+                gradient.rotate(90).resize((width, height)),
+                gradient.resize((width, height)),
+                gradient.rotate(45).resize((width, height)),
+            ),
+        )
+
+    def render(self, segment, out_dir: str, cancel_check=None):
+        with self.gpus:
+            time.sleep(segment.rendered_frames * self.frame_seconds)
+
+        paths = []
+        for i in range(segment.rendered_frames):
+            shift = (segment.start_frame + i) * 4
+            path = os.path.join(out_dir, f"{i:05d}.png")
+            ImageChops.offset(self.base, shift, shift // 2).save(path, compress_level=1)
+            paths.append(path)
+        return paths
+
+
+class LocalStorage:
+    """upload_bytes into a directory, like R2 with file:// URLs"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def upload_bytes(
+        self,
+        data: bytes,
+        tenant_id: str,
+        filename: str,
+        content_type: str = "",
+        cache_control=None,
+    ) -> str:
+        path = os.path.join(self.root, tenant_id, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        return f"file://{path}"
+
+
+def decoded_frames(ffmpeg: str, playlist_path: str) -> int:
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-i", playlist_path, "-map", "0:v", "-f", "null", "-"],
+        capture_output=True,
+        text=True,
+    )
+    counts = re.findall(r"frame=\s*(\d+)", result.stderr)
+    return int(counts[-1]) if counts else 0
+
+
+def run(
+    name: str, args, segment_frames: int, overlap: int, gpus: int, storage_root: str
+):
+    width, height = RESOLUTIONS[args.resolution]
+    total_frames = args.duration * args.fps
+    segments = plan_segments(total_frames, segment_frames, overlap)
+    renderer = StandinFrameRenderer(width, height, args.frame_ms / 1000, gpus)
+    pipeline = VideoPipeline(
+        LocalStorage(storage_root),
+        FFmpegPool(max_workers=args.ffmpeg_workers, ffmpeg_path=args.ffmpeg),
+        render_concurrency=gpus,
+    )
+
+    first_segment = []
+    start = time.perf_counter()
+    result = pipeline.render(
+        renderer,
+        segments,
+        args.fps,
+        width,
+        height,
+        "bench",
+        name,
+        on_segment=lambda done, total, url: first_segment
+        or first_segment.append(time.perf_counter() - start),
+    )
+    elapsed = time.perf_counter() - start
+    pipeline.ffmpeg_pool.shutdown()
+
+    print(
+        f"{name:<10} {len(segments):>3} segments  total {elapsed:>7.2f} s  "
+        f"first segment playable {first_segment[0]:>7.2f} s"
+    )
+    if args.verify:
+        frames = decoded_frames(args.ffmpeg, result["playlist_url"][len("file://") :])
+        status = "ok" if frames == total_frames else "MISMATCH"
+        print(
+            f"{'':<10} decoded {frames} of {total_frames} frames from the playlist ({status})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--duration", type=int, default=20, help="Clip length in seconds"
+    )
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--resolution", default="480p", choices=sorted(RESOLUTIONS))
+    parser.add_argument(
+        "--frame-ms", type=float, default=20, help="Stand-in GPU time per frame"
+    )
+    parser.add_argument(
+        "--gpus", type=int, default=4, help="Stand-in GPUs (segments rendering at once)"
+    )
+    parser.add_argument(
+        "--segment-seconds", type=float, default=settings.VIDEO_SEGMENT_SECONDS
+    )
+    parser.add_argument(
+        "--overlap-frames", type=int, default=settings.VIDEO_SEGMENT_OVERLAP_FRAMES
+    )
+    parser.add_argument(
+        "--ffmpeg-workers", type=int, default=settings.VIDEO_FFMPEG_WORKERS
+    )
+    parser.add_argument("--ffmpeg", default=settings.VIDEO_FFMPEG_PATH)
+    parser.add_argument(
+        "--verify", action="store_true", help="Decode the finished playlist"
+    )
+    args = parser.parse_args()
+
+    if not shutil.which(args.ffmpeg):
+        raise SystemExit(f"ffmpeg not found at '{args.ffmpeg}'; pass --ffmpeg")
+
+    total_frames = args.duration * args.fps
+    print(
+        f"{args.duration} s at {args.fps} fps ({total_frames} frames), {args.resolution}, "
+        f"{args.frame_ms:.0f} ms/frame, {args.gpus} GPUs, {args.ffmpeg_workers} ffmpeg workers"
+    )
+    storage_root = tempfile.mkdtemp(prefix="jams-video-bench-")
+    try:
+        run("single", args, total_frames, 0, 1, storage_root)
+        run(
+            "segmented",
+            args,
+            round(args.segment_seconds * args.fps),
+            args.overlap_frames,
+            args.gpus,
+            storage_root,
+        )
+    finally:
+        shutil.rmtree(storage_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
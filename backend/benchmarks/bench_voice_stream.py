@@ -0,0 +1,135 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Streaming Voice Benchmark
+
+Synthesizes one script three ways: as a single TTS request for the whole
+script (nothing can play until it returns), through VoicePipeline one
+sentence at a time, and through VoicePipeline with --concurrency sentences
+synthesizing at once. Reports time to the first encoded audio chunk and
+total time. R2 is stood in for by draining the upload stream.
+
+Usage (from backend/, needs ffmpeg with libmp3lame):
+    python -m benchmarks.tts_standin --port 5002 &
+    python -m benchmarks.bench_voice_stream --url http://127.0.0.1:5002 --sentences 40
+
+Without --url an in-process stand-in is started.
+"""
+
+import argparse
+import asyncio
+import shutil
+import time
+
+from app.core.config import settings
+from app.services.voice_pipeline import AsyncTTSClient, VoicePipeline, split_sentences
+from benchmarks.tts_standin import start_standin
+
+SENTENCES = (
+    "The station came online a little after midnight.",
+    "Nobody had expected the signal to be that clear, or that close.",
+    "We logged every burst, tagged it, and sent the tapes upstream.",
+    "By morning the pattern was obvious: it repeated every eleven minutes.",
+    "Was it a beacon?",
+    "Nobody could say, and the people who could were not answering their phones.",
+)
+
+
+class DrainingStorage:
+    """Counts the upload stream's bytes and the time its first chunk arrived"""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.first_chunk = None
+        self.size = 0
+
+    async def upload_stream(
+        self, chunks, tenant_id: str, filename: str, content_type: str = ""
+    ) -> str:
+        async for chunk in chunks:
+            if self.first_chunk is None:
+                self.first_chunk = time.perf_counter() - self.start
+            self.size += len(chunk)
+        return f"https://r2.invalid/{tenant_id}/{filename}"
+
+
+async def bench_whole(client: AsyncTTSClient, text: str):
+    start = time.perf_counter()
+    await client.synthesize(text)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'whole':<10} {1:>4} chunks  first audio {elapsed:>7.2f} s  total {elapsed:>7.2f} s"
+    )
+
+
+async def bench(name: str, client: AsyncTTSClient, pipeline: VoicePipeline, text: str):
+    start = time.perf_counter()
+    storage = DrainingStorage(start)
+    await pipeline.render(client, storage, "bench", f"voice/{name}.mp3", text)
+    elapsed = time.perf_counter() - start
+    chunks = len(split_sentences(text, pipeline.max_chunk_chars))
+    print(
+        f"{name:<10} {chunks:>4} chunks  first audio {storage.first_chunk:>7.2f} s  "
+        f"total {elapsed:>7.2f} s  {storage.size / 1024:>8.1f} KiB"
+    )
+
+
+async def main_async(args, base_url: str, text: str):
+    client = AsyncTTSClient(base_url, max_connections=args.concurrency)
+    try:
+        await bench_whole(client, text)
+        await bench(
+            "sequential",
+            client,
+            VoicePipeline(1, args.max_chunk_chars, args.ffmpeg),
+            text,
+        )
+        await bench(
+            "sentences",
+            client,
+            VoicePipeline(args.concurrency, args.max_chunk_chars, args.ffmpeg),
+            text,
+        )
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sentences", type=int, default=30, help="Script length in sentences"
+    )
+    parser.add_argument("--concurrency", type=int, default=settings.TTS_CONCURRENCY)
+    parser.add_argument(
+        "--max-chunk-chars", type=int, default=settings.TTS_MAX_CHUNK_CHARS
+    )
+    parser.add_argument(
+        "--real-time-factor",
+        type=float,
+        default=0.3,
+        help="Stand-in synthesis speed (ignored with --url)",
+    )
+    parser.add_argument("--ffmpeg", default=settings.TTS_FFMPEG_PATH)
+    parser.add_argument(
+        "--url", help="Benchmark a real TTS server (or external stand-in)"
+    )
+    args = parser.parse_args()
+
+    if not shutil.which(args.ffmpeg):
+        raise SystemExit(f"ffmpeg not found at '{args.ffmpeg}'; pass --ffmpeg")
+
+    text = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(args.sentences))
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_standin(
+            real_time_factor=args.real_time_factor, gpus=args.concurrency
+        )
+
+    print(f"{len(text)} characters, concurrency {args.concurrency}, target {base_url}")
+    asyncio.run(main_async(args, base_url, text))
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
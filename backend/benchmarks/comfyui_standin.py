@@ -0,0 +1,188 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Local ComfyUI Stand-in
+Minimal HTTP/1.1 server that mimics the ComfyUI endpoints used by the backend
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import urlparse
+
+# 1x1 transparent PNG
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class StandinState:
+    """Shared state for the stand-in server"""
+
+    def __init__(self, render_seconds: float = 0.0):
+        self.render_seconds = render_seconds
+        self.lock = threading.Lock()
+        self.prompts: Dict[str, Dict[str, Any]] = {}
+
+    def submit(self, prompt: Dict[str, Any]) -> str:
+        prompt_id = str(uuid.uuid4())
+        with self.lock:
+            self.prompts[prompt_id] = {"prompt": prompt, "submitted": time.monotonic()}
+        return prompt_id
+
+    def pending(self) -> int:
+        return len(self.queue())
+
+    def queue(self) -> list:
+        """Unfinished prompts as ComfyUI-style [number, prompt_id] entries, oldest first"""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                [number, prompt_id]
+                for number, (prompt_id, p) in enumerate(self.prompts.items())
+                if now - p["submitted"] < self.render_seconds
+            ]
+
+    def remove(self, prompt_ids) -> None:
+        with self.lock:
+            for prompt_id in prompt_ids:
+                self.prompts.pop(prompt_id, None)
+
+    def history(self, prompt_id: str) -> Dict[str, Any]:
+        with self.lock:
+            entry = self.prompts.get(prompt_id)
+        if not entry or time.monotonic() - entry["submitted"] < self.render_seconds:
+            return {}
+
+        outputs = {}
+        for node_id, node in entry["prompt"].items():
+            if node.get("class_type") == "SaveImage":
+                count = self._batch_size(entry["prompt"], node_id)
+                outputs[node_id] = {
+                    "images": [
+                        {
+                            "filename": f"{prompt_id}_{node_id}_{i}.png",
+                            "subfolder": "",
+                            "type": "output",
+                        }
+                        for i in range(count)
+                    ]
+                }
+        return {prompt_id: {"outputs": outputs, "status": {"completed": True}}}
+
+    @staticmethod
+    def _batch_size(prompt: Dict[str, Any], node_id: str) -> int:
+        """Follow the first upstream link of each node back to its EmptyLatentImage"""
+        seen = set()
+        while node_id in prompt and node_id not in seen:
+            seen.add(node_id)
+            node = prompt[node_id]
+            if node.get("class_type") == "EmptyLatentImage":
+                return node["inputs"].get("batch_size", 1)
+            links = [
+                v
+                for k, v in node.get("inputs", {}).items()
+                if isinstance(v, list) and k != "vae"
+            ]
+            if not links:
+                break
+            node_id = (
+                links[-1][0] if node.get("class_type") == "KSampler" else links[0][0]
+            )
+        return 1
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state: StandinState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(
+        self, body: bytes, content_type: str = "application/json", status: int = 200
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload: Any, status: int = 200):
+        self._send(json.dumps(payload).encode("utf-8"), status=status)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = urlparse(self.path).path
+
+        if path == "/prompt":
+            self._send_json(
+                {"prompt_id": self.state.submit(body["prompt"]), "number": 0}
+            )
+        elif path == "/queue":
+            self.state.remove(body.get("delete", []))
+            self._send_json({})
+        elif path == "/interrupt":
+            if body.get("prompt_id"):
+                self.state.remove([body["prompt_id"]])
+            self._send_json({})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+
+        if parsed.path.startswith("/history/"):
+            self._send_json(self.state.history(parsed.path.rsplit("/", 1)[1]))
+        elif parsed.path == "/view":
+            self._send(PNG_BYTES, content_type="image/png")
+        elif parsed.path == "/queue":
+            queue = self.state.queue()
+            self._send_json({"queue_running": queue[:1], "queue_pending": queue[1:]})
+        elif parsed.path == "/system_stats":
+            self._send_json(
+                {
+                    "system": {"os": "standin"},
+                    "devices": [{"name": "cpu", "vram_free": 0}],
+                }
+            )
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+def start_standin(host: str = "127.0.0.1", port: int = 0, render_seconds: float = 0.0):
+    """
+    Start the stand-in server in a daemon thread
+
+    Returns:
+        (server, base_url) tuple; call server.shutdown() when done
+    """
+    handler = type(
+        "BoundStandinHandler",
+        (StandinHandler,),
+        {"state": StandinState(render_seconds)},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ComfyUI stand-in server")
+    parser.add_argument("--port", type=int, default=8188)
+    parser.add_argument("--render-seconds", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_standin(port=args.port, render_seconds=args.render_seconds)
+    print(f"ComfyUI stand-in listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
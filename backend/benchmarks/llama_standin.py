@@ -0,0 +1,189 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Local llama.cpp Stand-in
+Minimal HTTP/1.1 server that mimics llama.cpp server's /v1/chat/completions endpoint
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "the",
+    "signal",
+    "came",
+    "back",
+    "clearer",
+    "than",
+    "before,",
+    "and",
+    "somewhere",
+    "under",
+    "it",
+    "a",
+    "second",
+    "voice",
+    "was",
+    "counting",
+    "slowly",
+    "towards",
+    "eleven.",
+)
+
+
+class StandinState:
+    """
+    Shared state for the stand-in server
+
+    A completion holds one of `slots` for prompt_seconds (prompt
+    processing), then samples one word per seconds_per_token.
+    """
+
+    def __init__(
+        self,
+        prompt_seconds: float = 0.4,
+        seconds_per_token: float = 0.02,
+        slots: int = 4,
+    ):
+        self.prompt_seconds = prompt_seconds
+        self.seconds_per_token = seconds_per_token
+        self.slots = threading.Semaphore(slots)
+
+    def generate(self, max_tokens: int):
+        time.sleep(self.prompt_seconds)
+        for i in range(max_tokens):
+            if i:
+                time.sleep(self.seconds_per_token)
+            yield WORDS[i % len(WORDS)] + " "
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state: StandinState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _event(self, payload):
+        self._chunk(
+            b"data: "
+            + (payload if isinstance(payload, bytes) else json.dumps(payload).encode())
+            + b"\n\n"
+        )
+
+    def _chat(self, request: dict):
+        max_tokens = int(request.get("max_tokens") or 256)
+        if not request.get("messages"):
+            self._send(
+                b'{"error": {"message": "messages is required"}}',
+                "application/json",
+                status=400,
+            )
+            return
+
+        with self.state.slots:
+            if not request.get("stream"):
+                content = "".join(self.state.generate(max_tokens))
+                body = {
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "length",
+                        }
+                    ],
+                    "usage": {"completion_tokens": max_tokens},
+                }
+                self._send(json.dumps(body).encode(), "application/json")
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for token in self.state.generate(max_tokens):
+                self._event(
+                    {
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": token},
+                                "finish_reason": None,
+                            }
+                        ]
+                    }
+                )
+            self._event(
+                {"choices": [{"index": 0, "delta": {}, "finish_reason": "length"}]}
+            )
+            self._event(b"[DONE]")
+            self._chunk(b"")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path == "/v1/chat/completions":
+            self._chat(json.loads(body or b"{}"))
+        else:
+            self._send(b'{"error": "not found"}', "application/json", status=404)
+
+
+def start_standin(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    prompt_seconds: float = 0.4,
+    seconds_per_token: float = 0.02,
+    slots: int = 4,
+):
+    """
+    Start the stand-in server in a daemon thread
+
+    Returns:
+        (server, base_url) tuple; call server.shutdown() when done
+    """
+    state = StandinState(prompt_seconds, seconds_per_token, slots)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the llama.cpp stand-in server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--prompt-seconds", type=float, default=0.4, help="Prompt processing time"
+    )
+    parser.add_argument(
+        "--seconds-per-token", type=float, default=0.02, help="Sampling time per token"
+    )
+    parser.add_argument(
+        "--slots", type=int, default=4, help="Completions running at once (--parallel)"
+    )
+    args = parser.parse_args()
+
+    server, base_url = start_standin(
+        port=args.port,
+        prompt_seconds=args.prompt_seconds,
+        seconds_per_token=args.seconds_per_token,
+        slots=args.slots,
+    )
+    print(f"llama.cpp stand-in listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
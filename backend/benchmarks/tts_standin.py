@@ -0,0 +1,152 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Local TTS Stand-in
+Minimal HTTP/1.1 server that mimics the Coqui TTS server's /api/tts endpoint
+"""
+
+import io
+import math
+import struct
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_RATE = 22050
+
+
+class StandinState:
+    """
+    Shared state for the stand-in server
+
+    Speech lasts seconds_per_char per character of text; synthesizing it
+    holds one of `gpus` slots for that long times real_time_factor.
+    """
+
+    def __init__(
+        self,
+        seconds_per_char: float = 0.065,
+        real_time_factor: float = 0.3,
+        gpus: int = 4,
+    ):
+        self.seconds_per_char = seconds_per_char
+        self.real_time_factor = real_time_factor
+        self.gpus = threading.Semaphore(gpus)
+
+    def synthesize(self, text: str) -> bytes:
+        duration = len(text) * self.seconds_per_char
+        with self.gpus:
+            time.sleep(duration * self.real_time_factor)
+
+        # A tone whose pitch follows the text, so chunks are told apart by ear
+        frequency = 180 + sum(map(ord, text)) % 200
+        samples = int(duration * SAMPLE_RATE)
+        frames = b"".join(
+            struct.pack(
+                "<h", int(8000 * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+            )
+            for i in range(samples)
+        )
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(frames)
+        return buffer.getvalue()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state: StandinState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _tts(self, params):
+        text = params.get("text", [""])[0]
+        if not text:
+            self._send(b'{"error": "text is required"}', "application/json", status=400)
+            return
+        self._send(self.state.synthesize(text), "audio/wav")
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/tts":
+            self._tts(parse_qs(parsed.query))
+        else:
+            self._send(b'{"error": "not found"}', "application/json", status=404)
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        params = parse_qs(parsed.query)
+        params.update(parse_qs(self.rfile.read(length).decode()))
+        if parsed.path == "/api/tts":
+            self._tts(params)
+        else:
+            self._send(b'{"error": "not found"}', "application/json", status=404)
+
+
+def start_standin(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    seconds_per_char: float = 0.065,
+    real_time_factor: float = 0.3,
+    gpus: int = 4,
+):
+    """
+    Start the stand-in server in a daemon thread
+
+    Returns:
+        (server, base_url) tuple; call server.shutdown() when done
+    """
+    state = StandinState(seconds_per_char, real_time_factor, gpus)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the TTS stand-in server")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument(
+        "--seconds-per-char",
+        type=float,
+        default=0.065,
+        help="Speech length per character",
+    )
+    parser.add_argument(
+        "--real-time-factor",
+        type=float,
+        default=0.3,
+        help="Synthesis time / speech length",
+    )
+    parser.add_argument(
+        "--gpus", type=int, default=4, help="Chunks synthesizing at once"
+    )
+    args = parser.parse_args()
+
+    server, base_url = start_standin(
+        port=args.port,
+        seconds_per_char=args.seconds_per_char,
+        real_time_factor=args.real_time_factor,
+        gpus=args.gpus,
+    )
+    print(f"TTS stand-in listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,158 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Test Fixtures
+ComfyUI services are tested against the in-process stand-in server,
+services that keep state in Redis against REDIS_URL, and API routes
+against the Postgres database at DATABASE_URL; tests are skipped when
+Redis or Postgres is not reachable
+"""
+
+import socket
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import pytest_asyncio
+import redis
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.redis import redis_client, sync_redis_client
+from app.services import fair_scheduler
+from benchmarks.comfyui_standin import start_standin
+
+SCHEMA = Path(__file__).resolve().parents[2] / "database" / "schema.sql"
+
+
+@pytest.fixture
+def standin():
+    server, base_url = start_standin()
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def unreachable():
+    """Address of a port nothing listens on"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def sync_redis():
+    """Sync client, after checking the server is up"""
+    try:
+        sync_redis_client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not reachable at REDIS_URL")
+    return sync_redis_client
+
+
+@pytest_asyncio.fixture
+async def async_redis(sync_redis):
+    """Async client; its pool is dropped afterwards, as each test has its own loop"""
+    yield redis_client
+    await redis_client.connection_pool.disconnect()
+
+
+@pytest.fixture
+def scheduler_prefix(sync_redis, monkeypatch):
+    """Keep the fair scheduler's Redis keys apart from other tests'"""
+    prefix = f"jams:test:{uuid.uuid4()}:sched"
+    monkeypatch.setattr(fair_scheduler, "SCHEDULER_PREFIX", prefix)
+    yield prefix
+    keys = list(sync_redis.scan_iter(f"{prefix}*"))
+    if keys:
+        sync_redis.delete(*keys)
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Sync engine on DATABASE_URL, loading database/schema.sql into an empty database"""
+    engine = create_engine(settings.DATABASE_URL)
+    try:
+        with engine.begin() as conn:
+            if conn.execute(text("SELECT to_regclass('generations')")).scalar() is None:
+                conn.exec_driver_sql(SCHEMA.read_text())
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("Postgres is not reachable at DATABASE_URL")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def account(database):
+    """A tenant of its own with one active user, deleted (with its rows) afterwards"""
+    tenant_id, user_id = uuid.uuid4(), uuid.uuid4()
+    domain = f"{tenant_id.hex}.test"
+    with database.begin() as conn:
+        conn.execute(
+            text("INSERT INTO tenants (id, name, domain) VALUES (:id, :name, :domain)"),
+            {"id": tenant_id, "name": "Test Tenant", "domain": domain},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO users (id, tenant_id, email, hashed_password) "
+                "VALUES (:id, :tenant_id, :email, 'x')"
+            ),
+            {"id": user_id, "tenant_id": tenant_id, "email": f"{user_id.hex}@test"},
+        )
+    yield SimpleNamespace(tenant_id=tenant_id, user_id=user_id, domain=domain)
+    with database.begin() as conn:
+        conn.execute(text("DELETE FROM tenants WHERE id = :id"), {"id": tenant_id})
+
+
+@pytest.fixture
+def add_generation(database, account):
+    """Insert a generation row for the account's user; returns its id"""
+
+    def add(created_at=None, **columns):
+        row = {
+            "id": uuid.uuid4(),
+            "tenant_id": account.tenant_id,
+            "user_id": account.user_id,
+            "type": "image",
+            "status": "queued",
+            "prompt": "a lighthouse at dusk",
+            "model": "RealVisXL_V4.0.safetensors",
+            "created_at": created_at or datetime.now(timezone.utc),
+            **columns,
+        }
+        with database.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO generations ({', '.join(row)}) "
+                    f"VALUES ({', '.join(':' + name for name in row)})"
+                ),
+                row,
+            )
+        return row["id"]
+
+    return add
+
+
+@pytest_asyncio.fixture
+async def api(account, async_redis):
+    """HTTP client for the app, authenticated as the account's user"""
+    from app.core.database import engine
+    from app.core.security import create_access_token
+    from app.main import app
+
+    token = create_access_token(
+        {"sub": str(account.user_id), "tenant_id": str(account.tenant_id)}
+    )
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}", "X-Tenant-Domain": account.domain},
+    ) as client:
+        yield client
+    # Pooled connections belong to this test's loop
+    await engine.dispose()
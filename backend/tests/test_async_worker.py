@@ -0,0 +1,100 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Asyncio Worker Pipeline Tests
+Run against the in-process ComfyUI stand-in
+"""
+
+import os
+
+import pytest
+import pytest_asyncio
+
+from app.services.comfyui_client import PromptCancelled
+from app.services.comfyui_pool import ComfyUIPool
+from app.tasks.async_worker import AsyncImagePipeline
+from benchmarks.comfyui_standin import PNG_BYTES, start_standin
+
+
+class RecordingStorage:
+    """Collects streamed uploads in memory"""
+
+    def __init__(self):
+        self.files = {}
+
+    async def upload_stream(self, chunks, tenant_id, filename, content_type):
+        key = f"{tenant_id}/{filename}"
+        self.files[key] = b"".join([chunk async for chunk in chunks])
+        return f"https://cdn.test/{key}"
+
+
+def make_pipeline(address):
+    pool = ComfyUIPool([address])
+    # Health is not sampled during these tests
+    pool._pid = os.getpid()
+    return AsyncImagePipeline(pool, RecordingStorage(), poll_interval=0.01, timeout=5)
+
+
+@pytest_asyncio.fixture
+async def pipeline(standin):
+    pipeline = make_pipeline(standin)
+    yield pipeline
+    await pipeline.aclose()
+
+
+@pytest.mark.asyncio
+async def test_image_job_runs_through_submit_collect_and_upload(pipeline, standin):
+    queued = []
+
+    async def on_queued(node, prompt_id):
+        queued.append((node, prompt_id))
+
+    submitted = await pipeline.submit(
+        {"prompt": "a lighthouse at dusk", "seed": 7, "batch_size": 2}, on_queued
+    )
+    outputs = await pipeline.collect(submitted["node"], submitted["prompt_id"])
+    urls = await pipeline.upload(submitted["node"], outputs, "tenant")
+
+    assert queued == [(standin, submitted["prompt_id"])]
+    assert submitted["seed"] == 7
+    assert len(outputs) == 2
+    assert [url.rsplit("/", 2)[1] for url in urls] == ["tenant", "tenant"]
+    assert list(pipeline.storage.files.values()) == [PNG_BYTES, PNG_BYTES]
+
+
+@pytest.mark.asyncio
+async def test_collect_stops_once_the_job_is_cancelled():
+    server, base_url = start_standin(render_seconds=60)
+    pipeline = make_pipeline(base_url)
+    checks = []
+
+    async def cancel_check():
+        checks.append(1)
+        return "cancelled" if len(checks) >= 3 else None
+
+    try:
+        submitted = await pipeline.submit({"prompt": "a lighthouse at dusk"})
+        with pytest.raises(PromptCancelled) as cancelled:
+            await pipeline.collect(
+                submitted["node"], submitted["prompt_id"], cancel_check
+            )
+    finally:
+        await pipeline.aclose()
+        server.shutdown()
+
+    assert cancelled.value.prompt_id == submitted["prompt_id"]
+    assert cancelled.value.reason == "cancelled"
+    assert len(checks) == 3
+
+
+@pytest.mark.asyncio
+async def test_collect_gives_up_after_the_timeout():
+    server, base_url = start_standin(render_seconds=60)
+    pipeline = make_pipeline(base_url)
+    pipeline.timeout = 0.05
+
+    try:
+        submitted = await pipeline.submit({"prompt": "a lighthouse at dusk"})
+        with pytest.raises(TimeoutError):
+            await pipeline.collect(submitted["node"], submitted["prompt_id"])
+    finally:
+        await pipeline.aclose()
+        server.shutdown()
@@ -0,0 +1,162 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Client Tests
+Run against the in-process ComfyUI stand-in
+"""
+
+import os
+import threading
+
+import pytest
+
+from app.services.comfyui_client import (
+    AsyncComfyUIClient,
+    ComfyUIClient,
+    ComfyUIConnectionError,
+    ComfyUIOutputError,
+    PromptCancelled,
+)
+from benchmarks.comfyui_standin import PNG_BYTES, start_standin
+
+WORKFLOW = {"9": {"class_type": "SaveImage", "inputs": {}}}
+
+
+@pytest.mark.asyncio
+async def test_prompt_round_trip(standin):
+    client = AsyncComfyUIClient(standin, "test")
+    try:
+        prompt_id = await client.queue_prompt(WORKFLOW)
+        result = await client.wait_for_completion(prompt_id, poll_interval=0.01)
+        image = result["outputs"]["9"]["images"][0]
+
+        assert await client.get_image(image["filename"]) == PNG_BYTES
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_calls_share_one_session(standin):
+    client = AsyncComfyUIClient(standin, "test", max_connections=4)
+    try:
+        session = client.session
+        prompt_id = await client.queue_prompt(WORKFLOW)
+        for _ in range(20):
+            assert prompt_id in await client.get_history(prompt_id)
+
+        assert client.session is session
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_wait_gives_up_after_the_timeout():
+    server, base_url = start_standin(render_seconds=60)
+    client = AsyncComfyUIClient(base_url, "test")
+    try:
+        prompt_id = await client.queue_prompt(WORKFLOW)
+        with pytest.raises(TimeoutError):
+            await client.wait_for_completion(prompt_id, timeout=0.1, poll_interval=0.01)
+    finally:
+        await client.aclose()
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancel_check_runs_off_the_event_loop():
+    server, base_url = start_standin(render_seconds=60)
+    client = AsyncComfyUIClient(base_url, "test")
+    loop_thread = threading.get_ident()
+    checked_on = []
+
+    def cancel_check():
+        # Stands in for a blocking Redis read
+        checked_on.append(threading.get_ident())
+        return "cancelled"
+
+    try:
+        prompt_id = await client.queue_prompt(WORKFLOW)
+        with pytest.raises(PromptCancelled):
+            await client.wait_for_completion(
+                prompt_id, timeout=5, poll_interval=0.01, cancel_check=cancel_check
+            )
+
+        assert checked_on and loop_thread not in checked_on
+    finally:
+        await client.aclose()
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_fails_the_submission(unreachable):
+    client = AsyncComfyUIClient(unreachable, "test")
+    try:
+        with pytest.raises(ComfyUIConnectionError):
+            await client.queue_prompt(WORKFLOW)
+        # History lookups are polled, so they report nothing instead
+        assert await client.get_history("missing") == {}
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_fails_output_reads(unreachable):
+    client = AsyncComfyUIClient(unreachable, "test")
+    try:
+        with pytest.raises(ComfyUIOutputError):
+            await client.get_image("a.png")
+        with pytest.raises(ComfyUIOutputError):
+            async for _ in client.stream_image("a.png"):
+                pass
+    finally:
+        await client.aclose()
+
+
+def test_sync_client_is_shared_across_threads(standin):
+    client = ComfyUIClient(standin, "test")
+    results = []
+
+    def generate():
+        prompt_id = client.queue_prompt(WORKFLOW)
+        result = client.wait_for_completion(prompt_id, poll_interval=0.01)
+        image = result["outputs"]["9"]["images"][0]
+        results.append(client.get_image(image["filename"]))
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+
+    assert results == [PNG_BYTES] * 8
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_sync_client_works_in_a_forked_child(standin):
+    client = ComfyUIClient(standin, "test")
+    prompt_id = client.queue_prompt(WORKFLOW)
+
+    pid = os.fork()
+    if pid == 0:
+        # The parent's loop thread does not exist here
+        ok = False
+        try:
+            ok = prompt_id in client.get_history(prompt_id)
+        finally:
+            os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    client.close()
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_sync_client_streams_outputs_in_chunks(standin):
+    client = ComfyUIClient(standin, "test")
+    prompt_id = client.queue_prompt(WORKFLOW)
+    result = client.wait_for_completion(prompt_id, poll_interval=0.01)
+    image = result["outputs"]["9"]["images"][0]
+
+    chunks = list(client.iter_image(image["filename"], chunk_size=16))
+    client.close()
+
+    assert all(len(chunk) <= 16 for chunk in chunks)
+    assert b"".join(chunks) == PNG_BYTES
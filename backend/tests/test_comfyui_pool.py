@@ -0,0 +1,227 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Pool Tests
+"""
+
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.services.comfyui_client import ComfyUIConnectionError
+from app.services.comfyui_pool import ComfyUIPool
+from app.services.generation_control import (
+    PreemptionPolicy,
+    cancel_reason,
+    clear_dispatch,
+    clear_preemption,
+    record_dispatch,
+)
+from benchmarks.comfyui_standin import PNG_BYTES, start_standin
+
+
+@pytest.fixture(autouse=True)
+def polling(monkeypatch):
+    """Services built by the pool poll history instead of opening a WebSocket"""
+    monkeypatch.setattr(settings, "COMFYUI_USE_WEBSOCKET", False)
+    monkeypatch.setattr(settings, "COMFYUI_POLL_INTERVAL_SECONDS", 0.01)
+
+
+WORKFLOW = {"9": {"class_type": "SaveImage", "inputs": {}}}
+
+
+def make_pool(addresses, **kwargs):
+    pool = ComfyUIPool(addresses, health_check_timeout=1.0, **kwargs)
+    # Health is checked by the tests, not the background thread
+    pool._pid = os.getpid()
+    return pool
+
+
+def test_routes_to_the_least_loaded_node():
+    pool = make_pool(["http://a", "http://b", "http://c"])
+    for node, depth in zip(pool.nodes, [3, 0, 1]):
+        node.queue_remaining = depth
+
+    picked = [pool.select_node().address for _ in range(4)]
+
+    # Prompts sent since the last sample count as load, so they spread out
+    assert picked == ["http://b", "http://b", "http://c", "http://b"]
+
+
+def test_in_flight_breaks_ties():
+    pool = make_pool(["http://a", "http://b"])
+    pool.nodes[0].in_flight = 2
+
+    assert pool.select_node().address == "http://b"
+
+
+def test_health_check_samples_the_queue():
+    server, base_url = start_standin(render_seconds=60)
+    try:
+        pool = make_pool([base_url])
+        node = pool.nodes[0]
+        for _ in range(3):
+            node.service.queue_prompt(WORKFLOW)
+        pool.select_node()
+
+        assert pool.check_health(node)
+        assert node.queue_remaining == 3
+        assert node.dispatched_since_check == 0
+        assert node.last_checked is not None
+    finally:
+        server.shutdown()
+
+
+def test_failing_node_is_ejected_and_readmitted(standin):
+    pool = make_pool([standin, "http://other"], eject_after_failures=2)
+    node = pool.get_node(standin)
+
+    pool.record_failure(node, "submission failed")
+    assert node.healthy
+    pool.record_failure(node, "submission failed")
+    assert not node.healthy
+    assert all(pool.select_node().address == "http://other" for _ in range(3))
+
+    assert pool.check_health(node)
+    assert node.healthy
+    assert node.consecutive_failures == 0
+
+
+def test_unreachable_node_fails_its_health_checks(unreachable):
+    pool = make_pool([unreachable], eject_after_failures=2)
+    node = pool.nodes[0]
+
+    assert not pool.check_health(node)
+    assert not pool.check_health(node)
+
+    assert not node.healthy
+    with pytest.raises(ComfyUIConnectionError):
+        pool.select_node()
+
+
+def test_generation_fails_over_to_the_next_node(standin, unreachable):
+    pool = make_pool([unreachable, standin])
+    # Route to the unreachable node first
+    pool.get_node(standin).queue_remaining = 5
+
+    result = pool.generate_image(prompt="a lighthouse at dusk", steps=1)
+
+    assert result["node"] == standin
+    image = result["images"][0]
+    assert b"".join(pool.stream_output(result["node"], image)) == PNG_BYTES
+    assert pool.get_node(unreachable).consecutive_failures == 1
+    assert all(node.in_flight == 0 for node in pool.nodes)
+
+
+def test_prompts_stick_to_the_node_with_their_checkpoint_loaded():
+    pool = make_pool(["http://a", "http://b"], checkpoint_swap_penalty=2.0)
+    warm, cold = pool.nodes
+    warm.checkpoint, warm.queue_remaining = "sdxl.safetensors", 1
+
+    picked = []
+    for _ in range(3):
+        picked.append(pool.select_node("sdxl.safetensors"))
+        pool._record_checkpoint(picked[-1], "sdxl.safetensors")
+
+    # Until its queue is longer than the cost of loading the model elsewhere
+    assert picked == [warm, warm, cold]
+    assert cold.checkpoint == "sdxl.safetensors"
+    assert pool.stats()["checkpoint_hits"] == 2
+    assert pool.stats()["checkpoint_hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_prompts_without_a_checkpoint_route_by_load_alone():
+    pool = make_pool(["http://a", "http://b"])
+    pool.nodes[0].queue_remaining = 1
+    pool.nodes[1].checkpoint = "sdxl.safetensors"
+
+    assert pool.select_node().address == "http://b"
+    assert pool.stats()["checkpoint_hit_rate"] is None
+
+
+def test_node_only_takes_a_checkpoint_once_it_accepts_the_prompt(standin, unreachable):
+    pool = make_pool([unreachable, standin])
+    pool.get_node(standin).queue_remaining = 5
+    queued = []
+
+    pool.submit_image(
+        prompt="a lighthouse at dusk",
+        model="sdxl.safetensors",
+        steps=1,
+        on_queued=lambda node, prompt_id: queued.append(node),
+    )
+
+    assert queued == [standin]
+    assert pool.get_node(unreachable).checkpoint is None
+    assert pool.get_node(standin).checkpoint == "sdxl.safetensors"
+    assert pool.stats()["checkpoint_misses"] == 1
+
+
+def test_wedged_nodes_are_probed_at_once():
+    # Accepts connections but never answers, so each probe waits out its timeout
+    wedged = [socket.socket() for _ in range(3)]
+    for sock in wedged:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+    pool = make_pool([f"http://127.0.0.1:{sock.getsockname()[1]}" for sock in wedged])
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(pool.nodes)) as probes:
+            start = time.monotonic()
+            assert pool.check_all(probes) == [False, False, False]
+            # One timeout, not three
+            assert time.monotonic() - start < 2.0
+    finally:
+        for sock in wedged:
+            sock.close()
+
+
+def test_ejected_node_forgets_its_checkpoint():
+    pool = make_pool(["http://a"], eject_after_failures=1)
+    node = pool.select_node("sdxl.safetensors")
+    pool._record_checkpoint(node, "sdxl.safetensors")
+
+    pool.record_failure(node, "health check failed")
+
+    assert node.checkpoint is None
+
+
+def test_cancel_removes_a_pending_prompt_and_interrupts_a_running_one():
+    server, base_url = start_standin(render_seconds=60)
+    try:
+        service = make_pool([base_url]).nodes[0].service
+        running, pending = (service.queue_prompt(WORKFLOW) for _ in range(2))
+
+        assert service.cancel_prompt(pending) == "removed"
+        assert service.cancel_prompt(running) == "interrupted"
+        assert service.cancel_prompt(running) == "not_found"
+        assert service.get_queue() == {"queue_running": [], "queue_pending": []}
+    finally:
+        server.shutdown()
+
+
+def test_saturated_node_evicts_lower_priority_pending_prompts(sync_redis):
+    server, base_url = start_standin(render_seconds=60)
+    victim = str(uuid.uuid4())
+    try:
+        pool = make_pool(
+            [base_url], preemption_policy=PreemptionPolicy(saturation_depth=2)
+        )
+        node = pool.nodes[0]
+        node.service.queue_prompt(WORKFLOW)
+        prompt_id = node.service.queue_prompt(WORKFLOW)
+        record_dispatch(victim, base_url, prompt_id, priority=1)
+        pool.check_health(node)
+
+        pool._maybe_preempt(node, priority=9)
+
+        assert cancel_reason(victim) == "preempted"
+        assert node.service.get_queue()["queue_pending"] == []
+        assert node.queue_remaining == 1
+    finally:
+        clear_dispatch(victim)
+        clear_preemption(victim)
+        server.shutdown()
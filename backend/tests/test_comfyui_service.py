@@ -0,0 +1,60 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Service Tests
+Run against the in-process ComfyUI stand-in
+"""
+
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.services.comfyui_service import (
+    ComfyUIService,
+    _completion_key,
+    publish_completion,
+)
+
+OUTPUT = {"images": [{"filename": "a.png", "subfolder": "", "type": "output"}]}
+
+
+@pytest.fixture
+def collector(standin, monkeypatch):
+    """Service collecting prompts queued by another process's tracker"""
+    service = ComfyUIService(standin)
+    # Only its presence matters to wait_for_prompt
+    monkeypatch.setattr(service, "tracker", object())
+    return service
+
+
+@pytest.fixture
+def prompt_id(sync_redis):
+    prompt_id = str(uuid.uuid4())
+    yield prompt_id
+    sync_redis.delete(_completion_key(prompt_id))
+
+
+def test_collect_takes_the_published_completion(collector, prompt_id, monkeypatch):
+    lookups = []
+    monkeypatch.setattr(collector, "get_history", lambda *args: lookups.append(args))
+    publish_completion(prompt_id, {"outputs": {"9": OUTPUT}})
+
+    first = collector.wait_for_prompt(prompt_id, timeout=5)
+    # A retried collect still finds it
+    retried = collector.wait_for_prompt(prompt_id, timeout=5)
+
+    assert first == retried == {"outputs": {"9": OUTPUT}}
+    assert lookups == []
+
+
+def test_collect_falls_back_to_history_when_nothing_is_published(
+    collector, sync_redis, monkeypatch
+):
+    monkeypatch.setattr(settings, "COMFYUI_COLLECT_HISTORY_CHECK_SECONDS", 0.1)
+    prompt_id = collector.queue_prompt({"9": {"class_type": "SaveImage"}})
+
+    try:
+        result = collector.wait_for_prompt(prompt_id, timeout=5)
+    finally:
+        sync_redis.delete(_completion_key(prompt_id))
+
+    assert result["outputs"]
@@ -0,0 +1,209 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - ComfyUI Completion Tracker Tests
+Events are fed to the tracker directly instead of over a WebSocket
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.comfyui_tracker import ComfyUICompletionTracker
+
+OUTPUT = {"images": [{"filename": "a.png", "subfolder": "", "type": "output"}]}
+
+
+class History:
+    """/history stand-in that counts lookups"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lookups = 0
+
+    def __call__(self, prompt_id):
+        self.lookups += 1
+        return {prompt_id: self.entries[prompt_id]} if prompt_id in self.entries else {}
+
+
+@pytest.fixture
+def history():
+    return History()
+
+
+@pytest.fixture
+def tracker(history):
+    tracker = ComfyUICompletionTracker(
+        "http://comfyui:8188", "test", history_fetcher=history, poll_interval=0.01
+    )
+    # No listener thread; tests drive the socket callbacks themselves
+    tracker._pid = os.getpid()
+    yield tracker
+
+
+@pytest.fixture
+def waiter():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def send(tracker, event_type, **data):
+    tracker._on_message(None, json.dumps({"type": event_type, "data": data}))
+
+
+def until(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.005)
+
+
+def test_socket_url_follows_the_server_scheme(history):
+    plain = ComfyUICompletionTracker("http://gpu-1:8188/", "abc", history)
+    secure = ComfyUICompletionTracker("https://gpu-1", "abc", history)
+
+    assert plain.ws_url == "ws://gpu-1:8188/ws?clientId=abc"
+    assert secure.ws_url == "wss://gpu-1/ws?clientId=abc"
+
+
+def test_events_finish_the_wait_without_polling(tracker, history, waiter):
+    tracker._on_open(None)
+    progress = []
+    result = waiter.submit(
+        tracker.wait, "p1", 5, lambda event_type, data: progress.append(event_type)
+    )
+    until(lambda: tracker._prompts["p1"].listeners)
+
+    send(tracker, "progress", prompt_id="p1", value=5, max=30)
+    send(tracker, "executed", prompt_id="p1", node="9", output=OUTPUT)
+    send(tracker, "executing", prompt_id="p1", node=None)
+
+    assert result.result(timeout=1) == {"outputs": {"9": OUTPUT}}
+    assert progress == ["progress", "executed", "executing"]
+    assert history.lookups == 0
+
+
+def test_events_for_other_prompts_are_ignored(tracker, waiter):
+    tracker._on_open(None)
+    result = waiter.submit(tracker.wait, "p1", 0.2)
+
+    send(tracker, "executing", prompt_id="p2", node=None)
+
+    with pytest.raises(TimeoutError):
+        result.result(timeout=1)
+
+
+def test_fully_cached_prompt_is_read_from_history(tracker, history, waiter):
+    tracker._on_open(None)
+    history.entries["p1"] = {"outputs": {"9": OUTPUT}}
+
+    send(tracker, "execution_success", prompt_id="p1")
+
+    assert tracker.wait("p1", 1) == {"outputs": {"9": OUTPUT}}
+
+
+def test_execution_error_fails_the_wait(tracker):
+    tracker._on_open(None)
+
+    send(
+        tracker,
+        "execution_error",
+        prompt_id="p1",
+        exception_message="CUDA out of memory",
+    )
+
+    with pytest.raises(Exception, match="CUDA out of memory"):
+        tracker.wait("p1", 1)
+
+
+def test_wait_polls_history_while_the_socket_is_down(tracker, history, waiter):
+    result = waiter.submit(tracker.wait, "p1", 5)
+    until(lambda: history.lookups >= 2)
+
+    history.entries["p1"] = {"outputs": {"9": OUTPUT}}
+
+    assert result.result(timeout=1) == {"outputs": {"9": OUTPUT}}
+
+
+def test_reconnect_checks_history_for_missed_completions(tracker, history, waiter):
+    tracker._on_open(None)
+    result = waiter.submit(tracker.wait, "p1", 5)
+    until(lambda: "p1" in tracker._prompts)
+
+    # The socket dropped and came back between two checks, and the prompt
+    # finished in between; its events are lost
+    history.entries["p1"] = {"outputs": {"9": OUTPUT}}
+    tracker._on_open(None)
+
+    assert result.result(timeout=1) == {"outputs": {"9": OUTPUT}}
+
+
+def test_watched_prompt_reports_its_finish(tracker, history):
+    tracker._on_open(None)
+    finished = []
+
+    tracker.watch("p1", on_finish=lambda *args: finished.append(args))
+    send(tracker, "executed", prompt_id="p1", node="9", output=OUTPUT)
+    send(tracker, "executing", prompt_id="p1", node=None)
+
+    assert finished == [("p1", {"outputs": {"9": OUTPUT}})]
+    assert history.lookups == 0
+
+
+def test_watched_prompt_that_finished_offline_is_read_from_history(tracker, history):
+    tracker._on_open(None)
+    finished = []
+    tracker.watch("p1", on_finish=lambda *args: finished.append(args))
+
+    # The socket dropped while the prompt finished
+    history.entries["p1"] = {"outputs": {"9": OUTPUT}}
+    tracker._on_open(None)
+    tracker._on_open(None)
+
+    assert finished == [("p1", {"outputs": {"9": OUTPUT}})]
+
+
+def test_watched_prompts_are_forgotten_after_their_timeout(tracker, history):
+    tracker._on_open(None)
+    tracker.watch("p1", on_finish=lambda *args: None, timeout=0)
+
+    tracker._on_open(None)
+
+    assert "p1" not in tracker._watched
+    assert history.lookups == 0
+
+
+def test_finished_prompts_are_evicted_oldest_first(history):
+    tracker = ComfyUICompletionTracker(
+        "http://comfyui:8188", "test", history_fetcher=history, max_finished=2
+    )
+
+    for prompt_id in ("p1", "p2", "p3"):
+        send(tracker, "executing", prompt_id=prompt_id, node=None)
+
+    assert list(tracker._prompts) == ["p2", "p3"]
+
+
+def test_unfinished_prompts_nobody_waits_on_are_evicted(history, waiter):
+    tracker = ComfyUICompletionTracker(
+        "http://comfyui:8188",
+        "test",
+        history_fetcher=history,
+        poll_interval=0.01,
+        max_finished=2,
+    )
+    tracker._pid = os.getpid()
+    tracker._connected.set()
+    waited = waiter.submit(tracker.wait, "p1", timeout=5)
+    until(lambda: "p1" in tracker._prompts)
+
+    # Progress for prompts queued elsewhere, which never report a finish here
+    for prompt_id in ("other-1", "other-2", "other-3"):
+        send(tracker, "progress", prompt_id=prompt_id, value=1, max=20)
+
+    assert list(tracker._prompts) == ["p1", "other-3"]
+
+    send(tracker, "executed", prompt_id="p1", node="9", output=OUTPUT)
+    send(tracker, "executing", prompt_id="p1", node=None)
+    assert waited.result(timeout=1) == {"outputs": {"9": OUTPUT}}
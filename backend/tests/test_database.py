@@ -0,0 +1,59 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Worker Database Engine Tests
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.core import database as db_module
+from app.core.database import (
+    dispose_sync_engine,
+    init_sync_engine,
+    new_sync_session,
+    sync_session,
+)
+
+
+@pytest.fixture
+def worker_engine(database):
+    """A fresh process engine, disposed afterwards"""
+    dispose_sync_engine()
+    yield init_sync_engine()
+    dispose_sync_engine()
+
+
+def test_sessions_share_one_engine_per_process(worker_engine):
+    sessions = [new_sync_session() for _ in range(3)]
+    try:
+        assert {session.get_bind() for session in sessions} == {worker_engine}
+        assert init_sync_engine() is worker_engine
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def test_engine_is_rebuilt_after_a_fork(worker_engine, monkeypatch):
+    # As seen by a prefork child: the engine was created under another pid
+    monkeypatch.setattr(db_module, "_sync_engine_pid", -1)
+
+    with sync_session() as session:
+        assert session.get_bind() is not worker_engine
+        assert session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_sync_session_returns_its_connection_on_error(worker_engine):
+    with pytest.raises(RuntimeError):
+        with sync_session() as session:
+            session.execute(text("SELECT 1"))
+            assert worker_engine.pool.checkedout() == 1
+            raise RuntimeError("task failed")
+
+    assert worker_engine.pool.checkedout() == 0
+
+
+def test_disposed_engine_is_recreated_on_demand(worker_engine):
+    dispose_sync_engine()
+
+    with sync_session() as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+        assert session.get_bind() is not worker_engine
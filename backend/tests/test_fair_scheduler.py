@@ -0,0 +1,88 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Fair-Share Scheduler Tests
+"""
+
+from app.services.fair_scheduler import FairScheduler
+
+
+class RecordingApp:
+    """Stands in for the Celery app; records what would be published"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, kwargs=None, task_id=None, priority=None):
+        self.sent.append(task_id)
+
+
+def make_scheduler(**kwargs):
+    return FairScheduler(**{"max_in_flight": 100, "tenant_max_in_flight": 0, **kwargs})
+
+
+def enqueue(scheduler, job_id, tenant, user="user", **kwargs):
+    return scheduler.enqueue(
+        job_id, "generate_image", {"generation_id": job_id}, tenant, user, **kwargs
+    )
+
+
+def test_backlogged_tenant_does_not_starve_a_newcomer(scheduler_prefix):
+    scheduler = make_scheduler()
+    for job in ("a1", "a2", "a3"):
+        enqueue(scheduler, job, "tenant-a")
+    enqueue(scheduler, "b1", "tenant-b")
+
+    assert scheduler.dispatch(RecordingApp()) == ["a1", "b1", "a2", "a3"]
+
+
+def test_tenants_share_in_proportion_to_weight(scheduler_prefix):
+    scheduler = make_scheduler()
+    for i in range(1, 5):
+        enqueue(scheduler, f"a{i}", "tenant-a", tenant_weight=2.0)
+        enqueue(scheduler, f"b{i}", "tenant-b", tenant_weight=1.0)
+
+    order = scheduler.dispatch(RecordingApp())
+
+    assert order == ["a1", "b1", "a2", "a3", "b2", "a4", "b3", "b4"]
+
+
+def test_users_within_a_tenant_share_by_plan_weight(scheduler_prefix):
+    scheduler = make_scheduler(plan_weights={"free": 1, "pro": 3})
+    for job in ("f1", "f2", "f3"):
+        enqueue(scheduler, job, "tenant", user="free-user", plan="free")
+    for job in ("p1", "p2", "p3"):
+        enqueue(scheduler, job, "tenant", user="pro-user", plan="pro")
+
+    order = scheduler.dispatch(RecordingApp())
+
+    # The pro user gets three slots for every one of the free user's
+    assert order.index("p3") < order.index("f2")
+
+
+def test_dispatch_respects_in_flight_limits(scheduler_prefix):
+    scheduler = make_scheduler(max_in_flight=3, tenant_max_in_flight=1)
+    for job in ("a1", "a2"):
+        enqueue(scheduler, job, "tenant-a")
+    for job in ("b1", "b2"):
+        enqueue(scheduler, job, "tenant-b")
+    app = RecordingApp()
+
+    assert scheduler.dispatch(app) == ["a1", "b1"]
+    assert scheduler.dispatch(app) == []
+
+    assert scheduler.release("a1")
+    assert scheduler.dispatch(app) == ["a2"]
+    assert app.sent == ["a1", "b1", "a2"]
+
+
+def test_position_counts_jobs_ahead_until_dispatch(scheduler_prefix):
+    scheduler = make_scheduler()
+    assert enqueue(scheduler, "a1", "tenant-a") == 0
+    assert enqueue(scheduler, "a2", "tenant-a") == 1
+    # Tenant B's first job is due with tenant A's first, ahead of its second
+    assert enqueue(scheduler, "b1", "tenant-b") == 0
+    assert scheduler.position("a2") == 2
+
+    scheduler.dispatch(RecordingApp(), limit=1)
+
+    assert scheduler.position("a1") is None
+    assert scheduler.position("a2") == 1
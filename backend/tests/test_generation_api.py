@@ -0,0 +1,638 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation API Tests
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException, Response
+from sqlalchemy import text
+
+from app.api.v1 import generation as generation_api
+from app.services.generation_control import cancel_reason
+from app.services.generation_events import generation_events
+from app.services.generation_status import generation_status
+from app.services.idempotency import idempotency_store, request_fingerprint
+
+BASE = "/api/v1/generate"
+
+
+def generation_row(database, generation_id):
+    with database.connect() as conn:
+        return conn.execute(
+            text("SELECT * FROM generations WHERE id = :id"), {"id": generation_id}
+        ).one()
+
+
+# Cancellation
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_a_queued_generation(api, database, add_generation):
+    generation_id = add_generation()
+
+    response = await api.delete(f"{BASE}/{generation_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert generation_row(database, generation_id).status == "cancelled"
+    # Workers that pick the job up later skip it
+    assert cancel_reason(str(generation_id)) == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_cancel_of_a_finished_generation_conflicts(api, database, add_generation):
+    generation_id = add_generation(status="completed")
+
+    response = await api.delete(f"{BASE}/{generation_id}")
+
+    assert response.status_code == 409
+    assert generation_row(database, generation_id).status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_cancel_of_an_unknown_generation_is_not_found(api):
+    response = await api.delete(f"{BASE}/{uuid.uuid4()}")
+
+    assert response.status_code == 404
+
+
+# Dispatch
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Record jobs handed to the broker instead of queueing them"""
+    jobs = []
+
+    async def dispatch_generation(db, task, generation_ids, **kwargs):
+        jobs.append(generation_ids)
+        return str(uuid.uuid4())
+
+    monkeypatch.setattr(generation_api, "dispatch_generation", dispatch_generation)
+    return jobs
+
+
+@pytest.mark.asyncio
+async def test_image_request_is_dispatched_to_the_workers(api, database, dispatched):
+    response = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+
+    assert response.status_code == 200
+    assert dispatched == [[response.json()["id"]]]
+    assert generation_row(database, response.json()["id"]).status == "queued"
+
+
+@pytest.mark.asyncio
+async def test_unpublished_generation_is_marked_failed(
+    api, database, account, monkeypatch
+):
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(generation_api, "dispatch_generation", unavailable)
+
+    response = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+
+    assert response.status_code == 503
+    with database.connect() as conn:
+        statuses = conn.execute(
+            text("SELECT status FROM generations WHERE user_id = :user_id"),
+            {"user_id": account.user_id},
+        ).scalars()
+        assert list(statuses) == ["failed"]
+
+
+# Hot status
+
+
+@pytest.mark.asyncio
+async def test_in_flight_generation_is_read_from_hot_status(api, database, dispatched):
+    created = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+    generation_id = created.json()["id"]
+
+    generation_status.set(generation_id, status="processing", progress=40)
+    read = await api.get(f"{BASE}/{generation_id}")
+    listed = await api.get(f"{BASE}/")
+
+    assert (read.json()["status"], read.json()["progress"]) == ("processing", 40)
+    assert [(g["id"], g["status"]) for g in listed.json()] == [
+        (generation_id, "processing")
+    ]
+    assert generation_row(database, generation_id).status == "queued"
+
+
+@pytest.mark.asyncio
+async def test_cancel_sees_a_terminal_state_awaiting_the_flush(api, dispatched):
+    created = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+    generation_id = created.json()["id"]
+
+    generation_status.set(generation_id, status="completed", progress=100)
+    response = await api.delete(f"{BASE}/{generation_id}")
+
+    assert response.status_code == 409
+
+
+# Grids
+
+
+@pytest.mark.asyncio
+async def test_grid_creates_one_generation_per_cell(api, dispatched):
+    response = await api.post(
+        f"{BASE}/grid",
+        json={
+            "base": {"prompt": "a lighthouse at dusk", "seed": 3},
+            "cfgs": [5.0, 7.0],
+            "steps": [20, 30],
+        },
+    )
+
+    assert response.status_code == 200
+    grid = response.json()
+    assert [(c["cfg"], c["steps"]) for c in grid["cells"]] == [
+        (5.0, 20),
+        (5.0, 30),
+        (7.0, 20),
+        (7.0, 30),
+    ]
+    # One checkpoint, so all cells share a prompt
+    assert [len(generation_ids) for generation_ids in dispatched] == [4]
+
+    progress = await api.get(f"{BASE}/grid/{grid['grid_id']}")
+
+    assert progress.status_code == 200
+    assert progress.json()["status"] == "queued"
+    assert [c["generation_id"] for c in progress.json()["cells"]] == [
+        c["generation_id"] for c in grid["cells"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_grid_progress_reads_cells_in_flight_from_hot_status(api, dispatched):
+    created = await api.post(
+        f"{BASE}/grid",
+        json={"base": {"prompt": "a lighthouse at dusk"}, "seeds": [1, 2]},
+    )
+    grid = created.json()
+    first, second = (c["generation_id"] for c in grid["cells"])
+
+    generation_status.set(first, status="processing", progress=30)
+    generation_status.finish(second, "completed", output_url="https://cdn.test/2.webp")
+    progress = await api.get(f"{BASE}/grid/{grid['grid_id']}")
+
+    assert progress.json()["status"] == "processing"
+    assert [(c["status"], c["output_url"]) for c in progress.json()["cells"]] == [
+        ("processing", None),
+        ("completed", "https://cdn.test/2.webp"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_grid_over_the_image_limit_is_rejected(api, dispatched):
+    response = await api.post(
+        f"{BASE}/grid",
+        json={
+            "base": {"prompt": "a lighthouse at dusk"},
+            "seeds": list(range(9)),
+            "cfgs": [float(cfg) for cfg in range(1, 9)],
+        },
+    )
+
+    assert response.status_code == 400
+    assert dispatched == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("axis", [{"cfgs": [0.5, 7.0]}, {"steps": [20, 100000]}])
+async def test_grid_axes_carry_the_image_request_bounds(api, dispatched, axis):
+    response = await api.post(
+        f"{BASE}/grid", json={"base": {"prompt": "a lighthouse at dusk"}, **axis}
+    )
+
+    assert response.status_code == 422
+    assert dispatched == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_grid_is_not_found(api):
+    response = await api.get(f"{BASE}/grid/{uuid.uuid4()}")
+
+    assert response.status_code == 404
+
+
+# Idempotency-Key
+
+
+def image_request(**params):
+    return json.dumps({"prompt": "a lighthouse at dusk", **params}).encode()
+
+
+async def post_image(api, body, key):
+    return await api.post(
+        f"{BASE}/image",
+        content=body,
+        headers={"Content-Type": "application/json", "Idempotency-Key": key},
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_with_the_same_key_replays_the_generation(api, dispatched):
+    key = uuid.uuid4().hex
+
+    first = await post_image(api, image_request(), key)
+    retry = await post_image(api, image_request(), key)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert dispatched == [[first.json()["id"]]]
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_payload_is_rejected(api, dispatched):
+    key = uuid.uuid4().hex
+
+    await post_image(api, image_request(), key)
+    response = await post_image(api, image_request(steps=40), key)
+
+    assert response.status_code == 422
+    assert len(dispatched) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_racing_the_first_request_conflicts(api, account, dispatched):
+    key = uuid.uuid4().hex
+    path = f"{BASE}/image"
+    body = image_request()
+    # The first request has reserved the key and not finished yet
+    await idempotency_store.reserve(
+        f"{account.tenant_id}:{account.user_id}:{path}",
+        key,
+        request_fingerprint("POST", path, body),
+    )
+
+    response = await post_image(api, body, key)
+
+    assert response.status_code == 409
+    assert dispatched == []
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_its_key(api, monkeypatch, dispatched):
+    key = uuid.uuid4().hex
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("broker down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(generation_api, "dispatch_generation", unavailable)
+        failed = await post_image(api, image_request(), key)
+    retry = await post_image(api, image_request(), key)
+
+    assert failed.status_code == 503
+    assert retry.status_code == 200
+    assert retry.json()["id"] != failed.json().get("id")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kind, params",
+    [("text", {"prompt": "a lighthouse at dusk"}), ("voice", {"text": "Hello."})],
+)
+async def test_stream_retry_gets_the_generation_back_as_json(
+    api, account, add_generation, kind, params
+):
+    generation_id = str(add_generation(type=kind, status="completed"))
+    key = uuid.uuid4().hex
+    path = f"{BASE}/{kind}/stream"
+    body = json.dumps(params).encode()
+    scope = f"{account.tenant_id}:{account.user_id}:{path}"
+    fingerprint = request_fingerprint("POST", path, body)
+    # The first request started the stream
+    await idempotency_store.reserve(scope, key, fingerprint)
+    await idempotency_store.complete(scope, key, fingerprint, generation_id)
+
+    response = await api.post(
+        path,
+        content=body,
+        headers={"Content-Type": "application/json", "Idempotency-Key": key},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["id"] == generation_id
+
+
+# List cursors
+
+
+def test_cursor_round_trips_the_row_position():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    generation_id = uuid.uuid4()
+
+    cursor = generation_api._encode_cursor(created_at, generation_id)
+
+    assert "=" not in cursor
+    assert generation_api._decode_cursor(cursor) == (created_at, generation_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm90IGEgY3Vyc29y"])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        generation_api._decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_walk_the_list_once_newest_first(api, add_generation):
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    # Two rows share a timestamp; id breaks the tie
+    times = [start, start + timedelta(seconds=1), start + timedelta(seconds=1)]
+    times += [start + timedelta(seconds=2), start + timedelta(seconds=3)]
+    rows = [(created_at, add_generation(created_at)) for created_at in times]
+    expected = [str(generation_id) for _, generation_id in sorted(rows, reverse=True)]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await api.get(f"{BASE}/", params=params)
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == expected
+
+
+@pytest.mark.asyncio
+async def test_list_rejects_a_malformed_cursor(api):
+    response = await api.get(f"{BASE}/", params={"cursor": "not a cursor"})
+
+    assert response.status_code == 400
+
+
+# ETags
+
+
+def test_etag_is_a_strong_validator_over_its_parts():
+    etag = generation_api._etag("id", "completed", 3)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == generation_api._etag("id", "completed", 3)
+    assert etag != generation_api._etag("id", "completed", 4)
+
+
+def test_unmatched_request_gets_validator_headers():
+    response = Response()
+
+    result = generation_api._not_modified(
+        response, '"other"', '"tag"', "private, no-cache"
+    )
+
+    assert result is None
+    assert response.headers["ETag"] == '"tag"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.parametrize("if_none_match", ['"tag"', 'W/"tag"', '"old", "tag"', "*"])
+def test_matching_request_gets_304(if_none_match):
+    response = Response()
+
+    result = generation_api._not_modified(
+        response, if_none_match, '"tag"', "private, no-cache"
+    )
+
+    assert result.status_code == 304
+    assert result.headers["ETag"] == '"tag"'
+    assert "ETag" not in response.headers
+
+
+def test_only_finished_generations_are_cached_as_immutable(monkeypatch):
+    monkeypatch.setattr(generation_api.settings, "IMAGE_POSTPROCESS_ENABLED", True)
+    cache_control = generation_api._cache_control
+
+    assert "immutable" in cache_control("completed", "video", None)
+    assert "immutable" in cache_control("completed", "image", "https://cdn/thumb.webp")
+    # Post-processing will still add the thumbnail
+    assert cache_control("completed", "image", None) == "private, no-cache"
+    assert cache_control("processing", "video", None) == "private, no-cache"
+
+
+@pytest.mark.asyncio
+async def test_generation_read_revalidates_until_it_changes(
+    api, database, add_generation
+):
+    generation_id = add_generation(type="video")
+
+    first = await api.get(f"{BASE}/{generation_id}")
+    etag = first.headers["ETag"]
+    unchanged = await api.get(
+        f"{BASE}/{generation_id}", headers={"If-None-Match": etag}
+    )
+    with database.begin() as conn:
+        conn.execute(
+            text("UPDATE generations SET status = 'completed' WHERE id = :id"),
+            {"id": generation_id},
+        )
+    changed = await api.get(f"{BASE}/{generation_id}", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "immutable" in changed.headers["Cache-Control"]
+
+
+@pytest.mark.asyncio
+async def test_list_is_not_modified_until_the_users_version_moves(
+    api, account, add_generation
+):
+    add_generation()
+
+    first = await api.get(f"{BASE}/")
+    etag = first.headers["ETag"]
+    unchanged = await api.get(f"{BASE}/", headers={"If-None-Match": etag})
+    await generation_status.touch(str(account.user_id))
+    changed = await api.get(f"{BASE}/", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+# Batch status
+
+
+@pytest.mark.asyncio
+async def test_status_batch_reads_hot_and_flushed_generations(
+    api, add_generation, dispatched
+):
+    created = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+    in_flight = created.json()["id"]
+    generation_status.set(in_flight, status="processing", progress=60)
+    finished = str(
+        add_generation(status="failed", error_message="ComfyUI node unreachable")
+    )
+    # Hot status of a generation that is not the user's
+    foreign = str(uuid.uuid4())
+    generation_status.set(foreign, status="processing", progress=10)
+
+    response = await api.post(
+        f"{BASE}/status:batch",
+        json={"ids": [in_flight, finished, foreign, str(uuid.uuid4()), in_flight]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        in_flight: {"status": "processing", "progress": 60},
+        finished: {"status": "failed", "error_message": "ComfyUI node unreachable"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_status_batch_size_is_capped(api):
+    ids = [
+        str(uuid.uuid4())
+        for _ in range(generation_api.settings.GENERATION_STATUS_BATCH_MAX_IDS + 1)
+    ]
+
+    response = await api.post(f"{BASE}/status:batch", json={"ids": ids})
+
+    assert response.status_code == 422
+
+
+# Progress events
+
+
+def without_session(api, method, url, **kwargs):
+    """Request carrying no Authorization header, as EventSource sends them"""
+    request = api.build_request(method, url, **kwargs)
+    del request.headers["Authorization"]
+    return api.send(request)
+
+
+@pytest_asyncio.fixture
+async def events(api, monkeypatch):
+    """Stream events with a minted token in the query, as the image page does"""
+    monkeypatch.setattr(
+        generation_api.settings, "GENERATION_EVENTS_HEARTBEAT_SECONDS", 0.2
+    )
+
+    async def stream(generation_id):
+        minted = await api.post(f"{BASE}/{generation_id}/events/token")
+        response = await without_session(
+            api,
+            "GET",
+            f"{BASE}/{generation_id}/events",
+            params={"token": minted.json()["token"]},
+        )
+        data = [
+            line[len("data: ") :]
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        return response, [json.loads(event) for event in data]
+
+    yield stream
+    # The hub's reader task belongs to this test's loop
+    await generation_events.close()
+
+
+@pytest.mark.asyncio
+async def test_events_of_a_finished_generation_end_with_its_state(
+    events, add_generation
+):
+    generation_id = add_generation(
+        status="completed", output_url="https://cdn.test/a.webp"
+    )
+
+    response, sent = await events(generation_id)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [(e["status"], e["output_url"]) for e in sent] == [
+        ("completed", "https://cdn.test/a.webp")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_events_follow_the_worker_until_the_generation_ends(
+    api, events, dispatched
+):
+    created = await api.post(f"{BASE}/image", json={"prompt": "a lighthouse at dusk"})
+    generation_id = created.json()["id"]
+
+    async def worker():
+        await asyncio.sleep(0.3)
+        generation_status.set(generation_id, status="processing", progress=50)
+        await asyncio.sleep(0.3)
+        generation_status.finish(
+            generation_id, "completed", output_url="https://cdn.test/b.webp"
+        )
+
+    (response, sent), _ = await asyncio.gather(events(generation_id), worker())
+
+    assert [(e["status"], e["progress"]) for e in sent] == [
+        ("queued", 0),
+        ("processing", 50),
+        ("completed", 100),
+    ]
+    assert sent[-1]["output_url"] == "https://cdn.test/b.webp"
+
+
+@pytest.mark.asyncio
+async def test_events_need_a_token(api, add_generation):
+    generation_id = add_generation()
+    api.headers.pop("Authorization")
+
+    response = await api.get(f"{BASE}/{generation_id}/events")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_session_token_is_not_accepted_in_the_query(api, add_generation):
+    generation_id = add_generation()
+    session_token = api.headers["Authorization"].split()[1]
+
+    response = await without_session(
+        api,
+        "GET",
+        f"{BASE}/{generation_id}/events",
+        params={"token": session_token},
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_stream_token_only_opens_its_own_generation(api, add_generation):
+    generation_id, other_id = add_generation(), add_generation()
+    minted = await api.post(f"{BASE}/{generation_id}/events/token")
+    token = minted.json()["token"]
+
+    other_stream = await without_session(
+        api, "GET", f"{BASE}/{other_id}/events", params={"token": token}
+    )
+    read = await api.get(
+        f"{BASE}/{generation_id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert minted.json()["expires_in"] > 0
+    assert other_stream.status_code == 401
+    assert read.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_stream_token_needs_an_owned_generation(api):
+    response = await api.post(f"{BASE}/{uuid.uuid4()}/events/token")
+
+    assert response.status_code == 404
@@ -0,0 +1,87 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Cache Tests
+"""
+
+import uuid
+
+import pytest
+
+from app.services.generation_cache import GenerationCache, image_cache_key
+
+PARAMS = {
+    "prompt": "a lighthouse at dusk",
+    "negative_prompt": "",
+    "model": "RealVisXL_V4.0.safetensors",
+    "width": 1024,
+    "height": 1024,
+    "steps": 30,
+    "cfg": 7.0,
+    "sampler": "euler_ancestral",
+    "scheduler": "normal",
+    "seed": 42,
+}
+
+
+def test_random_seed_requests_are_not_cached():
+    assert image_cache_key(**{**PARAMS, "seed": -1}) is None
+
+
+def test_key_is_stable_and_ignores_fields_outside_the_workflow():
+    key = image_cache_key(**PARAMS)
+
+    assert key == image_cache_key(**PARAMS)
+    assert key == image_cache_key(**PARAMS, safety_checker=True)
+    # cfg arrives as int or float depending on the client
+    assert key == image_cache_key(**{**PARAMS, "cfg": 7})
+    assert key == image_cache_key(**{**PARAMS, "negative_prompt": None})
+
+
+def test_key_changes_with_anything_that_changes_the_image():
+    key = image_cache_key(**PARAMS)
+
+    for field, value in [
+        ("prompt", "a lighthouse at dawn"),
+        ("seed", 43),
+        ("steps", 31),
+        ("cfg", 7.5),
+        ("width", 768),
+        ("model", "juggernautXL.safetensors"),
+    ]:
+        assert image_cache_key(**{**PARAMS, field: value}) != key, field
+    assert image_cache_key(**PARAMS, batch_size=2) != key
+
+
+@pytest.fixture
+def tenant_id():
+    return uuid.uuid4().hex
+
+
+@pytest.mark.asyncio
+async def test_stored_result_is_served_and_counted(async_redis, tenant_id):
+    cache = GenerationCache(ttl_seconds=60, max_entries_per_tenant=10)
+    key = image_cache_key(**PARAMS)
+    result = {"output_urls": ["https://cdn/a.png"], "metadata": {"seed": 42}}
+
+    assert await cache.get(tenant_id, key) is None
+    cache.set(tenant_id, key, result)
+
+    assert await cache.get(tenant_id, key) == result
+    assert await cache.stats(tenant_id) == {"hits": 1, "misses": 1, "entries": 1}
+    # Entries are scoped per tenant
+    assert await cache.get(uuid.uuid4().hex, key) is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted(async_redis, tenant_id):
+    cache = GenerationCache(ttl_seconds=60, max_entries_per_tenant=2)
+    for key in ("a", "b"):
+        cache.set(tenant_id, key, {"output_urls": [key]})
+    # Reading "a" makes "b" the least recently used
+    await cache.get(tenant_id, "a")
+
+    cache.set(tenant_id, "c", {"output_urls": ["c"]})
+
+    assert await cache.get(tenant_id, "b") is None
+    assert await cache.get(tenant_id, "a") is not None
+    assert await cache.get(tenant_id, "c") is not None
+    assert (await cache.stats(tenant_id))["entries"] == 2
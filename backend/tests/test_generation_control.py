@@ -0,0 +1,180 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Control Tests
+"""
+
+import uuid
+
+import pytest
+
+from app.services.generation_control import (
+    PreemptionPolicy,
+    _cancel_key,
+    _dispatch_key,
+    _lock_key,
+    _pending_key,
+    acquire_generation_lock,
+    cancel_reason,
+    clear_dispatch,
+    clear_preemption,
+    mark_preempted,
+    record_dispatch,
+    release_generation_lock,
+    request_cancel,
+)
+
+NODE = "http://comfyui-test"
+
+
+@pytest.fixture
+def generation_id(sync_redis):
+    generation_id = str(uuid.uuid4())
+    yield generation_id
+    clear_dispatch(generation_id)
+    sync_redis.delete(_cancel_key(generation_id), _lock_key(generation_id))
+
+
+@pytest.fixture
+def node(sync_redis):
+    node = f"{NODE}-{uuid.uuid4().hex}"
+    yield node
+    sync_redis.delete(_pending_key(node))
+
+
+def test_preemption_does_not_overwrite_a_user_cancel(generation_id, sync_redis):
+    sync_redis.set(_cancel_key(generation_id), "cancelled")
+
+    mark_preempted(generation_id)
+
+    assert cancel_reason(generation_id) == "cancelled"
+
+
+def test_clear_preemption_drops_a_preemption_flag(generation_id):
+    mark_preempted(generation_id)
+
+    assert clear_preemption(generation_id) is None
+    assert cancel_reason(generation_id) is None
+
+
+def test_clear_preemption_keeps_a_user_cancel(generation_id, sync_redis):
+    sync_redis.set(_cancel_key(generation_id), "cancelled")
+
+    assert clear_preemption(generation_id) == "cancelled"
+    assert cancel_reason(generation_id) == "cancelled"
+
+
+def test_cancel_landing_after_preemption_survives_the_restart(
+    generation_id, sync_redis
+):
+    # Preempted, then cancelled by the user before the retry starts
+    mark_preempted(generation_id)
+    sync_redis.set(_cancel_key(generation_id), "cancelled")
+
+    assert clear_preemption(generation_id) == "cancelled"
+    assert cancel_reason(generation_id) == "cancelled"
+
+
+def test_clear_preemption_without_a_flag(generation_id):
+    assert clear_preemption(generation_id) is None
+
+
+@pytest.mark.asyncio
+async def test_cancel_returns_where_the_prompt_was_queued(
+    async_redis, generation_id, node
+):
+    record_dispatch(generation_id, node, "prompt-1", priority=3)
+
+    dispatch = await request_cancel(generation_id)
+
+    assert dispatch == {"node": node, "prompt_id": "prompt-1", "priority": "3"}
+    assert cancel_reason(generation_id) == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_shared_prompt_is_only_stopped_once_its_group_is_cancelled(
+    async_redis, sync_redis, node
+):
+    group = [str(uuid.uuid4()) for _ in range(2)]
+    for generation_id in group:
+        record_dispatch(generation_id, node, "prompt-1", shared_with=group)
+
+    try:
+        # Never a preemption victim
+        assert sync_redis.zcard(_pending_key(node)) == 0
+
+        assert await request_cancel(group[0]) is None
+        dispatch = await request_cancel(group[1])
+
+        assert dispatch["prompt_id"] == "prompt-1"
+    finally:
+        for generation_id in group:
+            clear_dispatch(generation_id)
+            sync_redis.delete(_cancel_key(generation_id))
+
+
+@pytest.mark.asyncio
+async def test_cancel_of_an_undispatched_generation(async_redis, generation_id):
+    assert await request_cancel(generation_id) is None
+    assert cancel_reason(generation_id) == "cancelled"
+
+
+def test_cleared_dispatch_is_no_longer_pending(sync_redis, generation_id, node):
+    record_dispatch(generation_id, node, "prompt-1")
+
+    clear_dispatch(generation_id)
+
+    assert sync_redis.zcard(_pending_key(node)) == 0
+
+
+def test_redelivered_job_is_dropped_while_the_first_holds_the_lock(generation_id):
+    token = acquire_generation_lock(generation_id)
+
+    assert token
+    assert acquire_generation_lock(generation_id) is None
+
+    release_generation_lock(generation_id, token)
+    assert acquire_generation_lock(generation_id)
+
+
+def test_lock_is_only_released_by_its_holder(generation_id, sync_redis):
+    token = acquire_generation_lock(generation_id)
+
+    release_generation_lock(generation_id, "another worker")
+
+    assert sync_redis.get(_lock_key(generation_id)) == token
+
+
+def test_only_lower_priority_prompts_on_a_saturated_node_are_victims(node):
+    policy = PreemptionPolicy(saturation_depth=4, max_victims=2)
+    low, mid, high = (str(uuid.uuid4()) for _ in range(3))
+    record_dispatch(low, node, "p-low", priority=1)
+    record_dispatch(mid, node, "p-mid", priority=5)
+    record_dispatch(high, node, "p-high", priority=9)
+
+    try:
+        assert policy.select_victims(node, node_load=3, priority=9) == []
+        assert policy.select_victims(node, node_load=4, priority=9) == [
+            (low, "p-low"),
+            (mid, "p-mid"),
+        ]
+        # Equal priority never preempts
+        assert policy.select_victims(node, node_load=4, priority=1) == []
+    finally:
+        for generation_id in (low, mid, high):
+            clear_dispatch(generation_id)
+
+
+def test_entries_left_by_dead_workers_are_pruned_not_preempted(node, sync_redis):
+    policy = PreemptionPolicy(saturation_depth=1, max_victims=1)
+    dead, live = str(uuid.uuid4()), str(uuid.uuid4())
+    record_dispatch(dead, node, "p-dead", priority=1)
+    record_dispatch(live, node, "p-live", priority=2)
+    # The dead worker's dispatch record expired without clear_dispatch
+    sync_redis.delete(_dispatch_key(dead))
+
+    try:
+        assert policy.select_victims(node, node_load=4, priority=9) == [
+            (live, "p-live")
+        ]
+        assert sync_redis.zrange(_pending_key(node), 0, -1) == [f"{live}:p-live"]
+    finally:
+        clear_dispatch(live)
@@ -0,0 +1,62 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Progress Event Tests
+"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.services.generation_events import GenerationEventHub
+from app.services.generation_status import events_channel, generation_status
+
+
+@pytest_asyncio.fixture
+async def hub(async_redis):
+    hub = GenerationEventHub(queue_size=4)
+    yield hub
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_updates_reach_subscribers(hub):
+    generation_id = str(uuid.uuid4())
+
+    async with hub.subscribe(generation_id) as queue:
+        await asyncio.to_thread(
+            generation_status.set, generation_id, status="processing", progress=40
+        )
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+
+    assert event == {"status": "processing", "progress": 40}
+
+
+@pytest.mark.asyncio
+async def test_subscribers_only_see_their_generation(hub, async_redis):
+    watched, other = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async with hub.subscribe(watched) as queue:
+        await async_redis.publish(events_channel(other), json.dumps({"progress": 10}))
+        await async_redis.publish(events_channel(watched), json.dumps({"progress": 20}))
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+
+    assert event == {"progress": 20}
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_events_instead_of_blocking(hub, async_redis):
+    generation_id = str(uuid.uuid4())
+
+    async with hub.subscribe(generation_id) as slow, hub.subscribe(
+        generation_id
+    ) as fast:
+        for progress in range(6):
+            await async_redis.publish(
+                events_channel(generation_id), json.dumps({"progress": progress})
+            )
+            await asyncio.wait_for(fast.get(), timeout=5)
+
+    assert slow.qsize() == hub.queue_size
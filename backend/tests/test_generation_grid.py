@@ -0,0 +1,71 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Parameter Grid Tests
+"""
+
+from app.services.generation_grid import expand_grid, plan_grid_prompts
+
+BASE = {
+    "prompt": "a lighthouse at dusk",
+    "model": "RealVisXL_V4.0.safetensors",
+    "seed": -1,
+    "cfg": 7.0,
+    "steps": 30,
+}
+
+
+def test_cells_are_the_row_major_product_of_the_axes():
+    cells = expand_grid(BASE, seeds=[1, 2], cfgs=[5.0, 7.0], steps=[20, 30])
+
+    assert [(c["seed"], c["cfg"], c["steps"]) for c in cells] == [
+        (1, 5.0, 20),
+        (1, 5.0, 30),
+        (1, 7.0, 20),
+        (1, 7.0, 30),
+        (2, 5.0, 20),
+        (2, 5.0, 30),
+        (2, 7.0, 20),
+        (2, 7.0, 30),
+    ]
+    assert all(c["prompt"] == BASE["prompt"] for c in cells)
+
+
+def test_empty_axes_keep_the_base_value():
+    cells = expand_grid({**BASE, "seed": 5}, cfgs=[4.0, 8.0])
+
+    assert [(c["seed"], c["cfg"], c["steps"]) for c in cells] == [
+        (5, 4.0, 30),
+        (5, 8.0, 30),
+    ]
+
+
+def test_random_seeds_are_resolved_once_per_seed_axis_value():
+    cells = expand_grid(BASE, seeds=[-1, -1, 7], cfgs=[5.0, 7.0], steps=[20, 30])
+
+    rows = [cells[i : i + 4] for i in range(0, len(cells), 4)]
+    row_seeds = [{c["seed"] for c in row} for row in rows]
+    # Every cfg/steps cell in a row renders the same seed...
+    assert all(len(seeds) == 1 for seeds in row_seeds)
+    first, second, third = (seeds.pop() for seeds in row_seeds)
+    # ...and the random rows get distinct, concrete seeds
+    assert first != -1 and second != -1 and first != second
+    assert third == 7
+
+
+def test_random_base_seed_is_resolved_when_only_cfg_or_steps_sweep():
+    cells = expand_grid(BASE, cfgs=[5.0, 7.0], steps=[20, 30])
+
+    assert len({c["seed"] for c in cells}) == 1
+    assert cells[0]["seed"] != -1
+
+
+def test_prompts_pack_cells_by_checkpoint_up_to_max_batch():
+    cells = [
+        {"model": "a"},
+        {"model": "b"},
+        {"model": "a"},
+        {"model": "a", "batch_size": 2},
+        {"model": "b"},
+    ]
+
+    assert plan_grid_prompts(cells, max_batch=3) == [[0, 2], [3], [1, 4]]
+    assert plan_grid_prompts(cells, max_batch=8) == [[0, 2, 3], [1, 4]]
@@ -0,0 +1,174 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Job Dispatch Tests
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.generation_control import broker_priority
+from app.services.generation_jobs import dispatch_generation
+from app.tasks.generation_tasks import mark_job_finished, mark_job_started
+
+
+class RecordingApp:
+    """Stands in for the Celery app the scheduler publishes through"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, kwargs=None, task_id=None, priority=None):
+        self.sent.append(task_id)
+
+
+class RecordingTask:
+    """Stands in for a Celery task; publishing fails when given an error"""
+
+    name = "generate_image"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.published = []
+        self.app = RecordingApp()
+
+    def apply_async(self, **options):
+        if self.error:
+            raise self.error
+        self.published.append(options)
+
+
+@pytest.fixture
+def unscheduled(monkeypatch):
+    """Publish straight to the broker"""
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", False)
+
+
+@pytest_asyncio.fixture
+async def db(database):
+    from app.core.database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as session:
+        yield session
+    await engine.dispose()
+
+
+def job_statuses(database, task_id):
+    with database.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT generation_id, status FROM generation_jobs "
+                "WHERE celery_task_id = :task_id ORDER BY generation_id"
+            ),
+            {"task_id": task_id},
+        ).all()
+
+
+async def dispatch(db, account, task, generation_ids, priority=5):
+    return await dispatch_generation(
+        db,
+        task,
+        generation_ids=[str(generation_id) for generation_id in generation_ids],
+        tenant_id=str(account.tenant_id),
+        user_id=str(account.user_id),
+        kwargs={"prompt": "a lighthouse at dusk"},
+        priority=priority,
+    )
+
+
+def test_higher_priorities_are_served_first_by_the_broker():
+    assert broker_priority(9) == 0
+    assert broker_priority(0) == 9
+    assert broker_priority(5) < broker_priority(4)
+    # Out-of-range tenant settings are clamped
+    assert broker_priority(42) == 0
+    assert broker_priority(-1) == 9
+
+
+@pytest.mark.asyncio
+async def test_job_rows_are_recorded_before_the_task_is_published(
+    db, database, account, add_generation, unscheduled
+):
+    generation_ids = sorted([add_generation(), add_generation()])
+    task = RecordingTask()
+
+    task_id = await dispatch(db, account, task, generation_ids, priority=8)
+
+    assert job_statuses(database, task_id) == [
+        (generation_id, "queued") for generation_id in generation_ids
+    ]
+    assert task.published == [
+        {
+            "kwargs": {"prompt": "a lighthouse at dusk"},
+            "task_id": task_id,
+            "priority": 1,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unpublished_job_is_marked_failed(
+    db, database, account, add_generation, unscheduled
+):
+    generation_id = add_generation()
+
+    with pytest.raises(ConnectionError):
+        await dispatch(
+            db, account, RecordingTask(ConnectionError("broker down")), [generation_id]
+        )
+
+    with database.connect() as conn:
+        status = conn.execute(
+            text("SELECT status FROM generation_jobs WHERE generation_id = :id"),
+            {"id": generation_id},
+        ).scalar_one()
+    assert status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_scheduled_job_records_its_queue_position(
+    db, database, account, add_generation, scheduler_prefix
+):
+    generation_id = add_generation()
+    task = RecordingTask()
+
+    task_id = await dispatch(db, account, task, [generation_id])
+
+    with database.connect() as conn:
+        position = conn.execute(
+            text(
+                "SELECT queue_position FROM generation_jobs WHERE generation_id = :id"
+            ),
+            {"id": generation_id},
+        ).scalar_one()
+    assert position == 0
+    # Released by the scheduler rather than published directly
+    assert task.published == []
+    assert task.app.sent == [task_id]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "state, retval, expected",
+    [
+        ("SUCCESS", {"status": "completed"}, "completed"),
+        ("SUCCESS", {"status": "cancelled"}, "cancelled"),
+        ("RETRY", None, "queued"),
+        ("FAILURE", None, "failed"),
+    ],
+)
+async def test_worker_signals_move_the_job_through_its_states(
+    db, database, account, add_generation, unscheduled, state, retval, expected
+):
+    generation_id = add_generation()
+    task = RecordingTask()
+    task_id = await dispatch(db, account, task, [generation_id])
+    worker_task = SimpleNamespace(name=task.name)
+
+    mark_job_started(task_id=task_id, task=worker_task)
+    assert job_statuses(database, task_id) == [(generation_id, "processing")]
+
+    mark_job_finished(task_id=task_id, task=worker_task, retval=retval, state=state)
+    assert job_statuses(database, task_id) == [(generation_id, expected)]
@@ -0,0 +1,147 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Hot Generation Status Tests
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.services import generation_status as generation_status_module
+from app.services.generation_status import FLUSH_GROUP, GenerationStatusStore
+
+
+@pytest.fixture
+def store(sync_redis, database, monkeypatch):
+    """A store flushing through a stream of its own"""
+    stream = f"jams:test:{uuid.uuid4()}:flush"
+    monkeypatch.setattr(generation_status_module, "FLUSH_STREAM", stream)
+    yield GenerationStatusStore(
+        ttl_seconds=60, flush_batch_size=100, flush_block_ms=10, claim_idle_ms=60000
+    )
+    sync_redis.delete(stream)
+
+
+def generation(database, generation_id):
+    with database.connect() as conn:
+        return conn.execute(
+            text("SELECT * FROM generations WHERE id = :id"), {"id": generation_id}
+        ).one()
+
+
+@pytest.mark.asyncio
+async def test_in_flight_updates_stay_in_redis(
+    store, async_redis, database, add_generation
+):
+    generation_id = str(add_generation())
+
+    store.set(generation_id, status="processing", progress=40, node="http://gpu-1")
+
+    hot = await store.get(generation_id)
+    # Postgres is not written until the generation finishes
+    assert generation(database, generation_id).status == "queued"
+    assert hot["status"] == "processing"
+    assert hot["progress"] == 40
+    assert hot["node"] == "http://gpu-1"
+    assert await store.get_many([generation_id, str(uuid.uuid4())]) == {
+        generation_id: hot
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_terminal_states_and_drops_the_hashes(
+    store, async_redis, database, add_generation
+):
+    done, failed = str(add_generation()), str(add_generation())
+    store.finish(
+        done,
+        "completed",
+        output_url="https://cdn/a.png",
+        output_urls=["https://cdn/a.png"],
+        processing_time_seconds=12,
+        metadata={"seed": 7},
+    )
+    store.finish(failed, "failed", error_message="ComfyUI error")
+
+    assert (await store.get(done))["progress"] == 100
+    assert store.flush("test") == 2
+
+    row = generation(database, done)
+    assert (row.status, row.output_url, row.processing_time_seconds) == (
+        "completed",
+        "https://cdn/a.png",
+        12,
+    )
+    assert row.metadata == {"seed": 7}
+    assert generation(database, failed).error_message == "ComfyUI error"
+    assert await store.get(done) is None
+    assert store.flush("test") == 0
+
+
+def test_flush_merges_metadata_written_first(store, database, add_generation):
+    generation_id = str(add_generation())
+    with database.begin() as conn:
+        conn.execute(
+            text(
+                'UPDATE generations SET metadata = \'{"thumbnail_url": "t"}\' '
+                "WHERE id = :id"
+            ),
+            {"id": generation_id},
+        )
+
+    store.finish(generation_id, "completed", metadata={"seed": 7})
+    store.flush("test")
+
+    assert generation(database, generation_id).metadata == {
+        "thumbnail_url": "t",
+        "seed": 7,
+    }
+
+
+def test_flush_keeps_a_row_the_api_cancelled(store, database, add_generation):
+    generation_id = str(add_generation(status="cancelled"))
+
+    store.finish(generation_id, "completed", output_url="https://cdn/a.png")
+    store.flush("test")
+
+    row = generation(database, generation_id)
+    assert (row.status, row.output_url) == ("cancelled", None)
+
+
+@pytest.mark.asyncio
+async def test_annotations_merge_into_a_finished_row(
+    store, async_redis, database, add_generation, account
+):
+    generation_id = str(add_generation())
+    user_id = str(account.user_id)
+    store.finish(generation_id, "completed", metadata={"seed": 7})
+    store.flush("test")
+    version = await store.version(user_id)
+
+    store.annotate(generation_id, user_id, {"thumbnail_url": "t"})
+    store.annotate(generation_id, user_id, {"formats": {"webp": "w"}})
+
+    assert store.flush("test") == 1
+    row = generation(database, generation_id)
+    assert row.status == "completed"
+    assert row.metadata == {"seed": 7, "thumbnail_url": "t", "formats": {"webp": "w"}}
+    # Cached list responses of the owner are revalidated
+    assert await store.version(user_id) != version
+
+
+def test_batch_read_by_a_dead_flusher_is_reclaimed(
+    store, sync_redis, database, add_generation
+):
+    generation_id = str(add_generation())
+    store.finish(generation_id, "completed", output_url="https://cdn/a.png")
+    store._ensure_group()
+    # Another flusher reads the entry, then dies before writing it
+    sync_redis.xreadgroup(
+        FLUSH_GROUP, "dead", {generation_status_module.FLUSH_STREAM: ">"}, count=10
+    )
+    assert store.flush("live") == 0
+
+    store.claim_idle_ms = 0
+
+    assert store.flush("live") == 1
+    assert generation(database, generation_id).status == "completed"
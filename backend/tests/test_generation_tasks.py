@@ -0,0 +1,203 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Generation Task Tests
+"""
+
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.comfyui_pool import ComfyUIPool
+from app.services.generation_control import _cancel_key, _dispatch_key
+from app.services.generation_status import generation_status
+from app.tasks import generation_tasks
+from app.tasks.generation_tasks import (
+    _finished_status,
+    generate_image_grid_task,
+    mark_job_finished,
+)
+from benchmarks.comfyui_standin import start_standin
+
+
+@pytest.fixture
+def generation(sync_redis):
+    generation = SimpleNamespace(id=uuid.uuid4(), status="queued")
+    yield generation
+    sync_redis.delete(generation_status._key(str(generation.id)))
+
+
+def test_unfinished_generation_is_rendered(generation):
+    generation_status.set(str(generation.id), status="processing")
+
+    assert _finished_status(generation) is None
+
+
+@pytest.mark.parametrize("status", ["completed", "failed", "cancelled"])
+def test_finished_row_stops_a_redelivery(generation, status):
+    generation.status = status
+
+    assert _finished_status(generation) == status
+
+
+def test_finish_awaiting_the_flush_stops_a_redelivery(generation):
+    generation_status.finish(str(generation.id), "completed")
+
+    assert _finished_status(generation) == "completed"
+
+
+@pytest.mark.parametrize(
+    "retval, recorded",
+    [
+        ({"generation_id": "g", "status": "failed"}, "failed"),
+        ({"generation_id": "g", "status": "cancelled"}, "cancelled"),
+        ({"generation_id": "g", "status": "completed"}, "completed"),
+        ({"generation_id": "g"}, "completed"),
+        (None, "completed"),
+    ],
+)
+def test_redelivery_records_the_status_its_first_run_finished_with(
+    monkeypatch, retval, recorded
+):
+    finished = []
+    monkeypatch.setattr(
+        generation_tasks, "_finish_job", lambda *args: finished.append(args)
+    )
+
+    mark_job_finished(
+        task_id="job-1",
+        task=SimpleNamespace(name="generate_image"),
+        retval=retval,
+        state="SUCCESS",
+    )
+
+    assert finished == [("job-1", recorded)]
+
+
+@pytest.fixture
+def grid_node(monkeypatch):
+    """Render grid prompts on a stand-in node; outputs keep their ComfyUI names"""
+    server, base_url = start_standin(render_seconds=0.2)
+    monkeypatch.setattr(settings, "COMFYUI_USE_WEBSOCKET", False)
+    monkeypatch.setattr(settings, "COMFYUI_POLL_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "IMAGE_POSTPROCESS_ENABLED", False)
+    pool = ComfyUIPool([base_url], health_check_timeout=1.0)
+    pool._pid = os.getpid()
+    monkeypatch.setattr(generation_tasks, "comfyui_pool", pool)
+    monkeypatch.setattr(
+        generation_tasks,
+        "upload_output",
+        lambda node, output, tenant: output["filename"],
+    )
+    yield server.RequestHandlerClass.state
+    server.shutdown()
+
+
+def grid_cell(generation_id, seed):
+    return {
+        "generation_id": str(generation_id),
+        "params": {
+            "prompt": "a lighthouse at dusk",
+            "model": "RealVisXL_V4.0.safetensors",
+            "seed": seed,
+        },
+    }
+
+
+def test_grid_redelivery_only_renders_unfinished_cells(
+    grid_node, add_generation, account, sync_redis
+):
+    rendered = add_generation(status="processing")
+    flushed = add_generation(status="completed")
+    awaiting_flush = add_generation(status="processing")
+    generation_status.finish(str(awaiting_flush), "completed")
+    cells = [
+        grid_cell(g, seed) for seed, g in enumerate([flushed, rendered, awaiting_flush])
+    ]
+
+    result = generate_image_grid_task.run(
+        str(uuid.uuid4()), str(account.tenant_id), cells
+    )
+
+    assert result["status"] == "completed"
+    assert result["generation_ids"] == [str(rendered)]
+    assert generation_status.current_status(str(awaiting_flush)) == "completed"
+
+
+def start_grid(tenant_id, cells):
+    """Run the grid task in a thread; returns (thread, result holder)"""
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(
+            generate_image_grid_task.run(str(uuid.uuid4()), str(tenant_id), cells)
+        )
+    )
+    thread.start()
+    return thread, result
+
+
+def wait_for_dispatch(sync_redis, generation_id):
+    deadline = time.monotonic() + 5
+    while not sync_redis.exists(_dispatch_key(generation_id)):
+        assert time.monotonic() < deadline, "grid prompt was never dispatched"
+        time.sleep(0.01)
+    return sync_redis.hgetall(_dispatch_key(generation_id))
+
+
+@pytest.fixture
+def cancelled(sync_redis):
+    """Cancel generations the way the API does; flags are removed afterwards"""
+    flagged = []
+
+    def cancel(generation_id):
+        flagged.append(str(generation_id))
+        sync_redis.set(_cancel_key(str(generation_id)), "cancelled")
+
+    yield cancel
+    if flagged:
+        sync_redis.delete(*(_cancel_key(g) for g in flagged))
+
+
+def test_grid_prompt_is_abandoned_once_every_cell_is_cancelled(
+    grid_node, add_generation, account, sync_redis, cancelled
+):
+    grid_node.render_seconds = 60
+    ids = [add_generation(status="queued") for _ in range(2)]
+    thread, result = start_grid(
+        account.tenant_id, [grid_cell(g, seed) for seed, g in enumerate(ids)]
+    )
+
+    first = wait_for_dispatch(sync_redis, str(ids[0]))
+    second = wait_for_dispatch(sync_redis, str(ids[1]))
+    assert first["prompt_id"] == second["prompt_id"]
+
+    for generation_id in ids:
+        cancelled(generation_id)
+    thread.join(timeout=10)
+
+    assert result["status"] == "cancelled"
+    assert [generation_status.current_status(str(g)) for g in ids] == [
+        "cancelled",
+        "cancelled",
+    ]
+    assert not sync_redis.exists(_dispatch_key(str(ids[0])))
+
+
+def test_grid_keeps_rendering_the_cells_still_wanted(
+    grid_node, add_generation, account, sync_redis, cancelled
+):
+    grid_node.render_seconds = 0.5
+    kept, dropped = (add_generation(status="queued") for _ in range(2))
+    thread, result = start_grid(
+        account.tenant_id, [grid_cell(kept, 1), grid_cell(dropped, 2)]
+    )
+
+    wait_for_dispatch(sync_redis, str(dropped))
+    cancelled(dropped)
+    thread.join(timeout=10)
+
+    assert result["status"] == "completed"
+    assert result["generation_ids"] == [str(kept)]
@@ -0,0 +1,82 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Idempotency Key Tests
+"""
+
+import uuid
+
+import pytest
+
+from app.services.idempotency import IdempotencyStore, request_fingerprint
+
+FINGERPRINT = request_fingerprint("POST", "/api/v1/generate/image", b'{"prompt": "a"}')
+
+
+@pytest.fixture
+def scope():
+    return f"test:{uuid.uuid4()}"
+
+
+@pytest.fixture
+def store(async_redis):
+    return IdempotencyStore(ttl_seconds=60, pending_ttl_seconds=5)
+
+
+def test_fingerprint_covers_route_and_body():
+    assert FINGERPRINT == request_fingerprint(
+        "POST", "/api/v1/generate/image", b'{"prompt": "a"}'
+    )
+    assert FINGERPRINT != request_fingerprint(
+        "POST", "/api/v1/generate/video", b'{"prompt": "a"}'
+    )
+    assert FINGERPRINT != request_fingerprint(
+        "POST", "/api/v1/generate/image", b'{"prompt": "b"}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_first_request_reserves_and_retries_see_it_pending(store, scope):
+    assert await store.reserve(scope, "key", FINGERPRINT) is None
+
+    assert await store.reserve(scope, "key", FINGERPRINT) == {
+        "fingerprint": FINGERPRINT,
+        "resource_id": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_completed_key_replays_the_created_resource(store, scope, async_redis):
+    await store.reserve(scope, "key", FINGERPRINT)
+    await store.complete(scope, "key", FINGERPRINT, "generation-1")
+
+    assert await store.reserve(scope, "key", FINGERPRINT) == {
+        "fingerprint": FINGERPRINT,
+        "resource_id": "generation-1",
+    }
+    # Completed records outlive the pending TTL
+    assert await async_redis.ttl(store._key(scope, "key")) > store.pending_ttl_seconds
+
+
+@pytest.mark.asyncio
+async def test_reused_key_reports_the_original_fingerprint(store, scope):
+    other = request_fingerprint("POST", "/api/v1/generate/image", b'{"prompt": "b"}')
+    await store.reserve(scope, "key", FINGERPRINT)
+
+    record = await store.reserve(scope, "key", other)
+
+    assert record["fingerprint"] == FINGERPRINT
+
+
+@pytest.mark.asyncio
+async def test_released_key_can_be_reserved_again(store, scope):
+    await store.reserve(scope, "key", FINGERPRINT)
+    await store.release(scope, "key")
+
+    assert await store.reserve(scope, "key", FINGERPRINT) is None
+    await store.release(scope, "key")
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped(store, scope):
+    await store.reserve(scope, "key", FINGERPRINT)
+
+    assert await store.reserve(f"{scope}:other-user", "key", FINGERPRINT) is None
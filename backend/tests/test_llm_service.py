@@ -0,0 +1,72 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - LLM Service Tests
+"""
+
+import pytest
+
+from app.services.llm_service import (
+    AsyncLlamaCppClient,
+    LlamaCppClient,
+    LLMError,
+    TokenStats,
+)
+from benchmarks.llama_standin import WORDS, start_standin
+
+
+@pytest.fixture
+def llama():
+    server, base_url = start_standin(prompt_seconds=0.05, seconds_per_token=0.01)
+    yield base_url
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reply_is_streamed_token_by_token(llama):
+    client = AsyncLlamaCppClient(llama)
+    stats = TokenStats()
+
+    tokens = [
+        token
+        async for token in client.stream(
+            "hello", max_tokens=5, temperature=0.7, stats=stats
+        )
+    ]
+    await client.close()
+
+    assert tokens == [word + " " for word in WORDS[:5]]
+    assert stats.tokens == 5
+    assert stats.finish_reason == "length"
+    assert 0 < stats.time_to_first_token
+    assert stats.as_metadata()["tokens_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_raises_llm_error(unreachable):
+    client = AsyncLlamaCppClient(unreachable)
+
+    with pytest.raises(LLMError):
+        async for _ in client.stream("hello", max_tokens=5, temperature=0.7):
+            pass
+    await client.close()
+
+
+def test_sync_client_reuses_one_pool_across_streams(llama):
+    client = LlamaCppClient(llama)
+
+    first = "".join(client.iter_stream("hello", max_tokens=3, temperature=0.7))
+    session = client._async_client._session
+    second = "".join(client.iter_stream("again", max_tokens=3, temperature=0.7))
+
+    assert first == second == "".join(word + " " for word in WORDS[:3])
+    assert client._async_client._session is session
+
+
+def test_sync_client_stream_can_be_abandoned(llama):
+    client = LlamaCppClient(llama)
+
+    tokens = client.iter_stream("hello", max_tokens=50, temperature=0.7)
+    assert next(tokens) == WORDS[0] + " "
+    tokens.close()
+
+    # The loop is free for the next task
+    assert "".join(client.iter_stream("again", max_tokens=2, temperature=0.7))
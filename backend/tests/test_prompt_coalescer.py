@@ -0,0 +1,120 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Prompt Coalescer Tests
+"""
+
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services.comfyui_pool import ComfyUIPool
+from app.services.prompt_coalescer import (
+    CHECKPOINT_NODE,
+    CoalescedRequest,
+    PromptCoalescer,
+    build_coalesced_workflow,
+)
+
+
+def request(**params):
+    return CoalescedRequest({"prompt": "a lighthouse at dusk", **params})
+
+
+def nodes_of_type(workflow, class_type):
+    return {
+        node_id: node
+        for node_id, node in workflow.items()
+        if node["class_type"] == class_type
+    }
+
+
+def test_random_seed_requests_with_one_prompt_share_a_batch():
+    requests = [request(batch_size=1), request(batch_size=2), request(batch_size=1)]
+
+    workflow, slices = build_coalesced_workflow(requests, seed=1234)
+
+    latents = nodes_of_type(workflow, "EmptyLatentImage")
+    assert len(latents) == 1
+    assert next(iter(latents.values()))["inputs"]["batch_size"] == 4
+
+    save_node = next(iter(nodes_of_type(workflow, "SaveImage")))
+    assert slices == [
+        (save_node, 0, 1, 1234),
+        (save_node, 1, 2, 1234),
+        (save_node, 3, 1, 1234),
+    ]
+
+
+def test_seeded_and_differently_prompted_requests_get_their_own_branches():
+    requests = [
+        request(seed=7),
+        request(seed=7),
+        request(prompt="a harbour in fog"),
+    ]
+
+    workflow, slices = build_coalesced_workflow(requests, seed=99)
+
+    assert len(nodes_of_type(workflow, "KSampler")) == 3
+    assert len({save_node for save_node, _, _, _ in slices}) == 3
+    assert [seed for _, _, _, seed in slices] == [7, 7, 99]
+    assert [(offset, count) for _, offset, count, _ in slices] == [(0, 1)] * 3
+
+
+def test_branches_share_one_checkpoint_loader():
+    requests = [request(seed=1), request(seed=2)]
+
+    workflow, _ = build_coalesced_workflow(requests)
+
+    assert list(nodes_of_type(workflow, "CheckpointLoaderSimple")) == [CHECKPOINT_NODE]
+    for node in workflow.values():
+        for value in node["inputs"].values():
+            if isinstance(value, list):
+                # Every link points at a node that exists in the merged workflow
+                assert value[0] in workflow
+
+
+@pytest.fixture
+def coalescer(standin, monkeypatch):
+    monkeypatch.setattr(settings, "COMFYUI_USE_WEBSOCKET", False)
+    monkeypatch.setattr(settings, "COMFYUI_POLL_INTERVAL_SECONDS", 0.01)
+    pool = ComfyUIPool([standin])
+    pool._pid = os.getpid()
+    return PromptCoalescer(pool, window_seconds=0.05, max_batch=4)
+
+
+def collect(futures):
+    return [future.result(timeout=10) for future in futures]
+
+
+def test_requests_in_one_window_share_a_prompt(coalescer):
+    futures = [
+        coalescer.submit(prompt="a lighthouse at dusk", batch_size=2),
+        coalescer.submit(prompt="a lighthouse at dusk"),
+        coalescer.submit(prompt="a harbour in fog", seed=7),
+    ]
+
+    results = collect(futures)
+
+    assert len({result["prompt_id"] for result in results}) == 1
+    assert [len(result["images"]) for result in results] == [2, 1, 1]
+    assert results[2]["seed"] == 7
+    assert all(result["metadata"]["coalesced_requests"] == 3 for result in results)
+
+
+def test_incompatible_requests_are_not_merged(coalescer):
+    futures = [
+        coalescer.submit(prompt="a lighthouse at dusk", steps=20),
+        coalescer.submit(prompt="a lighthouse at dusk", steps=30),
+    ]
+
+    results = collect(futures)
+
+    assert results[0]["prompt_id"] != results[1]["prompt_id"]
+
+
+def test_full_batch_is_sent_without_waiting(coalescer):
+    coalescer.window_seconds = 60
+
+    results = collect([coalescer.submit(prompt="a lighthouse at dusk", batch_size=4)])
+
+    assert len(results[0]["images"]) == 4
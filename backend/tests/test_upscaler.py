@@ -0,0 +1,55 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Tiled Upscaler Tests
+"""
+
+import numpy as np
+import pytest
+
+from app.services.upscaler import feather, tile_spans
+
+
+@pytest.mark.parametrize(
+    "length, tile, overlap",
+    [(512, 512, 32), (513, 512, 32), (1000, 256, 32), (4096, 512, 64), (700, 300, 0)],
+)
+def test_tiles_cover_the_edge_with_at_least_the_overlap(length, tile, overlap):
+    spans = tile_spans(length, tile, overlap)
+
+    assert spans[0][0] == 0
+    assert spans[-1][1] == length
+    assert all(end - start == min(tile, length) for start, end in spans)
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert previous_end - start >= overlap
+
+
+def test_short_edges_are_one_tile():
+    assert tile_spans(300, 512, 32) == [(0, 300)]
+
+
+def test_feather_ramps_from_existing_to_incoming():
+    existing = np.zeros((4, 8, 3), dtype=np.uint8)
+    incoming = np.full((4, 8, 3), 255, dtype=np.uint8)
+
+    columns = feather(existing, incoming, axis=1)[0, :, 0]
+
+    assert columns.dtype == np.uint8
+    assert list(columns) == sorted(columns)
+    # Half a step in from each side, so neither edge is a hard copy
+    assert 0 < columns[0] < 32
+    assert 223 < columns[-1] < 255
+
+
+def test_feather_along_rows_leaves_columns_uniform():
+    existing = np.full((8, 4, 3), 100, dtype=np.uint8)
+    incoming = np.full((8, 4, 3), 200, dtype=np.uint8)
+
+    blended = feather(existing, incoming, axis=0)
+
+    assert (blended == blended[:, :1]).all()
+    assert list(blended[:, 0, 0]) == sorted(blended[:, 0, 0])
+
+
+def test_feather_of_identical_tiles_is_seamless():
+    tile = np.random.default_rng(0).integers(0, 256, (6, 6, 3), dtype=np.uint8)
+
+    assert (feather(tile, tile.copy(), axis=1) == tile).all()
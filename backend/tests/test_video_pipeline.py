@@ -0,0 +1,54 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Video Pipeline Tests
+"""
+
+import pytest
+from PIL import Image
+
+from app.services.video_pipeline import HLSPlaylist, blend_frames, plan_segments
+
+
+@pytest.mark.parametrize(
+    "total, segment, overlap", [(48, 16, 4), (50, 16, 4), (10, 16, 4), (17, 16, 8)]
+)
+def test_segments_cover_the_clip_once(total, segment, overlap):
+    segments = plan_segments(total, segment, overlap)
+
+    starts = [s.start_frame for s in segments]
+    assert starts == [sum(s.frames for s in segments[:i]) for i in range(len(segments))]
+    assert sum(s.frames for s in segments) == total
+    assert max(s.frames for s in segments) - min(s.frames for s in segments) <= 1
+    # Only the seams are rendered twice, and never longer than a segment's half
+    assert segments[-1].overlap == 0
+    assert all(0 < s.overlap <= s.frames // 2 for s in segments[:-1])
+
+
+def test_crossfade_moves_from_the_old_segment_to_the_new(tmp_path):
+    old, new = [], []
+    for j in range(3):
+        old.append(str(tmp_path / f"old_{j}.png"))
+        new.append(str(tmp_path / f"new_{j}.png"))
+        Image.new("RGB", (8, 8), (0, 0, 0)).save(old[-1])
+        Image.new("RGB", (8, 8), (200, 200, 200)).save(new[-1])
+
+    blended = blend_frames(old, new, str(tmp_path))
+
+    levels = [Image.open(path).getpixel((0, 0))[0] for path in blended]
+    assert levels == [50, 100, 150]
+
+
+def test_playlist_is_only_ended_once_the_last_segment_is_published():
+    playlist = HLSPlaylist(target_duration=2.4)
+    playlist.add("segment_00000.ts", 2.0)
+
+    assert "#EXT-X-TARGETDURATION:3" in playlist.render()
+    assert "#EXT-X-ENDLIST" not in playlist.render()
+
+    playlist.add("segment_00001.ts", 1.5)
+    playlist.ended = True
+
+    assert playlist.render().splitlines()[-3:] == [
+        "#EXTINF:1.500,",
+        "segment_00001.ts",
+        "#EXT-X-ENDLIST",
+    ]
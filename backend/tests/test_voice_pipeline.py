@@ -0,0 +1,50 @@
+"""
+Jukeyman Autonomous Media Station (JAMS) - Voice Sentence Splitter Tests
+"""
+
+from app.services.voice_pipeline import split_sentences
+
+
+def test_splits_at_sentence_ends():
+    assert split_sentences("Hello there. How are you? Fine!  Good…", 200) == [
+        "Hello there.",
+        "How are you?",
+        "Fine!",
+        "Good…",
+    ]
+
+
+def test_quoted_exclamation_followed_by_lowercase_stays_together():
+    assert split_sentences('"Stop!" she said. "Why?" He left.', 200) == [
+        '"Stop!" she said.',
+        '"Why?"',
+        "He left.",
+    ]
+
+
+def test_line_breaks_end_a_chunk_and_whitespace_is_collapsed():
+    assert split_sentences("Chapter one\n\n  The   night\twas cold.", 200) == [
+        "Chapter one",
+        "The night was cold.",
+    ]
+
+
+def test_chunks_without_letters_or_digits_are_dropped():
+    assert split_sentences("Wait. ... !\n-- \n", 200) == ["Wait."]
+
+
+def test_long_sentences_break_at_clauses_then_spaces():
+    text = (
+        "The signal came back clearer than before, and somewhere under it "
+        "a second voice was counting slowly towards eleven; nobody answered."
+    )
+
+    chunks = split_sentences(text, 60)
+
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks) == text
+    assert chunks[0] == "The signal came back clearer than before,"
+
+
+def test_unbroken_text_is_cut_at_the_limit():
+    assert split_sentences("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
@@ -55,7 +55,7 @@ CREATE TABLE generations (
     tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     type VARCHAR(50) NOT NULL, -- 'image', 'video', 'voice', 'text'
-    status VARCHAR(50) NOT NULL DEFAULT 'queued', -- 'queued', 'processing', 'completed', 'failed'
+    status VARCHAR(50) NOT NULL DEFAULT 'queued', -- 'queued', 'processing', 'completed', 'failed', 'cancelled'
     prompt TEXT NOT NULL,
     negative_prompt TEXT,
     model VARCHAR(255) NOT NULL,
@@ -145,7 +145,7 @@ CREATE TABLE generation_jobs (
     tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     generation_id UUID REFERENCES generations(id) ON DELETE CASCADE,
-    celery_task_id VARCHAR(255) UNIQUE,
+    celery_task_id VARCHAR(255), -- Shared by every generation a batched task renders
     status VARCHAR(50) NOT NULL DEFAULT 'queued',
     queue_position INTEGER,
     started_at TIMESTAMP WITH TIME ZONE,
@@ -170,9 +170,11 @@ CREATE TABLE audit_logs (
 -- Create Indexes
 CREATE INDEX idx_users_tenant_email ON users(tenant_id, email);
 CREATE INDEX idx_users_email ON users(email);
-CREATE INDEX idx_generations_tenant_user ON generations(tenant_id, user_id);
+CREATE INDEX idx_generations_tenant_user_created ON generations(tenant_id, user_id, created_at DESC, id DESC); -- Keyset pages of list_generations
 CREATE INDEX idx_generations_status ON generations(status);
 CREATE INDEX idx_generations_created_at ON generations(created_at DESC);
+CREATE INDEX idx_generations_grid ON generations((parameters->>'grid_id')) WHERE parameters ? 'grid_id';
+CREATE INDEX idx_generation_jobs_celery_task ON generation_jobs(celery_task_id);
 CREATE INDEX idx_products_tenant ON products(tenant_id);
 CREATE INDEX idx_products_creator ON products(creator_id);
 CREATE INDEX idx_products_active_featured ON products(active, featured);
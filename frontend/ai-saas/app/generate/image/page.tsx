@@ -25,6 +25,17 @@ const imageSchema = z.object({
 
 type ImageFormData = z.infer<typeof imageSchema>
 
+// State pushed by GET /api/v1/generate/{id}/events
+type GenerationEvent = {
+  id: string
+  status: 'queued' | 'processing' | 'completed' | 'failed' | 'cancelled'
+  progress?: number | null
+  output_url?: string | null
+  output_urls?: string[] | null
+  error_message?: string | null
+  queue_position?: number | null
+}
+
 export default function ImageGenerationPage() {
   const [generating, setGenerating] = useState(false)
   const [progress, setProgress] = useState(0)
@@ -46,22 +57,68 @@ export default function ImageGenerationPage() {
     }
   })
 
+  const apiUrl = process.env.NEXT_PUBLIC_API_URL ?? ''
+
+  // EventSource cannot set headers, so it authenticates with a short-lived
+  // token scoped to this generation's stream instead of the session token
+  const streamToken = async (generationId: string) => {
+    const response = await fetch(`${apiUrl}/api/v1/generate/${generationId}/events/token`, {
+      method: 'POST',
+      headers: { Authorization: `Bearer ${localStorage.getItem('access_token') ?? ''}` },
+    })
+    if (!response.ok) {
+      throw new Error('Could not open the generation progress stream')
+    }
+    const { token } = await response.json()
+    return token as string
+  }
+
+  const followGeneration = (generationId: string) =>
+    new Promise<GenerationEvent>((resolve, reject) => {
+      const connect = async () => {
+        const token = await streamToken(generationId)
+        const source = new EventSource(
+          `${apiUrl}/api/v1/generate/${generationId}/events?token=${encodeURIComponent(token)}`
+        )
+
+        source.onmessage = (message) => {
+          const event: GenerationEvent = JSON.parse(message.data)
+          if (event.progress != null) {
+            setProgress(event.progress)
+          }
+          if (event.status === 'completed') {
+            source.close()
+            resolve(event)
+          } else if (event.status === 'failed' || event.status === 'cancelled') {
+            source.close()
+            reject(new Error(event.error_message ?? `Generation ${event.status}`))
+          }
+        }
+
+        // The stream token has expired by the time the browser would retry,
+        // so reconnect with a fresh one instead
+        source.onerror = () => {
+          source.close()
+          setTimeout(() => {
+            connect().catch(() => reject(new Error('Lost connection to the generation progress stream')))
+          }, 1000)
+        }
+      }
+
+      connect().catch(reject)
+    })
+
   const onSubmit = async (data: ImageFormData) => {
     setGenerating(true)
     setProgress(0)
     setResult(null)
 
     try {
-      // Simulate progress updates (in real app, use WebSocket)
-      const progressInterval = setInterval(() => {
-        setProgress(prev => Math.min(prev + 10, 90))
-      }, 500)
-
-      const response = await generateImage(data)
+      const generation = await generateImage(data)
+      const event = await followGeneration(generation.id)
 
-      clearInterval(progressInterval)
       setProgress(100)
-      setResult(response.image_url)
+      setResult(event.output_url ?? event.output_urls?.[0] ?? null)
 
       toast({
         title: 'Success!',
@@ -61,7 +61,7 @@ sleep 15
 cd ~/jams
 echo ""
 echo "🔧 Starting Backend services..."
-docker-compose up -d backend celery-worker celery-flower n8n prometheus grafana
+docker-compose up -d backend celery-worker celery-collect celery-upload celery-finalize celery-postprocess celery-flower n8n prometheus grafana
 
 echo ""
 echo "✅ All services started!"